@@ -1,5 +1,3 @@
-import random
-
 from Classes.Constants import *
 from Classes.Materials import Materials
 from Classes.TradeOffer import TradeOffer
@@ -10,14 +8,14 @@ class AdrianHerasAgent(AgentInterface):
     """
     Es necesario poner super().nombre_de_funcion() para asegurarse de que coge la función del padre
     """
-    town_number = 0
-    material_given_more_than_three = None
-    # Son los materiales más necesarios en construcciones, luego se piden con year of plenty para tener en mano
-    year_of_plenty_material_one = MaterialConstants.CEREAL
-    year_of_plenty_material_two = MaterialConstants.MINERAL
 
     def __init__(self, agent_id):
         super().__init__(agent_id)
+        self.town_number = 0
+        self.material_given_more_than_three = None
+        # Son los materiales más necesarios en construcciones, luego se piden con year of plenty para tener en mano
+        self.year_of_plenty_material_one = MaterialConstants.CEREAL
+        self.year_of_plenty_material_two = MaterialConstants.MINERAL
 
     def on_trade_offer(self, board_instance, offer=TradeOffer(), player_id=int):
         """
@@ -125,7 +123,7 @@ class AdrianHerasAgent(AgentInterface):
                 for i in range(0, total_given_materials):
                     # Se mezcla el orden de materiales
                     order = [MaterialConstants.CLAY, MaterialConstants.WOOD, MaterialConstants.WOOL]
-                    random.shuffle(order)
+                    self.rng.shuffle(order)
                     # una vez mezclado se recorre el orden de los materiales y se coge el primero que tenga un valor
                     for mat in order:
                         if self.hand.resources.get_from_id(mat) > 0:
@@ -173,7 +171,7 @@ class AdrianHerasAgent(AgentInterface):
                     # Se mezcla el orden de materiales
                     order = [MaterialConstants.CEREAL, MaterialConstants.MINERAL, MaterialConstants.CLAY,
                              MaterialConstants.WOOD, MaterialConstants.WOOL]
-                    random.shuffle(order)
+                    self.rng.shuffle(order)
                     # una vez mezclado se recorre el orden de los materiales y se coge el primero que tenga un valor
                     for mat in order:
                         if self.hand.resources.get_from_id(mat) > 1 or mat == MaterialConstants.MINERAL:
@@ -254,10 +252,10 @@ class AdrianHerasAgent(AgentInterface):
 
             # Asumiendo que no hay ninguna ideal (es decir, robarse los puertos),
             #   construye una carretera aleatoria, el 60% de las veces
-            will_build = random.randint(0, 2)
+            will_build = self.rng.randint(0, 2)
             if will_build:
                 if len(possibilities):
-                    road_node = random.randint(0, len(possibilities) - 1)
+                    road_node = self.rng.randint(0, len(possibilities) - 1)
                     return {'building': BuildConstants.ROAD,
                             'node_id': possibilities[road_node]['starting_node'],
                             'road_to': possibilities[road_node]['finishing_node']}
@@ -285,14 +283,14 @@ class AdrianHerasAgent(AgentInterface):
 
         # Si no hay ningún nodo ideal, se elige aleatoriamente entre las opciones
         if chosen_node_id == -1:
-            chosen_node_id = possibilities[random.randint(0, len(possibilities) - 1)]
+            chosen_node_id = possibilities[self.rng.randint(0, len(possibilities) - 1)]
 
         # Sumamos 1 a la cantidad de pueblos creados
         self.town_number += 1
 
         # Se elige una carretera aleatoria entre todas las opciones
         possible_roads = self.board.nodes[chosen_node_id]['adjacent']
-        chosen_road_to_id = possible_roads[random.randint(0, len(possible_roads) - 1)]
+        chosen_road_to_id = possible_roads[self.rng.randint(0, len(possible_roads) - 1)]
 
         return chosen_node_id, chosen_road_to_id
 
@@ -308,8 +306,8 @@ class AdrianHerasAgent(AgentInterface):
         # pero se dejan por si acaso
         if len(valid_nodes) > 1:
             while True:
-                road_node = random.randint(0, len(valid_nodes) - 1)
-                road_node_2 = random.randint(0, len(valid_nodes) - 1)
+                road_node = self.rng.randint(0, len(valid_nodes) - 1)
+                road_node_2 = self.rng.randint(0, len(valid_nodes) - 1)
                 if road_node != road_node_2:
                     return {'node_id': valid_nodes[road_node]['starting_node'],
                             'road_to': valid_nodes[road_node]['finishing_node'],
@@ -1,5 +1,3 @@
-import random
-
 from Classes.Constants import *
 from Classes.Materials import Materials
 from Classes.TradeOffer import TradeOffer
@@ -57,10 +55,10 @@ class AlexPastorAgent(AgentInterface):
         return {'terrain': terrain_with_thief_id, 'player': -1}
 
     def on_commerce_phase(self):
-        if len(self.development_cards_hand.hand) and random.randint(0, 1):
+        if len(self.development_cards_hand.hand) and self.rng.randint(0, 1):
             return self.development_cards_hand.select_card(0)
 
-        answer = random.randint(0, 1)
+        answer = self.rng.randint(0, 1)
         if answer:
             if self.hand.resources.cereal >= 4:
                 return {'gives': MaterialConstants.CEREAL, 'receives': MaterialConstants.MINERAL}
@@ -75,39 +73,39 @@ class AlexPastorAgent(AgentInterface):
 
             return None
         else:
-            gives = Materials(random.randint(0, self.hand.resources.cereal),
-                              random.randint(0, self.hand.resources.mineral),
-                              random.randint(0, self.hand.resources.clay),
-                              random.randint(0, self.hand.resources.wood),
-                              random.randint(0, self.hand.resources.wool))
-            receives = Materials(random.randint(0, self.hand.resources.cereal),
-                                 random.randint(0, self.hand.resources.mineral),
-                                 random.randint(0, self.hand.resources.clay),
-                                 random.randint(0, self.hand.resources.wood),
-                                 random.randint(0, self.hand.resources.wool))
+            gives = Materials(self.rng.randint(0, self.hand.resources.cereal),
+                              self.rng.randint(0, self.hand.resources.mineral),
+                              self.rng.randint(0, self.hand.resources.clay),
+                              self.rng.randint(0, self.hand.resources.wood),
+                              self.rng.randint(0, self.hand.resources.wool))
+            receives = Materials(self.rng.randint(0, self.hand.resources.cereal),
+                                 self.rng.randint(0, self.hand.resources.mineral),
+                                 self.rng.randint(0, self.hand.resources.clay),
+                                 self.rng.randint(0, self.hand.resources.wood),
+                                 self.rng.randint(0, self.hand.resources.wool))
             trade_offer = TradeOffer(gives, receives)
             return trade_offer
 
     def on_build_phase(self, board_instance):
         self.board = board_instance
 
-        if len(self.development_cards_hand.hand) and random.randint(0, 1):
+        if len(self.development_cards_hand.hand) and self.rng.randint(0, 1):
             return self.development_cards_hand.select_card(0)
 
-        answer = random.randint(0, 2)
+        answer = self.rng.randint(0, 2)
         # Pueblo / carretera
         if self.hand.resources.has_more(BuildConstants.TOWN) and answer == 0:
-            answer = random.randint(0, 1)
+            answer = self.rng.randint(0, 1)
             # Elegimos aleatoriamente si hacer un pueblo o una carretera
             if answer:
                 valid_nodes = self.board.valid_town_nodes(self.id)
                 if len(valid_nodes):
-                    town_node = random.randint(0, len(valid_nodes) - 1)
+                    town_node = self.rng.randint(0, len(valid_nodes) - 1)
                     return {'building': BuildConstants.TOWN, 'node_id': valid_nodes[town_node]}
             else:
                 valid_nodes = self.board.valid_road_nodes(self.id)
                 if len(valid_nodes):
-                    road_node = random.randint(0, len(valid_nodes) - 1)
+                    road_node = self.rng.randint(0, len(valid_nodes) - 1)
                     return {'building': BuildConstants.ROAD,
                             'node_id': valid_nodes[road_node]['starting_node'],
                             'road_to': valid_nodes[road_node]['finishing_node']}
@@ -116,7 +114,7 @@ class AlexPastorAgent(AgentInterface):
         elif self.hand.resources.has_more(BuildConstants.CITY) and answer == 1:
             valid_nodes = self.board.valid_city_nodes(self.id)
             if len(valid_nodes):
-                city_node = random.randint(0, len(valid_nodes) - 1)
+                city_node = self.rng.randint(0, len(valid_nodes) - 1)
                 return {'building': BuildConstants.CITY, 'node_id': valid_nodes[city_node]}
 
         # Carta de desarrollo
@@ -129,15 +127,15 @@ class AlexPastorAgent(AgentInterface):
         return super().on_game_start(board_instance)
 
     def on_monopoly_card_use(self):
-        material = random.randint(0, 4)
+        material = self.rng.randint(0, 4)
         return material
 
     def on_road_building_card_use(self):
         valid_nodes = self.board.valid_road_nodes(self.id)
         if len(valid_nodes) > 1:
             while True:
-                road_node = random.randint(0, len(valid_nodes) - 1)
-                road_node_2 = random.randint(0, len(valid_nodes) - 1)
+                road_node = self.rng.randint(0, len(valid_nodes) - 1)
+                road_node_2 = self.rng.randint(0, len(valid_nodes) - 1)
                 if road_node != road_node_2:
                     return {'node_id': valid_nodes[road_node]['starting_node'],
                             'road_to': valid_nodes[road_node]['finishing_node'],
@@ -153,5 +151,5 @@ class AlexPastorAgent(AgentInterface):
         return None
 
     def on_year_of_plenty_card_use(self):
-        material, material2 = random.randint(0, 4), random.randint(0, 4)
+        material, material2 = self.rng.randint(0, 4), self.rng.randint(0, 4)
         return {'material': material, 'material_2': material2}
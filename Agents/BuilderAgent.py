@@ -0,0 +1,45 @@
+from Classes.Constants import BuildConstants
+from Interfaces.AgentInterface import AgentInterface
+
+
+class BuilderAgent(AgentInterface):
+    """
+    Agente con una política fija, sin comercio ni cartas de desarrollo: en la fase de construcción construye lo primero
+    de BUILD_PRIORITY que pueda pagar y que sea legal, eligiendo al azar entre las jugadas legales.
+
+    Es la misma política que juega el motor vectorizado (Managers/BatchGameEngine.py), así que sirve para comparar los
+    resultados de los dos.
+    """
+    BUILD_PRIORITY = (BuildConstants.CITY, BuildConstants.TOWN, BuildConstants.ROAD)
+
+    def __init__(self, agent_id):
+        super().__init__(agent_id)
+
+    def on_game_start(self, board_instance):
+        self.board = board_instance
+        node_id = self.rng.choice(self.board.valid_starting_nodes())
+        possible_roads = self.board.nodes[node_id]['adjacent']
+        return node_id, possible_roads[self.rng.randint(0, len(possible_roads) - 1)]
+
+    def on_moving_thief(self):
+        # Cualquier terreno menos en el que ya está, robando a un rival al azar de los que tengan pueblo en él
+        thief_terrain = self.board.state.thief
+        terrain = self.rng.choice([terrain_id for terrain_id in range(19) if terrain_id != thief_terrain])
+        players = []
+        for node_id in self.board.terrain[terrain]['contacting_nodes']:
+            player = self.board.nodes[node_id]['player']
+            if player not in (-1, self.id) and player not in players:
+                players.append(player)
+        return {'terrain': terrain, 'player': self.rng.choice(players) if players else -1}
+
+    def on_build_phase(self, board_instance):
+        self.board = board_instance
+        legal_moves = self.board.moves.legal_moves(self.id, self.hand, cards_left=False)
+        for building in self.BUILD_PRIORITY:
+            if not legal_moves[building]:
+                continue
+            if building == BuildConstants.ROAD:
+                road = self.rng.choice(legal_moves[building])
+                return {'building': building, 'node_id': road['starting_node'], 'road_to': road['finishing_node']}
+            return {'building': building, 'node_id': self.rng.choice(legal_moves[building]), 'road_to': None}
+        return None
@@ -1,5 +1,3 @@
-import random
-
 from Classes.Constants import MaterialConstants, BuildConstants
 from Classes.Materials import Materials
 from Classes.TradeOffer import TradeOffer
@@ -14,19 +12,19 @@ class RandomAgent(AgentInterface):
         super().__init__(agent_id)
 
     def on_trade_offer(self, board_instance, offer=TradeOffer(), player_id=int):
-        answer = random.randint(0, 2)
+        answer = self.rng.randint(0, 2)
         if answer:
             if answer == 2:
-                gives = Materials(random.randint(0, self.hand.resources.cereal),
-                                  random.randint(0, self.hand.resources.mineral),
-                                  random.randint(0, self.hand.resources.clay),
-                                  random.randint(0, self.hand.resources.wood),
-                                  random.randint(0, self.hand.resources.wool))
-                receives = Materials(random.randint(0, self.hand.resources.cereal),
-                                     random.randint(0, self.hand.resources.mineral),
-                                     random.randint(0, self.hand.resources.clay),
-                                     random.randint(0, self.hand.resources.wood),
-                                     random.randint(0, self.hand.resources.wool))
+                gives = Materials(self.rng.randint(0, self.hand.resources.cereal),
+                                  self.rng.randint(0, self.hand.resources.mineral),
+                                  self.rng.randint(0, self.hand.resources.clay),
+                                  self.rng.randint(0, self.hand.resources.wood),
+                                  self.rng.randint(0, self.hand.resources.wool))
+                receives = Materials(self.rng.randint(0, self.hand.resources.cereal),
+                                     self.rng.randint(0, self.hand.resources.mineral),
+                                     self.rng.randint(0, self.hand.resources.clay),
+                                     self.rng.randint(0, self.hand.resources.wood),
+                                     self.rng.randint(0, self.hand.resources.wool))
                 return TradeOffer(gives, receives)
             else:
                 return True
@@ -35,7 +33,7 @@ class RandomAgent(AgentInterface):
 
     def on_turn_start(self):
         # self.development_cards_hand.add_card(DevelopmentCard(99, 0, 0))
-        if len(self.development_cards_hand.hand) and random.randint(0, 1):
+        if len(self.development_cards_hand.hand) and self.rng.randint(0, 1):
             return self.development_cards_hand.select_card(0)
         return None
 
@@ -43,7 +41,7 @@ class RandomAgent(AgentInterface):
         return self.hand
 
     def on_moving_thief(self):
-        terrain = random.randint(0, 18)
+        terrain = self.rng.randint(0, 18)
         player = -1
         for node in self.board.terrain[terrain]['contacting_nodes']:
             if self.board.nodes[node]['player'] != -1:
@@ -51,15 +49,15 @@ class RandomAgent(AgentInterface):
         return {'terrain': terrain, 'player': player}
 
     def on_turn_end(self):
-        if len(self.development_cards_hand.hand) and random.randint(0, 1):
+        if len(self.development_cards_hand.hand) and self.rng.randint(0, 1):
             return self.development_cards_hand.select_card(0)
         return None
 
     def on_commerce_phase(self):
-        if len(self.development_cards_hand.hand) and random.randint(0, 1):
+        if len(self.development_cards_hand.hand) and self.rng.randint(0, 1):
             return self.development_cards_hand.select_card(0)
 
-        answer = random.randint(0, 1)
+        answer = self.rng.randint(0, 1)
         if answer:
             if self.hand.resources.cereal >= 4:
                 return {'gives': MaterialConstants.CEREAL, 'receives': MaterialConstants.MINERAL}
@@ -74,39 +72,39 @@ class RandomAgent(AgentInterface):
 
             return None
         else:
-            gives = Materials(random.randint(0, self.hand.resources.cereal),
-                              random.randint(0, self.hand.resources.mineral),
-                              random.randint(0, self.hand.resources.clay),
-                              random.randint(0, self.hand.resources.wood),
-                              random.randint(0, self.hand.resources.wool))
-            receives = Materials(random.randint(0, self.hand.resources.cereal),
-                                 random.randint(0, self.hand.resources.mineral),
-                                 random.randint(0, self.hand.resources.clay),
-                                 random.randint(0, self.hand.resources.wood),
-                                 random.randint(0, self.hand.resources.wool))
+            gives = Materials(self.rng.randint(0, self.hand.resources.cereal),
+                              self.rng.randint(0, self.hand.resources.mineral),
+                              self.rng.randint(0, self.hand.resources.clay),
+                              self.rng.randint(0, self.hand.resources.wood),
+                              self.rng.randint(0, self.hand.resources.wool))
+            receives = Materials(self.rng.randint(0, self.hand.resources.cereal),
+                                 self.rng.randint(0, self.hand.resources.mineral),
+                                 self.rng.randint(0, self.hand.resources.clay),
+                                 self.rng.randint(0, self.hand.resources.wood),
+                                 self.rng.randint(0, self.hand.resources.wool))
             trade_offer = TradeOffer(gives, receives)
             return trade_offer
 
     def on_build_phase(self, board_instance):
         self.board = board_instance
 
-        if len(self.development_cards_hand.hand) and random.randint(0, 1):
+        if len(self.development_cards_hand.hand) and self.rng.randint(0, 1):
             return self.development_cards_hand.select_card(0)
 
-        answer = random.randint(0, 2)
+        answer = self.rng.randint(0, 2)
         # Pueblo / carretera
         if self.hand.resources.has_more(BuildConstants.TOWN) and answer == 0:
-            answer = random.randint(0, 1)
+            answer = self.rng.randint(0, 1)
             # Elegimos aleatoriamente si hacer un pueblo o una carretera
             if answer:
                 valid_nodes = self.board.valid_town_nodes(self.id)
                 if len(valid_nodes):
-                    town_node = random.randint(0, len(valid_nodes) - 1)
+                    town_node = self.rng.randint(0, len(valid_nodes) - 1)
                     return {'building': BuildConstants.TOWN, 'node_id': valid_nodes[town_node]}
             else:
                 valid_nodes = self.board.valid_road_nodes(self.id)
                 if len(valid_nodes):
-                    road_node = random.randint(0, len(valid_nodes) - 1)
+                    road_node = self.rng.randint(0, len(valid_nodes) - 1)
                     return {'building': BuildConstants.ROAD,
                             'node_id': valid_nodes[road_node]['starting_node'],
                             'road_to': valid_nodes[road_node]['finishing_node']}
@@ -115,7 +113,7 @@ class RandomAgent(AgentInterface):
         elif self.hand.resources.has_more(BuildConstants.CITY) and answer == 1:
             valid_nodes = self.board.valid_city_nodes(self.id)
             if len(valid_nodes):
-                city_node = random.randint(0, len(valid_nodes) - 1)
+                city_node = self.rng.randint(0, len(valid_nodes) - 1)
                 return {'building': BuildConstants.CITY, 'node_id': valid_nodes[city_node]}
 
         # Carta de desarrollo
@@ -128,7 +126,7 @@ class RandomAgent(AgentInterface):
         return super().on_game_start(board_instance)
 
     def on_monopoly_card_use(self):
-        material = random.randint(0, 4)
+        material = self.rng.randint(0, 4)
         return material
 
     # noinspection DuplicatedCode
@@ -136,8 +134,8 @@ class RandomAgent(AgentInterface):
         valid_nodes = self.board.valid_road_nodes(self.id)
         if len(valid_nodes) > 1:
             while True:
-                road_node = random.randint(0, len(valid_nodes) - 1)
-                road_node_2 = random.randint(0, len(valid_nodes) - 1)
+                road_node = self.rng.randint(0, len(valid_nodes) - 1)
+                road_node_2 = self.rng.randint(0, len(valid_nodes) - 1)
                 if road_node != road_node_2:
                     return {'node_id': valid_nodes[road_node]['starting_node'],
                             'road_to': valid_nodes[road_node]['finishing_node'],
@@ -153,5 +151,5 @@ class RandomAgent(AgentInterface):
         return None
 
     def on_year_of_plenty_card_use(self):
-        material, material2 = random.randint(0, 4), random.randint(0, 4)
+        material, material2 = self.rng.randint(0, 4), self.rng.randint(0, 4)
         return {'material': material, 'material_2': material2}
@@ -0,0 +1,123 @@
+import argparse
+import math
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))  # Para poder importar los módulos del simulador
+
+import numpy as np
+
+from Agents.BuilderAgent import BuilderAgent
+from Classes.Constants import TraceLevelConstants
+from Managers.BatchGameEngine import BatchGameEngine
+from Managers.GameDirector import GameDirector
+
+
+def chi_square_homogeneity(first_counts, second_counts):
+    """
+    Test chi-cuadrado de que dos muestras vienen de la misma distribución categórica
+    :param first_counts: [int...]
+    :param second_counts: [int...]
+    :return: float, int, float. Estadístico, grados de libertad y p-valor
+    """
+    table = np.array([first_counts, second_counts], dtype=float)
+    table = table[:, table.sum(axis=0) > 0]
+    expected = table.sum(axis=1, keepdims=True) * table.sum(axis=0, keepdims=True) / table.sum()
+    statistic = float(((table - expected) ** 2 / expected).sum())
+    degrees = table.shape[1] - 1
+    return statistic, degrees, chi_square_p_value(statistic, degrees)
+
+
+def chi_square_p_value(statistic, degrees):
+    """
+    P(X >= statistic) para una chi-cuadrado, con la serie de la gamma incompleta
+    """
+    if statistic <= 0:
+        return 1.0
+    a, x = degrees / 2, statistic / 2
+    term = total = 1 / a
+    for n in range(1, 500):
+        term *= x / (a + n)
+        total += term
+    return max(0.0, 1 - total * math.exp(-x + a * math.log(x) - math.lgamma(a)))
+
+
+def kolmogorov_smirnov(first, second):
+    """
+    Test de Kolmogorov-Smirnov de dos muestras
+    :param first: np.array
+    :param second: np.array
+    :return: float, float. Estadístico D y p-valor asintótico
+    """
+    values = np.union1d(first, second)
+    first_cdf = np.searchsorted(np.sort(first), values, side='right') / len(first)
+    second_cdf = np.searchsorted(np.sort(second), values, side='right') / len(second)
+    statistic = float(np.abs(first_cdf - second_cdf).max())
+    effective = math.sqrt(len(first) * len(second) / (len(first) + len(second)))
+    lam = (effective + 0.12 + 0.11 / effective) * statistic
+    p_value = 2 * sum((-1) ** (k - 1) * math.exp(-2 * k * k * lam * lam) for k in range(1, 101))
+    return statistic, min(1.0, max(0.0, p_value))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara BatchGameEngine con el GameDirector jugando BuilderAgent en '
+                                                 'los 4 asientos: tiempo por partida y distribución de resultados')
+    parser.add_argument('--director-games', type=int, default=300, help='Partidas con el GameDirector')
+    parser.add_argument('--batch-games', type=int, default=3000, help='Partidas con el motor vectorizado')
+    parser.add_argument('--max-rounds', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    game_director = GameDirector(agents=(BuilderAgent,) * 4, max_rounds=args.max_rounds,
+                                 trace_level=TraceLevelConstants.NONE)
+    start = time.perf_counter()
+    summaries = []
+    for game_number in range(args.director_games):
+        summaries.append(game_director.game_start(game_number, print_outcome=False, seed=args.seed + game_number))
+    director_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine = BatchGameEngine(args.batch_games, max_rounds=args.max_rounds, seed=args.seed)
+    results = engine.run()
+    batch_time = time.perf_counter() - start
+
+    director = {
+        'winner': np.array([summary['winner'] for summary in summaries]),
+        'longest_road': np.array([summary['longest_road'] for summary in summaries]),
+        'rounds': np.array([summary['rounds'] for summary in summaries]),
+        'victory_points': np.array([summary['victory_points'] for summary in summaries]),
+    }
+
+    print('GameDirector:    ' + str(round(director_time / args.director_games * 1000, 2)) + ' ms/game (' +
+          str(args.director_games) + ' games)')
+    print('BatchGameEngine: ' + str(round(batch_time / args.batch_games * 1000, 2)) + ' ms/game (' +
+          str(args.batch_games) + ' games)')
+    print('Speedup: ' + str(round((director_time / args.director_games) / (batch_time / args.batch_games), 1)) + 'x')
+    print()
+
+    for key in ('winner', 'longest_road'):
+        director_counts = np.bincount(director[key] + 1, minlength=5)
+        batch_counts = np.bincount(results[key] + 1, minlength=5)
+        statistic, degrees, p_value = chi_square_homogeneity(director_counts, batch_counts)
+        print(key + ' (none, P0, P1, P2, P3)')
+        print('  GameDirector:    ' + str(np.round(director_counts / director_counts.sum(), 3).tolist()))
+        print('  BatchGameEngine: ' + str(np.round(batch_counts / batch_counts.sum(), 3).tolist()))
+        print('  chi2 = ' + str(round(statistic, 2)) + ' (df ' + str(degrees) + '), p = ' + str(round(p_value, 3)))
+
+    statistic, p_value = kolmogorov_smirnov(director['rounds'], results['rounds'])
+    print('rounds')
+    print('  GameDirector:    mean ' + str(round(director['rounds'].mean(), 1)) + ', median ' +
+          str(np.median(director['rounds'])))
+    print('  BatchGameEngine: mean ' + str(round(results['rounds'].mean(), 1)) + ', median ' +
+          str(np.median(results['rounds'])))
+    print('  KS D = ' + str(round(statistic, 3)) + ', p = ' + str(round(p_value, 3)))
+
+    print('mean victory points')
+    print('  GameDirector:    ' + str(np.round(director['victory_points'].mean(axis=0), 2).tolist()))
+    print('  BatchGameEngine: ' + str(np.round(results['victory_points'].mean(axis=0), 2).tolist()))
+    return
+
+
+if __name__ == '__main__':
+    main()
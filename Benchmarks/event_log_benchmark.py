@@ -0,0 +1,72 @@
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))  # Para poder importar los módulos del simulador
+
+import numpy as np
+
+from Agents.AdrianHerasAgent import AdrianHerasAgent
+from Agents.AlexPastorAgent import AlexPastorAgent
+from Agents.BuilderAgent import BuilderAgent
+from Agents.RandomAgent import RandomAgent
+from Classes.Constants import TraceLevelConstants
+from Managers.GameDirector import GameDirector
+from TraceLoader.EventLog import EventLog, EventLogReader
+from TraceLoader.TraceStream import TraceStream
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Escribe N partidas en un EventLog y en un fichero JSON Lines de '
+                                                 'trazas de eventos, y mide lo que cuesta ir a una partida o a una '
+                                                 'ronda en cada uno')
+    parser.add_argument('--games', type=int, default=5000)
+    parser.add_argument('--played', type=int, default=20, help='Partidas que se juegan. Se repiten hasta --games')
+    parser.add_argument('--lookups', type=int, default=1000)
+    args = parser.parse_args()
+
+    game_director = GameDirector(agents=(AlexPastorAgent, BuilderAgent, RandomAgent, AdrianHerasAgent),
+                                 max_rounds=200, trace_level=TraceLevelConstants.EVENTS)
+    game_director.trace_loader.export_to_file = lambda game_number: None
+    traces = [game_director.game_start(game_number, False, seed=game_number) for game_number in range(args.played)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        for sink in (EventLog(directory / 'games.events'), TraceStream(directory / 'games.jsonl')):
+            start = time.perf_counter()
+            for game_number in range(args.games):
+                sink.write(game_number, traces[game_number % args.played])
+            sink.close()
+            print(type(sink).__name__ + ' write: ' + str(round(time.perf_counter() - start, 2)) + ' s, ' +
+                  str(round(sink.path.stat().st_size / 2 ** 20, 1)) + ' MiB')
+
+        start = time.perf_counter()
+        reader = EventLogReader(directory / 'games.events')
+        print('EventLogReader open: ' + str(round((time.perf_counter() - start) * 1000, 2)) + ' ms, ' +
+              str(sum(len(events) for events in reader.records)) + ' records')
+
+        rng = random.Random(0)
+        game_numbers = [rng.randrange(args.games) for _ in range(args.lookups)]
+        start = time.perf_counter()
+        for game_number in game_numbers:
+            np.count_nonzero(reader.game(game_number)['event_type'] == EventLog.event_type('trade'))
+        print('Game lookup: ' + str(round((time.perf_counter() - start) / args.lookups * 1e6, 1)) + ' us')
+        start = time.perf_counter()
+        for game_number in game_numbers:
+            np.count_nonzero(reader.round(game_number, 10)['event_type'] == EventLog.event_type('trade'))
+        print('Round lookup: ' + str(round((time.perf_counter() - start) / args.lookups * 1e6, 1)) + ' us')
+
+        # Sin índice, hay que leer el fichero JSON Lines hasta la partida
+        start = time.perf_counter()
+        lookups = max(1, args.lookups // 200)
+        for game_number in game_numbers[:lookups]:
+            next(trace for trace in TraceStream.read(directory / 'games.jsonl')
+                 if trace['game_number'] == game_number)
+        print('JSON Lines game lookup: ' + str(round((time.perf_counter() - start) / lookups * 1e6, 1)) + ' us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))  # Para poder importar los módulos del simulador
+
+from Classes.Board import Board
+from Managers.GameManager import GameManager
+
+
+def build_road_from_card(board, player, card_obj):
+    """
+    Construye las carreteras de una carta de construir carreteras guardada en la traza
+    :param board: Board()
+    :param player: int
+    :param card_obj: dict
+    :return: None
+    """
+    if card_obj.get('played_card') != 'road_building' or not card_obj.get('roads'):
+        return
+    roads = card_obj['roads']
+    board.build_road(player, roads['node_id'], roads['road_to'])
+    if roads['node_id_2'] is not None:
+        board.build_road(player, roads['node_id_2'], roads['road_to_2'])
+
+
+def replay_turns(trace):
+    """
+    Reconstruye el tablero a partir de una traza y devuelve el tablero tras cada final de turno
+    :param trace: dict. Traza de una partida
+    :return: generator(Board)
+    """
+    board = Board()
+    setup = trace['setup']
+    order = [(player, 0) for player in range(4)] + [(player, 1) for player in range(3, -1, -1)]
+    for player, placement in order:
+        placement_obj = setup['P' + str(player)][placement]
+        board.nodes[placement_obj['id']]['player'] = player
+        board.build_road(player, placement_obj['id'], placement_obj['road'])
+
+    for round_obj in trace['game'].values():
+        for turn_key, turn_obj in round_obj.items():
+            player = int(turn_key[-1])
+            for card_obj in turn_obj['start_turn']['development_card_played']:
+                build_road_from_card(board, player, card_obj)
+            for commerce_obj in turn_obj['commerce_phase']:
+                build_road_from_card(board, player, commerce_obj.get('development_card_played', {}))
+            for build_obj in turn_obj['build_phase']:
+                if build_obj.get('building') == 'played_card':
+                    build_road_from_card(board, player, build_obj['development_card_played'])
+                elif build_obj.get('finished') and build_obj['building'] == 'town':
+                    board.nodes[build_obj['node_id']]['player'] = player
+                elif build_obj.get('finished') and build_obj['building'] == 'road':
+                    board.build_road(player, build_obj['node_id'], build_obj['road_to'])
+            if 'end_turn' in turn_obj:
+                for card_obj in turn_obj['end_turn']['development_card_played']:
+                    build_road_from_card(board, player, card_obj)
+            yield board
+
+
+def old_longest_road(game_manager):
+    """
+    Cálculo anterior: búsqueda desde los 54 nodos del tablero en cada turno
+    :param game_manager: GameManager()
+    :return: int
+    """
+    longest_road = 0
+    for node in game_manager.board.nodes:
+        longest_road_obj = game_manager.longest_road_calculator(node, 1, {'longest_road': 0, 'player': -1}, -1,
+                                                                [node['id']])
+        longest_road = max(longest_road, longest_road_obj['longest_road'])
+    return longest_road
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara el cálculo de la carretera más larga anterior con '
+                                                 'RoadNetwork usando las trazas guardadas')
+    parser.add_argument('--traces', default=str(Path(__file__).parent.parent / 'Tests' / 'test_traces'),
+                        help='Carpeta con las trazas game_N.json')
+    parser.add_argument('--games', type=int, default=20, help='Número de trazas a reproducir')
+    args = parser.parse_args()
+
+    game_manager = GameManager(for_test=True)
+    turns = 0
+    old_time = 0.0
+    new_time = 0.0
+    longer = 0
+    shorter = 0
+
+    for i in range(args.games):
+        with open(Path(args.traces) / ('game_' + str(i) + '.json')) as trace_file:
+            trace = json.load(trace_file)
+
+        for board in replay_turns(trace):
+            game_manager.board = board
+            turns += 1
+
+            start = time.perf_counter()
+            old_length = old_longest_road(game_manager)
+            old_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            new_length = board.road_network.longest_road()['longest_road']
+            new_time += time.perf_counter() - start
+
+            if new_length > old_length:
+                longer += 1
+            elif new_length < old_length:
+                shorter += 1
+
+    print('Games: ' + str(args.games) + ' | Turns: ' + str(turns))
+    print('longest_road_calculator (54 nodes): ' + str(round(old_time, 3)) + ' s (' +
+          str(round(old_time / turns * 1e6, 1)) + ' us/turn)')
+    print('RoadNetwork (incremental):          ' + str(round(new_time, 3)) + ' s (' +
+          str(round(new_time / turns * 1e6, 1)) + ' us/turn)')
+    print('Speedup: ' + str(round(old_time / new_time, 1)) + 'x')
+    print('Turns where RoadNetwork finds a longer road: ' + str(longer) + ' | shorter: ' + str(shorter))
+    return
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import operator as op
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))  # Para poder importar los módulos del simulador
+
+from Classes.Constants import BuildConstants, BuildMaterialsConstants, MaterialConstants
+from Classes.Hand import Hand
+from Classes.Materials import Materials
+
+
+class LegacyHand:
+    """
+    Mano tal y como funcionaba antes de ResourceVector: cada suma crea tres Materials nuevos (from_ids contando cada id,
+    la suma con map y replace_negative) y has_more compara con map
+    """
+
+    def __init__(self):
+        self.resources = Materials(0, 0, 0, 0, 0)
+
+    def add_material(self, resource_id, amount):
+        ids = [resource_id] if isinstance(resource_id, int) else resource_id
+        materials = Materials(*[amount * ids.count(id) for id in range(5)])
+        materials = Materials(*map(op.add, materials, self.resources))
+        self.resources = Materials(*[0 if n < 0 else n for n in materials])
+
+    def remove_material(self, resource, amount):
+        self.add_material(resource, -amount)
+
+    def has_more(self, materials):
+        if isinstance(materials, str):
+            materials = Materials(*BuildMaterialsConstants[materials])
+        return all(map(op.le, materials, self.resources))
+
+
+def run(name, statement, setup_globals, number):
+    seconds = min(timeit.repeat(statement, globals=setup_globals, number=number, repeat=5))
+    return seconds / number * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara la mano basada en Materials con la basada en ResourceVector')
+    parser.add_argument('--number', type=int, default=100000, help='Repeticiones de cada operación')
+    args = parser.parse_args()
+
+    town_list = [MaterialConstants.CEREAL, MaterialConstants.CLAY, MaterialConstants.WOOD, MaterialConstants.WOOL]
+    offer = Materials(1, 0, 1, 0, 0)
+    cases = [
+        ('add_material(id, 1)', 'hand.add_material(3, 1); hand.remove_material(3, 1)'),
+        ('add_material([4 ids], 1)', 'hand.add_material(town_list, 1); hand.remove_material(town_list, 1)'),
+        ('has_more(town)', 'has_more(town)'),
+        ('has_more(Materials)', 'has_more(offer)'),
+    ]
+
+    print('Operation'.ljust(28) + 'Materials (ns)'.rjust(16) + 'ResourceVector (ns)'.rjust(21) + 'Speedup'.rjust(10))
+    for name, statement in cases:
+        times = []
+        for hand in (LegacyHand(), Hand()):
+            hand.add_material([0, 1, 2, 3, 4], 3)
+            has_more = hand.has_more if isinstance(hand, LegacyHand) else hand.resources.has_more
+            setup_globals = {'hand': hand, 'has_more': has_more, 'town_list': town_list,
+                             'town': BuildConstants.TOWN, 'offer': offer}
+            times.append(run(name, statement, setup_globals, args.number))
+        print(name.ljust(28) + str(round(times[0])).rjust(16) + str(round(times[1])).rjust(21) +
+              (str(round(times[0] / times[1], 1)) + 'x').rjust(10))
+    return
+
+
+if __name__ == '__main__':
+    main()
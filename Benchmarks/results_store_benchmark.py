@@ -0,0 +1,88 @@
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))  # Para poder importar los módulos del simulador
+
+import numpy as np
+
+from TraceLoader.ResultsStore import ResultsStore
+
+
+def fake_summary(rng, game_number, agent_names):
+    """
+    Resultado de partida inventado, con la forma de GameDirector.game_summary
+    """
+    winner = rng.randrange(-1, 4)
+    return {
+        'game_number': game_number,
+        'agents': [rng.choice(agent_names) for _ in range(4)],
+        'winner': winner,
+        'victory_points': [10 if player == winner else rng.randrange(2, 10) for player in range(4)],
+        'largest_army': rng.randrange(-1, 4),
+        'longest_road': rng.randrange(-1, 4),
+        'rounds': rng.randrange(20, 200),
+        'max_rounds_reached': winner == -1,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Escribe N resultados en un ResultsStore y mide lo que cuesta '
+                                                 'añadirlos, leerlos y calcular estadísticas con ellos')
+    parser.add_argument('--games', type=int, default=1000000)
+    parser.add_argument('--shards', type=int, default=4, help='Escritores, como procesos de un TournamentRunner')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    agent_names = ['RandomAgent', 'AdrianHerasAgent', 'AlexPastorAgent', 'BuilderAgent']
+    summaries = [fake_summary(rng, game_number, agent_names) for game_number in range(args.games)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        stores = [ResultsStore(directory) for _ in range(args.shards)]
+        start = time.perf_counter()
+        for summary in summaries:
+            stores[summary['game_number'] % args.shards].append(summary, summary['game_number'], 0.05)
+        append_time = time.perf_counter() - start
+        for store in stores:
+            store.close()
+        size = sum(shard.stat().st_size for shard in ResultsStore.shards(directory))
+
+        start = time.perf_counter()
+        records, names = ResultsStore.read(directory)
+        read_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        decided = records[records['winner'] >= 0]
+        winners = decided['agents'][np.arange(len(decided)), decided['winner']]
+        win_rates = np.bincount(winners, minlength=len(names)) / np.bincount(records['agents'].ravel(),
+                                                                             minlength=len(names))
+        seat_win_rates = np.bincount(decided['winner'], minlength=4) / len(records)
+        average_rounds = records['rounds'].mean()
+        stats_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        merged_shard = ResultsStore.merge(directory)
+        merge_time = time.perf_counter() - start
+        assert len(ResultsStore.read(directory)[0]) == args.games and merged_shard.exists()
+
+    json_size = sum(len(json.dumps(summary)) for summary in summaries[:1000]) / 1000 * args.games
+    print('Games:        ' + str(args.games) + ' in ' + str(args.shards) + ' shards')
+    print('Append:       ' + str(round(append_time / args.games * 1e6, 2)) + ' us/game')
+    print('Size:         ' + str(round(size / 2 ** 20, 1)) + ' MiB (' + str(round(size / args.games, 1)) +
+          ' B/game, JSON summaries: ' + str(round(json_size / 2 ** 20, 1)) + ' MiB)')
+    print('Read:         ' + str(round(read_time, 3)) + ' s')
+    print('Stats:        ' + str(round(stats_time, 3)) + ' s')
+    print('Merge:        ' + str(round(merge_time, 3)) + ' s')
+    print('Win rates:    ' + ' '.join(name + ' ' + str(round(rate * 100, 1)) + '%'
+                                      for name, rate in zip(names, win_rates)))
+    print('Seat wins:    ' + ' '.join('P' + str(seat) + ' ' + str(round(rate * 100, 1)) + '%'
+                                      for seat, rate in enumerate(seat_win_rates)) +
+          ' | average rounds: ' + str(round(float(average_rounds), 1)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import pickle
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))  # Para poder importar los módulos del simulador
+
+from Agents.AdrianHerasAgent import AdrianHerasAgent
+from Agents.AlexPastorAgent import AlexPastorAgent
+from Agents.RandomAgent import RandomAgent
+from Classes.Constants import TraceLevelConstants
+from Classes.SandboxedAgent import SandboxedAgent
+from Managers.GameDirector import GameDirector
+
+
+def play(agents, games, max_rounds, seed):
+    """
+    :return: float, [dict...]. Segundos y resumen de cada partida
+    """
+    game_director = GameDirector(agents=agents, max_rounds=max_rounds, trace_level=TraceLevelConstants.SUMMARY)
+    start = time.perf_counter()
+    summaries = [game_director.game_start(game_number, False, seed=seed + game_number) for game_number in range(games)]
+    return time.perf_counter() - start, summaries, game_director
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara partidas con los agentes en el mismo proceso y en procesos '
+                                                 'aparte (SandboxedAgent): tiempo, coste por llamada y bytes enviados')
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--max-rounds', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    agents = (RandomAgent, AdrianHerasAgent, AlexPastorAgent, RandomAgent)
+    sandboxed_agents = tuple(SandboxedAgent.wrap(agent) for agent in agents)
+
+    local_time, local_summaries, _ = play(agents, args.games, args.max_rounds, args.seed)
+    try:
+        # La primera partida arranca los procesos, se mide aparte
+        start = time.perf_counter()
+        play(sandboxed_agents, 1, args.max_rounds, args.seed)
+        startup_time = time.perf_counter() - start
+        for sandbox in sandboxed_agents:
+            sandbox.stats.clear()
+            sandbox.stats.update({seat: {'calls': 0, 'bytes_sent': 0, 'bytes_received': 0, 'errors': 0,
+                                         'crashes': 0} for seat in sandbox.workers})
+        sandbox_time, sandbox_summaries, game_director = play(sandboxed_agents, args.games, args.max_rounds, args.seed)
+    finally:
+        SandboxedAgent.close_all()
+
+    outcome = lambda summary: (summary['winner'], summary['victory_points'], summary['rounds'])
+    assert list(map(outcome, sandbox_summaries)) == list(map(outcome, local_summaries)), \
+        'Las partidas con y sin sandbox deberían ser iguales'
+    calls = sum(sandbox.stats[seat]['calls'] for seat, sandbox in enumerate(sandboxed_agents))
+    bytes_sent = sum(sandbox.stats[seat]['bytes_sent'] for seat, sandbox in enumerate(sandboxed_agents))
+    bytes_received = sum(sandbox.stats[seat]['bytes_received'] for seat, sandbox in enumerate(sandboxed_agents))
+    # Lo que costaría enviar el estado completo en cada llamada
+    full_state = len(pickle.dumps((game_director.game_manager.board.get_view(),
+                                   game_director.game_manager.agent_manager.players[0]['resources']), protocol=5))
+
+    print('In-process:  ' + str(round(args.games / local_time, 2)) + ' games/s')
+    print('Sandboxed:   ' + str(round(args.games / sandbox_time, 2)) + ' games/s (' +
+          str(round(sandbox_time / local_time, 1)) + 'x slower, ' + str(round(startup_time, 2)) +
+          ' s for the first game with the processes starting)')
+    print('Calls:       ' + str(calls) + ' | overhead: ' +
+          str(round((sandbox_time - local_time) / calls * 1e6, 1)) + ' us/call')
+    print('Bytes/call:  ' + str(round(bytes_sent / calls, 1)) + ' sent, ' + str(round(bytes_received / calls, 1)) +
+          ' received | full board pickle: ' + str(full_state))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))  # Para poder importar los módulos del simulador
+
+from TraceLoader.TraceCompression import TraceCompression
+from TraceLoader.TraceLoader import TraceLoader
+from TraceLoader.TraceStream import TraceStream
+
+
+def write(traces, directory, compression, stream):
+    """
+    Escribe las trazas como lo hace TraceLoader, un fichero por partida, o en un único fichero JSON Lines de TraceStream
+    :return: float, int. Segundos y bytes escritos
+    """
+    start = time.perf_counter()
+    if stream:
+        trace_stream = TraceStream.in_directory(directory, compression)
+        for game_number, trace in enumerate(traces):
+            trace_stream.write(game_number, trace)
+        trace_stream.close()
+    else:
+        trace_loader = TraceLoader(compression=compression)
+        trace_loader.full_path = Path(directory)
+        for game_number, trace in enumerate(traces):
+            trace_loader.current_trace = trace
+            trace_loader.export_to_file(game_number)
+    elapsed = time.perf_counter() - start
+    return elapsed, sum(file_path.stat().st_size for file_path in Path(directory).iterdir())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tamaño y velocidad de escritura y lectura de las trazas de '
+                                                 'Tests/test_traces con cada formato de compresión')
+    parser.add_argument('--traces', default=str(Path(__file__).parent.parent / 'Tests' / 'test_traces'))
+    parser.add_argument('--games', type=int, default=100, help='Número de trazas de la carpeta que se usan')
+    parser.add_argument('--stream', action='store_true', help='Escribirlas en un fichero JSON Lines (TraceStream)')
+    args = parser.parse_args()
+
+    traces = [trace for _, trace in zip(range(args.games), TraceLoader.read(args.traces))]
+    for trace in traces:
+        del trace['game_number']
+
+    print('Format'.ljust(8) + 'Size (MiB)'.rjust(12) + 'Ratio'.rjust(8) + 'Write (s)'.rjust(11) +
+          'Write (MiB/s)'.rjust(15) + 'Read (s)'.rjust(10))
+    raw_size = None
+    for compression in [None] + TraceCompression.available():
+        with tempfile.TemporaryDirectory() as directory:
+            write_time, size = write(traces, directory, compression, args.stream)
+            start = time.perf_counter()
+            read_games = sum(1 for _ in TraceLoader.read(directory))
+            read_time = time.perf_counter() - start
+        assert read_games == len(traces)
+        if raw_size is None:
+            raw_size = size
+        # Velocidad de escritura medida sobre el JSON sin comprimir, para que se puedan comparar los formatos
+        print(str(compression or 'json').ljust(8) + str(round(size / 2 ** 20, 2)).rjust(12) +
+              str(round(raw_size / size, 1)).rjust(8) + str(round(write_time, 2)).rjust(11) +
+              str(round(raw_size / 2 ** 20 / write_time, 1)).rjust(15) + str(round(read_time, 2)).rjust(10))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))  # Para poder importar los módulos del simulador
+
+from Agents.AdrianHerasAgent import AdrianHerasAgent
+from Agents.AlexPastorAgent import AlexPastorAgent
+from Agents.BuilderAgent import BuilderAgent
+from Agents.RandomAgent import RandomAgent
+from Classes.Constants import TraceLevelConstants
+from Managers.GameDirector import GameDirector
+from TraceLoader.TraceEvents import TraceEvents
+from TraceLoader.TraceLoader import TraceLoader
+
+
+def play(trace_level, games, agents):
+    """
+    Juega las partidas con semillas 0..games-1 y devuelve sus trazas, sin escribirlas
+    :return: [dict...]
+    """
+    game_director = GameDirector(agents=agents, max_rounds=200, trace_level=trace_level)
+    game_director.trace_loader.export_to_file = lambda game_number: None
+    return [game_director.game_start(game_number, False, seed=game_number) for game_number in range(games)]
+
+
+def write(traces, directory):
+    """
+    Escribe las trazas como lo hace TraceLoader, un fichero por partida (y board.json con las de eventos)
+    :return: float, int. Segundos y bytes escritos
+    """
+    trace_loader = TraceLoader()
+    trace_loader.full_path = Path(directory)
+    start = time.perf_counter()
+    for game_number, trace in enumerate(traces):
+        trace_loader.current_trace = trace
+        trace_loader.export_to_file(game_number)
+    elapsed = time.perf_counter() - start
+    return elapsed, sum(file_path.stat().st_size for file_path in Path(directory).iterdir())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tamaño y tiempo de escritura de las trazas completas y de las de '
+                                                 'eventos de las mismas partidas, y lo que cuesta reconstruir las '
+                                                 'completas a partir de las de eventos')
+    parser.add_argument('--games', type=int, default=50)
+    args = parser.parse_args()
+
+    agents = (AlexPastorAgent, BuilderAgent, RandomAgent, AdrianHerasAgent)
+    full_traces = play(TraceLevelConstants.FULL, args.games, agents)
+    event_traces = play(TraceLevelConstants.EVENTS, args.games, agents)
+
+    print('Trace'.ljust(8) + 'Size (MiB)'.rjust(12) + 'Ratio'.rjust(8) + 'Dumps (s)'.rjust(11) + 'Ratio'.rjust(8) +
+          'Write (s)'.rjust(11))
+    results = []
+    for name, traces in (('full', full_traces), ('events', event_traces)):
+        start = time.perf_counter()
+        for trace in traces:
+            json.dumps(trace, separators=TraceEvents.separators(trace))
+        dumps_time = time.perf_counter() - start
+        with tempfile.TemporaryDirectory() as directory:
+            write_time, size = write(traces, directory)
+        results.append((size, dumps_time))
+        print(name.ljust(8) + str(round(size / 2 ** 20, 2)).rjust(12) + str(round(results[0][0] / size, 1)).rjust(8) +
+              str(round(dumps_time, 3)).rjust(11) + str(round(results[0][1] / dumps_time, 1)).rjust(8) +
+              str(round(write_time, 3)).rjust(11))
+
+    start = time.perf_counter()
+    expanded_traces = [TraceEvents.expand(event_trace) for event_trace in event_traces]
+    expand_time = time.perf_counter() - start
+    for full_trace, expanded_trace in zip(full_traces, expanded_traces):
+        assert json.dumps(expanded_trace) == json.dumps(full_trace)
+    print('Expand: ' + str(round(expand_time / args.games * 1000, 2)) + ' ms/game')
+
+
+if __name__ == '__main__':
+    main()
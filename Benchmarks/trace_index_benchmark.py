@@ -0,0 +1,63 @@
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))  # Para poder importar los módulos del simulador
+
+from Agents.AdrianHerasAgent import AdrianHerasAgent
+from Agents.AlexPastorAgent import AlexPastorAgent
+from Agents.BuilderAgent import BuilderAgent
+from Agents.RandomAgent import RandomAgent
+from Classes.Constants import TraceLevelConstants
+from Managers.GameDirector import GameDirector
+from TraceLoader.TraceIndex import TraceIndex
+from TraceLoader.TraceLoader import TraceLoader
+
+
+def seconds(start):
+    return str(round((time.perf_counter() - start) * 1000, 1)) + ' ms'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Escribe N trazas completas en una carpeta y compara buscar partidas '
+                                                 'con TraceIndex con abrir todas las trazas con TraceLoader.read')
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--played', type=int, default=10, help='Partidas que se juegan. Se repiten hasta --games')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        game_director = GameDirector(agents=(AlexPastorAgent, BuilderAgent, RandomAgent, AdrianHerasAgent),
+                                     max_rounds=200, trace_level=TraceLevelConstants.FULL)
+        game_director.trace_loader.full_path = directory
+        for game_number in range(args.played):
+            game_director.game_start(game_number, False, seed=game_number)
+        for game_number in range(args.played, args.games):
+            (directory / ('game_' + str(game_number) + '.json')).write_bytes(
+                (directory / ('game_' + str(game_number % args.played) + '.json')).read_bytes())
+        print(str(args.games) + ' traces, ' +
+              str(round(sum(path.stat().st_size for path in directory.iterdir()) / 2 ** 20, 1)) + ' MiB')
+
+        start = time.perf_counter()
+        TraceIndex.open(directory)
+        print('Index build: ' + seconds(start) + ', ' + str((directory / TraceIndex.FILE).stat().st_size) + ' bytes')
+        start = time.perf_counter()
+        trace_index = TraceIndex.open(directory)
+        print('Index open: ' + seconds(start))
+
+        # Partidas en las que se jugó un monopolio, y su ronda 10
+        start = time.perf_counter()
+        games = trace_index.query(lambda game: 'monopoly' in game['cards'] and game['rounds'] > 10)
+        rounds = [trace_index.load_round(game, 10) for game in games]
+        print('Index query: ' + seconds(start) + ', ' + str(len(rounds)) + ' games')
+
+        start = time.perf_counter()
+        rounds = [trace['game']['round_10'] for trace in TraceLoader.read(directory)
+                  if len(trace['game']) > 10 and TraceIndex.count_full_cards(trace['game']).get('monopoly')]
+        print('TraceLoader.read scan: ' + seconds(start) + ', ' + str(len(rounds)) + ' games')
+
+
+if __name__ == '__main__':
+    main()
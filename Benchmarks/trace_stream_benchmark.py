@@ -0,0 +1,58 @@
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))  # Para poder importar los módulos del simulador
+
+from Agents.RandomAgent import RandomAgent
+from Classes.Constants import TraceLevelConstants
+from Managers.GameDirector import GameDirector
+from TraceLoader.TraceStream import TraceStream
+
+
+def play(games, directory, stream):
+    """
+    Juega las partidas con traza completa guardándolas en un fichero por partida y en games.json al final, o en un
+    TraceStream
+    :return: float, int. Segundos y pico de memoria en bytes
+    """
+    trace_stream = TraceStream(Path(directory) / 'games.jsonl') if stream else None
+    game_director = GameDirector(agents=(RandomAgent,) * 4, max_rounds=200, trace_level=TraceLevelConstants.FULL,
+                                 trace_stream=trace_stream)
+    game_director.trace_loader.full_path = Path(directory)
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    for game_number in range(games):
+        game_director.game_start(game_number, False, seed=game_number)
+    if stream:
+        trace_stream.close()
+    else:
+        game_director.trace_loader.export_every_game_to_file()
+    elapsed = time.perf_counter() - start
+    return elapsed, tracemalloc.get_traced_memory()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pico de memoria guardando las trazas completas en games.json al '
+                                                 'final o en un fichero JSON Lines según terminan las partidas')
+    parser.add_argument('--games', type=int, nargs='+', default=[10, 40])
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    print('Games'.ljust(8) + 'games.json (MiB)'.rjust(18) + 'JSON Lines (MiB)'.rjust(18) +
+          'games.json (s)'.rjust(16) + 'JSON Lines (s)'.rjust(16))
+    for games in args.games:
+        results = []
+        for stream in (False, True):
+            with tempfile.TemporaryDirectory() as directory:
+                results.append(play(games, directory, stream))
+        print(str(games).ljust(8) + str(round(results[0][1] / 2 ** 20, 1)).rjust(18) +
+              str(round(results[1][1] / 2 ** 20, 1)).rjust(18) + str(round(results[0][0], 2)).rjust(16) +
+              str(round(results[1][0], 2)).rjust(16))
+
+
+if __name__ == '__main__':
+    main()
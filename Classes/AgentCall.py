@@ -0,0 +1,75 @@
+import inspect
+
+
+class AgentCall:
+    """
+    Llamada a un trigger de un agente.
+
+    Los pasos de la partida que llaman a los agentes (los métodos *_steps del GameManager y del GameDirector) son
+    generadores: devuelven (yield) un AgentCall y reciben la respuesta del agente. Así el mismo código sirve para
+    jugar llamando a los agentes directamente (run, GameDirector) y esperando (await) a los agentes asíncronos
+    (run_async, AsyncGameDirector), sin que el motor tenga que saber de qué tipo es cada agente.
+
+    agent: AgentInterface() Agente al que se llama
+    trigger: str Nombre del trigger (on_build_phase, on_trade_offer...)
+    args: tuple Argumentos del trigger
+    default: Respuesta que se usa si el agente se pasa de tiempo (ver AgentWatchdog)
+    """
+    __slots__ = ('agent', 'trigger', 'args', 'default')
+
+    def __init__(self, agent, trigger, *args, default=None):
+        self.agent = agent
+        self.trigger = trigger
+        self.args = args
+        self.default = default
+        return
+
+    def call(self):
+        """
+        :return: La respuesta del agente, o un awaitable si el trigger es asíncrono
+        """
+        return getattr(self.agent, self.trigger)(*self.args)
+
+    @staticmethod
+    def run(steps, watchdog=None):
+        """
+        Ejecuta unos pasos llamando a los agentes directamente
+        :param steps: generator. Pasos que devuelven AgentCall
+        :param watchdog: AgentWatchdog/None. Mide los tiempos de respuesta y aplica el tiempo máximo de cada trigger
+        :return: Lo que devuelven los pasos
+        """
+        try:
+            agent_call = next(steps)
+            while True:
+                response = watchdog.call(agent_call) if watchdog is not None else agent_call.call()
+                if inspect.isawaitable(response):
+                    if inspect.iscoroutine(response):
+                        response.close()
+                    steps.close()
+                    raise TypeError('El trigger ' + agent_call.trigger + ' de ' + type(agent_call.agent).__name__ +
+                                    ' es asíncrono, hay que jugar la partida con AsyncGameDirector')
+                agent_call = steps.send(response)
+        except StopIteration as stop:
+            return stop.value
+
+    @staticmethod
+    async def run_async(steps, watchdog=None):
+        """
+        Ejecuta unos pasos esperando a los agentes cuyos triggers son asíncronos. Los agentes síncronos se llaman
+        directamente, así que pueden jugar en la misma partida que los asíncronos
+        :param steps: generator. Pasos que devuelven AgentCall
+        :param watchdog: AgentWatchdog/None. Mide los tiempos de respuesta y aplica el tiempo máximo de cada trigger
+        :return: Lo que devuelven los pasos
+        """
+        try:
+            agent_call = next(steps)
+            while True:
+                if watchdog is not None:
+                    response = await watchdog.call_async(agent_call)
+                else:
+                    response = agent_call.call()
+                if inspect.isawaitable(response):
+                    response = await response
+                agent_call = steps.send(response)
+        except StopIteration as stop:
+            return stop.value
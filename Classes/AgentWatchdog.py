@@ -0,0 +1,262 @@
+import asyncio
+import bisect
+import concurrent.futures
+import copy
+import inspect
+import queue
+import threading
+import time
+
+from Classes.DevelopmentCards import DevelopmentCardsHand
+from Classes.Hand import Hand
+from Classes.ResourceVector import ResourceVector
+from Classes.TrackedRandom import TrackedRandom
+
+
+def _run_agent_calls(requests):
+    """
+    Hilo que ejecuta los triggers con tiempo máximo. Termina al recibir None
+    :param requests: queue.SimpleQueue de (Future, AgentCall)
+    :return: None
+    """
+    while True:
+        request = requests.get()
+        if request is None:
+            return
+        future, agent_call = request
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(agent_call.call())
+            except BaseException as exception:
+                future.set_exception(exception)
+
+
+class AgentWatchdog:
+    """
+    Mide cuánto tarda cada agente en responder a sus triggers y les aplica un tiempo máximo.
+
+    Si un agente se pasa de tiempo se usa la respuesta por defecto de la llamada (AgentCall.default), que es la misma
+    que usa el GameManager con las respuestas no válidas: no comerciar, no construir, colocar al azar... El agente
+    sigue ejecutándose en segundo plano, pero su respuesta se descarta.
+
+    Los triggers síncronos con tiempo máximo se ejecutan en un hilo aparte para poder dejar de esperarlos, lo que
+    hace cada llamada algo más lenta. Si un agente se pasa de tiempo su hilo se abandona y las siguientes llamadas van
+    a un hilo nuevo. Los triggers asíncronos se cancelan al acabarse su tiempo.
+
+    En el hilo se llama a una copia del agente con su propia mano, sus cartas de desarrollo y su propio generador
+    (ver isolate), ya que un agente abandonado sigue ejecutándose mientras la partida continúa. Solo si responde a
+    tiempo se pasan sus cambios al agente de la partida (ver merge), así que un agente que se pasa de tiempo no toca
+    la mano del motor ni saca números del generador de la partida. El tablero que ve sigue siendo el de la partida,
+    pero es de solo lectura. Lo que el agente guarde en sus propios atributos mutables (listas, diccionarios...) sí
+    puede cambiar mientras tanto; para aislarlo del todo hay que usar SandboxedAgent.
+
+    time_budgets: {str: float} Segundos que tiene cada trigger (on_build_phase, on_trade_offer...). Con la clave
+                  DEFAULT se indica el tiempo de los triggers que no aparecen. Sin tiempo, no hay límite
+    latencies: [{'calls': int, 'total_time': float, 'max_time': float, 'histogram': [int...],
+                 'timeouts': {str: int}}...] Tiempos de respuesta de cada jugador en la partida actual. histogram
+               cuenta las llamadas que han tardado menos de cada HISTOGRAM_BOUNDS, y la última posición las que han
+               tardado más
+    """
+    DEFAULT = 'default'
+    # Segundos: 0.1 ms, 1 ms, 10 ms, 100 ms y 1 s
+    HISTOGRAM_BOUNDS = (0.0001, 0.001, 0.01, 0.1, 1.0)
+
+    def __init__(self, time_budgets=None):
+        self.time_budgets = dict(time_budgets or {})
+        self.default_budget = self.time_budgets.pop(self.DEFAULT, None)
+        self.latencies = []
+        self._requests = None
+        self.reset()
+        return
+
+    def reset(self):
+        """
+        Empieza a medir una partida nueva
+        :return: None
+        """
+        self.latencies = [{'calls': 0, 'total_time': 0.0, 'max_time': 0.0,
+                           'histogram': [0] * (len(self.HISTOGRAM_BOUNDS) + 1), 'timeouts': {}} for _ in range(4)]
+        return
+
+    def get_budget(self, trigger):
+        """
+        :param trigger: str
+        :return: float/None. Segundos que tiene el trigger, None si no tiene límite
+        """
+        return self.time_budgets.get(trigger, self.default_budget)
+
+    def call(self, agent_call):
+        """
+        Llama al agente respetando su tiempo máximo
+        :param agent_call: AgentCall()
+        :return: La respuesta del agente, o la respuesta por defecto si se ha pasado de tiempo
+        """
+        budget = self.get_budget(agent_call.trigger)
+        start = time.perf_counter()
+        isolated_call = None
+        if budget is None:
+            response = agent_call.call()
+            timed_out = False
+        else:
+            future, isolated_call = self._submit(agent_call)
+            try:
+                response = future.result(budget)
+                timed_out = False
+            except concurrent.futures.TimeoutError:
+                self._abandon_thread()
+                response = None
+                timed_out = True
+        return self._finish(agent_call, isolated_call, response, timed_out, budget, start)
+
+    async def call_async(self, agent_call):
+        """
+        Igual que call, pero esperando (await) a los triggers asíncronos. Los síncronos con tiempo máximo se esperan
+        sin bloquear el bucle de eventos, para que las demás partidas sigan mientras tanto
+        :param agent_call: AgentCall()
+        :return: La respuesta del agente, o la respuesta por defecto si se ha pasado de tiempo
+        """
+        budget = self.get_budget(agent_call.trigger)
+        asynchronous = inspect.iscoroutinefunction(getattr(agent_call.agent, agent_call.trigger))
+        if not asynchronous and budget is None:
+            return self.call(agent_call)
+
+        start = time.perf_counter()
+        isolated_call = None
+        try:
+            if asynchronous:
+                response = await asyncio.wait_for(agent_call.call(), budget)
+            else:
+                future, isolated_call = self._submit(agent_call)
+                response = await asyncio.wait_for(asyncio.wrap_future(future), budget)
+            timed_out = False
+        except asyncio.TimeoutError:
+            if isolated_call is not None:
+                self._abandon_thread()
+            response = None
+            timed_out = True
+        return self._finish(agent_call, isolated_call, response, timed_out, budget, start)
+
+    def _finish(self, agent_call, isolated_call, response, timed_out, budget, start):
+        """
+        Apunta el tiempo de la llamada y decide la respuesta
+        :param agent_call: AgentCall()
+        :param isolated_call: AgentCall/None. Llamada a la copia del agente si se ha ejecutado en el hilo
+        :param response: Respuesta del agente
+        :param timed_out: bool
+        :param budget: float/None
+        :param start: float. time.perf_counter() al empezar la llamada
+        :return: La respuesta del agente, o la respuesta por defecto si se ha pasado de tiempo
+        """
+        elapsed = time.perf_counter() - start
+        # Una respuesta que llega tarde también se descarta, aunque el agente haya terminado
+        timed_out = timed_out or (budget is not None and elapsed > budget)
+        self.record(agent_call, elapsed, timed_out)
+        if timed_out:
+            return agent_call.default
+        if isolated_call is not None:
+            return self.merge(agent_call.agent, isolated_call.agent, response)
+        return response
+
+    @staticmethod
+    def isolate(agent_call):
+        """
+        Copia el agente para llamarlo en el hilo: la mano, las cartas de desarrollo y el generador de la partida son
+        copias, el resto de atributos son los del agente
+        :param agent_call: AgentCall()
+        :return: AgentCall() La misma llamada a la copia del agente
+        """
+        agent = copy.copy(agent_call.agent)
+        if isinstance(agent.hand, Hand):
+            agent.hand = Hand()
+            agent.hand.resources = ResourceVector.from_iterable(agent_call.agent.hand.resources.amounts)
+        if isinstance(agent.development_cards_hand, DevelopmentCardsHand):
+            agent.development_cards_hand = DevelopmentCardsHand()
+            agent.development_cards_hand.hand = list(agent_call.agent.development_cards_hand.hand)
+        agent.rng = TrackedRandom()
+        agent.rng.setstate(agent_call.agent.rng.getstate())
+        # Se guardan las copias para saber en merge si el agente las ha cambiado por otras
+        agent._isolated = (agent.hand, agent.development_cards_hand, agent.development_cards_hand.hand, agent.rng,
+                           agent.rng.draws)
+        return type(agent_call)(agent, agent_call.trigger, *agent_call.args, default=agent_call.default)
+
+    @staticmethod
+    def merge(agent, isolated_agent, response):
+        """
+        Pasa al agente de la partida lo que ha cambiado su copia, igual que si se hubiese llamado directamente: los
+        cambios en la mano y en las cartas de desarrollo se hacen en las de la partida, y el generador de la partida
+        sigue donde lo ha dejado la copia
+        :param agent: AgentInterface() Agente de la partida
+        :param isolated_agent: AgentInterface() Copia del agente (ver isolate)
+        :param response: Respuesta de la copia
+        :return: La respuesta, con la mano de la copia cambiada por la del agente si la devuelve
+        """
+        hand, development_cards_hand, development_cards, rng, draws = isolated_agent.__dict__.pop('_isolated')
+        attributes = dict(isolated_agent.__dict__)
+        if attributes['hand'] is hand:
+            agent.hand.resources.amounts[:] = hand.resources.amounts
+            del attributes['hand']
+            if response is hand:
+                response = agent.hand
+        if attributes['development_cards_hand'] is development_cards_hand:
+            if development_cards_hand.hand is development_cards:
+                agent.development_cards_hand.hand[:] = development_cards
+            else:
+                agent.development_cards_hand.hand = development_cards_hand.hand
+            del attributes['development_cards_hand']
+        if attributes['rng'] is rng:
+            if rng.draws != draws:
+                agent.rng.setstate(rng.getstate())
+            del attributes['rng']
+        agent.__dict__.update(attributes)
+        return response
+
+    def record(self, agent_call, elapsed, timed_out):
+        """
+        Apunta el tiempo de respuesta de una llamada
+        :param agent_call: AgentCall()
+        :param elapsed: float. Segundos
+        :param timed_out: bool
+        :return: None
+        """
+        latency = self.latencies[agent_call.agent.id]
+        latency['calls'] += 1
+        latency['total_time'] += elapsed
+        if elapsed > latency['max_time']:
+            latency['max_time'] = elapsed
+        latency['histogram'][bisect.bisect_right(self.HISTOGRAM_BOUNDS, elapsed)] += 1
+        if timed_out:
+            latency['timeouts'][agent_call.trigger] = latency['timeouts'].get(agent_call.trigger, 0) + 1
+        return
+
+    def summary(self):
+        """
+        :return: [{'calls': int, 'total_time': float, 'max_time': float, 'histogram': [int...],
+                   'timeouts': {str: int}}...] Copia de los tiempos de cada jugador
+        """
+        return [dict(latency, histogram=list(latency['histogram']), timeouts=dict(latency['timeouts']))
+                for latency in self.latencies]
+
+    def _submit(self, agent_call):
+        """
+        Manda la llamada al hilo de los triggers con tiempo máximo, con una copia del agente (ver isolate)
+        :param agent_call: AgentCall()
+        :return: concurrent.futures.Future, AgentCall. Respuesta del agente y llamada que se ejecuta
+        """
+        if self._requests is None:
+            self._requests = queue.SimpleQueue()
+            threading.Thread(target=_run_agent_calls, args=(self._requests,), daemon=True).start()
+
+        isolated_call = self.isolate(agent_call)
+        future = concurrent.futures.Future()
+        self._requests.put((future, isolated_call))
+        return future, isolated_call
+
+    def _abandon_thread(self):
+        """
+        El hilo sigue con un agente que se ha pasado de tiempo. Se le dice que termine cuando acabe y las siguientes
+        llamadas usan otro
+        :return: None
+        """
+        self._requests.put(None)
+        self._requests = None
+        return
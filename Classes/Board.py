@@ -1,13 +1,20 @@
 import random
+from types import MappingProxyType
 
+from Classes.BoardState import BoardState, BoardStateView, NodeView, TerrainView
+from Classes.BoardTopology import BoardTopology
 from Classes.Constants import HarborConstants, TerrainConstants, MaterialConstants
-from Classes.Utilities import is_even
+from Classes.MoveGenerator import MoveGenerator, MoveGeneratorView
+from Classes.RoadNetwork import RoadNetwork, RoadNetworkView
 
 
 class Board:
     """
     Clase que representa una instancia del tablero.
 
+    state: BoardState() Estado de la partida en arrays: dueño de cada nodo y carretera, ciudades y ladrón. Las copias
+           superficiales del tablero (las que reciben los agentes) comparten el estado.
+
     nodes: [{"id": int,
              "adjacent": [int...],
              "harbor": int,
@@ -15,7 +22,8 @@ class Board:
              "has_city": bool,
              "player": int,
              "contacting_terrain": [int...]}] Representa los nodos del tablero. Poseen información de los puertos y
-                                              nodos adyacentes
+                                              nodos adyacentes.
+                                              Son vistas (NodeView) que se crean al pedirlas y leen el estado.
 
     terrain: [{"id": int,
                "has_thief": bool,
@@ -24,97 +32,106 @@ class Board:
                "contacting_nodes": [int...]}]
 
               Representa una ficha de terreno del tablero. Poseen información de los nodos con
-                 los que hacen contacto, si posee al ladrón actualmente y su probabilidad de salir
+                 los que hacen contacto, si posee al ladrón actualmente y su probabilidad de salir.
+                 Igual que los nodos, son vistas (TerrainView) del estado.
+
+    production: {roll: {(terrain_id, node_id): (player, material, amount)}} Tabla de producción. Para cada tirada de
+                dados indica qué jugador recibe qué material y cuánto. Se actualiza cada vez que cambia un nodo.
+
+    road_network: RoadNetwork() Carreteras de cada jugador, para calcular la carretera más larga.
+
+    moves: MoveGenerator() Jugadas legales de cada jugador, guardadas mientras no cambie la versión del tablero.
+           Los métodos valid_* las sacan de aquí.
+
+    rng: random.Random() Generador de números aleatorios de la partida. Si no se indica el tablero crea el suyo
 
     La asignación de los ids de nodo y terreno se ha llevado a cabo por filas, de izquierda a derecha y de arriba a abajo.
     """
 
-    def __init__(self, nodes=None, terrain=None):
-        # TODO: esto se deberia de poder calcular automaticamente
-        self.contacting_nodes = {
-            0: [0, 1, 2, 8, 9, 10],
-            1: [2, 3, 4, 10, 11, 12],
-            2: [4, 5, 6, 12, 13, 14],
-            3: [7, 8, 9, 17, 18, 19],
-            4: [9, 10, 11, 19, 20, 21],
-            5: [11, 12, 13, 21, 22, 23],
-            6: [13, 14, 15, 23, 24, 25],
-            7: [16, 17, 18, 27, 28, 29],
-            8: [18, 19, 20, 29, 30, 31],
-            9: [20, 21, 22, 31, 32, 33],
-            10: [22, 23, 24, 33, 34, 35],
-            11: [24, 25, 26, 35, 36, 37],
-            12: [28, 29, 30, 38, 39, 40],
-            13: [30, 31, 32, 40, 41, 42],
-            14: [32, 33, 34, 42, 43, 44],
-            15: [34, 35, 36, 44, 45, 46],
-            16: [39, 40, 41, 47, 48, 49],
-            17: [41, 42, 43, 49, 50, 51],
-            18: [43, 44, 45, 51, 52, 53],
-        }
-
-        self.probabilities = {
-            0: 11,      1: 12,      2: 9,       3: 4,       4: 6,
-            5: 5,       6: 10,      7: 7,       8: 3,       9: 11,
-            10: 4,      11: 8,      12: 8,      13: 10,     14: 9,
-            15: 3,      16: 5,      17: 2,      18: 6
-        }
-
-        self.terrain_types = {
-            0: TerrainConstants.WOOD, 1: TerrainConstants.WOOL, 2: TerrainConstants.CEREAL,
-            3: TerrainConstants.CLAY, 4: TerrainConstants.MINERAL, 5: TerrainConstants.CLAY,
-            6: TerrainConstants.WOOL, 7: TerrainConstants.DESERT, 8: TerrainConstants.WOOD,
-            9: TerrainConstants.CEREAL, 10: TerrainConstants.WOOD, 11: TerrainConstants.CEREAL,
-            12: TerrainConstants.CLAY, 13: TerrainConstants.WOOL, 14: TerrainConstants.WOOL,
-            15: TerrainConstants.MINERAL, 16: TerrainConstants.MINERAL, 17: TerrainConstants.CEREAL,
-            18: TerrainConstants.WOOD
-        }
-
-        self.harbors = {
-            0: HarborConstants.WOOD, 1: HarborConstants.WOOD,
-            3: HarborConstants.CEREAL, 4: HarborConstants.CEREAL,
-            14: HarborConstants.CLAY, 15: HarborConstants.CLAY,
-            28: HarborConstants.MINERAL, 38: HarborConstants.MINERAL,
-            50: HarborConstants.WOOL, 51: HarborConstants.WOOL,
-            7: HarborConstants.ALL, 17: HarborConstants.ALL, 26: HarborConstants.ALL, 37: HarborConstants.ALL,
-            45: HarborConstants.ALL, 46: HarborConstants.ALL, 47: HarborConstants.ALL, 48: HarborConstants.ALL
-        }
-
-        self.coastal_nodes = [0, 1, 2, 3, 4, 5, 6, 7, 8, 14, 15, 16, 17, 25, 26, 27, 28, 36, 37, 38, 39, 45, 46, 47, 48, 49, 50, 51, 52, 53]
+    def __init__(self, nodes=None, terrain=None, rng=None):
+        # La topología (adyacencias, puertos, terrenos...) se comparte entre todos los tableros. Aquí solo se crea el
+        # estado de la partida
+        self.rng = rng if rng is not None else random.Random()
+        self.state = BoardState()
+        self.production = {roll: {} for roll in range(2, 13)}
+        self.road_network = RoadNetwork(self.state.node_owner)
+        self.moves = MoveGenerator(self.state)
+        self._nodes = None
+        self._terrain = None
+        self._view = None
 
         if nodes:
-            self.nodes = nodes
-        else:
-            self.nodes = []  # 0 a 53
-            for i in range(54):
-                self.nodes.append({
-                    "id": i,
-                    "adjacent": self.__get_adjacent_nodes__(i),
-                    "harbor": self.__get_harbors__(i),
-                    "roads": [],
-                    "has_city": False,
-                    "player": -1,
-                    "contacting_terrain": self.__get_contacting_terrain__(i),
-                })
-
+            for node in nodes:
+                self.set_node_player(node['id'], node['player'])
+                self.set_node_city(node['id'], node['has_city'])
+            for node in nodes:
+                for road in node['roads']:
+                    self.add_road(road['player_id'], node['id'], road['node_id'])
         if terrain:
-            self.terrain = terrain
-        else:
-            self.terrain = []  # 0 a 18
-            for j in range(19):
-                probability = self.__get_probability__(j)
-                has_thief = probability == 7
-                self.terrain.append({
-                    "id": j,
-                    "has_thief": has_thief,
-                    "probability": probability if not has_thief else 0,
-                    "terrain_type": self.__get_terrain_type__(j),
-                    "contacting_nodes": self.__get_contacting_nodes__(j),
-                })
+            self.state.thief = next((square['id'] for square in terrain if square['has_thief']), -1)
+        return
 
+    @property
+    def nodes(self):
+        """
+        :return: [NodeView...] 0 a 53
+        """
+        if self._nodes is None:
+            self._nodes = [NodeView(self, node_id) for node_id in range(BoardTopology.NODES)]
+        return self._nodes
 
+    @property
+    def terrain(self):
+        """
+        :return: [TerrainView...] 0 a 18
+        """
+        if self._terrain is None:
+            self._terrain = [TerrainView(self, terrain_id) for terrain_id in range(BoardTopology.TERRAIN)]
+        return self._terrain
 
-        return
+    @property
+    def version(self):
+        """
+        :return: int. Versión del estado del tablero, cambia cada vez que se modifica
+        """
+        return self.state.version
+
+    def get_view(self):
+        """
+        Vista de solo lectura del tablero para los agentes. Siempre es la misma vista y lee el estado actual del
+        tablero, así que no hace falta crear otra en cada llamada a un agente
+        :return: BoardView()
+        """
+        if self._view is None:
+            self._view = BoardView(self)
+        return self._view
+
+    def export_nodes(self):
+        """
+        :return: [dict...] Copia de los nodos como diccionarios normales, por ejemplo para exportarlos a JSON
+        """
+        return [{
+            "id": node_id,
+            "adjacent": list(BoardTopology.ADJACENT_NODES[node_id]),
+            "harbor": BoardTopology.HARBORS[node_id],
+            "roads": [{"player_id": player, "node_id": other_node_id}
+                      for player, other_node_id in self.state.node_roads(node_id)],
+            "has_city": self.state.has_city(node_id),
+            "player": self.state.node_owner[node_id],
+            "contacting_terrain": list(BoardTopology.CONTACTING_TERRAIN[node_id]),
+        } for node_id in range(BoardTopology.NODES)]
+
+    def export_terrain(self):
+        """
+        :return: [dict...] Copia de los terrenos como diccionarios normales, por ejemplo para exportarlos a JSON
+        """
+        return [{
+            "id": terrain_id,
+            "has_thief": self.state.thief == terrain_id,
+            "probability": BoardTopology.TERRAIN_PROBABILITIES[terrain_id],
+            "terrain_type": BoardTopology.TERRAIN_TYPES[terrain_id],
+            "contacting_nodes": list(BoardTopology.CONTACTING_NODES[terrain_id]),
+        } for terrain_id in range(BoardTopology.TERRAIN)]
 
     def visualize_board(self):
         print('Nodos:')
@@ -135,105 +152,143 @@ class Board:
             print('---\n')
 
     def get_board(self):
+        """
+        :return: Board(). Tablero nuevo, sin nada construido
+        """
         return self.__class__()
 
+    def copy_board(self):
+        """
+        Copia del tablero con su estado actual que sí se puede modificar, por ejemplo para que un agente pruebe jugadas
+        sin tocar la partida. Tiene su propio generador de números aleatorios, no el de la partida
+        :return: Board()
+        """
+        return Board(nodes=self.nodes, terrain=self.terrain)
+
     def __get_contacting_terrain__(self, node_id):
         """
         Indica todas las piezas de terreno a los que el nodo es adyacente, para por ejemplo repartir materiales
         :param node_id: El ID de la pieza del terreno actual
-        :return: [terrain_id, terrain_id, terrain_id, terrain_id, terrain_id, terrain_id]
+        :return: (terrain_id, terrain_id, terrain_id)
         """
-        contact = [terrain_id for terrain_id, nodes in self.contacting_nodes.items() if node_id in nodes]
-        return contact
+        return BoardTopology.CONTACTING_TERRAIN[node_id]
 
     def __get_contacting_nodes__(self, terrain_id):
         """
         Indica todos los nodos a los que la casilla "terreno" es adyacente, para como por ejemplo repartir materiales
         :param terrain_id: El ID de la pieza del terreno actual
-        :return: [node_id, node_id, node_id, node_id, node_id, node_id]
+        :return: (node_id, node_id, node_id, node_id, node_id, node_id)
         """
-        return self.contacting_nodes.get(terrain_id, TerrainConstants.DESERT)
+        if 0 <= terrain_id < BoardTopology.TERRAIN:
+            return BoardTopology.CONTACTING_NODES[terrain_id]
+        return TerrainConstants.DESERT
 
     def __get_probability__(self, terrain_id):
-        return self.probabilities[terrain_id]
+        return BoardTopology.PROBABILITIES[terrain_id]
 
     def __get_terrain_type__(self, terrain_id):
-        return self.terrain_types[terrain_id]
+        return BoardTopology.TERRAIN_TYPES[terrain_id]
 
-    def __get_adjacent_nodes__(self, node_id): #TODO
+    def __get_adjacent_nodes__(self, node_id):
         """
-        Función que obtiene los nodos adyacentes de manera automática
         :param node_id: Id del nodo del que se quieren los ID de los nodos adyacentes
-        :return: [int, ...]
+        :return: (int, ...)
         """
-        adjacent_nodes = []
+        return BoardTopology.ADJACENT_NODES[node_id]
 
-        if 0 <= node_id < 7:
-            if node_id != 0:
-                adjacent_nodes.append(node_id - 1)
-            if node_id != 6:
-                adjacent_nodes.append(node_id + 1)
-
-            if is_even(node_id):
-                adjacent_nodes.append(node_id + 8)
-
-        elif 7 <= node_id < 16:
-            if node_id != 7:
-                adjacent_nodes.append(node_id - 1)
-            if node_id != 15:
-                adjacent_nodes.append(node_id + 1)
-
-            if is_even(node_id):
-                adjacent_nodes.append(node_id - 8)
-            else:
-                adjacent_nodes.append(node_id + 10)
-
-        elif 16 <= node_id < 27:
-            if node_id != 16:
-                adjacent_nodes.append(node_id - 1)
-            if node_id != 26:
-                adjacent_nodes.append(node_id + 1)
+    def __get_harbors__(self, node_id):
+        return BoardTopology.HARBORS[node_id]
 
-            if is_even(node_id):
-                adjacent_nodes.append(node_id + 11)
-            else:
-                adjacent_nodes.append(node_id - 10)
+    def set_node_player(self, node_id, player):
+        """
+        Cambia el dueño del nodo y mantiene actualizadas la producción y la red de carreteras
+        :param node_id: int
+        :param player: int. -1 para quitar el pueblo
+        :return: None
+        """
+        previous_player = self.state.node_owner[node_id]
+        self.state.node_owner[node_id] = player
+        self.state.version += 1
+        if BoardTopology.HARBORS[node_id] != HarborConstants.NONE:
+            for harbor_player in {previous_player, player} - {-1}:
+                self.state.update_player_harbors(harbor_player)
+        self.update_node_production(node_id)
+        self.road_network.node_owner_changed(node_id)
+        return
 
-        elif 27 <= node_id < 38:
-            if node_id != 27:
-                adjacent_nodes.append(node_id - 1)
-            if node_id != 37:
-                adjacent_nodes.append(node_id + 1)
+    def set_node_city(self, node_id, has_city):
+        """
+        :param node_id: int
+        :param has_city: bool
+        :return: None
+        """
+        if has_city:
+            self.state.cities |= 1 << node_id
+        else:
+            self.state.cities &= ~(1 << node_id)
+        self.state.version += 1
+        self.update_node_production(node_id)
+        return
 
-            if is_even(node_id):
-                adjacent_nodes.append(node_id + 10)
-            else:
-                adjacent_nodes.append(node_id - 11)
+    def add_road(self, player, start, end):
+        """
+        Añade la carretera al estado sin comprobar si se puede construir. Si ya existe no hace nada
+        :param player: int
+        :param start: int
+        :param end: int
+        :return: None
+        """
+        edge_id = BoardTopology.EDGE_IDS[(start, end)]
+        if self.state.edge_owner[edge_id] != -1:
+            return
+        self.state.add_road(player, edge_id)
+        self.road_network.add_road(player, start, end)
+        return
 
-        elif 38 <= node_id < 47:
-            if node_id != 37:
-                adjacent_nodes.append(node_id - 1)
-            if node_id != 46:
-                adjacent_nodes.append(node_id + 1)
+    def set_thief(self, terrain_id, has_thief):
+        """
+        :param terrain_id: int
+        :param has_thief: bool
+        :return: None
+        """
+        if has_thief:
+            self.state.thief = terrain_id
+        elif self.state.thief == terrain_id:
+            self.state.thief = -1
+        self.state.version += 1
+        return
 
-            if is_even(node_id):
-                adjacent_nodes.append(node_id - 10)
+    def update_node_production(self, node_id):
+        """
+        Actualiza las entradas de la tabla de producción de un nodo a partir de su jugador y de si tiene ciudad.
+        :param node_id: int
+        :return: None
+        """
+        player = self.state.node_owner[node_id]
+        amount = 2 if self.state.has_city(node_id) else 1
+        for terrain_id in BoardTopology.CONTACTING_TERRAIN[node_id]:
+            probability = BoardTopology.TERRAIN_PROBABILITIES[terrain_id]
+            if probability not in self.production:
+                # El desierto no produce
+                continue
+
+            if player == -1:
+                self.production[probability].pop((terrain_id, node_id), None)
             else:
-                adjacent_nodes.append(node_id + 8)
-
-        elif 47 <= node_id < 54:
-            if node_id != 47:
-                adjacent_nodes.append(node_id - 1)
-            if node_id != 53:
-                adjacent_nodes.append(node_id + 1)
-
-            if not is_even(node_id):
-                adjacent_nodes.append(node_id - 8)
-
-        return adjacent_nodes
+                self.production[probability][(terrain_id, node_id)] = (player, BoardTopology.TERRAIN_TYPES[terrain_id],
+                                                                       amount)
+        return
 
-    def __get_harbors__(self, node_id):
-        return self.harbors.get(node_id, HarborConstants.NONE)
+    def get_production(self, roll):
+        """
+        Devuelve quién produce qué con la tirada de dados indicada, sin necesidad de recorrer el tablero
+        :param roll: int
+        :return: [(player, material, amount)...]
+        """
+        production = self.production.get(roll)
+        if production is None:
+            return []
+        return production.values()
 
     def build_town(self, player: int, node: int =-1):
         """
@@ -242,18 +297,18 @@ class Board:
         :param node: id del nodo.
         :return: {bool, string}. Devuelve si se ha podido o no construir el poblado, y en caso de no el porqué
         """
-        if self.nodes[node]['player'] != -1:
+        if self.state.node_owner[node] != -1:
             return {'response': False, 'error_msg': 'No se puede construir en un nodo que le pertenece a otro jugador'}
         
         if not self.empty_adjacent_nodes(node):
             return {'response': False, 'error_msg': 'Hay un pueblo o ciudad muy cercano al nodo'}
 
-        can_build = any([road['player_id'] == player for road in self.nodes[node]['roads']])
+        can_build = self.state.road_players[node] >> player & 1
         if not can_build:
             return {'response': False, 'error_msg': 'Debes poseer una carretera hasta el nodo para poder construir un pueblo'}
         
-        self.nodes[node]['player'] = player
-        self.nodes[node]['has_city'] = False
+        self.set_node_player(node, player)
+        self.set_node_city(node, False)
         return {'response': True, 'error_msg': ''}
             
             
@@ -265,16 +320,16 @@ class Board:
         :param node: Número que representa un nodo en el tablero
         :return: {bool, string}. Envía si se ha podido construir la ciudad y en caso de no haberse podido el porqué
         """
-        if self.nodes[node]['player'] != player:
+        if self.state.node_owner[node] != player:
             return {'response': False, 'error_msg': 'Ya posee el nodo otro jugador'}
         
-        if self.nodes[node]['player'] == -1:
+        if self.state.node_owner[node] == -1:
             return {'response': False, 'error_msg': 'Primero debe construirse un poblado'}
 
-        if self.nodes[node]['has_city']:
+        if self.state.has_city(node):
             return {'response': False, 'error_msg': 'Ya hay una ciudad tuya en el nodo'}
         
-        self.nodes[node]['has_city'] = True
+        self.set_node_city(node, True)
         return {'response': True, 'error_msg': ''}
             
 
@@ -288,23 +343,24 @@ class Board:
         :param finishing_node: Nodo al que llega la carretera. Debe ser adyacente
         :return: {bool, string}. Envía si se ha podido construir la carretera y en caso de no haberse podido el porqué
         """
-        # Comprobamos si ya existe una carretera. Dado que las carreteras se registran en
-        # ambas direcciones (como se puede ver al final de la función), solo es necesario
-        # comprobar una de las dos direcciones
-        already_built = any([road['node_id'] == end for road in self.nodes[start]['roads']])
-        if already_built:
+        edge_id = BoardTopology.EDGE_IDS.get((start, end))
+        if edge_id is None:
+            return {'response': False, 'error_msg': 'Los nodos de la carretera no son adyacentes'}
+
+        # Comprobamos si ya existe una carretera. Cada carretera tiene un único ID, da igual la dirección
+        edge_owner = self.state.edge_owner
+        if edge_owner[edge_id] != -1:
             return {'response': False, 'error_msg': 'Ya hay una carretera aquí'}
 
         # comprobamos si el jugador se puede conectar a la carretera, ya sea mediante otra carretera o
         # una ciudad o pueblo
-        conected_road = any([road['player_id'] in [player] for road in self.nodes[start]['roads']])
-        player_owns_node = self.nodes[start]['player'] == player
+        conected_road = self.state.road_players[start] >> player & 1
+        player_owns_node = self.state.node_owner[start] == player
         if not (conected_road or player_owns_node):
             return {'response': False, 'error_msg': 'No puedes hacer una carretera aquí,' +
                         ' no hay una carretera, ciudad o pueblo adyacente que te pertenezca.'}
 
-        self.nodes[start]['roads'].append({'player_id': player, 'node_id': end})
-        self.nodes[end]['roads'].append({'player_id': player, 'node_id': start})
+        self.add_road(player, start, end)
         return {'response': True, 'error_msg': ''}
             
 
@@ -322,7 +378,7 @@ class Board:
             # hay que regenerar tests
             rand_terrain = terrain_id 
             while rand_terrain == terrain_id:
-                rand_terrain = random.randint(0, 18)
+                rand_terrain = self.rng.randint(0, 18)
 
             self.terrain[terrain_id]['has_thief'] = False
             self.terrain[rand_terrain]['has_thief'] = True
@@ -331,13 +387,12 @@ class Board:
                     'terrain_id': rand_terrain,
                     'last_thief_terrain': terrain_id}
         
-        last_terrain = next(filter(lambda square: square['has_thief'], self.terrain)) # buscamos el ladron
-        last_terrain['has_thief'] = False # movemos el ladron
-        self.terrain[terrain_id]['has_thief'] = True
+        last_thief_terrain = self.state.thief # buscamos el ladron
+        self.terrain[terrain_id]['has_thief'] = True # movemos el ladron
         return {'response': True,
                 'error_msg': '',
                 'terrain_id': terrain_id,
-                'last_thief_terrain': last_terrain['id']}
+                'last_thief_terrain': last_thief_terrain}
 
     def empty_adjacent_nodes(self, node_id):
         """
@@ -345,13 +400,14 @@ class Board:
         :param node_id:
         :return: bool
         """
-        for adjacent_id in self.nodes[node_id]['adjacent']:
-            if self.nodes[adjacent_id]['player'] != -1:
+        node_owner = self.state.node_owner
+        for adjacent_id in BoardTopology.ADJACENT_NODES[node_id]:
+            if node_owner[adjacent_id] != -1:
                 return False
         return True
 
     def is_coastal_node(self, node_id):
-        return node_id in self.coastal_nodes
+        return node_id in BoardTopology.COASTAL_NODES
 
     def valid_town_nodes(self, player_id):
         """
@@ -360,17 +416,7 @@ class Board:
         :param player_id: int
         :return: [int...]
         """
-        valid_nodes = []
-        for node in self.nodes:
-            for road in node['roads']:
-                if (
-                    road['player_id'] == player_id and
-                    self.empty_adjacent_nodes(node['id']) and
-                    node['player'] == -1 and
-                    node['id'] not in valid_nodes
-                ):
-                    valid_nodes.append(node['id'])
-        return valid_nodes
+        return self.moves.towns(player_id)
 
     def valid_city_nodes(self, player_id):
         """
@@ -378,8 +424,7 @@ class Board:
         :param player_id: int
         :return: [int...]
         """
-        valid_city_node = lambda node: node['player'] == player_id and node['has_city'] == False
-        return [node['id'] for node in self.nodes if valid_city_node(node)]
+        return self.moves.cities(player_id)
 
 
     def valid_road_nodes(self, player_id): # TODO
@@ -388,34 +433,7 @@ class Board:
         :param player_id:
         :return: [{'starting_node': int, 'finishing_node': int}, ...]
         """
-        valid_nodes = []
-        # Por cada nodo que existe
-        for node in self.nodes:
-            # Se comprueban sus nodos adyacentes
-            for adjacent_node_id in node['adjacent']:
-                # Se crea una variable para ver si se puede construir
-                allowed_to_build = False
-                # Se comprueba que el nodo ADYACENTE sea del jugador o no tenga jugador antes siquiera de mirar si
-                # se puede construir. Si se quiere llegar al pueblo de otro jugador, cuando se esté en ese nodo,
-                # al mirar el adyacente verá que puede construir y dejará hacer la carretera.
-                # Sin embargo, esto evitará que se pueda atravesar pueblos de otros jugadores.
-
-                if self.nodes[adjacent_node_id]['player'] in [player_id, -1]:
-
-                    # Por cada carretera que haya en el nodo adyacente
-                    for road in self.nodes[adjacent_node_id]['roads']:
-                        # Si la carretera no es una carretera de vuelta
-                        if road['node_id'] != node['id']:
-                            allowed_to_build = road['player_id'] == player_id
-                        # En caso de haber una carretera de vuelta, independientemente de qué jugador,
-                        # se corta inmediatamente y se prohíbe construir
-                        else:
-                            allowed_to_build = False
-                            break
-                if allowed_to_build:
-                    valid_nodes.append({'starting_node': adjacent_node_id, 'finishing_node': node['id']})
-
-        return valid_nodes
+        return self.moves.roads(player_id)
 
 
     def valid_starting_nodes(self):
@@ -424,8 +442,7 @@ class Board:
         No necesita número del jugador porque es cualquier nodo que no tenga un jugador en él y no sea costero
         :return: [int]
         """
-        valid_node = lambda n: n['player'] == -1 and self.empty_adjacent_nodes(n['id']) and not self.is_coastal_node(n['id'])
-        return [node['id'] for node in self.nodes if valid_node(node)]
+        return self.moves.starting_towns()
 
 
     def check_for_player_harbors(self, player, material_harbor=None):
@@ -435,19 +452,87 @@ class Board:
         :param material_harbor: int/None
         :return: int
         """
-        # create the inverted dictionary of harbors: {harbor: [nodes...]}
-        inverted_harbors = {harbor: [] for harbor in self.harbors.values()}
-        for node, harbor in self.harbors.items():
-                inverted_harbors[harbor].append(node)
-
-        # specific resource nodes
-        harbor_nodes = inverted_harbors[material_harbor]
-        if any([self.nodes[node_id]['player'] == player for node_id in harbor_nodes]):
+        harbors = self.state.player_harbors[player]
+        if material_harbor is not None and harbors >> material_harbor & 1:
             return material_harbor
-
-        # 3:1 nodes
-        harbor_nodes = inverted_harbors[HarborConstants.ALL]
-        if any([self.nodes[harbor]['player'] == player for harbor in harbor_nodes]):
+        if harbors >> HarborConstants.ALL & 1:
             return HarborConstants.ALL
-
         return HarborConstants.NONE
+
+    def get_trade_ratio(self, player, material):
+        """
+        Cuántas unidades del material tiene que dar el jugador al banco por 1 del material que quiera
+        :param player: int
+        :param material: int. MaterialConstants
+        :return: int. 2 con un puerto de ese material, 3 con un puerto 3:1 y 4 sin puerto
+        """
+        harbors = self.state.player_harbors[player]
+        if harbors >> material & 1:
+            return 2
+        if harbors >> HarborConstants.ALL & 1:
+            return 3
+        return 4
+
+    def get_trade_ratios(self, player):
+        """
+        Lo mismo que get_trade_ratio para todos los materiales a la vez
+        :param player: int
+        :return: [int...] Indexado por MaterialConstants
+        """
+        return [self.get_trade_ratio(player, material) for material in range(5)]
+
+
+class BoardView(Board):
+    """
+    Tablero de solo lectura que comparte el estado con el tablero original. Es el tablero que reciben los agentes:
+    pueden hacer las mismas consultas (nodes, terrain, valid_road_nodes...) y ver el estado actual, pero cualquier
+    intento de modificarlo lanza un TypeError.
+
+    state, production, road_network y moves son vistas de solo lectura de los del tablero original (BoardStateView,
+    MappingProxyType, RoadNetworkView y MoveGeneratorView), así que tampoco se puede cambiar la partida a través de
+    ellos.
+
+    version: int Versión del estado del tablero original. Si no cambia, el tablero no ha cambiado, así que los agentes
+             pueden reutilizar lo que hayan calculado con ella
+    """
+
+    def __init__(self, board):
+        self._state = BoardStateView(board.state)
+        self._production = MappingProxyType({roll: MappingProxyType(production)
+                                             for roll, production in board.production.items()})
+        self._road_network = RoadNetworkView(board.road_network)
+        self._moves = MoveGeneratorView(board.moves)
+        self._nodes = None
+        self._terrain = None
+        self._view = self
+        return
+
+    @property
+    def state(self):
+        return self._state
+
+    @property
+    def production(self):
+        return self._production
+
+    @property
+    def road_network(self):
+        return self._road_network
+
+    @property
+    def moves(self):
+        return self._moves
+
+    def __read_only__(self, *args, **kwargs):
+        raise TypeError('El tablero que reciben los agentes es de solo lectura')
+
+    def get_board(self):
+        """
+        Tablero nuevo, sin nada construido, como en Board. Es un Board que se puede modificar, no una vista. Para una
+        copia con el estado actual está copy_board
+        :return: Board()
+        """
+        return Board()
+
+    build_town = build_city = build_road = move_thief = __read_only__
+    set_node_player = set_node_city = add_road = set_thief = update_node_production = __read_only__
@@ -0,0 +1,247 @@
+from array import array
+from collections.abc import MutableMapping
+
+from Classes.BoardTopology import BoardTopology
+
+
+class BoardState:
+    """
+    Estado de una partida sobre el tablero, guardado en arrays en lugar de diccionarios. La topología no está aquí, está
+    en BoardTopology y se comparte entre todas las partidas.
+
+    node_owner: array[int] Jugador dueño de cada nodo, -1 si no tiene pueblo ni ciudad
+    cities: int Máscara de bits con los nodos que tienen ciudad (bit node_id)
+    edge_owner: array[int] Jugador dueño de cada carretera (BoardTopology.EDGES), -1 si no está construida
+    edge_order: array[int] Orden en el que se construyó cada carretera. Las carreteras de un nodo se devuelven en el orden
+                           en el que se construyeron
+    built_roads: int Número de carreteras construidas
+    road_players: array[int] Máscara de bits con los jugadores que tienen carretera en cada nodo (bit player)
+    last_road_owner: array[int] Jugador de la última carretera construida en cada nodo, -1 si no hay ninguna
+    thief: int ID del terreno con el ladrón, -1 si no está en ninguno
+    player_harbors: [int...] Máscara de bits con los tipos de puerto (HarborConstants) que tiene cada jugador
+    version: int Aumenta con cada cambio del estado. Sirve para saber si lo calculado a partir del tablero sigue valiendo
+    """
+
+    def __init__(self, players=4):
+        self.node_owner = array('b', [-1]) * BoardTopology.NODES
+        self.cities = 0
+        self.edge_owner = array('b', [-1]) * len(BoardTopology.EDGES)
+        self.edge_order = array('i', [0]) * len(BoardTopology.EDGES)
+        self.built_roads = 0
+        self.road_players = array('b', [0]) * BoardTopology.NODES
+        self.last_road_owner = array('b', [-1]) * BoardTopology.NODES
+        self.thief = BoardTopology.THIEF_START_TERRAIN
+        self.player_harbors = [0] * players
+        self.version = 0
+        return
+
+    def update_player_harbors(self, player):
+        """
+        Recalcula los puertos del jugador. Solo hace falta cuando cambia el dueño de un nodo con puerto
+        :param player: int
+        :return: None
+        """
+        harbors = 0
+        for node_id, harbor in BoardTopology.HARBOR_BY_NODE.items():
+            if self.node_owner[node_id] == player:
+                harbors |= 1 << harbor
+        self.player_harbors[player] = harbors
+        return
+
+    def has_city(self, node_id):
+        return bool(self.cities >> node_id & 1)
+
+    def node_roads(self, node_id):
+        """
+        Carreteras construidas en el nodo, en el orden en el que se construyeron
+        :param node_id: int
+        :return: [(player, node_id)...]
+        """
+        edge_owner = self.edge_owner
+        roads = [(self.edge_order[edge_id], edge_owner[edge_id], other_node_id)
+                 for edge_id, other_node_id in BoardTopology.NODE_EDGES[node_id] if edge_owner[edge_id] != -1]
+        roads.sort()
+        return [(player, other_node_id) for _, player, other_node_id in roads]
+
+    def add_road(self, player, edge_id):
+        """
+        :param player: int
+        :param edge_id: int
+        :return: None
+        """
+        self.edge_owner[edge_id] = player
+        self.edge_order[edge_id] = self.built_roads
+        self.built_roads += 1
+        for node_id in BoardTopology.EDGES[edge_id]:
+            self.road_players[node_id] |= 1 << player
+            self.last_road_owner[node_id] = player
+        self.version += 1
+        return
+
+
+class BoardStateView:
+    """
+    Vista de solo lectura de un BoardState, la que ven los agentes en BoardView.state. Tiene los mismos atributos y
+    consultas (has_city, node_roads) y lee siempre el estado actual: los arrays son memoryview de solo lectura sobre los
+    del estado y player_harbors es una tupla. Cambiar cualquier atributo lanza un TypeError.
+    """
+    __slots__ = ('_state', 'node_owner', 'edge_owner', 'edge_order', 'road_players', 'last_road_owner')
+
+    def __init__(self, state):
+        object.__setattr__(self, '_state', state)
+        for name in ('node_owner', 'edge_owner', 'edge_order', 'road_players', 'last_road_owner'):
+            object.__setattr__(self, name, memoryview(getattr(state, name)).toreadonly())
+
+    def __setattr__(self, name, value):
+        raise TypeError('El estado del tablero que reciben los agentes es de solo lectura')
+
+    __delattr__ = __setattr__
+
+    @property
+    def cities(self):
+        return self._state.cities
+
+    @property
+    def built_roads(self):
+        return self._state.built_roads
+
+    @property
+    def thief(self):
+        return self._state.thief
+
+    @property
+    def player_harbors(self):
+        return tuple(self._state.player_harbors)
+
+    @property
+    def version(self):
+        return self._state.version
+
+    def has_city(self, node_id):
+        return self._state.has_city(node_id)
+
+    def node_roads(self, node_id):
+        return self._state.node_roads(node_id)
+
+
+class NodeRoads(list):
+    """
+    Lista de carreteras de un nodo ({'player_id': int, 'node_id': int}) generada a partir del estado del tablero.
+    Añadir una carretera a la lista la construye en el tablero, en ambos nodos
+    """
+    __slots__ = ('board', 'node_id')
+
+    def append(self, road):
+        self.board.add_road(road['player_id'], self.node_id, road['node_id'])
+        super().append(road)
+
+
+class NodeView(MutableMapping):
+    """
+    Vista de un nodo con la misma forma que el diccionario de nodo de siempre:
+    {"id", "adjacent", "harbor", "roads", "has_city", "player", "contacting_terrain"}
+
+    Los valores se leen del estado del tablero cada vez que se piden. Solo se pueden cambiar "player" y "has_city" (y
+    añadir carreteras a "roads"), el resto son parte de la topología.
+    """
+    __slots__ = ('board', 'node_id')
+
+    KEYS = ('id', 'adjacent', 'harbor', 'roads', 'has_city', 'player', 'contacting_terrain')
+
+    def __init__(self, board, node_id):
+        self.board = board
+        self.node_id = node_id
+
+    def __getitem__(self, key):
+        node_id = self.node_id
+        if key == 'player':
+            return self.board.state.node_owner[node_id]
+        if key == 'id':
+            return node_id
+        if key == 'adjacent':
+            return BoardTopology.ADJACENT_NODES[node_id]
+        if key == 'contacting_terrain':
+            return BoardTopology.CONTACTING_TERRAIN[node_id]
+        if key == 'has_city':
+            return self.board.state.has_city(node_id)
+        if key == 'roads':
+            roads = NodeRoads({'player_id': player, 'node_id': other_node_id}
+                              for player, other_node_id in self.board.state.node_roads(node_id))
+            roads.board = self.board
+            roads.node_id = node_id
+            return roads
+        if key == 'harbor':
+            return BoardTopology.HARBORS[node_id]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == 'player':
+            self.board.set_node_player(self.node_id, value)
+        elif key == 'has_city':
+            self.board.set_node_city(self.node_id, value)
+        elif key in self.KEYS:
+            raise TypeError('"' + key + '" no se puede modificar en un nodo')
+        else:
+            raise KeyError(key)
+
+    def __delitem__(self, key):
+        raise TypeError('No se pueden borrar claves de un nodo')
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self):
+        return len(self.KEYS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class TerrainView(MutableMapping):
+    """
+    Vista de un terreno con la misma forma que el diccionario de terreno de siempre:
+    {"id", "has_thief", "probability", "terrain_type", "contacting_nodes"}
+
+    Solo se puede cambiar "has_thief", el resto son parte de la topología.
+    """
+    __slots__ = ('board', 'terrain_id')
+
+    KEYS = ('id', 'has_thief', 'probability', 'terrain_type', 'contacting_nodes')
+
+    def __init__(self, board, terrain_id):
+        self.board = board
+        self.terrain_id = terrain_id
+
+    def __getitem__(self, key):
+        terrain_id = self.terrain_id
+        if key == 'probability':
+            return BoardTopology.TERRAIN_PROBABILITIES[terrain_id]
+        if key == 'has_thief':
+            return self.board.state.thief == terrain_id
+        if key == 'id':
+            return terrain_id
+        if key == 'terrain_type':
+            return BoardTopology.TERRAIN_TYPES[terrain_id]
+        if key == 'contacting_nodes':
+            return BoardTopology.CONTACTING_NODES[terrain_id]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == 'has_thief':
+            self.board.set_thief(self.terrain_id, value)
+        elif key in self.KEYS:
+            raise TypeError('"' + key + '" no se puede modificar en un terreno')
+        else:
+            raise KeyError(key)
+
+    def __delitem__(self, key):
+        raise TypeError('No se pueden borrar claves de un terreno')
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self):
+        return len(self.KEYS)
+
+    def __repr__(self):
+        return repr(dict(self))
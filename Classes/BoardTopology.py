@@ -0,0 +1,222 @@
+from types import MappingProxyType
+
+from Classes.Constants import HarborConstants, TerrainConstants
+from Classes.Utilities import is_even
+
+
+def calculate_adjacent_nodes(node_id):
+    """
+    Función que obtiene los nodos adyacentes de manera automática
+    :param node_id: Id del nodo del que se quieren los ID de los nodos adyacentes
+    :return: [int, ...]
+    """
+    adjacent_nodes = []
+
+    if 0 <= node_id < 7:
+        if node_id != 0:
+            adjacent_nodes.append(node_id - 1)
+        if node_id != 6:
+            adjacent_nodes.append(node_id + 1)
+
+        if is_even(node_id):
+            adjacent_nodes.append(node_id + 8)
+
+    elif 7 <= node_id < 16:
+        if node_id != 7:
+            adjacent_nodes.append(node_id - 1)
+        if node_id != 15:
+            adjacent_nodes.append(node_id + 1)
+
+        if is_even(node_id):
+            adjacent_nodes.append(node_id - 8)
+        else:
+            adjacent_nodes.append(node_id + 10)
+
+    elif 16 <= node_id < 27:
+        if node_id != 16:
+            adjacent_nodes.append(node_id - 1)
+        if node_id != 26:
+            adjacent_nodes.append(node_id + 1)
+
+        if is_even(node_id):
+            adjacent_nodes.append(node_id + 11)
+        else:
+            adjacent_nodes.append(node_id - 10)
+
+    elif 27 <= node_id < 38:
+        if node_id != 27:
+            adjacent_nodes.append(node_id - 1)
+        if node_id != 37:
+            adjacent_nodes.append(node_id + 1)
+
+        if is_even(node_id):
+            adjacent_nodes.append(node_id + 10)
+        else:
+            adjacent_nodes.append(node_id - 11)
+
+    elif 38 <= node_id < 47:
+        if node_id != 37:
+            adjacent_nodes.append(node_id - 1)
+        if node_id != 46:
+            adjacent_nodes.append(node_id + 1)
+
+        if is_even(node_id):
+            adjacent_nodes.append(node_id - 10)
+        else:
+            adjacent_nodes.append(node_id + 8)
+
+    elif 47 <= node_id < 54:
+        if node_id != 47:
+            adjacent_nodes.append(node_id - 1)
+        if node_id != 53:
+            adjacent_nodes.append(node_id + 1)
+
+        if not is_even(node_id):
+            adjacent_nodes.append(node_id - 8)
+
+    return adjacent_nodes
+
+
+def calculate_contacting_terrain(contacting_nodes, total_nodes):
+    """
+    Invierte la tabla de nodos de cada terreno
+    :param contacting_nodes: ((node_id...)...)
+    :param total_nodes: int
+    :return: ((terrain_id...)...) Terrenos que toca cada nodo
+    """
+    contacting_terrain = [[] for _ in range(total_nodes)]
+    for terrain_id, nodes in enumerate(contacting_nodes):
+        for node_id in nodes:
+            contacting_terrain[node_id].append(terrain_id)
+    return tuple(tuple(terrain) for terrain in contacting_terrain)
+
+
+def calculate_harbors(harbor_by_node, total_nodes):
+    """
+    Calcula el puerto de cada nodo y los nodos de cada puerto
+    :param harbor_by_node: {node_id: harbor}
+    :param total_nodes: int
+    :return: (harbor...), {harbor: (node_id...)}
+    """
+    harbors = tuple(harbor_by_node.get(node_id, HarborConstants.NONE) for node_id in range(total_nodes))
+    harbor_nodes = {}
+    for node_id, harbor in harbor_by_node.items():
+        harbor_nodes.setdefault(harbor, []).append(node_id)
+    return harbors, MappingProxyType({harbor: tuple(nodes) for harbor, nodes in harbor_nodes.items()})
+
+
+def calculate_edges(adjacent_nodes):
+    """
+    Lista todas las carreteras posibles del tablero
+    :param adjacent_nodes: ((node_id...)...)
+    :return: ((int, int)...) Cada carretera como (nodo menor, nodo mayor), ordenadas
+    """
+    edges = set()
+    for node_id, adjacent in enumerate(adjacent_nodes):
+        for adjacent_id in adjacent:
+            edges.add((min(node_id, adjacent_id), max(node_id, adjacent_id)))
+    return tuple(sorted(edges))
+
+
+def calculate_node_edges(edges, total_nodes):
+    """
+    Calcula las carreteras posibles de cada nodo
+    :param edges: ((int, int)...)
+    :param total_nodes: int
+    :return: (((edge_id, node_id)...)...) Para cada nodo, el ID de cada carretera y el nodo al que llega
+    """
+    node_edges = [[] for _ in range(total_nodes)]
+    for edge_id, (start, end) in enumerate(edges):
+        node_edges[start].append((edge_id, end))
+        node_edges[end].append((edge_id, start))
+    return tuple(tuple(roads) for roads in node_edges)
+
+
+def calculate_adjacent_edges(adjacent_nodes, edge_ids):
+    """
+    Añade a cada nodo adyacente el ID de la carretera que llega a él
+    :param adjacent_nodes: ((node_id...)...)
+    :param edge_ids: {(int, int): edge_id}
+    :return: (((node_id, edge_id)...)...) En el mismo orden que adjacent_nodes
+    """
+    return tuple(tuple((adjacent_id, edge_ids[(node_id, adjacent_id)]) for adjacent_id in adjacent)
+                 for node_id, adjacent in enumerate(adjacent_nodes))
+
+
+class BoardTopology:
+    """
+    Topología del tablero: todo lo que no cambia durante una partida. Se calcula una sola vez al importar el módulo y
+    la comparten todas las instancias de Board, así que crear un tablero solo tiene que crear el estado de la partida
+    (jugadores, ciudades, carreteras y ladrón).
+
+    Todas las tablas son tuplas (o diccionarios de solo lectura) indexadas por el ID del nodo o del terreno.
+    """
+
+    NODES = 54
+    TERRAIN = 19
+
+    # TODO: esto se deberia de poder calcular automaticamente
+    CONTACTING_NODES = (
+        (0, 1, 2, 8, 9, 10),
+        (2, 3, 4, 10, 11, 12),
+        (4, 5, 6, 12, 13, 14),
+        (7, 8, 9, 17, 18, 19),
+        (9, 10, 11, 19, 20, 21),
+        (11, 12, 13, 21, 22, 23),
+        (13, 14, 15, 23, 24, 25),
+        (16, 17, 18, 27, 28, 29),
+        (18, 19, 20, 29, 30, 31),
+        (20, 21, 22, 31, 32, 33),
+        (22, 23, 24, 33, 34, 35),
+        (24, 25, 26, 35, 36, 37),
+        (28, 29, 30, 38, 39, 40),
+        (30, 31, 32, 40, 41, 42),
+        (32, 33, 34, 42, 43, 44),
+        (34, 35, 36, 44, 45, 46),
+        (39, 40, 41, 47, 48, 49),
+        (41, 42, 43, 49, 50, 51),
+        (43, 44, 45, 51, 52, 53),
+    )
+
+    PROBABILITIES = (11, 12, 9, 4, 6, 5, 10, 7, 3, 11, 4, 8, 8, 10, 9, 3, 5, 2, 6)
+
+    TERRAIN_TYPES = (
+        TerrainConstants.WOOD, TerrainConstants.WOOL, TerrainConstants.CEREAL, TerrainConstants.CLAY,
+        TerrainConstants.MINERAL, TerrainConstants.CLAY, TerrainConstants.WOOL, TerrainConstants.DESERT,
+        TerrainConstants.WOOD, TerrainConstants.CEREAL, TerrainConstants.WOOD, TerrainConstants.CEREAL,
+        TerrainConstants.CLAY, TerrainConstants.WOOL, TerrainConstants.WOOL, TerrainConstants.MINERAL,
+        TerrainConstants.MINERAL, TerrainConstants.CEREAL, TerrainConstants.WOOD,
+    )
+
+    # {node_id: harbor}. Solo están los nodos con puerto
+    HARBOR_BY_NODE = MappingProxyType({
+        0: HarborConstants.WOOD, 1: HarborConstants.WOOD,
+        3: HarborConstants.CEREAL, 4: HarborConstants.CEREAL,
+        14: HarborConstants.CLAY, 15: HarborConstants.CLAY,
+        28: HarborConstants.MINERAL, 38: HarborConstants.MINERAL,
+        50: HarborConstants.WOOL, 51: HarborConstants.WOOL,
+        7: HarborConstants.ALL, 17: HarborConstants.ALL, 26: HarborConstants.ALL, 37: HarborConstants.ALL,
+        45: HarborConstants.ALL, 46: HarborConstants.ALL, 47: HarborConstants.ALL, 48: HarborConstants.ALL
+    })
+
+    COASTAL_NODES = frozenset((0, 1, 2, 3, 4, 5, 6, 7, 8, 14, 15, 16, 17, 25, 26, 27, 28, 36, 37, 38, 39, 45, 46,
+                               47, 48, 49, 50, 51, 52, 53))
+
+    # Tablas derivadas de las anteriores
+    # El ladrón empieza en el desierto, que no tiene probabilidad de salir
+    THIEF_START_TERRAIN = PROBABILITIES.index(7)
+    TERRAIN_PROBABILITIES = tuple(0 if probability == 7 else probability for probability in PROBABILITIES)
+    ADJACENT_NODES = tuple(tuple(calculate_adjacent_nodes(node_id)) for node_id in range(NODES))
+    CONTACTING_TERRAIN = calculate_contacting_terrain(CONTACTING_NODES, NODES)
+    HARBORS, HARBOR_NODES = calculate_harbors(HARBOR_BY_NODE, NODES)
+    # Cada carretera posible tiene un ID: EDGES[edge_id] = (nodo menor, nodo mayor)
+    EDGES = calculate_edges(ADJACENT_NODES)
+    # {(start, end): edge_id} en ambas direcciones
+    EDGE_IDS = MappingProxyType({**{edge: edge_id for edge_id, edge in enumerate(EDGES)},
+                                 **{(edge[1], edge[0]): edge_id for edge_id, edge in enumerate(EDGES)}})
+    NODE_EDGES = calculate_node_edges(EDGES, NODES)
+    # Igual que ADJACENT_NODES, pero con el ID de la carretera a cada nodo adyacente: ((node_id, edge_id)...)
+    ADJACENT_EDGES = calculate_adjacent_edges(ADJACENT_NODES, EDGE_IDS)
+
+    def __init__(self):
+        return
@@ -77,6 +77,22 @@ class DevelopmentCardConstants:
     def __init__(self):
         return
 
+
+class TraceLevelConstants:
+    """
+    Constantes para facilitar la legibilidad al elegir cuánta traza genera el GameDirector.
+    NONE no genera traza, SUMMARY solo genera el resultado de cada partida, FULL genera la traza completa y EVENTS la
+    traza de eventos, mucho más pequeña, de la que se puede sacar la completa (ver TraceEvents)
+    """
+
+    NONE = 'none'
+    SUMMARY = 'summary'
+    FULL = 'full'
+    EVENTS = 'events'
+
+    def __init__(self):
+        return
+
 BuildMaterialsConstants = {
     BuildConstants.TOWN: (1, 0, 1, 1, 1),
     BuildConstants.CITY: (2, 3, 0, 0, 0),
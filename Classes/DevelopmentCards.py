@@ -14,7 +14,7 @@ class DevelopmentDeck:
     # NO se puede jugar una carta que se acaba de comprar SALVO que sea una que te lleve a 10 puntos de victoria
     # Se pueden jugar en cualquier momento de una ronda, incluso antes de tirar el dado (en cualquier on_... del agente)
 
-    def __init__(self):
+    def __init__(self, rng=None):
         # cuidado, [objeto] * n crea n referencias al mismo objeto
         self.deck = [DevelopmentCard(Dcc.KNIGHT, Dcc.KNIGHT_EFFECT) for i in range(14)] # Soldados
         self.deck += [DevelopmentCard(Dcc.VICTORY_POINT, Dcc.VICTORY_POINT_EFFECT) for i in range(5)] # Puntos de victoria
@@ -22,7 +22,9 @@ class DevelopmentDeck:
         self.deck += [DevelopmentCard(Dcc.PROGRESS_CARD, Dcc.YEAR_OF_PLENTY_EFFECT) for i in range(2)]
         self.deck += [DevelopmentCard(Dcc.PROGRESS_CARD, Dcc.MONOPOLY_EFFECT) for i in range(2)]
 
-        random.shuffle(self.deck)
+        # Se baraja con el generador de la partida, si se indica, para que la partida se pueda repetir con su semilla
+        self.rng = rng if rng is not None else random.Random()
+        self.rng.shuffle(self.deck)
 
 
     def draw_card(self):
@@ -1,13 +1,14 @@
-from Classes.Materials import Materials
+from Classes.ResourceVector import ResourceVector
 
 
 class Hand:
     """
-    Clase que representa la mano de los jugadores
+    Clase que representa la mano de los jugadores. Los materiales se guardan en un ResourceVector que se modifica en el
+    sitio, sin crear objetos nuevos en cada suma o resta
     """
 
     def __init__(self):
-        self.resources = Materials(0,0,0,0,0)
+        self.resources = ResourceVector()
 
 
     def add_material(self, resource_id, amount):
@@ -17,9 +18,7 @@ class Hand:
         :param amount: (int) cantidad del recurso a añadir.
         :return: None
         """
-        materials = Materials.from_ids(resource_id, amount)
-        materials = materials + self.resources
-        self.resources = materials.replace_negative()
+        self.resources.add_from_id_in_place(resource_id, amount)
 
 
     def remove_material(self, resource, amount):
@@ -29,14 +28,14 @@ class Hand:
         :param amount: (int)cantidad del recurso a quitar.
         :return: None
         """
-        self.add_material(resource, -amount)
+        self.resources.add_from_id_in_place(resource, -amount)
 
 
     def get_from_id(self, material_id):
-        return self.resources.get_from_id(material_id)
+        return self.resources.amounts[material_id]
 
     def get_total(self):
-        return sum(self.resources)
+        return sum(self.resources.amounts)
 
     def __str__(self):
-        return f'Hand: {str(self.resources)}' 
\ No newline at end of file
+        return f'Hand: {str(self.resources)}'
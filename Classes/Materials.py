@@ -6,7 +6,11 @@ import operator as op
 
 class Materials(NamedTuple):
     """
-    Clase que representa los materiales. Se usa tanto en la mano de los jugadores como en las ofertas
+    Clase que representa los materiales. Se usa en las ofertas; la mano de los jugadores usa ResourceVector, que tiene
+    la misma interfaz pero se modifica sin crear objetos nuevos.
+
+    == compara material a material y <=, >=, <, > son el orden parcial por componentes: a <= b si a tiene como mucho lo
+    que tiene b de cada material.
     """
     cereal: int
     mineral: int
@@ -19,7 +23,11 @@ class Materials(NamedTuple):
     def from_ids(cls, ids, amount = 1):
         if isinstance(ids, int):
             ids = [ids]
-        return Materials(*[amount * ids.count(id) for id in range(5)])
+        amounts = [0, 0, 0, 0, 0]
+        for id in ids:
+            if 0 <= id <= 4:
+                amounts[id] += amount
+        return Materials(*amounts)
         
     @classmethod
     def from_iterable(cls, iterable):
@@ -53,13 +61,16 @@ class Materials(NamedTuple):
         """
         Si le llega otra clase Materials() comprobará si hay más o igual materiales que los que hay en el parámetro y
         si le llega un string con lo que se quiere construir comprobará si tiene suficiente material para hacerlo.
+        Pedir cantidades negativas devuelve False.
         :param materials: (str o Materials()) Nombre de lo que se quiere construir o materiales.
         :return: bool
         """
         if isinstance(materials, str):
-            materials = Materials.from_building(materials)
-            
-        return all(materials <= self)
+            materials = bmc.get(materials)
+            if materials is None:
+                return False
+
+        return all(0 <= need <= have for have, need in zip(self, materials))
     
     def __str__(self):
         material_icons = ["🥖", "🪨", "🧱", "🪵", "🧶"]
@@ -74,21 +85,29 @@ class Materials(NamedTuple):
     def __repr__(self):
         return 'Materials()'
 
-    # aqui hay demasiado codigo repetido, debe haber una mejor forma
     def __eq__(self, other):
-        return map(op.eq, self, other)
+        try:
+            return len(other) == 5 and all(map(op.eq, self, other))
+        except TypeError:
+            return NotImplemented
 
-    def __lt__(self, other):
-        return map(op.lt, self, other)
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = tuple.__hash__
 
     def __le__(self, other):
-        return map(op.le, self, other)
+        return all(map(op.le, self, other))
 
-    def __gt__(self, other):
-        return map(op.gt, self, other)
-        
     def __ge__(self, other):
-        return map(op.ge, self, other)
+        return all(map(op.ge, self, other))
+
+    def __lt__(self, other):
+        return self <= other and self != other
+
+    def __gt__(self, other):
+        return self >= other and self != other
 
     def __sub__(self, other):
         return Materials(*map(op.sub, self, other))
@@ -100,4 +119,4 @@ class Materials(NamedTuple):
         return Materials(*map(op.mul, self, other))
     
     def __rmul__(self, other):
-        return self.__mul__(other)
\ No newline at end of file
+        return self.__mul__(other)
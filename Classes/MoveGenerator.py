@@ -0,0 +1,168 @@
+from Classes.BoardTopology import BoardTopology
+from Classes.Constants import BuildConstants
+
+
+class MoveGenerator:
+    """
+    Genera las jugadas legales de cada jugador sobre el tablero: carreteras, pueblos, ciudades y cartas de desarrollo.
+
+    Los resultados se guardan por (tipo de jugada, jugador) junto a la versión del tablero con la que se calcularon. Si
+    el tablero no ha cambiado desde entonces se devuelven sin recalcular; cualquier construcción cambia la versión y los
+    invalida. Se devuelve siempre una copia para que quien la reciba pueda modificarla sin estropear la caché.
+
+    state: BoardState() Estado del tablero del que se generan las jugadas
+    cache: {(str, int): (int, (...))} Jugadas calculadas y la versión del tablero con la que se calcularon
+    """
+
+    ROAD = BuildConstants.ROAD
+    TOWN = BuildConstants.TOWN
+    CITY = BuildConstants.CITY
+    CARD = BuildConstants.CARD
+    STARTING_TOWN = 'starting_town'
+
+    def __init__(self, state):
+        self.state = state
+        self.cache = {}
+        return
+
+    def roads(self, player_id):
+        """
+        Carreteras que puede construir el jugador
+        :param player_id: int
+        :return: [{'starting_node': int, 'finishing_node': int}, ...]
+        """
+        return [dict(road) for road in self._get(self.ROAD, player_id, self._calculate_roads)]
+
+    def towns(self, player_id):
+        """
+        Nodos en los que el jugador puede construir un pueblo
+        :param player_id: int
+        :return: [int...]
+        """
+        return list(self._get(self.TOWN, player_id, self._calculate_towns))
+
+    def cities(self, player_id):
+        """
+        Nodos en los que el jugador puede construir una ciudad
+        :param player_id: int
+        :return: [int...]
+        """
+        return list(self._get(self.CITY, player_id, self._calculate_cities))
+
+    def starting_towns(self):
+        """
+        Nodos válidos para los pueblos de la colocación inicial. Son los mismos para todos los jugadores
+        :return: [int...]
+        """
+        return list(self._get(self.STARTING_TOWN, -1, self._calculate_starting_towns))
+
+    def legal_moves(self, player_id, hand=None, cards_left=True):
+        """
+        Todas las construcciones legales del jugador. Si se pasa la mano solo se incluyen las que puede pagar
+        :param player_id: int
+        :param hand: Hand()/None
+        :param cards_left: bool. Si quedan cartas de desarrollo en el mazo
+        :return: {'road': [{'starting_node': int, 'finishing_node': int}...], 'town': [int...], 'city': [int...],
+                  'card': bool}
+        """
+        can_pay = (lambda building: True) if hand is None else hand.resources.has_more
+        return {
+            self.ROAD: self.roads(player_id) if can_pay(self.ROAD) else [],
+            self.TOWN: self.towns(player_id) if can_pay(self.TOWN) else [],
+            self.CITY: self.cities(player_id) if can_pay(self.CITY) else [],
+            self.CARD: cards_left and can_pay(self.CARD),
+        }
+
+    def _get(self, move_type, player_id, calculate):
+        """
+        Devuelve las jugadas de la caché si se calcularon con la versión actual del tablero y si no las calcula
+        :param move_type: str
+        :param player_id: int
+        :param calculate: function(player_id) -> tuple
+        :return: tuple
+        """
+        version = self.state.version
+        cached = self.cache.get((move_type, player_id))
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        moves = calculate(player_id)
+        self.cache[(move_type, player_id)] = (version, moves)
+        return moves
+
+    def _empty_adjacent_nodes(self, node_id):
+        node_owner = self.state.node_owner
+        for adjacent_id in BoardTopology.ADJACENT_NODES[node_id]:
+            if node_owner[adjacent_id] != -1:
+                return False
+        return True
+
+    def _calculate_roads(self, player_id):
+        node_owner = self.state.node_owner
+        edge_owner = self.state.edge_owner
+        last_road_owner = self.state.last_road_owner
+        valid_nodes = []
+        # Por cada nodo que existe
+        for node_id, adjacent_edges in enumerate(BoardTopology.ADJACENT_EDGES):
+            # Se comprueban sus nodos adyacentes
+            for adjacent_node_id, edge_id in adjacent_edges:
+                # Se puede construir si la última carretera que se construyó en el nodo ADYACENTE es del jugador y no
+                # hay ya una carretera entre los dos nodos, sea de quien sea.
+                # Además, el nodo adyacente tiene que ser del jugador o no tener jugador. Si se quiere llegar al pueblo
+                # de otro jugador, cuando se esté en ese nodo, al mirar el adyacente verá que puede construir y dejará
+                # hacer la carretera. Sin embargo, esto evitará que se pueda atravesar pueblos de otros jugadores.
+                if (
+                    last_road_owner[adjacent_node_id] == player_id and
+                    edge_owner[edge_id] == -1 and
+                    node_owner[adjacent_node_id] in (player_id, -1)
+                ):
+                    valid_nodes.append({'starting_node': adjacent_node_id, 'finishing_node': node_id})
+        return tuple(valid_nodes)
+
+    def _calculate_towns(self, player_id):
+        node_owner = self.state.node_owner
+        road_players = self.state.road_players
+        return tuple(node_id for node_id in range(BoardTopology.NODES)
+                     if road_players[node_id] >> player_id & 1 and node_owner[node_id] == -1 and
+                     self._empty_adjacent_nodes(node_id))
+
+    def _calculate_cities(self, player_id):
+        cities = self.state.cities
+        return tuple(node_id for node_id, player in enumerate(self.state.node_owner)
+                     if player == player_id and not cities >> node_id & 1)
+
+    def _calculate_starting_towns(self, player_id):
+        return tuple(node_id for node_id, player in enumerate(self.state.node_owner)
+                     if player == -1 and node_id not in BoardTopology.COASTAL_NODES and
+                     self._empty_adjacent_nodes(node_id))
+
+
+class MoveGeneratorView:
+    """
+    Vista de solo lectura de un MoveGenerator, la que ven los agentes en BoardView.moves. Tiene las mismas consultas y
+    comparte su caché, pero no deja cambiar la caché ni el estado del que se generan las jugadas.
+    """
+    __slots__ = ('_moves',)
+
+    def __init__(self, moves):
+        object.__setattr__(self, '_moves', moves)
+
+    def __setattr__(self, name, value):
+        raise TypeError('Las jugadas del tablero que reciben los agentes son de solo lectura')
+
+    __delattr__ = __setattr__
+
+    def roads(self, player_id):
+        return self._moves.roads(player_id)
+
+    def towns(self, player_id):
+        return self._moves.towns(player_id)
+
+    def cities(self, player_id):
+        return self._moves.cities(player_id)
+
+    def starting_towns(self):
+        return self._moves.starting_towns()
+
+    def legal_moves(self, player_id, hand=None, cards_left=True):
+        return self._moves.legal_moves(player_id, hand, cards_left)
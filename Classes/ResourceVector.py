@@ -0,0 +1,218 @@
+from Classes.Constants import BuildMaterialsConstants
+from Classes.Materials import Materials
+
+
+class ResourceVector:
+    """
+    Vector de 5 materiales (cereal, mineral, arcilla, madera y lana) que se modifica sin crear objetos nuevos. Es el que
+    usa Hand para guardar los materiales del jugador.
+
+    Tiene la misma interfaz de lectura que Materials (cereal, get_from_id, has_more, __to_object__...), así que los
+    agentes pueden seguir usando hand.resources igual que antes. Las operaciones +, - y * y add_from_id/remove_from_id
+    devuelven un vector nuevo como en Materials; add, subtract y add_from_id_in_place modifican este.
+
+    Las comparaciones devuelven bool. == compara material a material con cualquier secuencia de 5 enteros y <=, >=, <, >
+    son el orden parcial por componentes: a <= b si a tiene como mucho lo que tiene b de cada material.
+
+    amounts: [int, int, int, int, int] Cantidad de cada material, por MaterialConstants
+    """
+    __slots__ = ('amounts',)
+    __hash__ = None
+
+    # Coste de cada construcción (BuildConstants). Se calcula una vez para no crear Materials en cada comprobación
+    BUILD_COSTS = {building: tuple(cost) for building, cost in BuildMaterialsConstants.items()}
+
+    def __init__(self, cereal=0, mineral=0, clay=0, wood=0, wool=0):
+        self.amounts = [cereal, mineral, clay, wood, wool]
+        return
+
+    # constructores alternativos
+    @classmethod
+    def from_iterable(cls, iterable):
+        return cls(*iterable)
+
+    @classmethod
+    def from_ids(cls, ids, amount=1):
+        vector = cls()
+        vector.add_from_id_in_place(ids, amount)
+        return vector
+
+    @property
+    def cereal(self):
+        return self.amounts[0]
+
+    @property
+    def mineral(self):
+        return self.amounts[1]
+
+    @property
+    def clay(self):
+        return self.amounts[2]
+
+    @property
+    def wood(self):
+        return self.amounts[3]
+
+    @property
+    def wool(self):
+        return self.amounts[4]
+
+    def to_materials(self):
+        """
+        Copia inmutable de los materiales, por ejemplo para guardarla en una oferta
+        :return: Materials()
+        """
+        return Materials(*self.amounts)
+
+    def copy(self):
+        return ResourceVector(*self.amounts)
+
+    # -- -- -- -- Operaciones en el propio vector -- -- -- --
+    def add_from_id_in_place(self, material_ids, amount):
+        """
+        Suma amount al material o materiales seleccionados (si es negativo lo resta). Ningún material baja de 0
+        :param material_ids: (int o list[int]) tipo de material(es). Si se repite un material se suma varias veces. Los
+                             IDs que no son de un material (como el desierto, -1) se ignoran
+        :param amount: int
+        :return: None
+        """
+        amounts = self.amounts
+        if isinstance(material_ids, int):
+            material_ids = (material_ids,)
+        for material_id in material_ids:
+            if 0 <= material_id <= 4:
+                value = amounts[material_id] + amount
+                amounts[material_id] = value if value > 0 else 0
+        return
+
+    def add(self, materials):
+        """
+        Suma otros materiales a este vector. Ningún material baja de 0
+        :param materials: (Materials(), ResourceVector() o secuencia de 5 int)
+        :return: None
+        """
+        amounts = self.amounts
+        for material_id, amount in enumerate(materials):
+            value = amounts[material_id] + amount
+            amounts[material_id] = value if value > 0 else 0
+        return
+
+    def subtract(self, materials):
+        """
+        Resta otros materiales a este vector. Ningún material baja de 0
+        :param materials: (Materials(), ResourceVector() o secuencia de 5 int)
+        :return: None
+        """
+        amounts = self.amounts
+        for material_id, amount in enumerate(materials):
+            value = amounts[material_id] - amount
+            amounts[material_id] = value if value > 0 else 0
+        return
+
+    # -- -- -- -- Consultas -- -- -- --
+    def can_afford(self, building):
+        """
+        Si hay materiales suficientes para la construcción
+        :param building: (str) BuildConstants
+        :return: bool
+        """
+        cost = self.BUILD_COSTS.get(building)
+        if cost is None:
+            return False
+        amounts = self.amounts
+        return (amounts[0] >= cost[0] and amounts[1] >= cost[1] and amounts[2] >= cost[2] and
+                amounts[3] >= cost[3] and amounts[4] >= cost[4])
+
+    def has_more(self, materials):
+        """
+        Si le llega un string con lo que se quiere construir comprobará si tiene suficiente material para hacerlo. Si le
+        llegan materiales comprobará si tiene al menos esos materiales. Pedir cantidades negativas devuelve False.
+        :param materials: (str, Materials() o ResourceVector()) Nombre de lo que se quiere construir o materiales.
+        :return: bool
+        """
+        if isinstance(materials, str):
+            return self.can_afford(materials)
+        cereal, mineral, clay, wood, wool = materials
+        amounts = self.amounts
+        return (0 <= cereal <= amounts[0] and 0 <= mineral <= amounts[1] and 0 <= clay <= amounts[2] and
+                0 <= wood <= amounts[3] and 0 <= wool <= amounts[4])
+
+    def get_from_id(self, material_constant):
+        return self.amounts[material_constant]
+
+    def is_empty(self):
+        return not any(self.amounts)
+
+    def check_negative(self):
+        return any(n < 0 for n in self.amounts)
+
+    def replace_negative(self):
+        return ResourceVector(*[0 if n < 0 else n for n in self.amounts])
+
+    # -- -- -- -- Operaciones que devuelven un vector nuevo, como Materials -- -- -- --
+    def add_from_id(self, material_constant, amount):
+        vector = self.copy()
+        vector.amounts[material_constant] += amount
+        return vector
+
+    def remove_from_id(self, material_constant, amount):
+        return self.add_from_id(material_constant, -amount)
+
+    def __add__(self, other):
+        return ResourceVector(*[a + b for a, b in zip(self.amounts, other)])
+
+    def __sub__(self, other):
+        return ResourceVector(*[a - b for a, b in zip(self.amounts, other)])
+
+    def __mul__(self, other):
+        if isinstance(other, int):
+            return ResourceVector(*[a * other for a in self.amounts])
+        return ResourceVector(*[a * b for a, b in zip(self.amounts, other)])
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    # -- -- -- -- Comparaciones -- -- -- --
+    def __eq__(self, other):
+        try:
+            return len(other) == 5 and all(a == b for a, b in zip(self.amounts, other))
+        except TypeError:
+            return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __le__(self, other):
+        return all(a <= b for a, b in zip(self.amounts, other))
+
+    def __ge__(self, other):
+        return all(a >= b for a, b in zip(self.amounts, other))
+
+    def __lt__(self, other):
+        return self <= other and self != other
+
+    def __gt__(self, other):
+        return self >= other and self != other
+
+    # -- -- -- -- Secuencia -- -- -- --
+    def __iter__(self):
+        return iter(self.amounts)
+
+    def __getitem__(self, material_constant):
+        return self.amounts[material_constant]
+
+    def __len__(self):
+        return 5
+
+    def __str__(self):
+        material_icons = ["🥖", "🪨", "🧱", "🪵", "🧶"]
+        return " ".join(str(amount).rjust(2) + icon for amount, icon in zip(self.amounts, material_icons))
+
+    def __to_object__(self):
+        amounts = self.amounts
+        return {'cereal': str(amounts[0]), 'mineral': str(amounts[1]), 'clay': str(amounts[2]),
+                'wood': str(amounts[3]), 'wool': str(amounts[4])}
+
+    def __repr__(self):
+        return 'ResourceVector(' + ', '.join(str(amount) for amount in self.amounts) + ')'
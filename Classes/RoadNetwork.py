@@ -0,0 +1,200 @@
+class RoadNetwork:
+    """
+    Clase que mantiene la red de carreteras de cada jugador para calcular la carretera más larga sin recorrer todo el
+    tablero en cada turno.
+
+    edges: [{(int, int)...}...] Conjunto de carreteras (nodo menor, nodo mayor) de cada jugador
+    adjacency: [{node_id: [(node_id, int)...]}...] Para cada jugador y nodo, los nodos a los que llega con sus
+                                                   carreteras y el bit que identifica a cada carretera
+    lengths: [int...] Longitud de la carretera más larga de cada jugador. Solo se recalcula la de los jugadores
+                      cuya red ha cambiado (dirty) desde la última consulta
+
+    Las carreteras se cortan en los nodos con un pueblo o ciudad de otro jugador: la carretera puede acabar en ese
+    nodo, pero no atravesarlo.
+
+    node_owner: Secuencia con el jugador dueño de cada nodo (BoardState.node_owner). Se lee cada vez que se recalcula,
+                así que tiene que estar al día con el tablero
+    """
+
+    def __init__(self, node_owner, players=4):
+        self.node_owner = node_owner
+        self.edges = [set() for _ in range(players)]
+        self.adjacency = [{} for _ in range(players)]
+        self.lengths = [0] * players
+        self.dirty = set()
+        return
+
+    def add_road(self, player, start, end):
+        """
+        Añade una carretera a la red del jugador y marca su longitud para recalcularla
+        :param player: int
+        :param start: int
+        :param end: int
+        :return: None
+        """
+        edge = (start, end) if start < end else (end, start)
+        if edge in self.edges[player]:
+            return
+
+        bit = 1 << len(self.edges[player])
+        self.edges[player].add(edge)
+        self.adjacency[player].setdefault(start, []).append((end, bit))
+        self.adjacency[player].setdefault(end, []).append((start, bit))
+        self.dirty.add(player)
+        return
+
+    def node_owner_changed(self, node_id):
+        """
+        Un pueblo nuevo puede cortar las carreteras que pasan por el nodo, así que se recalculan los jugadores con
+        carreteras en él
+        :param node_id: int
+        :return: None
+        """
+        for player, adjacency in enumerate(self.adjacency):
+            if node_id in adjacency:
+                self.dirty.add(player)
+        return
+
+    def get_longest_road(self, player):
+        """
+        :param player: int
+        :return: int. Longitud de la carretera más larga del jugador
+        """
+        if player in self.dirty:
+            self.lengths[player] = self._calculate(player)
+            self.dirty.discard(player)
+        return self.lengths[player]
+
+    def longest_road(self):
+        """
+        Jugador con la carretera más larga. En caso de empate se queda el de menor ID
+        :return: {'longest_road': int, 'player': int}
+        """
+        longest_road_obj = {'longest_road': 0, 'player': -1}
+        for player in range(len(self.lengths)):
+            length = self.get_longest_road(player)
+            if length > longest_road_obj['longest_road']:
+                longest_road_obj = {'longest_road': length, 'player': player}
+        return longest_road_obj
+
+    def _calculate(self, player):
+        """
+        Busca el camino más largo sin repetir carreteras.
+
+        Primero se comprimen los tramos de nodos con exactamente 2 carreteras (y sin pueblo rival) en una sola carretera
+        con peso, ya que un camino que entra en un tramo tiene que recorrerlo entero. Después se hace la búsqueda desde
+        los nodos que quedan, guardando las carreteras usadas como una máscara de bits. Un camino más largo que empiece
+        a mitad de un tramo tiene que volver a su nodo inicial, así que también puede empezarse en un extremo del tramo.
+        Los ciclos sin bifurcaciones se recorren enteros.
+        :param player: int
+        :return: int
+        """
+        adjacency = self.adjacency[player]
+        node_owner = self.node_owner
+
+        def is_blocked(node_id):
+            return node_owner[node_id] not in (-1, player)
+
+        junctions = {node_id for node_id, roads in adjacency.items() if len(roads) != 2 or is_blocked(node_id)}
+
+        # Se comprimen los tramos entre bifurcaciones: {node_id: [(node_id, bit, length)...]}
+        compressed = {node_id: [] for node_id in junctions}
+        used_roads = 0
+        compressed_bit = 1
+        for node_id in junctions:
+            for next_node_id, bit in adjacency[node_id]:
+                if used_roads & bit:
+                    continue
+                used_roads |= bit
+                length = 1
+                while next_node_id not in junctions:
+                    # Nodo con 2 carreteras, se sigue por la que no se ha usado
+                    for following_node_id, following_bit in adjacency[next_node_id]:
+                        if not used_roads & following_bit:
+                            used_roads |= following_bit
+                            next_node_id = following_node_id
+                            length += 1
+                            break
+                compressed[node_id].append((next_node_id, compressed_bit, length))
+                if next_node_id != node_id:
+                    compressed[next_node_id].append((node_id, compressed_bit, length))
+                compressed_bit <<= 1
+
+        total_length = bin(used_roads).count('1')
+        longest_road = 0
+
+        def walk(node_id, used, length):
+            # length también es lo que se ha usado de total_length, así que si ni usando todas las carreteras que
+            # quedan se supera el mejor camino encontrado no hace falta seguir buscando
+            nonlocal longest_road
+            if length > longest_road:
+                longest_road = length
+            if total_length <= longest_road:
+                return
+            for next_node_id, bit, road_length in compressed[node_id]:
+                if not used & bit:
+                    if is_blocked(next_node_id):
+                        if length + road_length > longest_road:
+                            longest_road = length + road_length
+                    else:
+                        walk(next_node_id, used | bit, length + road_length)
+
+        # Se empieza por los extremos, que es donde suelen empezar los caminos más largos
+        for node_id in sorted(junctions, key=lambda junction: len(compressed[junction])):
+            walk(node_id, 0, 0)
+
+        # Las carreteras que no se han comprimido forman ciclos sin bifurcaciones, que se recorren enteros
+        pending_roads = len(self.edges[player]) - bin(used_roads).count('1')
+        if pending_roads:
+            cycles = {}
+            for node_id, roads in adjacency.items():
+                for next_node_id, bit in roads:
+                    if not used_roads & bit:
+                        cycles[bit] = self._cycle_length(adjacency, node_id, bit)
+                        used_roads |= cycles[bit][1]
+            longest_road = max([longest_road] + [length for length, cycle_roads in cycles.values()])
+
+        return longest_road
+
+    @staticmethod
+    def _cycle_length(adjacency, node_id, bit):
+        """
+        Recorre un ciclo sin bifurcaciones empezando por la carretera indicada
+        :param adjacency: {node_id: [(node_id, int)...]}
+        :param node_id: int
+        :param bit: int
+        :return: int, int. Longitud del ciclo y máscara con sus carreteras
+        """
+        cycle_roads = bit
+        length = 1
+        current = next(next_node_id for next_node_id, road_bit in adjacency[node_id] if road_bit == bit)
+        while current != node_id:
+            for next_node_id, road_bit in adjacency[current]:
+                if not cycle_roads & road_bit:
+                    cycle_roads |= road_bit
+                    current = next_node_id
+                    length += 1
+                    break
+        return length, cycle_roads
+
+
+class RoadNetworkView:
+    """
+    Vista de solo lectura de una RoadNetwork, la que ven los agentes en BoardView.road_network. Solo tiene las consultas
+    de la carretera más larga, sin acceso a las carreteras de cada jugador.
+    """
+    __slots__ = ('_road_network',)
+
+    def __init__(self, road_network):
+        object.__setattr__(self, '_road_network', road_network)
+
+    def __setattr__(self, name, value):
+        raise TypeError('La red de carreteras del tablero que reciben los agentes es de solo lectura')
+
+    __delattr__ = __setattr__
+
+    def get_longest_road(self, player):
+        return self._road_network.get_longest_road(player)
+
+    def longest_road(self):
+        return self._road_network.longest_road()
@@ -0,0 +1,338 @@
+import math
+import pickle
+import struct
+from array import array
+
+from Classes.BoardTopology import BoardTopology
+from Classes.DevelopmentCards import DevelopmentCard
+
+
+class SandboxProtocol:
+    """
+    Protocolo binario entre un SandboxedAgent y el proceso en el que se ejecuta su agente.
+
+    El proceso del agente tiene una copia del tablero, de la mano y de las cartas de desarrollo del agente. En cada
+    llamada a un trigger solo se envía lo que ha cambiado desde la llamada anterior, no el tablero entero. También se
+    envía el estado del generador de números aleatorios de la partida, que el agente comparte con el motor, para que
+    la partida sea la misma que con el agente en el mismo proceso. Del generador normalmente solo cambia la posición,
+    así que sus 624 palabras solo se envían cuando cambian, y si es un TrackedRandom solo se mira su estado cuando
+    alguien lo ha usado.
+
+    Mensajes al agente (enteros little-endian):
+        NEW_GAME: byte tipo, byte id del agente. El proceso crea un agente nuevo con el estado vacío
+        CLOSE: byte tipo. El proceso termina
+        CALL: byte tipo, byte trigger (TRIGGERS), uint16 secciones. Después, por orden, cada sección incluida:
+            NODES: byte n y n × (byte nodo, int8 jugador). Nodos que han cambiado de dueño
+            CITIES: uint64 máscara de bits con los nodos que tienen ciudad
+            ROADS: byte n y n × (byte carretera, byte jugador). Carreteras nuevas, en el orden en el que se construyeron
+            THIEF: int8 terreno con el ladrón
+            HAND: 5 × int16 materiales de la mano
+            DEVELOPMENT_CARDS: byte n y n × (byte tipo, byte efecto). Todas las cartas de desarrollo de la mano
+            RNG: uint16 posición del generador y double gauss_next (NaN si no tiene)
+            RNG_WORDS: 624 × uint32 palabras del generador
+            BOARD_ARGUMENT: sin datos. El primer argumento del trigger es el tablero
+        y el resto de argumentos del trigger en pickle, si los hay
+
+    Respuestas (agente al motor): byte tipo de respuesta (NONE, TRUE, FALSE, CARD, HAND_RESPONSE, PICKLE o ERROR),
+    uint16 secciones y las secciones HAND, RNG y RNG_WORDS si el agente ha cambiado su mano o ha usado el generador.
+    Después, con CARD un byte con el índice de la carta en la mano, con PICKLE la respuesta en pickle y con ERROR la
+    traza de la excepción del agente en UTF-8.
+
+    Cada lado tiene una instancia que guarda lo que el otro ya sabe, así que hay una por agente y se reinicia al empezar
+    cada partida (new_game).
+    """
+    NEW_GAME, CALL, CLOSE = range(3)
+    NONE, TRUE, FALSE, CARD, HAND_RESPONSE, PICKLE, ERROR = range(7)
+
+    NODES = 1
+    CITIES = 2
+    ROADS = 4
+    THIEF = 8
+    HAND = 16
+    DEVELOPMENT_CARDS = 32
+    RNG = 64
+    RNG_WORDS = 128
+    BOARD_ARGUMENT = 256
+
+    TRIGGERS = ('on_trade_offer', 'on_turn_start', 'on_having_more_than_7_materials_when_thief_is_called',
+                'on_moving_thief', 'on_turn_end', 'on_commerce_phase', 'on_build_phase', 'on_game_start',
+                'on_monopoly_card_use', 'on_road_building_card_use', 'on_year_of_plenty_card_use')
+    TRIGGER_IDS = {trigger: trigger_id for trigger_id, trigger in enumerate(TRIGGERS)}
+
+    CALL_HEADER = struct.Struct('<BBH')
+    RESPONSE_HEADER = struct.Struct('<BH')
+    HAND_STRUCT = struct.Struct('<5h')
+    RNG_STRUCT = struct.Struct('<Hd')
+    RNG_WORDS_SIZE = 624 * 4
+
+    EMPTY_NODE_OWNER = (array('b', [-1]) * BoardTopology.NODES).tobytes()
+
+    def __init__(self):
+        # Lo que sabe el otro lado
+        self.node_owner = self.EMPTY_NODE_OWNER
+        self.cities = 0
+        self.built_roads = 0
+        self.thief = BoardTopology.THIEF_START_TERRAIN
+        self.hand = (0, 0, 0, 0, 0)
+        self.development_cards = ()
+        self.rng_state = None
+        # Tablero y generador de los que se ha enviado el estado, y su versión en ese momento
+        self.state = None
+        self.version = -1
+        self.rng = None
+        self.rng_draws = -1
+        return
+
+    def new_game(self, agent_id):
+        """
+        El proceso del agente vuelve a tener el estado vacío
+        :param agent_id: int
+        :return: bytes. Mensaje NEW_GAME
+        """
+        self.__init__()
+        return bytes((self.NEW_GAME, agent_id))
+
+    # -- -- -- -- Lado del motor -- -- -- --
+    def encode_call(self, trigger, board, hand, development_cards, rng, args):
+        """
+        Mensaje CALL con los cambios desde el anterior
+        :param trigger: str
+        :param board: Board(). Tablero del que se envían los cambios
+        :param hand: Hand()
+        :param development_cards: [DevelopmentCard...]
+        :param rng: random.Random()
+        :param args: tuple. Argumentos del trigger. Si el primero es el tablero no se envía, se usa la copia
+        :return: bytes
+        """
+        sections = 0
+        body = []
+
+        state = board.state
+        if state is not self.state or state.version != self.version:
+            node_owner = state.node_owner.tobytes()
+            if node_owner != self.node_owner:
+                changes = [(node_id, owner) for node_id, (owner, previous_owner)
+                           in enumerate(zip(node_owner, self.node_owner)) if owner != previous_owner]
+                sections |= self.NODES
+                body.append(bytes((len(changes),)) + bytes(value for change in changes for value in change))
+                self.node_owner = node_owner
+            if state.cities != self.cities:
+                sections |= self.CITIES
+                body.append(state.cities.to_bytes(8, 'little'))
+                self.cities = state.cities
+            if state.built_roads != self.built_roads:
+                edge_owner, edge_order = state.edge_owner, state.edge_order
+                roads = sorted((edge_order[edge_id], edge_id) for edge_id in range(len(edge_owner))
+                               if edge_owner[edge_id] != -1 and edge_order[edge_id] >= self.built_roads)
+                sections |= self.ROADS
+                body.append(bytes((len(roads),)) +
+                            bytes(value for _, edge_id in roads for value in (edge_id, edge_owner[edge_id])))
+                self.built_roads = state.built_roads
+            if state.thief != self.thief:
+                sections |= self.THIEF
+                body.append(state.thief.to_bytes(1, 'little', signed=True))
+                self.thief = state.thief
+            self.state = state
+            self.version = state.version
+
+        sections |= self.encode_hand(body, hand)
+
+        cards = tuple((card.type, card.effect) for card in development_cards)
+        if cards != self.development_cards:
+            sections |= self.DEVELOPMENT_CARDS
+            body.append(bytes((len(cards),)) + bytes(value for card in cards for value in card))
+            self.development_cards = cards
+
+        sections |= self.encode_rng(body, rng)
+
+        # El tablero y su vista de solo lectura comparten la misma vista (get_view)
+        if args and hasattr(args[0], 'get_view') and args[0].get_view() is board.get_view():
+            sections |= self.BOARD_ARGUMENT
+            args = args[1:]
+        if args:
+            body.append(pickle.dumps(args, pickle.HIGHEST_PROTOCOL))
+
+        return self.CALL_HEADER.pack(self.CALL, self.TRIGGER_IDS[trigger], sections) + b''.join(body)
+
+    def decode_response(self, message, hand, development_cards, rng):
+        """
+        Aplica a la mano y al generador los cambios que ha hecho el agente y saca su respuesta
+        :param message: bytes
+        :param hand: Hand()
+        :param development_cards: [DevelopmentCard...]
+        :param rng: random.Random()
+        :return: respuesta, str/None. La respuesta del trigger y la traza de la excepción si el agente ha fallado
+        """
+        kind, sections = self.RESPONSE_HEADER.unpack_from(message)
+        offset = self.decode_hand(message, self.RESPONSE_HEADER.size, sections, hand)
+        offset = self.decode_rng(message, offset, sections, rng)
+
+        if kind == self.NONE:
+            return None, None
+        if kind == self.TRUE:
+            return True, None
+        if kind == self.FALSE:
+            return False, None
+        if kind == self.CARD:
+            return development_cards[message[offset]], None
+        if kind == self.HAND_RESPONSE:
+            return hand, None
+        if kind == self.PICKLE:
+            return pickle.loads(message[offset:]), None
+        return None, bytes(message[offset:]).decode()
+
+    # -- -- -- -- Lado del agente -- -- -- --
+    def decode_call(self, message, board, hand, development_cards_hand, rng):
+        """
+        Aplica los cambios de un mensaje CALL a la copia del estado que tiene el proceso del agente
+        :param message: bytes
+        :param board: Board(). Copia del tablero
+        :param hand: Hand()
+        :param development_cards_hand: DevelopmentCardsHand()
+        :param rng: random.Random()
+        :return: str, tuple. El trigger y sus argumentos, con la vista de la copia del tablero si lo recibe
+        """
+        _, trigger_id, sections = self.CALL_HEADER.unpack_from(message)
+        offset = self.CALL_HEADER.size
+        if sections & self.NODES:
+            count = message[offset]
+            for node_id, owner in struct.iter_unpack('<Bb', message[offset + 1:offset + 1 + count * 2]):
+                board.set_node_player(node_id, owner)
+            offset += 1 + count * 2
+        if sections & self.CITIES:
+            cities = int.from_bytes(message[offset:offset + 8], 'little')
+            changed = cities ^ board.state.cities
+            while changed:
+                node_id = (changed & -changed).bit_length() - 1
+                board.set_node_city(node_id, bool(cities >> node_id & 1))
+                changed &= changed - 1
+            offset += 8
+        if sections & self.ROADS:
+            count = message[offset]
+            for edge_id, player in struct.iter_unpack('<BB', message[offset + 1:offset + 1 + count * 2]):
+                board.add_road(player, *BoardTopology.EDGES[edge_id])
+            offset += 1 + count * 2
+        if sections & self.THIEF:
+            board.state.thief = int.from_bytes(message[offset:offset + 1], 'little', signed=True)
+            board.state.version += 1
+            offset += 1
+        offset = self.decode_hand(message, offset, sections, hand)
+        if sections & self.DEVELOPMENT_CARDS:
+            count = message[offset]
+            development_cards_hand.hand = [DevelopmentCard(card_type, effect) for card_type, effect
+                                           in struct.iter_unpack('<BB', message[offset + 1:offset + 1 + count * 2])]
+            offset += 1 + count * 2
+        offset = self.decode_rng(message, offset, sections, rng)
+
+        args = pickle.loads(message[offset:]) if offset < len(message) else ()
+        if sections & self.BOARD_ARGUMENT:
+            args = (board.get_view(),) + args
+        return self.TRIGGERS[trigger_id], args
+
+    def encode_response(self, response, error, hand, development_cards, rng):
+        """
+        :param response: Respuesta del trigger
+        :param error: str/None. Traza de la excepción si el agente ha fallado
+        :param hand: Hand() Mano del agente después del trigger
+        :param development_cards: [DevelopmentCard...]
+        :param rng: random.Random() Generador del agente después del trigger
+        :return: bytes
+        """
+        body = []
+        sections = self.encode_hand(body, hand) | self.encode_rng(body, rng)
+
+        if error is not None:
+            kind = self.ERROR
+            body.append(error.encode())
+        elif response is None:
+            kind = self.NONE
+        elif response is True:
+            kind = self.TRUE
+        elif response is False:
+            kind = self.FALSE
+        elif response is hand:
+            kind = self.HAND_RESPONSE
+        elif isinstance(response, DevelopmentCard) and any(card is response for card in development_cards):
+            kind = self.CARD
+            body.append(bytes((next(index for index, card in enumerate(development_cards) if card is response),)))
+        else:
+            kind = self.PICKLE
+            body.append(pickle.dumps(response, pickle.HIGHEST_PROTOCOL))
+        return self.RESPONSE_HEADER.pack(kind, sections) + b''.join(body)
+
+    # -- -- -- -- Secciones que envían los dos lados -- -- -- --
+    def encode_hand(self, body, hand):
+        """
+        Añade al mensaje la sección HAND si la mano ha cambiado
+        :param body: [bytes...] Partes del mensaje
+        :param hand: Hand()
+        :return: int. Secciones añadidas
+        """
+        amounts = tuple(hand.resources.amounts)
+        if amounts == self.hand:
+            return 0
+        body.append(self.HAND_STRUCT.pack(*amounts))
+        self.hand = amounts
+        return self.HAND
+
+    def decode_hand(self, message, offset, sections, hand):
+        """
+        :param message: bytes
+        :param offset: int. Posición de la sección HAND
+        :param sections: int
+        :param hand: Hand(). Mano en la que se escriben los materiales
+        :return: int. Posición siguiente a la sección
+        """
+        if not sections & self.HAND:
+            return offset
+        self.hand = self.HAND_STRUCT.unpack_from(message, offset)
+        hand.resources.amounts[:] = self.hand
+        return offset + self.HAND_STRUCT.size
+
+    def encode_rng(self, body, rng):
+        """
+        Añade al mensaje la sección RNG y, si han cambiado, las palabras del generador
+        :param body: [bytes...] Partes del mensaje
+        :param rng: random.Random()
+        :return: int. Secciones añadidas
+        """
+        draws = getattr(rng, 'draws', None)
+        if rng is self.rng and draws is not None and draws == self.rng_draws:
+            return 0
+        rng_state = rng.getstate()
+        self.rng, self.rng_draws = rng, draws
+        if draws is None and rng_state == self.rng_state:
+            return 0
+
+        _, internal_state, gauss_next = rng_state
+        body.append(self.RNG_STRUCT.pack(internal_state[-1], math.nan if gauss_next is None else gauss_next))
+        sections = self.RNG
+        # Las palabras cambian todas a la vez cuando el generador se queda sin ellas, así que basta con mirar algunas
+        # en lugar de comparar las 624
+        if self.rng_state is None or any(internal_state[index] != self.rng_state[1][index] for index in (0, 311, 623)):
+            body.append(array('I', internal_state[:-1]).tobytes())
+            sections |= self.RNG_WORDS
+        self.rng_state = rng_state
+        return sections
+
+    def decode_rng(self, message, offset, sections, rng):
+        """
+        :param message: bytes
+        :param offset: int. Posición de la sección RNG
+        :param sections: int
+        :param rng: random.Random(). Generador al que se le pone el estado recibido
+        :return: int. Posición siguiente a las secciones del generador
+        """
+        if not sections & self.RNG:
+            return offset
+        position, gauss_next = self.RNG_STRUCT.unpack_from(message, offset)
+        offset += self.RNG_STRUCT.size
+        if sections & self.RNG_WORDS:
+            words = tuple(array('I', message[offset:offset + self.RNG_WORDS_SIZE]))
+            offset += self.RNG_WORDS_SIZE
+        else:
+            words = self.rng_state[1][:-1]
+        self.rng_state = (3, words + (position,), None if math.isnan(gauss_next) else gauss_next)
+        rng.setstate(self.rng_state)
+        self.rng, self.rng_draws = rng, getattr(rng, 'draws', None)
+        return offset
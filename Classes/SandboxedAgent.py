@@ -0,0 +1,319 @@
+import importlib
+import inspect
+import os
+import secrets
+import subprocess
+import sys
+import threading
+import traceback
+import weakref
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
+
+from Classes.Board import Board
+from Classes.SandboxProtocol import SandboxProtocol
+from Classes.TrackedRandom import TrackedRandom
+from Classes.TradeOffer import TradeOffer
+from Interfaces.AgentInterface import AgentInterface
+from Interfaces.AsyncAgentInterface import AsyncAgentInterface
+
+
+class SandboxedAgent(AgentInterface):
+    """
+    Agente que ejecuta otro agente en un proceso aparte, uno por asiento. Si el agente se cuelga, falla o se queda sin
+    memoria, la partida y el torneo siguen.
+
+    Se crea una clase por agente con wrap y se juega con ella como con cualquier otro agente:
+
+        game_director = GameDirector(agents=(SandboxedAgent.wrap(MyAgent), RandomAgent, RandomAgent, RandomAgent))
+
+    El proceso de cada asiento se arranca en la primera partida y se reutiliza en las siguientes: en cada partida se
+    crea en él un agente nuevo, igual que el AgentManager crea uno nuevo en el mismo proceso. En cada trigger solo se
+    le envían los cambios del tablero, la mano, las cartas de desarrollo y el generador de la partida desde el trigger
+    anterior (ver SandboxProtocol), así que la partida es la misma que con el agente en el mismo proceso. Los cambios
+    que el agente hace en su mano (por ejemplo al descartar) se devuelven al motor igual que si la compartiese.
+
+    Si el agente lanza una excepción se cuenta como error y se usa la respuesta por defecto de AgentInterface. Si su
+    proceso muere, o sigue con un trigger que el AgentWatchdog ha dejado de esperar, se mata y el agente usa las
+    respuestas por defecto hasta el final de la partida; en la siguiente se arranca un proceso nuevo.
+
+    agent_class: class Agente que se ejecuta en el proceso (AgentInterface, no asíncrono)
+    workers: {int: dict} Proceso de cada asiento: {'process': Popen, 'connection': Connection, 'lock': Lock}
+    stats: {int: dict} Estadísticas de cada asiento: {'calls': int, 'bytes_sent': int, 'bytes_received': int,
+                                                      'errors': int, 'crashes': int}
+    """
+    agent_class = None
+    workers = None
+    stats = None
+    # Clases creadas con wrap, para poder parar todos sus procesos con close_all
+    sandboxes = weakref.WeakSet()
+
+    def __init__(self, agent_id):
+        super().__init__(agent_id)
+        self.protocol = SandboxProtocol()
+        self.worker = self.get_worker(agent_id)
+        self.last_error = None
+        if not self.send(self.protocol.new_game(agent_id)):
+            self.stop_worker(self.worker)
+            self.worker = None
+        return
+
+    @classmethod
+    def wrap(cls, agent_class):
+        """
+        :param agent_class: class. Agente que hereda de AgentInterface
+        :return: class. Agente que ejecuta agent_class en un proceso aparte
+        """
+        if not (inspect.isclass(agent_class) and issubclass(agent_class, AgentInterface)):
+            raise ValueError('Los agentes deben de ser clases que hereden de AgentInterface')
+        if issubclass(agent_class, (AsyncAgentInterface, SandboxedAgent)):
+            raise ValueError('Solo se pueden ejecutar en un proceso aparte agentes síncronos: ' + agent_class.__name__)
+        sandbox = type('Sandboxed' + agent_class.__name__, (cls,),
+                       {'agent_class': agent_class, 'workers': {}, 'stats': {}, '__module__': cls.__module__})
+        cls.sandboxes.add(sandbox)
+        return sandbox
+
+    # -- -- -- -- Procesos -- -- -- --
+    @classmethod
+    def get_worker(cls, agent_id):
+        """
+        Proceso del asiento. Si no hay, o el que había ha muerto o sigue colgado, se arranca uno nuevo
+        :param agent_id: int
+        :return: dict/None. None si no se ha podido arrancar
+        """
+        worker = cls.workers.get(agent_id)
+        if worker is not None and (worker['process'].poll() is not None or worker['lock'].locked()):
+            cls.stop_worker(worker)
+            worker = None
+        if worker is None:
+            cls.stats.setdefault(agent_id, {'calls': 0, 'bytes_sent': 0, 'bytes_received': 0, 'errors': 0,
+                                            'crashes': 0})
+            worker = cls.start_worker(agent_id)
+        return worker
+
+    @classmethod
+    def start_worker(cls, agent_id):
+        """
+        Arranca el proceso de un asiento. Se conecta al motor con multiprocessing.connection (un socket Unix o una named
+        pipe en Windows) y recibe la clave de la conexión por su entrada estándar
+        :param agent_id: int
+        :return: dict/None
+        """
+        authkey = secrets.token_bytes(32)
+        with Listener(authkey=authkey) as listener:
+            module_name = cls.agent_class.__module__
+            if module_name == '__main__':
+                # El agente está en el script que se ha ejecutado, el proceso lo importa como módulo
+                module_name = Path(sys.modules['__main__'].__file__).stem
+            environment = dict(os.environ, PYTHONPATH=os.pathsep.join(os.path.abspath(path) for path in sys.path))
+            process = subprocess.Popen([sys.executable, '-m', __name__, str(listener.address), module_name,
+                                        cls.agent_class.__qualname__], stdin=subprocess.PIPE, env=environment)
+            try:
+                process.stdin.write(authkey)
+                process.stdin.close()
+                connection = listener.accept()
+            except (EOFError, OSError):
+                process.kill()
+                return None
+        worker = {'process': process, 'connection': connection, 'lock': threading.Lock()}
+        cls.workers[agent_id] = worker
+        return worker
+
+    @classmethod
+    def stop_worker(cls, worker, crashed=True):
+        """
+        Mata el proceso de un asiento
+        :param worker: dict/None
+        :param crashed: bool. Si se cuenta como caída del agente
+        :return: None
+        """
+        if worker is None:
+            return
+        for agent_id, seat_worker in list(cls.workers.items()):
+            if seat_worker is worker:
+                del cls.workers[agent_id]
+                if crashed:
+                    cls.stats[agent_id]['crashes'] += 1
+        worker['process'].kill()
+        worker['process'].wait()
+        # Si otro hilo sigue esperando la respuesta, la conexión la cierra él al recibir el EOF
+        if worker['lock'].acquire(blocking=False):
+            worker['connection'].close()
+            worker['lock'].release()
+        return
+
+    @classmethod
+    def close(cls, timeout=5):
+        """
+        Para los procesos de todos los asientos
+        :param timeout: float. Segundos que se espera a que terminen antes de matarlos
+        :return: None
+        """
+        for worker in list(cls.workers.values()):
+            try:
+                worker['connection'].send_bytes(bytes((SandboxProtocol.CLOSE,)))
+                worker['process'].wait(timeout)
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+            cls.stop_worker(worker, crashed=False)
+        return
+
+    @classmethod
+    def close_all(cls):
+        """
+        Para los procesos de todas las clases creadas con wrap
+        :return: None
+        """
+        for sandbox in list(cls.sandboxes):
+            sandbox.close()
+        return
+
+    # -- -- -- -- Llamadas -- -- -- --
+    def send(self, message):
+        """
+        :param message: bytes
+        :return: bool. Si se ha podido enviar
+        """
+        if self.worker is None:
+            return False
+        try:
+            with self.worker['lock']:
+                self.worker['connection'].send_bytes(message)
+        except OSError:
+            return False
+        self.stats[self.id]['bytes_sent'] += len(message)
+        return True
+
+    def call_worker(self, trigger, *args):
+        """
+        Llama al trigger del agente en su proceso
+        :param trigger: str
+        :param args: Argumentos del trigger
+        :return: La respuesta del agente, o la de AgentInterface si ha fallado
+        """
+        worker = self.worker
+        if worker is None:
+            return self.fallback(trigger, args)
+        if not worker['lock'].acquire(blocking=False):
+            # El trigger anterior sigue ejecutándose: el AgentWatchdog lo ha abandonado porque el agente está colgado
+            self.worker = None
+            self.stop_worker(worker)
+            return self.fallback(trigger, args)
+
+        try:
+            message = self.protocol.encode_call(trigger, self.board, self.hand, self.development_cards_hand.hand,
+                                                self.rng, args)
+            worker['connection'].send_bytes(message)
+            response_message = worker['connection'].recv_bytes()
+            response, error = self.protocol.decode_response(response_message, self.hand,
+                                                            self.development_cards_hand.hand, self.rng)
+        except (EOFError, OSError):
+            # El proceso ha muerto o lo ha matado otra llamada
+            if self.worker is worker:
+                self.worker = None
+                self.stop_worker(worker)
+            worker['connection'].close()
+            return self.fallback(trigger, args)
+        finally:
+            worker['lock'].release()
+
+        stats = self.stats[self.id]
+        stats['calls'] += 1
+        stats['bytes_sent'] += len(message)
+        stats['bytes_received'] += len(response_message)
+        if error is not None:
+            stats['errors'] += 1
+            self.last_error = error
+            return self.fallback(trigger, args)
+        return response
+
+    def fallback(self, trigger, args):
+        """
+        Respuesta cuando el agente falla: la de AgentInterface. Al colocar los pueblos None, para que el GameManager los
+        coloque al azar
+        :param trigger: str
+        :param args: tuple
+        :return: Respuesta del trigger
+        """
+        if trigger == 'on_game_start':
+            return None
+        return getattr(AgentInterface, trigger)(self, *args)
+
+    # -- -- -- -- Triggers -- -- -- --
+    def on_trade_offer(self, board_instance, offer=TradeOffer(), player_id=int):
+        self.board = board_instance
+        return self.call_worker('on_trade_offer', board_instance, offer, player_id)
+
+    def on_turn_start(self):
+        return self.call_worker('on_turn_start')
+
+    def on_having_more_than_7_materials_when_thief_is_called(self):
+        return self.call_worker('on_having_more_than_7_materials_when_thief_is_called')
+
+    def on_moving_thief(self):
+        return self.call_worker('on_moving_thief')
+
+    def on_turn_end(self):
+        return self.call_worker('on_turn_end')
+
+    def on_commerce_phase(self):
+        return self.call_worker('on_commerce_phase')
+
+    def on_build_phase(self, board_instance):
+        self.board = board_instance
+        return self.call_worker('on_build_phase', board_instance)
+
+    def on_game_start(self, board_instance):
+        self.board = board_instance
+        return self.call_worker('on_game_start', board_instance)
+
+    def on_monopoly_card_use(self):
+        return self.call_worker('on_monopoly_card_use')
+
+    def on_road_building_card_use(self):
+        return self.call_worker('on_road_building_card_use')
+
+    def on_year_of_plenty_card_use(self):
+        return self.call_worker('on_year_of_plenty_card_use')
+
+
+def _run_worker(connection, agent_class):
+    """
+    Bucle del proceso de un asiento: crea un agente en cada partida y ejecuta sus triggers sobre la copia del estado
+    :param connection: Connection
+    :param agent_class: class
+    :return: None
+    """
+    protocol = SandboxProtocol()
+    agent = board = None
+    while True:
+        try:
+            message = connection.recv_bytes()
+        except EOFError:
+            return
+        if message[0] == SandboxProtocol.CLOSE:
+            return
+        if message[0] == SandboxProtocol.NEW_GAME:
+            protocol.new_game(message[1])
+            board = Board()
+            agent = agent_class(message[1])
+            # Como el generador de la partida que el AgentManager da a los agentes
+            agent.rng = TrackedRandom()
+            continue
+
+        trigger, args = protocol.decode_call(message, board, agent.hand, agent.development_cards_hand, agent.rng)
+        try:
+            response, error = getattr(agent, trigger)(*args), None
+        except Exception:
+            response, error = None, traceback.format_exc()
+        connection.send_bytes(protocol.encode_response(response, error, agent.hand, agent.development_cards_hand.hand,
+                                                       agent.rng))
+
+
+if __name__ == '__main__':
+    address, agent_module, agent_name = sys.argv[1:4]
+    agent_connection = Client(address, authkey=sys.stdin.buffer.read())
+    agent_object = importlib.import_module(agent_module)
+    for name in agent_name.split('.'):
+        agent_object = getattr(agent_object, name)
+    _run_worker(agent_connection, agent_object)
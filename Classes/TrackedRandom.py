@@ -0,0 +1,36 @@
+import random
+
+
+class TrackedRandom(random.Random):
+    """
+    random.Random que cuenta las veces que cambia su estado. Con la misma semilla da los mismos números que
+    random.Random: solo se sobrescriben los métodos base (random y getrandbits), de los que salen todos los demás.
+
+    Sirve para saber si alguien ha usado el generador sin copiar su estado con getstate, que es lento (ver
+    SandboxProtocol).
+
+    draws: int Número de veces que se ha usado, reiniciado (seed) o cambiado (setstate) el generador
+    """
+
+    def __init__(self, x=None):
+        self.draws = 0
+        super().__init__(x)
+        return
+
+    def random(self):
+        self.draws += 1
+        return super().random()
+
+    def getrandbits(self, k):
+        self.draws += 1
+        return super().getrandbits(k)
+
+    def seed(self, *args, **kwargs):
+        self.draws += 1
+        super().seed(*args, **kwargs)
+        return
+
+    def setstate(self, state):
+        self.draws += 1
+        super().setstate(state)
+        return
@@ -1,3 +1,5 @@
+import random
+
 from Classes.Board import Board
 from Classes.DevelopmentCards import *
 from Classes.Hand import Hand
@@ -6,14 +8,22 @@ from Classes.TradeOffer import TradeOffer
 
 class AgentInterface:
     """
-    Interfaz que implementa a un agente
+    Interfaz que implementa a un agente.
+
+    El tablero que reciben los agentes es de solo lectura. Sus jugadas legales están en board.moves
+    (por ejemplo board.moves.legal_moves(self.id, self.hand)) y se guardan mientras el tablero no cambie, así que no hace
+    falta recalcularlas en cada llamada.
+
+    Todo lo aleatorio del agente debe salir de self.rng, el generador de la partida que le asigna el AgentManager, y no
+    del módulo random. Así la partida se repite con la misma semilla aunque se jueguen otras a la vez
     """
 
     def __init__(self, agent_id):
         self.hand = Hand()
-        self.board = Board()
+        self.board = Board().get_view()
         self.development_cards_hand = DevelopmentCardsHand()
         self.id = agent_id
+        self.rng = random.Random()
 
     # Los triggers son llamados por el GameDirector las veces que sean necesarias hasta que devuelvan null
     #  o el GameDirector le niegue continuar el trigger
@@ -22,7 +32,7 @@ class AgentInterface:
         Trigger para cuando llega una oferta. Devuelve si la acepta, la niega o envía una contraoferta
         :param offer: Oferta de comercio que le llega al agente
         :param player_id: ID del jugador
-        :param board_instance: Board()
+        :param board_instance: BoardView(). Tablero de solo lectura
         :return: true, TradeOffer, false
         """
         return False
@@ -85,10 +95,10 @@ class AgentInterface:
         """
         self.board = board_instance
 
-        node_id = random.randint(0, 53)
+        node_id = self.rng.randint(0, 53)
         possible_roads = self.board.nodes[node_id]['adjacent']
 
-        return node_id, possible_roads[random.randint(0, len(possible_roads) - 1)]
+        return node_id, possible_roads[self.rng.randint(0, len(possible_roads) - 1)]
 
     def on_monopoly_card_use(self):
         """
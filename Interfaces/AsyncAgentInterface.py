@@ -0,0 +1,49 @@
+from Classes.TradeOffer import TradeOffer
+from Interfaces.AgentInterface import AgentInterface
+
+
+class AsyncAgentInterface(AgentInterface):
+    """
+    Interfaz de los agentes asíncronos, para agentes que esperan a E/S en sus triggers (por ejemplo a un servidor de
+    inferencia). Los triggers son los mismos que los de AgentInterface, con los mismos argumentos y respuestas, pero son
+    corrutinas.
+
+    Solo se pueden jugar con AsyncGameDirector. Mientras un agente espera su respuesta, el bucle de eventos sigue con
+    las demás partidas. Los agentes síncronos (AgentInterface) también pueden jugar con AsyncGameDirector, se les llama
+    directamente como en GameDirector.
+
+    Por defecto cada trigger hace lo mismo que en AgentInterface.
+    """
+
+    async def on_trade_offer(self, board_instance, offer=TradeOffer(), player_id=int):
+        return super().on_trade_offer(board_instance, offer, player_id)
+
+    async def on_turn_start(self):
+        return super().on_turn_start()
+
+    async def on_having_more_than_7_materials_when_thief_is_called(self):
+        return super().on_having_more_than_7_materials_when_thief_is_called()
+
+    async def on_moving_thief(self):
+        return super().on_moving_thief()
+
+    async def on_turn_end(self):
+        return super().on_turn_end()
+
+    async def on_commerce_phase(self):
+        return super().on_commerce_phase()
+
+    async def on_build_phase(self, board_instance):
+        return super().on_build_phase(board_instance)
+
+    async def on_game_start(self, board_instance):
+        return super().on_game_start(board_instance)
+
+    async def on_monopoly_card_use(self):
+        return super().on_monopoly_card_use()
+
+    async def on_road_building_card_use(self):
+        return super().on_road_building_card_use()
+
+    async def on_year_of_plenty_card_use(self):
+        return super().on_year_of_plenty_card_use()
@@ -3,21 +3,24 @@ from Interfaces.AgentInterface import AgentInterface as AgIn
 from Classes.DevelopmentCards import DevelopmentCardsHand
 from Classes.Hand import Hand
 import inspect
+import random
 
 class AgentManager:
     """
     Clase que se encarga de los agentes. De momento solo los carga en la partida, sin embargo, cabe la posibilidad de
     que sea el agent manager el que se encargue de darle paso a los agentes a hacer sus turnos
     """
-    actual_player = 0
-    first_agent_class = ''
-    second_agent_class = ''
-    third_agent_class = ''
-    fourth_agent_class = ''
 
-    players = []
-
-    def __init__(self, for_test=False, agents = None):
+    def __init__(self, for_test=False, agents = None, rng=None):
+        # Todo el estado es de la instancia para que varias partidas puedan jugarse a la vez en el mismo proceso
+        self.actual_player = 0
+        self.first_agent_class = ''
+        self.second_agent_class = ''
+        self.third_agent_class = ''
+        self.fourth_agent_class = ''
+        self.players = []
+        # Generador de la partida, que se les da a los agentes como self.rng
+        self.rng = rng if rng is not None else random.Random()
         if agents:
             if len(agents) != 4:
                 raise ValueError('El número de agentes debe ser 4')
@@ -105,17 +108,31 @@ class AgentManager:
                 'longest_road': 0,
             }
         ]
+        for player in self.players:
+            player['player'].rng = self.rng
         return
 
     def import_agent_class_from_input(self, name=''):
         module_class = input(
             'Module and class of the ' + name +
             ' agent located in the folder Agents/ (e.g. MyModule.MyClass) (leave blank to use the default): ')
+        return self.load_agent_class(module_class)
+
+    @staticmethod
+    def load_agent_class(module_class=''):
+        """
+        Carga la clase de un agente de la carpeta Agents/
+        :param module_class: str. Módulo y clase (MyModule.MyClass). Vacío para usar el agente por defecto
+        :return: class
+        """
         if module_class == '':
-            klass = RandomAgent.RandomAgent
-        else:
-            components = module_class.split('.')
-            module = __import__('Agents.' + components[0], fromlist=[components[1]])
-            klass = getattr(module, components[1])
+            return RandomAgent.RandomAgent
 
+        components = module_class.split('.')
+        if len(components) != 2:
+            raise ValueError('El agente debe indicarse como Módulo.Clase: ' + module_class)
+        module = __import__('Agents.' + components[0], fromlist=[components[1]])
+        klass = getattr(module, components[1], None)
+        if not (inspect.isclass(klass) and issubclass(klass, AgIn)):
+            raise ValueError('Los agentes deben de ser clases que hereden de AgentInterface')
         return klass
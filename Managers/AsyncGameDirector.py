@@ -0,0 +1,30 @@
+from Classes.AgentCall import AgentCall
+from Managers.GameDirector import GameDirector
+
+
+class AsyncGameDirector(GameDirector):
+    """
+    GameDirector cuya partida es una corrutina, para jugar con agentes asíncronos (AsyncAgentInterface).
+
+    Juega exactamente igual que GameDirector (los dos ejecutan los mismos pasos, ver AgentCall), pero espera (await) a
+    los triggers asíncronos. Cada AsyncGameDirector juega una partida a la vez, así que para jugar varias a la vez en
+    el mismo bucle de eventos se crea uno por partida:
+
+        directors = [AsyncGameDirector(agents=agents) for _ in range(1000)]
+        await asyncio.gather(*[director.game_start(n, False, seed=n) for n, director in enumerate(directors)])
+
+    Cada partida tiene su generador de números aleatorios, así que con la misma semilla la partida es la misma que con
+    GameDirector, se mezcle como se mezcle con las demás.
+    """
+
+    async def game_start(self, game_number=0, print_outcome=True, trace_level=None, seed=None):
+        """
+        Juega una partida nueva (ver GameDirector.game_start)
+        :param game_number: (int) número de la partida.
+        :param print_outcome: (bool) si se imprime el resultado de la partida por consola.
+        :param trace_level: (str) TraceLevelConstants. Si se indica, pasa a ser el nivel de traza del director.
+        :param seed: (int) semilla de la partida. Si es None se saca del módulo random.
+        :return: dict. La traza completa con FULL, o el resultado de la partida con SUMMARY y NONE
+        """
+        return await AgentCall.run_async(self.game_start_steps(game_number, print_outcome, trace_level, seed),
+                                         self.game_manager.watchdog)
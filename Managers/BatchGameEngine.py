@@ -0,0 +1,435 @@
+from array import array
+
+import numpy as np
+
+from Classes.BoardTopology import BoardTopology
+from Classes.Constants import BuildConstants, BuildMaterialsConstants
+from Classes.RoadNetwork import RoadNetwork
+
+
+def _production_table():
+    """
+    Materiales que produce cada nodo con cada tirada: [tirada][nodo][material] = número de terrenos del nodo con esa
+    probabilidad y ese material
+    """
+    production = np.zeros((13, BoardTopology.NODES, 5), dtype=np.int16)
+    for terrain_id in range(BoardTopology.TERRAIN):
+        probability = BoardTopology.TERRAIN_PROBABILITIES[terrain_id]
+        material = BoardTopology.TERRAIN_TYPES[terrain_id]
+        # El desierto no produce
+        if probability == 0 or material < 0:
+            continue
+        for node_id in BoardTopology.CONTACTING_NODES[terrain_id]:
+            production[probability, node_id, material] += 1
+    return production
+
+
+def _road_moves():
+    """
+    Carreteras que se pueden llegar a construir desde un nodo, en el mismo orden que MoveGenerator:
+    (nodo, nodo adyacente, carretera), cada uno en un array
+    """
+    moves = [(node_id, adjacent_node_id, edge_id)
+             for node_id, adjacent_edges in enumerate(BoardTopology.ADJACENT_EDGES)
+             for adjacent_node_id, edge_id in adjacent_edges]
+    return tuple(np.array(column, dtype=np.intp) for column in zip(*moves))
+
+
+def _padded_adjacent_nodes():
+    adjacent_nodes = np.zeros((BoardTopology.NODES, 3), dtype=np.intp)
+    adjacent_count = np.zeros(BoardTopology.NODES, dtype=np.intp)
+    for node_id, nodes in enumerate(BoardTopology.ADJACENT_NODES):
+        adjacent_nodes[node_id, :len(nodes)] = nodes
+        adjacent_count[node_id] = len(nodes)
+    return adjacent_nodes, adjacent_count
+
+
+def _adjacency_matrix():
+    """
+    adjacency[nodo][nodo adyacente] = 1, con los nodos adyacentes de BoardTopology.ADJACENT_NODES
+    """
+    adjacency = np.zeros((BoardTopology.NODES, BoardTopology.NODES), dtype=np.int8)
+    for node_id, nodes in enumerate(BoardTopology.ADJACENT_NODES):
+        adjacency[node_id, list(nodes)] = 1
+    return adjacency
+
+
+def _edge_id_matrix():
+    """
+    edge_ids[nodo][nodo] = ID de la carretera entre los dos nodos, -1 si no son adyacentes
+    """
+    edge_ids = np.full((BoardTopology.NODES, BoardTopology.NODES), -1, dtype=np.intp)
+    for (start, end), edge_id in BoardTopology.EDGE_IDS.items():
+        edge_ids[start, end] = edge_id
+    return edge_ids
+
+
+def _terrain_nodes():
+    terrain_nodes = np.zeros((BoardTopology.TERRAIN, BoardTopology.NODES), dtype=bool)
+    for terrain_id, nodes in enumerate(BoardTopology.CONTACTING_NODES):
+        terrain_nodes[terrain_id, list(nodes)] = True
+    return terrain_nodes
+
+
+def _starting_materials():
+    """
+    Lo que da cada nodo en la colocación inicial: 1 material por terreno que toca, menos el desierto
+    """
+    materials = np.zeros((BoardTopology.NODES, 5), dtype=np.int16)
+    for node_id, terrain_ids in enumerate(BoardTopology.CONTACTING_TERRAIN):
+        for terrain_id in terrain_ids:
+            if BoardTopology.TERRAIN_TYPES[terrain_id] >= 0:
+                materials[node_id, BoardTopology.TERRAIN_TYPES[terrain_id]] += 1
+    return materials
+
+
+class BatchGameEngine:
+    """
+    Juega a la vez N partidas entre políticas fijas, guardando el estado de todas en arrays de NumPy. Sirve para
+    estimar la fuerza de políticas sencillas con muchas más partidas de las que da tiempo con el GameDirector.
+
+    Usa la topología de BoardTopology y los costes de BuildMaterialsConstants, y sigue las reglas del GameDirector tal
+    y como se juegan: colocación inicial, dados, producción, ladrón (descarte y robo), construcción, carretera más larga
+    y victoria con 10 puntos. Las políticas son las de Agents/BuilderAgent.py: sin comercio ni cartas de desarrollo,
+    construyen lo primero de su prioridad que sea legal y puedan pagar, eligiendo al azar entre las jugadas legales.
+
+    Hay dos detalles del GameManager que cambian los resultados y que se reproducen tal cual:
+    - La producción se da dos veces: give_resources suma a la mano del agente y a la del AgentManager, que tras la
+      colocación inicial son el mismo objeto.
+    - Lo que roba el ladrón se lo lleva siempre el jugador 0 (THIEF_RECEIVER): _steal_from_player se lo da a
+      AgentManager.actual_player, que nunca cambia durante la partida.
+
+    La carretera más larga no se puede vectorizar, así que cada partida tiene su RoadNetwork y solo se recalcula en las
+    partidas en las que se ha construido en el turno.
+
+    Necesita NumPy.
+
+    node_owner: np.array (N, 54) Jugador dueño de cada nodo, -1 si no tiene pueblo ni ciudad
+    cities: np.array (N, 54) Si el nodo tiene ciudad
+    edge_owner: np.array (N, carreteras) Jugador de cada carretera (BoardTopology.EDGES), -1 si no está construida
+    last_road_owner: np.array (N, 54) Jugador de la última carretera construida en cada nodo
+    hands: np.array (N, 4, 5) Materiales de cada jugador
+    thief: np.array (N,) Terreno con el ladrón
+    victory_points: np.array (N, 4)
+    longest_road: np.array (N, 2) Longitud y jugador del récord de carretera más larga (empieza en 4, sin jugador)
+    rounds: np.array (N,) Rondas jugadas
+    winner: np.array (N,) Ganador de cada partida, -1 si no ha acabado o ha llegado al máximo de rondas
+    """
+    PLAYERS = 4
+    DISCARD_LIMIT = 7
+    PRODUCTION_MULTIPLIER = 2
+    VICTORY_POINTS_TO_WIN = 10
+    LONGEST_ROAD_POINTS = 2
+    THIEF_RECEIVER = 0
+
+    PRODUCTION = _production_table()
+    ROAD_NODE, ROAD_ADJACENT_NODE, ROAD_EDGE = _road_moves()
+    ADJACENT_NODES, ADJACENT_COUNT = _padded_adjacent_nodes()
+    ADJACENCY = _adjacency_matrix()
+    EDGE_NODES = np.array(BoardTopology.EDGES, dtype=np.intp)
+    EDGE_ID_MATRIX = _edge_id_matrix()
+    # incidence[carretera][nodo] = 1 si la carretera llega al nodo
+    INCIDENCE = np.zeros((len(BoardTopology.EDGES), BoardTopology.NODES), dtype=np.int8)
+    INCIDENCE[np.arange(len(BoardTopology.EDGES)), EDGE_NODES[:, 0]] = 1
+    INCIDENCE[np.arange(len(BoardTopology.EDGES)), EDGE_NODES[:, 1]] = 1
+    TERRAIN_NODES = _terrain_nodes()
+    COASTAL = np.isin(np.arange(BoardTopology.NODES), list(BoardTopology.COASTAL_NODES))
+    STARTING_MATERIALS = _starting_materials()
+    BUILD_COSTS = {building: np.array(cost, dtype=np.int16) for building, cost in BuildMaterialsConstants.items()}
+
+    def __init__(self, games, build_priorities=None, max_rounds=1000, seed=None):
+        """
+        :param games: int. Número de partidas
+        :param build_priorities: [(str...)...] Prioridad de construcción (BuildConstants) de cada jugador. Por defecto la
+                                 de BuilderAgent: ciudad, pueblo y carretera
+        :param max_rounds: int
+        :param seed: int/None. Semilla del generador de NumPy
+        """
+        if build_priorities is None:
+            build_priorities = [(BuildConstants.CITY, BuildConstants.TOWN, BuildConstants.ROAD)] * self.PLAYERS
+        for priority in build_priorities:
+            for building in priority:
+                if building not in (BuildConstants.CITY, BuildConstants.TOWN, BuildConstants.ROAD):
+                    raise ValueError('El motor vectorizado no sabe construir "' + str(building) + '"')
+
+        self.games = games
+        self.build_priorities = [tuple(priority) for priority in build_priorities]
+        self.max_rounds = max_rounds
+        self.rng = np.random.default_rng(seed)
+
+        self.node_owner = np.full((games, BoardTopology.NODES), -1, dtype=np.int8)
+        self.cities = np.zeros((games, BoardTopology.NODES), dtype=bool)
+        self.edge_owner = np.full((games, len(BoardTopology.EDGES)), -1, dtype=np.int8)
+        self.last_road_owner = np.full((games, BoardTopology.NODES), -1, dtype=np.int8)
+        self.hands = np.zeros((games, self.PLAYERS, 5), dtype=np.int16)
+        self.thief = np.full(games, BoardTopology.THIEF_START_TERRAIN, dtype=np.int8)
+        self.victory_points = np.zeros((games, self.PLAYERS), dtype=np.int16)
+        self.longest_road = np.tile(np.array([4, -1], dtype=np.int16), (games, 1))
+        self.rounds = np.zeros(games, dtype=np.int32)
+        self.winner = np.full(games, -1, dtype=np.int8)
+        self.finished = np.zeros(games, dtype=bool)
+        # Cada RoadNetwork tiene una copia de los dueños de los nodos de su partida en un array de Python, que es mucho
+        # más rápido de leer nodo a nodo que una fila de NumPy. Se actualiza en _place_town
+        self.road_networks = [RoadNetwork(array('b', [-1]) * BoardTopology.NODES, self.PLAYERS)
+                              for _ in range(games)]
+        return
+
+    # -- -- -- -- Partida -- -- -- --
+    def run(self):
+        """
+        Juega todas las partidas hasta que acaban o llegan al máximo de rondas
+        :return: {'winner': np.array, 'victory_points': np.array, 'longest_road': np.array, 'rounds': np.array,
+                  'max_rounds_reached': np.array}
+        """
+        self.setup()
+        for _ in range(self.max_rounds):
+            playing = np.flatnonzero(~self.finished)
+            if not len(playing):
+                break
+            for player in range(self.PLAYERS):
+                games = np.flatnonzero(~self.finished)
+                if not len(games):
+                    break
+                self.play_turn(games, player)
+            self.rounds[playing] += 1
+        return self.results()
+
+    def setup(self):
+        """
+        Colocación inicial: cada jugador, en orden 0, 1, 2, 3, 3, 2, 1, 0, pone un pueblo en un nodo válido al azar y una
+        carretera desde él, y recibe un material de cada terreno que toca el pueblo
+        :return: None
+        """
+        games = np.arange(self.games)
+        for player in list(range(self.PLAYERS)) + list(range(self.PLAYERS - 1, -1, -1)):
+            occupied = self.node_owner != -1
+            valid = ~occupied & ~self.COASTAL & ~((occupied.astype(np.int8) @ self.ADJACENCY.T) > 0)
+            nodes = self._choose(valid)
+            self._place_town(games, nodes, player)
+            self.hands[games, player] += self.STARTING_MATERIALS[nodes]
+
+            choice = (self.rng.random(self.games) * self.ADJACENT_COUNT[nodes]).astype(np.intp)
+            self._place_road(games, self.EDGE_ID_MATRIX[nodes, self.ADJACENT_NODES[nodes, choice]], player)
+            self.victory_points[games, player] += 1
+        return
+
+    def play_turn(self, games, player):
+        """
+        Turno de player en las partidas indicadas: dados, producción, ladrón, construcción y final de turno
+        :param games: np.array de índices de partida
+        :param player: int
+        :return: None
+        """
+        rolls = self.rng.integers(1, 7, len(games)) + self.rng.integers(1, 7, len(games))
+        self.give_resources(games, rolls)
+        thief_games = games[rolls == 7]
+        if len(thief_games):
+            self.discard(thief_games)
+            self.move_thief(thief_games, player)
+        changed = self.build_phase(games, player)
+        self.end_turn(games, player, changed)
+        return
+
+    def give_resources(self, games, rolls):
+        """
+        :param games: np.array de índices de partida
+        :param rolls: np.array con la tirada de cada partida
+        :return: None
+        """
+        owner = self.node_owner[games]
+        # Lo que produce cada nodo con la tirada, multiplicado por 2 si tiene ciudad
+        amount = self.PRODUCTION[rolls] * (1 + self.cities[games])[:, :, None] * self.PRODUCTION_MULTIPLIER
+        for player in range(self.PLAYERS):
+            self.hands[games, player] += (amount * (owner == player)[:, :, None]).sum(axis=1, dtype=np.int16)
+        return
+
+    def discard(self, games):
+        """
+        Los jugadores con más de 7 materiales descartan la mitad (redondeando hacia arriba), uno a uno y al azar entre
+        los materiales que tienen
+        :param games: np.array de índices de partida
+        :return: None
+        """
+        hands = self.hands[games].reshape(-1, 5)
+        totals = hands.sum(axis=1)
+        to_discard = np.where(totals > self.DISCARD_LIMIT, totals - totals // 2, 0)
+        rows = np.flatnonzero(to_discard)
+        while len(rows):
+            materials = self._choose(hands[rows] > 0)
+            hands[rows, materials] -= 1
+            to_discard[rows] -= 1
+            rows = rows[to_discard[rows] > 0]
+        self.hands[games] = hands.reshape(-1, self.PLAYERS, 5)
+        return
+
+    def move_thief(self, games, player):
+        """
+        El ladrón va a cualquier otro terreno y se roba un material al azar a un rival al azar con pueblo en él. El
+        material va a THIEF_RECEIVER
+        :param games: np.array de índices de partida
+        :param player: int
+        :return: None
+        """
+        terrain = (self.thief[games] + self.rng.integers(1, BoardTopology.TERRAIN, len(games))) % BoardTopology.TERRAIN
+        self.thief[games] = terrain
+
+        owner = self.node_owner[games]
+        on_terrain = self.TERRAIN_NODES[terrain]
+        victims = np.stack([(on_terrain & (owner == victim)).any(axis=1) for victim in range(self.PLAYERS)], axis=1)
+        victims[:, player] = False
+        has_victim = victims.any(axis=1)
+        games = games[has_victim]
+        victims = self._choose(victims[has_victim])
+
+        victim_hands = self.hands[games, victims]
+        has_materials = victim_hands.any(axis=1)
+        games, victims = games[has_materials], victims[has_materials]
+        materials = self._choose(victim_hands[has_materials] > 0)
+        self.hands[games, victims, materials] -= 1
+        self.hands[games, self.THIEF_RECEIVER, materials] += 1
+        return
+
+    def build_phase(self, games, player):
+        """
+        El jugador construye mientras tenga materiales y jugadas legales. Cada vuelta construye lo primero de su
+        prioridad que pueda
+        :param games: np.array de índices de partida
+        :param player: int
+        :return: np.array (bool) Partidas en las que se ha construido una carretera o un pueblo
+        """
+        changed = np.zeros(len(games), dtype=bool)
+        building = np.arange(len(games))
+        while len(building):
+            game_ids = games[building]
+            hands = self.hands[game_ids, player]
+            pending = np.ones(len(building), dtype=bool)
+            for kind in self.build_priorities[player]:
+                can_pay = pending & (hands >= self.BUILD_COSTS[kind]).all(axis=1)
+                if not can_pay.any():
+                    continue
+                legal = self._legal_moves(game_ids[can_pay], player, kind)
+                has_move = legal.any(axis=1)
+                rows = np.flatnonzero(can_pay)[has_move]
+                if not len(rows):
+                    continue
+                choices = self._choose(legal[has_move])
+                self._build(game_ids[rows], player, kind, choices)
+                pending[rows] = False
+                if kind != BuildConstants.CITY:
+                    changed[building[rows]] = True
+            building = building[~pending]
+        return changed
+
+    def end_turn(self, games, player, changed):
+        """
+        Carretera más larga y comprobación de victoria, como GameDirector.end_turn.
+
+        El récord solo cambia si alguien lo supera, y al acabar el turno anterior nadie lo superaba. En este turno solo
+        ha podido crecer la carretera del jugador que ha construido (un pueblo solo puede cortar las de los demás), así
+        que basta con calcular la suya, y solo si tiene más carreteras que el récord.
+        :param games: np.array de índices de partida
+        :param player: int
+        :param changed: np.array (bool) Partidas en las que el jugador ha construido una carretera o un pueblo
+        :return: None
+        """
+        roads = (self.edge_owner[games] == player).sum(axis=1)
+        for game in games[changed & (roads > self.longest_road[games, 0])].tolist():
+            length = self.road_networks[game].get_longest_road(player)
+            if length > self.longest_road[game, 0]:
+                self.longest_road[game] = (length, player)
+
+        buildings = self.node_owner[games][:, :, None] == np.arange(self.PLAYERS)
+        victory_points = (buildings * (1 + self.cities[games])[:, :, None]).sum(axis=1)
+        victory_points += (self.longest_road[games, 1][:, None] == np.arange(self.PLAYERS)) * self.LONGEST_ROAD_POINTS
+        self.victory_points[games] = victory_points
+
+        won = (victory_points >= self.VICTORY_POINTS_TO_WIN).any(axis=1)
+        self.winner[games[won]] = (victory_points[won] >= self.VICTORY_POINTS_TO_WIN).argmax(axis=1)
+        self.finished[games[won]] = True
+        return
+
+    def results(self):
+        """
+        :return: {'winner': np.array, 'victory_points': np.array, 'longest_road': np.array, 'rounds': np.array,
+                  'max_rounds_reached': np.array}
+        """
+        return {
+            'winner': self.winner.copy(),
+            'victory_points': self.victory_points.copy(),
+            'longest_road': self.longest_road[:, 1].copy(),
+            'rounds': self.rounds.copy(),
+            'max_rounds_reached': ~self.finished,
+        }
+
+    def game_summaries(self, first_game_number=0):
+        """
+        Resultado de cada partida con la misma forma que GameDirector.game_summary
+        :param first_game_number: int
+        :return: [dict...]
+        """
+        return [{
+            'game_number': first_game_number + game,
+            'agents': ['BuilderAgent'] * self.PLAYERS,
+            'winner': int(self.winner[game]),
+            'victory_points': self.victory_points[game].tolist(),
+            'largest_army': -1,
+            'longest_road': int(self.longest_road[game, 1]),
+            'rounds': int(self.rounds[game]),
+            'max_rounds_reached': not self.finished[game],
+        } for game in range(self.games)]
+
+    # -- -- -- -- Jugadas -- -- -- --
+    def _legal_moves(self, games, player, kind):
+        """
+        Jugadas legales del tipo indicado, con las mismas reglas que MoveGenerator
+        :return: np.array (bool) (partidas, nodos) para pueblos y ciudades y (partidas, ROAD_EDGE) para carreteras
+        """
+        owner = self.node_owner[games]
+        if kind == BuildConstants.CITY:
+            return (owner == player) & ~self.cities[games]
+
+        if kind == BuildConstants.TOWN:
+            occupied = owner != -1
+            near_town = (occupied.astype(np.int8) @ self.ADJACENCY.T) > 0
+            has_road = ((self.edge_owner[games] == player).astype(np.int8) @ self.INCIDENCE) > 0
+            return ~occupied & ~near_town & has_road
+
+        adjacent_owner = owner[:, self.ROAD_ADJACENT_NODE]
+        return ((self.last_road_owner[games][:, self.ROAD_ADJACENT_NODE] == player) &
+                (self.edge_owner[games][:, self.ROAD_EDGE] == -1) &
+                ((adjacent_owner == player) | (adjacent_owner == -1)))
+
+    def _build(self, games, player, kind, choices):
+        self.hands[games, player] -= self.BUILD_COSTS[kind]
+        if kind == BuildConstants.CITY:
+            self.cities[games, choices] = True
+        elif kind == BuildConstants.TOWN:
+            self._place_town(games, choices, player)
+        else:
+            self._place_road(games, self.ROAD_EDGE[choices], player)
+        return
+
+    def _place_town(self, games, nodes, player):
+        self.node_owner[games, nodes] = player
+        for game, node_id in zip(games.tolist(), nodes.tolist()):
+            road_network = self.road_networks[game]
+            road_network.node_owner[node_id] = player
+            road_network.node_owner_changed(node_id)
+        return
+
+    def _place_road(self, games, edges, player):
+        self.edge_owner[games, edges] = player
+        start, end = self.EDGE_NODES[edges, 0], self.EDGE_NODES[edges, 1]
+        self.last_road_owner[games, start] = player
+        self.last_road_owner[games, end] = player
+        for game, start_node, end_node in zip(games.tolist(), start.tolist(), end.tolist()):
+            self.road_networks[game].add_road(player, start_node, end_node)
+        return
+
+    def _choose(self, mask):
+        """
+        Elige al azar, con la misma probabilidad, una columna True de cada fila. Las filas tienen que tener alguna
+        :param mask: np.array (bool) (filas, columnas)
+        :return: np.array con la columna elegida en cada fila
+        """
+        return np.where(mask, self.rng.random(mask.shape), -1.0).argmax(axis=1)
@@ -9,21 +9,33 @@ class CommerceManager:
     def __init__(self):
         return
 
-    def trade_without_harbor(self, player_hand, gives, receives):
+    def trade_with_bank(self, player_hand, gives, receives, ratio):
         """
-        Sustituye 4 del material pasado por 1 del deseado.
+        Sustituye "ratio" del material pasado por 1 del deseado. El ratio lo da Board.get_trade_ratio según los puertos
+        del jugador: 4 sin puerto, 3 con un puerto 3:1 y 2 con un puerto de ese material.
         :param player_hand: (Hand()) materiales que tiene el jugador.
         :param gives: (int) ID del material que quiere cambiar con el puerto.
         :param receives: (int) ID del material que quiere recibir a cambio.
-        :return: bool
+        :param ratio: (int) Cuántos materiales hay que dar.
+        :return: Hand(), bool
         """
-        if player_hand.get_from_id(gives) >= 4:
-            player_hand.remove_material(gives, 4)
+        if player_hand.get_from_id(gives) >= ratio:
+            player_hand.remove_material(gives, ratio)
             player_hand.add_material(receives, 1)
             return player_hand
         else:
             return False
 
+    def trade_without_harbor(self, player_hand, gives, receives):
+        """
+        Sustituye 4 del material pasado por 1 del deseado.
+        :param player_hand: (Hand()) materiales que tiene el jugador.
+        :param gives: (int) ID del material que quiere cambiar con el puerto.
+        :param receives: (int) ID del material que quiere recibir a cambio.
+        :return: bool
+        """
+        return self.trade_with_bank(player_hand, gives, receives, 4)
+
     def trade_through_harbor(self, player_hand, gives, receives):
         """
         Sustituye 3 del material pasado por 1 del deseado.
@@ -32,12 +44,7 @@ class CommerceManager:
         :param receives: (int) ID del material que quiere recibir a cambio.
         :return: bool
         """
-        if player_hand.get_from_id(gives) >= 3:
-            player_hand.remove_material(gives, 3)
-            player_hand.add_material(receives, 1)
-            return player_hand
-        else:
-            return False
+        return self.trade_with_bank(player_hand, gives, receives, 3)
 
     def trade_through_special_harbor(self, player_hand, gives, receives):
         """
@@ -47,9 +54,4 @@ class CommerceManager:
         :param receives: (int) ID del material que quiere recibir a cambio.
         :return: bool
         """
-        if player_hand.get_from_id(gives) >= 2:
-            player_hand.remove_material(gives, 2)
-            player_hand.add_material(receives, 1)
-            return player_hand
-        else:
-            return False
+        return self.trade_with_bank(player_hand, gives, receives, 2)
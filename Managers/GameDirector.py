@@ -1,5 +1,11 @@
+import random
+import time
+
+from Classes.AgentCall import AgentCall
+from Classes.Constants import TraceLevelConstants
 from Classes.DevelopmentCards import DevelopmentCard
 from Managers.GameManager import GameManager
+from TraceLoader.TraceEvents import TraceEvents
 from TraceLoader.TraceLoader import TraceLoader
 
 
@@ -8,18 +14,28 @@ class GameDirector:
     Clase que se encarga de dirigir la partida, empezarla y acabarla
     """
 
-    def __init__(self, for_test=False, agents = None, max_rounds=1000):
-        self.game_manager = GameManager(for_test, agents)
-        self.trace_loader = TraceLoader()
+    def __init__(self, for_test=False, agents = None, max_rounds=1000, trace_level=TraceLevelConstants.FULL,
+                 time_budgets=None, results_store=None, trace_stream=None):
+        # time_budgets: {trigger: segundos} Tiempo máximo de respuesta de los agentes (ver AgentWatchdog)
+        self.game_manager = GameManager(for_test, agents, time_budgets=time_budgets)
+        # trace_stream: TraceStream en el que se escriben las trazas en lugar de en un fichero por partida
+        self.trace_loader = TraceLoader(trace_stream)
+        # Eventos de la partida actual con el nivel de traza EVENTS
+        self.trace_events = TraceEvents()
+        # ResultsStore en el que se guarda el resultado de cada partida, sea cual sea el nivel de traza
+        self.results_store = results_store
         self.max_rounds = max_rounds
+        self.trace_level = trace_level
+        # Resultado de la última partida jugada (ver game_summary), sea cual sea el nivel de traza
+        self.last_summary = None
         return
 
-    def reset_game_values(self):
+    def reset_game_values(self, seed=None):
         # Reseteamos la traza actual
         self.trace_loader.current_trace = {}
 
         # Reseteamos el game_manager
-        self.game_manager.reset_game_values()
+        self.game_manager.reset_game_values(seed)
         return
 
     # -- -- -- --  Turn  -- -- -- --
@@ -30,26 +46,41 @@ class GameDirector:
         :param player: (int) número que representa al jugador.
         :return: object, bool
         """
-        start_turn_object = {'development_card_played': []}
+        return AgentCall.run(self.start_turn_steps(winner, player), self.game_manager.watchdog)
+
+    def start_turn_steps(self, winner, player=-1):
+        """
+        Generador de start_turn (ver AgentCall). Sin objetos de la traza (NONE y SUMMARY) el objeto del turno es None
+        """
+        trace_objects = self.game_manager.trace_objects
+        start_turn_object = {'development_card_played': []} if trace_objects else None
 
         self.game_manager.set_phase(0)
         self.game_manager.set_actual_player(player)
 
-        turn_start_response = self.game_manager.call_to_agent_on_turn_start(player)
+        turn_start_response = yield from self.game_manager.call_to_agent_on_turn_start_steps(player)
 
         if isinstance(turn_start_response, DevelopmentCard) and not self.game_manager.get_card_used() and not winner:
-            played_card_obj, winner = self.game_manager.play_development_card(player, turn_start_response, winner)
-            start_turn_object['development_card_played'].append(played_card_obj)
+            played_card_obj, winner = yield from self.game_manager.play_development_card_steps(
+                player, turn_start_response, winner)
+            if trace_objects:
+                start_turn_object['development_card_played'].append(played_card_obj)
 
         if not winner:
             self.game_manager.throw_dice()
             self.game_manager.give_resources()
 
-            start_turn_object['dice'] = self.game_manager.get_last_dice_roll()
-            start_turn_object['actual_player'] = str(self.game_manager.get_whose_turn_is_it())
+            if trace_objects:
+                start_turn_object['dice'] = self.game_manager.get_last_dice_roll()
+            if self.trace_level == TraceLevelConstants.FULL:
+                start_turn_object['actual_player'] = str(self.game_manager.get_whose_turn_is_it())
 
             # Si ha salido un 7 en la tirada de dado se llama al ladrón
-            start_turn_object = self.game_manager.check_if_thief_is_called(start_turn_object, player)
+            start_turn_object = yield from self.game_manager.check_if_thief_is_called_steps(start_turn_object, player)
+
+            # Las manos de los jugadores solo se guardan si se quiere la traza completa
+            if self.trace_level != TraceLevelConstants.FULL:
+                return start_turn_object, winner
 
             for i in range(4):
                 start_turn_object['hand_P' + str(i)] = self.game_manager.player_resources_to_object(i)
@@ -66,15 +97,24 @@ class GameDirector:
         :param player: número que representa al jugador
         :return: None
         """
-        end_turn_object = {'development_card_played': []}
+        return AgentCall.run(self.end_turn_steps(winner, player), self.game_manager.watchdog)
+
+    def end_turn_steps(self, winner, player=-1):
+        """
+        Generador de end_turn (ver AgentCall). Sin objetos de la traza (NONE y SUMMARY) el objeto del turno es None
+        """
+        trace_objects = self.game_manager.trace_objects
+        end_turn_object = {'development_card_played': []} if trace_objects else None
 
         self.game_manager.set_phase(3)
 
-        turn_end_response = self.game_manager.call_to_agent_on_turn_end(player)
+        turn_end_response = yield from self.game_manager.call_to_agent_on_turn_end_steps(player)
 
         if isinstance(turn_end_response, DevelopmentCard) and not self.game_manager.get_card_used() and not winner:
-            played_card_obj, winner = self.game_manager.play_development_card(player, turn_end_response, winner)
-            end_turn_object['development_card_played'].append(played_card_obj)
+            played_card_obj, winner = yield from self.game_manager.play_development_card_steps(
+                player, turn_end_response, winner)
+            if trace_objects:
+                end_turn_object['development_card_played'].append(played_card_obj)
 
         if not winner:
             # -- -- -- -- Calcular carretera más larga -- -- -- --
@@ -85,27 +125,27 @@ class GameDirector:
                     player['victory_points'] -= 2
                     break
 
-            # Calculamos quien tiene la carretera más larga
-            for node in self.game_manager.get_board_nodes():
-                longest_road_obj = self.game_manager.longest_road_calculator(node, 1, {'longest_road': 0, 'player': -1},
-                                                                             -1, [node['id']])
-
-                if longest_road_obj['longest_road'] > self.game_manager.get_longest_road()['longest_road']:
-                    self.game_manager.set_longest_road(longest_road_obj)
+            # Calculamos quien tiene la carretera más larga. Solo se recalculan los jugadores cuya red de carreteras
+            # ha cambiado desde el último turno
+            longest_road_obj = self.game_manager.board.road_network.longest_road()
+            if longest_road_obj['longest_road'] > self.game_manager.get_longest_road()['longest_road']:
+                self.game_manager.set_longest_road(longest_road_obj)
             # Se le da el título a quien tenga la carretera más larga
             if self.game_manager.get_longest_road()['player'] != -1:
                 self.game_manager.get_players()[self.game_manager.get_longest_road()['player']]['longest_road'] = 1
                 self.game_manager.get_players()[self.game_manager.get_longest_road()['player']]['victory_points'] += 2
 
-        vp = {}
-        for i in range(4):
-            vp['J' + str(i)] = str(self.game_manager.get_players()[i]['victory_points'])
-
         for player in self.game_manager.get_players():
             if player['victory_points'] >= 10:
                 winner = True
 
-        end_turn_object['victory_points'] = vp
+        # Los puntos de victoria solo se guardan si se quiere la traza completa
+        if self.trace_level == TraceLevelConstants.FULL:
+            vp = {}
+            for i in range(4):
+                vp['J' + str(i)] = str(self.game_manager.get_players()[i]['victory_points'])
+            end_turn_object['victory_points'] = vp
+
         return end_turn_object, winner
 
     def start_commerce_phase(self, winner, depth=1, player=-1):
@@ -116,14 +156,20 @@ class GameDirector:
         :param player: (int) número que representa al jugador.
         :return: object
         """
+        return AgentCall.run(self.start_commerce_phase_steps(winner, depth, player), self.game_manager.watchdog)
+
+    def start_commerce_phase_steps(self, winner, depth=1, player=-1):
+        """
+        Generador de start_commerce_phase (ver AgentCall)
+        """
         commerce_phase_object = {}
 
         self.game_manager.set_phase(1)
 
-        commerce_response = self.game_manager.call_to_agent_on_commerce_phase(player)
+        commerce_response = yield from self.game_manager.call_to_agent_on_commerce_phase_steps(player)
 
-        commerce_phase_object, winner = self.game_manager.on_commerce_response(commerce_phase_object, commerce_response,
-                                                                               depth, player, winner)
+        commerce_phase_object, winner = yield from self.game_manager.on_commerce_response_steps(
+            commerce_phase_object, commerce_response, depth, player, winner)
 
         return commerce_phase_object, winner
 
@@ -134,14 +180,20 @@ class GameDirector:
         :param player: (int) número que representa al jugador.
         :return: None
         """
+        return AgentCall.run(self.start_build_phase_steps(winner, player), self.game_manager.watchdog)
+
+    def start_build_phase_steps(self, winner, player=-1):
+        """
+        Generador de start_build_phase (ver AgentCall)
+        """
         build_phase_object = {}
 
         self.game_manager.set_phase(2)
 
-        build_response = self.game_manager.call_to_agent_on_build_phase(player)
+        build_response = yield from self.game_manager.call_to_agent_on_build_phase_steps(player)
 
-        build_phase_object, winner = self.game_manager.build_phase_object(build_phase_object, build_response, player,
-                                                                          winner)
+        build_phase_object, winner = yield from self.game_manager.build_phase_object_steps(
+            build_phase_object, build_response, player, winner)
 
         return build_phase_object, winner
 
@@ -150,7 +202,16 @@ class GameDirector:
         """
         Esta función permite comenzar una ronda nueva.
         """
+        return AgentCall.run(self.round_start_steps(winner), self.game_manager.watchdog)
+
+    def round_start_steps(self, winner):
+        """
+        Generador de round_start (ver AgentCall)
+        """
         round_object = {}
+        full_trace = self.trace_level == TraceLevelConstants.FULL
+        events = self.trace_events if self.trace_level == TraceLevelConstants.EVENTS else None
+        round_number = self.game_manager.get_round()
         self.game_manager.set_card_used(False)
 
         if not winner:
@@ -159,8 +220,12 @@ class GameDirector:
                 self.game_manager.set_turn(self.game_manager.get_turn() + 1)
                 self.game_manager.set_whose_turn_is_it(i)
 
-                start_turn_object, winner = self.start_turn(winner, self.game_manager.get_whose_turn_is_it())
-                obj['start_turn'] = start_turn_object
+                start_turn_object, winner = yield from self.start_turn_steps(winner,
+                                                                             self.game_manager.get_whose_turn_is_it())
+                if full_trace:
+                    obj['start_turn'] = start_turn_object
+                elif events is not None:
+                    events.add_start_turn(round_number, i, start_turn_object, self.game_manager)
 
                 # Se permite comerciar un máximo de 2 veces con jugadores, pero cualquier cantidad con el puerto.
                 # Si se intenta comercia con un jugador una tercera vez, devuelve None y corta el bucle
@@ -168,53 +233,83 @@ class GameDirector:
                 trading = True
 
                 while trading and not winner:
-                    commerce_phase_object, winner = self.start_commerce_phase(winner, depth,
-                                                                              self.game_manager.get_whose_turn_is_it())
-                    commerce_phase_array.append(commerce_phase_object)
+                    commerce_phase_object, winner = yield from self.start_commerce_phase_steps(
+                        winner, depth, self.game_manager.get_whose_turn_is_it())
+                    if full_trace:
+                        commerce_phase_array.append(commerce_phase_object)
+                    elif events is not None:
+                        events.add_commerce(round_number, i, commerce_phase_object, self.game_manager)
                     if commerce_phase_object['trade_offer'] == 'None':
                         trading = False
                     elif not (commerce_phase_object['harbor_trade'] or commerce_phase_object['harbor_trade'] is None):
                         depth += 1
-                obj['commerce_phase'] = commerce_phase_array
+                if full_trace:
+                    obj['commerce_phase'] = commerce_phase_array
 
                 # Se puede construir cualquier cantidad de veces en un turno mientras tengan materiales. Así que
                 # para evitar un bucle infinito, se corta si se construye 'None' o si fallan al intentar construir
                 build_phase_array = []
                 building = True
                 while building and not winner:
-                    build_phase_object, winner = self.start_build_phase(winner,
-                                                                        self.game_manager.get_whose_turn_is_it())
-                    build_phase_array.append(build_phase_object)
+                    build_phase_object, winner = yield from self.start_build_phase_steps(
+                        winner, self.game_manager.get_whose_turn_is_it())
+                    if full_trace:
+                        build_phase_array.append(build_phase_object)
+                    elif events is not None:
+                        events.add_build(round_number, i, build_phase_object, self.game_manager)
                     if build_phase_object['building'] == 'None' or not build_phase_object['finished']:
                         building = False
-                obj['build_phase'] = build_phase_array
-
-                end_turn_object, winner = self.end_turn(winner, self.game_manager.get_whose_turn_is_it())
-                obj['end_turn'] = end_turn_object
+                if full_trace:
+                    obj['build_phase'] = build_phase_array
 
-                round_object['turn_P' + str(i)] = obj
+                end_turn_object, winner = yield from self.end_turn_steps(winner,
+                                                                         self.game_manager.get_whose_turn_is_it())
+                if full_trace:
+                    obj['end_turn'] = end_turn_object
+                    round_object['turn_P' + str(i)] = obj
+                elif events is not None:
+                    events.add_end_turn(round_number, i, end_turn_object, self.game_manager)
 
                 if winner:
                     break
         return round_object, winner
 
     # Game #
-    def game_start(self, game_number=0, print_outcome=True):
+    def game_start(self, game_number=0, print_outcome=True, trace_level=None, seed=None):
         """
         Esta función permite comenzar una partida nueva.
         :param game_number: (int) número de partidas que se van a jugar.
+        :param print_outcome: (bool) si se imprime el resultado de la partida por consola.
+        :param trace_level: (str) TraceLevelConstants. Si se indica, pasa a ser el nivel de traza del director.
+        :param seed: (int) semilla de la partida. Toda la aleatoriedad de la partida sale de un random.Random con esta
+                     semilla, así que la misma semilla juega la misma partida. Si es None se saca del módulo random.
+        :return: dict. La traza completa con FULL, la de eventos con EVENTS, o el resultado de la partida con SUMMARY y
+                 NONE
+        """
+        return AgentCall.run(self.game_start_steps(game_number, print_outcome, trace_level, seed),
+                             self.game_manager.watchdog)
+
+    def game_start_steps(self, game_number=0, print_outcome=True, trace_level=None, seed=None):
+        """
+        Generador de game_start (ver AgentCall)
         """
+        if trace_level is not None:
+            self.trace_level = trace_level
+        full_trace = self.trace_level == TraceLevelConstants.FULL
+        self.game_manager.track_changes = self.trace_level == TraceLevelConstants.EVENTS
+        self.game_manager.trace_objects = self.trace_level in (TraceLevelConstants.FULL, TraceLevelConstants.EVENTS)
+
         # Se cargan los agentes y se inicializa el tablero
         # self.game_manager.agent_manager.load_agents()
-        self.reset_game_values()
-
-        # Se añade el tablero al setup, para que el intérprete sepa cómo es el tablero
-        setup_object = {
-            "board": {
-                "board_nodes": self.game_manager.get_board_nodes(),
-                "board_terrain": self.game_manager.get_board_terrain(),
-            }
-        }
+        if seed is None:
+            seed = random.getrandbits(64)
+        start = time.perf_counter()
+        self.reset_game_values(seed)
+        self.trace_events.reset(seed)
+
+        # Se añade el tablero al setup, para que el intérprete sepa cómo es el tablero. Se rellena al acabar la
+        # partida (ver game_loop)
+        setup_object = {"board": {}} if full_trace else {}
         # Se le da paso al primer jugador para que ponga un poblado y una aldea
         for i in range(4):
             setup_object["P" + str(i)] = []
@@ -223,31 +318,50 @@ class GameDirector:
             self.game_manager.set_whose_turn_is_it(i)
 
             # función recursiva a introducir
-            node_id, road_to = self.game_manager.on_game_start_build_towns_and_roads(i)
+            node_id, road_to = yield from self.game_manager.on_game_start_build_towns_and_roads_steps(i)
             setup_object["P" + str(i)].append({"id": node_id, "road": road_to})
+            self.trace_events.add_setup(i, node_id, road_to)
 
         for i in range(3, -1, -1):
             self.game_manager.set_actual_player(i)
             self.game_manager.set_whose_turn_is_it(i)
 
             # función recursiva a introducir
-            node_id, road_to = self.game_manager.on_game_start_build_towns_and_roads(i)
+            node_id, road_to = yield from self.game_manager.on_game_start_build_towns_and_roads_steps(i)
             setup_object["P" + str(i)].append({"id": node_id, "road": road_to})
+            self.trace_events.add_setup(i, node_id, road_to)
+
+        if full_trace:
+            self.trace_loader.current_trace["setup"] = setup_object
+        summary = yield from self.game_loop_steps(game_number, print_outcome)
+        if self.results_store is not None:
+            self.results_store.append(summary, seed, time.perf_counter() - start)
 
-        self.trace_loader.current_trace["setup"] = setup_object
-        self.game_loop(game_number, print_outcome)
-        return self.trace_loader.current_trace
+        if full_trace or self.trace_level == TraceLevelConstants.EVENTS:
+            return self.trace_loader.current_trace
+        return summary
 
     def game_loop(self, game_number, print_outcome):
         """
         Esta función permite jugar varias partidas seguidas.
         :param game_number: (int) número de partidas que se van a jugar.
+        :return: dict. El resultado de la partida (ver game_summary)
         """
+        return AgentCall.run(self.game_loop_steps(game_number, print_outcome), self.game_manager.watchdog)
+
+    def game_loop_steps(self, game_number, print_outcome):
+        """
+        Generador de game_loop (ver AgentCall)
+        """
+        full_trace = self.trace_level == TraceLevelConstants.FULL
         game_object = {}
         winner = False
         for i in range(self.max_rounds):
-            if i == self.max_rounds-1: print('Game (' + str(game_number) + ') has reached the maximum number of rounds')
-            game_object['round_' + str(self.game_manager.get_round())], winner = self.round_start(winner)
+            if i == self.max_rounds-1 and print_outcome:
+                print('Game (' + str(game_number) + ') has reached the maximum number of rounds')
+            round_object, winner = yield from self.round_start_steps(winner)
+            if full_trace:
+                game_object['round_' + str(self.game_manager.get_round())] = round_object
             self.game_manager.set_round(self.game_manager.get_round() + 1)
             if winner:
                 break
@@ -261,6 +375,56 @@ class GameDirector:
                     str(self.game_manager.get_players()[i]['largest_army']) + ')' + ' (' +
                     str(self.game_manager.get_players()[i]['longest_road']) + ')')
 
-        self.trace_loader.current_trace["game"] = game_object
-        self.trace_loader.export_to_file(game_number)
-        return
+        summary = self.game_summary(game_number, winner)
+        self.last_summary = summary
+
+        if full_trace:
+            # El tablero del setup siempre se ha exportado tal y como está al acabar la partida
+            self.trace_loader.current_trace["setup"]["board"].update({
+                "board_nodes": self.game_manager.get_board_nodes(),
+                "board_terrain": self.game_manager.get_board_terrain(),
+            })
+            self.trace_loader.current_trace["game"] = game_object
+            self.trace_loader.export_to_file(game_number)
+        elif self.trace_level == TraceLevelConstants.SUMMARY:
+            self.trace_loader.current_trace["summary"] = summary
+            self.trace_loader.export_to_file(game_number)
+        elif self.trace_level == TraceLevelConstants.EVENTS:
+            self.trace_loader.current_trace = self.trace_events.to_object(summary)
+            self.trace_loader.export_to_file(game_number)
+        return summary
+
+    def game_summary(self, game_number, winner):
+        """
+        Genera el resultado de la partida que acaba de jugarse. Es lo único que se guarda con el nivel de traza SUMMARY
+        :param game_number: (int) número de la partida.
+        :param winner: (bool) si algún jugador ha ganado la partida.
+        :return: {'game_number': int, 'agents': [str...], 'winner': int, 'victory_points': [int...],
+                  'largest_army': int, 'longest_road': int, 'rounds': int, 'max_rounds_reached': bool,
+                  'agent_latency': [dict...]} agent_latency son los tiempos de respuesta de cada jugador
+                  (ver AgentWatchdog.summary)
+        """
+        players = self.game_manager.get_players()
+
+        winner_id = -1
+        largest_army = -1
+        longest_road = -1
+        for player in players:
+            if winner and winner_id == -1 and player['victory_points'] >= 10:
+                winner_id = player['id']
+            if player['largest_army']:
+                largest_army = player['id']
+            if player['longest_road']:
+                longest_road = player['id']
+
+        return {
+            'game_number': game_number,
+            'agents': [type(player['player']).__name__ for player in players],
+            'winner': winner_id,
+            'victory_points': [player['victory_points'] for player in players],
+            'largest_army': largest_army,
+            'longest_road': longest_road,
+            'rounds': self.game_manager.get_round(),
+            'max_rounds_reached': not winner,
+            'agent_latency': self.game_manager.watchdog.summary(),
+        }
@@ -1,8 +1,10 @@
-from copy import copy
+from Classes.AgentCall import AgentCall
+from Classes.AgentWatchdog import AgentWatchdog
 from Classes.Board import Board
 from Classes.Constants import *
 from Classes.DevelopmentCards import *
 from Classes.TradeOffer import TradeOffer
+from Classes.TrackedRandom import TrackedRandom
 from Classes.Hand import *
 from Managers.AgentManager import AgentManager
 from Managers.CommerceManager import CommerceManager
@@ -16,23 +18,71 @@ class GameManager:
     MAX_COMMERCE_DEPTH = 2
     MAX_COMMERCE_TRADES = 2
 
-    def __init__(self, for_test=False, agents = None):
+    def __init__(self, for_test=False, agents = None, seed=None, time_budgets=None):
         self.already_played_development_card = False
         self.last_dice_roll = 0
         self.largest_army = 2
         self.largest_army_player = {}
         self.longest_road = {'longest_road': 4, 'player': -1}
 
-        self.board = Board()
-        self.development_cards_deck = DevelopmentDeck()
+        # Todo lo aleatorio de la partida (dados, baraja, ladrón, agentes...) sale de este generador, así que la partida
+        # solo depende de su semilla y no del módulo random, que comparten todas las partidas del proceso
+        self.rng = TrackedRandom(seed)
+        self.board = Board(rng=self.rng)
+        self.development_cards_deck = DevelopmentDeck(self.rng)
         self.turn_manager = TurnManager()
         self.commerce_manager = CommerceManager()
-        self.agent_manager = AgentManager(for_test, agents=agents)
+        self.agent_manager = AgentManager(for_test, agents=agents, rng=self.rng)
+        # Tiempos de respuesta de los agentes y tiempo máximo de cada trigger
+        self.watchdog = AgentWatchdog(time_budgets)
+        # Si se apuntan los cambios de reset_last_changes. Solo hacen falta con el nivel de traza EVENTS (lo pone el
+        # GameDirector al empezar la partida)
+        self.track_changes = False
+        # Si se rellenan los objetos de la traza (ofertas, respuestas, ladrón...). Con los niveles de traza NONE y
+        # SUMMARY no se guardan, así que el GameDirector lo desactiva; solo se sigue rellenando lo que decide la partida
+        self.trace_objects = True
+        self.reset_last_changes()
         return
 
-    def reset_game_values(self):
+    def reset_last_changes(self):
+        """
+        Cambios de la última jugada que la traza completa no guarda, pero que hacen falta para reconstruir la partida a
+        partir de la traza de eventos (ver TraceEvents): lo que los agentes cambian de su mano durante sus triggers (los
+        del ladrón al salir un 7 aparte), los materiales descartados al salir un 7, las carreteras que se han construido
+        con la carta de construir carreteras y los materiales de la carta de año de la abundancia. Solo se apuntan con
+        track_changes
+        :return: None
+        """
+        self.last_agent_changes = []
+        self.last_thief_changes = []
+        self.last_discards = []
+        self.last_free_roads = []
+        self.last_year_of_plenty = None
+        return
+
+    def agent_call_steps(self, agent_call, changes=None):
+        """
+        Llama al agente (ver AgentCall) y apunta los cambios que haga en su mano, que es la misma que la del AgentManager
+        :param agent_call: AgentCall()
+        :param changes: list/None. Lista en la que se apuntan los cambios [jugador, cereal, mineral, arcilla, madera,
+                        lana]. Por defecto last_agent_changes
+        :return: La respuesta del agente
+        """
+        if not self.track_changes:
+            return (yield agent_call)
+        player_id = agent_call.agent.id
+        hand = self.agent_manager.players[player_id]['resources'].resources
+        hand_before = list(hand.amounts)
+        response = yield agent_call
+        if hand.amounts != hand_before:
+            (self.last_agent_changes if changes is None else changes).append(
+                [player_id] + [after - before for before, after in zip(hand_before, hand.amounts)])
+        return response
+
+    def reset_game_values(self, seed=None):
         """
         Reinicia las variables al valor inicial
+        :param seed: int/None. Semilla de la nueva partida. Si es None el generador sigue por donde iba
         :return: None
         """
         self.already_played_development_card = False
@@ -41,10 +91,14 @@ class GameManager:
         self.largest_army_player = {}
         self.longest_road = {'longest_road': 4, 'player': -1}
 
-        self.board = Board()
-        self.development_cards_deck = DevelopmentDeck()
+        if seed is not None:
+            self.rng.seed(seed)
+        self.board = Board(rng=self.rng)
+        self.development_cards_deck = DevelopmentDeck(self.rng)
         self.turn_manager = TurnManager()
         self.agent_manager.reset_game_values()
+        self.watchdog.reset()
+        self.reset_last_changes()
         return
 
     def throw_dice(self):
@@ -52,8 +106,8 @@ class GameManager:
         Función que devuelve un valor entre el 2 y el 12, simulando una tirada de 2d6
         :return: integer entre 2 y 12
         """
-        first_d6 = random.randint(1, 6)
-        second_d6 = random.randint(1, 6)
+        first_d6 = self.rng.randint(1, 6)
+        second_d6 = self.rng.randint(1, 6)
         self.last_dice_roll = first_d6 + second_d6
         return
 
@@ -62,23 +116,12 @@ class GameManager:
         Función que entrega materiales a cada uno de los jugadores en función de la tirada de dados
         :return: None
         """
-        # Por cada pieza de terreno en el tablero
-        for terrain in self.board.terrain:
-            # Si la probabilidad coincide
-            if terrain['probability'] == self.last_dice_roll:
-                # Se miran los nodos adyacentes
-                for node in terrain['contacting_nodes']:
-                    # Si tiene jugador, implica que hay pueblo
-                    if self.board.nodes[node]['player'] != -1:
-                        player = self.agent_manager.players[self.board.nodes[node]['player']]
-                        # Si tiene ciudad se dan 2 en lugar de 1 material
-
-                        if self.board.nodes[node]['has_city']:
-                            player['player'].hand.add_material(terrain['terrain_type'], 2)
-                            player['resources'].add_material(terrain['terrain_type'], 2)
-                        else:
-                            player['player'].hand.add_material(terrain['terrain_type'], 1)
-                            player['resources'].add_material(terrain['terrain_type'], 1)
+        # La tabla de producción del tablero ya sabe quién recibe qué con cada tirada (las ciudades dan 2 materiales),
+        # así que no hace falta recorrer el terreno
+        for player_id, material, amount in self.board.get_production(self.last_dice_roll):
+            player = self.agent_manager.players[player_id]
+            player['player'].hand.add_material(material, amount)
+            player['resources'].add_material(material, amount)
         return
 
     def _give_all_resources(self):
@@ -102,13 +145,19 @@ class GameManager:
         :param trade_offer: Oferta de comercio con el jugador, debe incluir qué se entrega y qué se recibe
         :return: array [...dict {}]
         """
+        return AgentCall.run(self.send_trade_to_everyone_steps(trade_offer), self.watchdog)
+
+    def send_trade_to_everyone_steps(self, trade_offer=TradeOffer()):
+        """
+        Generador de send_trade_to_everyone (ver AgentCall)
+        """
         answer_object = []
 
         receivers = self.agent_manager.players.copy()
         giver = receivers.pop(self.turn_manager.whose_turn_is_it)
 
         # Se aleatorizan el orden en el que se va a recibir la oferta para evitar que J1 tenga ventaja
-        random.shuffle(receivers)
+        self.rng.shuffle(receivers)
 
         original_trade_offer = trade_offer
 
@@ -122,9 +171,9 @@ class GameManager:
                 # Se hace un bucle de contraofertas hasta que se llegue a una decisión de True o False
                 if count % 2 == 0:
                     # Giver toma el papel de receiver porque es una contraoferta
-                    response_obj = self._on_tradeoffer_response(giver, receiver, count, trade_offer)
+                    response_obj = yield from self._on_tradeoffer_response_steps(giver, receiver, count, trade_offer)
                 else:
-                    response_obj = self._on_tradeoffer_response(receiver, giver, count, trade_offer)
+                    response_obj = yield from self._on_tradeoffer_response_steps(receiver, giver, count, trade_offer)
 
                 if isinstance(response_obj["response"], TradeOffer):
                     trade_offer = response_obj['response']
@@ -161,13 +210,21 @@ class GameManager:
         :return: json_obj {'count': int, 'giver': Player(), 'receiver': Player(),
                              'trade_offer': TradeOffer(), 'response': True/False}
         """
+        return AgentCall.run(self._on_tradeoffer_response_steps(receiver, giver, count, trade_offer), self.watchdog)
+
+    def _on_tradeoffer_response_steps(self, receiver, giver, count, trade_offer):
+        """
+        Generador de _on_tradeoffer_response (ver AgentCall)
+        """
         json_obj = {
             'count': count,
-            'trade_offer': trade_offer.__to_object__(),
+            'trade_offer': trade_offer.__to_object__() if self.trace_objects else None,
             'giver': giver['id'],
             'receiver': receiver['id'],
         }
-        response = receiver['player'].on_trade_offer(copy(self.board), trade_offer, giver['id'])
+        response = yield from self.agent_call_steps(AgentCall(receiver['player'], 'on_trade_offer',
+                                                              self.board.get_view(), trade_offer, giver['id'],
+                                                              default=False))
 
         if count > self.MAX_COMMERCE_DEPTH:
             json_obj['response'] = False
@@ -268,6 +325,8 @@ class GameManager:
                                                                                     MaterialConstants.WOOD
                                                                                     ], 1)
                 self.agent_manager.players[player_id]['player'].hand = self.agent_manager.players[player_id]['resources']
+            elif build_road_obj['response'] and self.track_changes:
+                self.last_free_roads.append([node, road])
 
             return build_road_obj
         else:
@@ -327,6 +386,14 @@ class GameManager:
                 move_thief_obj['error_msg'] = 'No se ha podido robar a otro jugador ya que no hay ninguno'
         return move_thief_obj
 
+    def thief_fallback(self):
+        """
+        Respuesta de on_moving_thief que se usa cuando el agente se pasa de tiempo. El ladrón se queda donde está, así
+        que el tablero lo mueve a un terreno aleatorio sin robar a nadie, igual que con una respuesta no válida
+        :return: {'terrain': int, 'player': int}
+        """
+        return {'terrain': self.board.state.thief, 'player': -1}
+
     def _steal_from_player(self, player):
         """
         Función que permite robar de manera aleatoria un material de la mano de un jugador.
@@ -341,7 +408,7 @@ class GameManager:
         new_total = player_obj["resources"].get_total()
 
         while new_total == total and total != 0:
-            material_id = random.randint(0, 4)
+            material_id = self.rng.randint(0, 4)
             player_obj['resources'].remove_material(material_id, 1)
             new_total = player_obj['resources'].get_total()
 
@@ -357,20 +424,32 @@ class GameManager:
         :param player: contador externo que indica a qué jugador le toca
         :return: node_id, road_to
         """
+        return AgentCall.run(self.on_game_start_build_towns_and_roads_steps(player), self.watchdog)
+
+    def on_game_start_build_towns_and_roads_steps(self, player):
+        """
+        Generador de on_game_start_build_towns_and_roads (ver AgentCall)
+        """
         # Le da a los agentes 2 intentos de poner bien los pueblos y carreteras. Si no, el GameManager lo hará por ellos.
         valid_nodes = self.board.valid_starting_nodes()
         materials = []
 
         for count in range(3):
-            node_id, road_to = self.agent_manager.players[player]['player'].on_game_start(copy(self.board))
+            response = yield from self.agent_call_steps(AgentCall(self.agent_manager.players[player]['player'],
+                                                                  'on_game_start', self.board.get_view()))
+            if response is None:
+                # El agente se ha pasado de tiempo: se coloca al azar, como si hubiese gastado sus intentos
+                node_id, road_to, count = None, None, 2
+            else:
+                node_id, road_to = response
 
             if node_id in valid_nodes or count == 2:
 
                 if count == 2:
-                    node_id = valid_nodes[random.randint(0, (len(valid_nodes) - 1))]
+                    node_id = valid_nodes[self.rng.randint(0, (len(valid_nodes) - 1))]
 
                     possible_roads = self.board.nodes[node_id]['adjacent']
-                    road_to = possible_roads[random.randint(0, len(possible_roads) - 1)]
+                    road_to = possible_roads[self.rng.randint(0, len(possible_roads) - 1)]
 
                 terrain_ids = self.board.nodes[node_id]['contacting_terrain']
                 for ter_id in terrain_ids:
@@ -389,7 +468,7 @@ class GameManager:
                     return node_id, road_to
                 else:
                     possible_roads = self.board.nodes[node_id]['adjacent']
-                    road_to = possible_roads[random.randint(0, len(possible_roads) - 1)]
+                    road_to = possible_roads[self.rng.randint(0, len(possible_roads) - 1)]
                     self.board.build_road(player, node_id, road_to)
                     return node_id, road_to
 
@@ -425,6 +504,12 @@ class GameManager:
         :param winner: bool
         :return: {'id': int, 'type': string, 'effect': int}, bool
         """
+        return AgentCall.run(self.play_development_card_steps(player_id, card, winner), self.watchdog)
+
+    def play_development_card_steps(self, player_id, card, winner):
+        """
+        Generador de play_development_card (ver AgentCall)
+        """
         card_obj = {}
 
         if card in self.agent_manager.players[player_id]['development_cards'].hand:
@@ -463,7 +548,8 @@ class GameManager:
                     self.largest_army_player['largest_army'] = 1
                     self.largest_army_player['victory_points'] += 2
 
-            on_moving_thief = self.agent_manager.players[player_id]['player'].on_moving_thief()
+            on_moving_thief = yield from self.agent_call_steps(AgentCall(
+                self.agent_manager.players[player_id]['player'], 'on_moving_thief', default=self.thief_fallback()))
             move_thief_obj = self.move_thief(on_moving_thief['terrain'], on_moving_thief['player'])
 
             # se pasan los cambios al objeto
@@ -498,11 +584,12 @@ class GameManager:
 
             if card.effect == DevelopmentCardConstants.MONOPOLY_EFFECT:
                 # Elige material
-                material_chosen = self.agent_manager.players[player_id]['player'].on_monopoly_card_use()
+                material_chosen = yield from self.agent_call_steps(AgentCall(
+                    self.agent_manager.players[player_id]['player'], 'on_monopoly_card_use'))
                 material_sum = 0
 
                 if material_chosen is None:
-                    material_chosen = random.randint(0, 4)
+                    material_chosen = self.rng.randint(0, 4)
 
                 # Se elimina el material de la mano de todos los jugadores
                 for player in self.agent_manager.players:
@@ -528,7 +615,8 @@ class GameManager:
             elif card.effect == DevelopmentCardConstants.ROAD_BUILDING_EFFECT:
 
                 # Se piden en qué puntos quieren construir carreteras
-                road_nodes = self.agent_manager.players[player_id]['player'].on_road_building_card_use()
+                road_nodes = yield from self.agent_call_steps(AgentCall(
+                    self.agent_manager.players[player_id]['player'], 'on_road_building_card_use'))
                 card_obj['played_card'] = 'road_building'
 
                 # Si hay al menos una carretera
@@ -558,7 +646,7 @@ class GameManager:
                                 # Si no se ha podido construir se cambia de carretera a una aleatoria posible
                                 valid_nodes = self.board.valid_road_nodes(player_id)
                                 if len(valid_nodes):
-                                    road_node = random.randint(0, len(valid_nodes) - 1)
+                                    road_node = self.rng.randint(0, len(valid_nodes) - 1)
                                     road_nodes['node_id'] = valid_nodes[road_node]['starting_node']
                                     road_nodes['road_to'] = valid_nodes[road_node]['finishing_node']
                                 else:
@@ -574,7 +662,7 @@ class GameManager:
 
                                 valid_nodes = self.board.valid_road_nodes(player_id)
                                 if len(valid_nodes):
-                                    road_node = random.randint(0, len(valid_nodes) - 1)
+                                    road_node = self.rng.randint(0, len(valid_nodes) - 1)
                                     road_nodes['node_id_2'] = valid_nodes[road_node]['starting_node']
                                     road_nodes['road_to_2'] = valid_nodes[road_node]['finishing_node']
                                 else:
@@ -597,13 +685,17 @@ class GameManager:
                 card_obj['played_card'] = 'year_of_plenty'
 
                 # Eligen 2 materiales (puede ser el mismo 2 veces)
-                materials_selected = self.agent_manager.players[player_id]['player'].on_year_of_plenty_card_use()
+                materials_selected = yield from self.agent_call_steps(AgentCall(
+                    self.agent_manager.players[player_id]['player'], 'on_year_of_plenty_card_use'))
                 card_obj['materials_selected'] = materials_selected
 
                 if materials_selected is None:
-                    material, material2 = random.randint(0, 4), random.randint(0, 4)
+                    material, material2 = self.rng.randint(0, 4), self.rng.randint(0, 4)
                     materials_selected = {'material': material, 'material_2': material2}
 
+                if self.track_changes:
+                    self.last_year_of_plenty = [materials_selected['material'], materials_selected['material_2']]
+
                 # Obtienen una carta de ese material elegido
                 self.agent_manager.players[player_id]['resources'].add_material(materials_selected['material'], 1)
                 self.agent_manager.players[player_id]['resources'].add_material(materials_selected['material_2'], 1)
@@ -730,40 +822,68 @@ class GameManager:
         :param player: int
         :return: DevelopmentCard, None
         """
-        return self.agent_manager.players[player]['player'].on_turn_start()
+        return AgentCall.run(self.call_to_agent_on_turn_start_steps(player), self.watchdog)
+
+    def call_to_agent_on_turn_start_steps(self, player):
+        """
+        Generador de call_to_agent_on_turn_start (ver AgentCall)
+        """
+        return (yield from self.agent_call_steps(AgentCall(self.agent_manager.players[player]['player'],
+                                                           'on_turn_start')))
 
     def call_to_agent_on_turn_end(self, player_id):
         """
         :param player_id: int
         :return: DevelopmentCard, None
         """
-        return self.agent_manager.players[player_id]['player'].on_turn_end()
+        return AgentCall.run(self.call_to_agent_on_turn_end_steps(player_id), self.watchdog)
+
+    def call_to_agent_on_turn_end_steps(self, player_id):
+        """
+        Generador de call_to_agent_on_turn_end (ver AgentCall)
+        """
+        return (yield from self.agent_call_steps(AgentCall(self.agent_manager.players[player_id]['player'],
+                                                           'on_turn_end')))
 
     def call_to_agent_on_commerce_phase(self, player_id):
         """
         :param player_id: int
         :return: TradeOffer, dict{'gives': int, 'receives': int}, None
         """
-        return self.agent_manager.players[player_id]['player'].on_commerce_phase()
+        return AgentCall.run(self.call_to_agent_on_commerce_phase_steps(player_id), self.watchdog)
+
+    def call_to_agent_on_commerce_phase_steps(self, player_id):
+        """
+        Generador de call_to_agent_on_commerce_phase (ver AgentCall)
+        """
+        return (yield from self.agent_call_steps(AgentCall(self.agent_manager.players[player_id]['player'],
+                                                           'on_commerce_phase')))
 
     def call_to_agent_on_build_phase(self, player_id):
         """
         :param player_id: int
         :return: dict{'building': str, 'node_id': int, 'road_to': int/None}, None
         """
-        return self.agent_manager.players[player_id]['player'].on_build_phase(copy(self.board))
+        return AgentCall.run(self.call_to_agent_on_build_phase_steps(player_id), self.watchdog)
+
+    def call_to_agent_on_build_phase_steps(self, player_id):
+        """
+        Generador de call_to_agent_on_build_phase (ver AgentCall)
+        """
+        return (yield from self.agent_call_steps(AgentCall(self.agent_manager.players[player_id]['player'],
+                                                           'on_build_phase', self.board.get_view())))
 
     def get_board_nodes(self):
         """
-        :return: nodes
+        :return: [dict...] Copia de los nodos
         """
-        return self.board.nodes
+        return self.board.export_nodes()
 
     def get_board_terrain(self):
         """
-        :return: terrain
+        :return: [dict...] Copia de los terrenos
         """
-        return self.board.terrain
+        return self.board.export_terrain()
 
     def get_card_used(self):
         """
@@ -785,23 +905,41 @@ class GameManager:
         :param start_turn_object: dict
         :return: start_turn_object, dict
         """
+        return AgentCall.run(self.check_if_thief_is_called_steps(start_turn_object, player_id), self.watchdog)
+
+    def check_if_thief_is_called_steps(self, start_turn_object, player_id=0):
+        """
+        Generador de check_if_thief_is_called (ver AgentCall)
+        """
         if self.last_dice_roll == 7:
             for obj in self.agent_manager.players:
                 if obj['resources'].get_total() > 7:
-                    total = obj['player'].on_having_more_than_7_materials_when_thief_is_called().get_total()
+                    hand_before = list(obj['resources'].resources.amounts) if self.track_changes else None
+                    discarded_hand = yield AgentCall(obj['player'],
+                                                     'on_having_more_than_7_materials_when_thief_is_called',
+                                                     default=obj['resources'])
+                    total = discarded_hand.get_total()
                     max_hand = math.floor(total / 2)
 
                     while total > max_hand:
-                        obj['resources'].remove_material(random.randint(0, 4), 1)
+                        obj['resources'].remove_material(self.rng.randint(0, 4), 1)
                         total = obj['resources'].get_total()
 
-            on_moving_thief = self.agent_manager.players[player_id]['player'].on_moving_thief()
+                    if self.track_changes:
+                        self.last_discards.append([obj['id']] + [before - after for before, after in
+                                                                 zip(hand_before, obj['resources'].resources.amounts)])
+
+            # Lo que cambie el agente de su mano aquí ya es después de los descartes
+            on_moving_thief = yield from self.agent_call_steps(AgentCall(
+                self.agent_manager.players[player_id]['player'], 'on_moving_thief', default=self.thief_fallback()),
+                self.last_thief_changes)
             move_thief_obj = self.move_thief(on_moving_thief['terrain'], on_moving_thief['player'])
 
-            start_turn_object['past_thief_terrain'] = move_thief_obj['last_thief_terrain']
-            start_turn_object['thief_terrain'] = move_thief_obj['terrain_id']
-            start_turn_object['robbed_player'] = move_thief_obj['robbed_player']
-            start_turn_object['stolen_material_id'] = move_thief_obj['stolen_material_id']
+            if start_turn_object is not None:
+                start_turn_object['past_thief_terrain'] = move_thief_obj['last_thief_terrain']
+                start_turn_object['thief_terrain'] = move_thief_obj['terrain_id']
+                start_turn_object['robbed_player'] = move_thief_obj['robbed_player']
+                start_turn_object['stolen_material_id'] = move_thief_obj['stolen_material_id']
         return start_turn_object
 
     def on_commerce_response(self, commerce_phase_object, commerce_response, depth, player_id, winner):
@@ -813,14 +951,22 @@ class GameManager:
         :param winner: bool
         :return: dict
         """
+        return AgentCall.run(self.on_commerce_response_steps(commerce_phase_object, commerce_response, depth, player_id,
+                                                             winner), self.watchdog)
+
+    def on_commerce_response_steps(self, commerce_phase_object, commerce_response, depth, player_id, winner):
+        """
+        Generador de on_commerce_response (ver AgentCall)
+        """
         if isinstance(commerce_response, TradeOffer) and depth <= self.MAX_COMMERCE_TRADES:
-            commerce_phase_object['trade_offer'] = commerce_response.__to_object__()
+            commerce_phase_object['trade_offer'] = (commerce_response.__to_object__() if self.trace_objects
+                                                    else commerce_response)
             commerce_phase_object['harbor_trade'] = False
 
             if self.agent_manager.players[player_id]['resources'].resources.has_more(
                     commerce_response.gives):
                 commerce_phase_object['inviable'] = False
-                answer_object = self.send_trade_to_everyone(commerce_response)
+                answer_object = yield from self.send_trade_to_everyone_steps(commerce_response)
                 commerce_phase_object['answers'] = answer_object
             else:
                 commerce_phase_object['inviable'] = True
@@ -832,25 +978,16 @@ class GameManager:
             commerce_phase_object['trade_offer'] = commerce_response
             commerce_phase_object['harbor_trade'] = True
 
-            harbor_type = self.board.check_for_player_harbors(player_id, commerce_response['gives'])
-
-            if harbor_type == HarborConstants.NONE:
-                response = self.commerce_manager.trade_without_harbor(
-                    self.agent_manager.players[player_id]['resources'], commerce_response['gives'],
-                    commerce_response['receives'])
-            elif harbor_type == HarborConstants.ALL:
-                response = self.commerce_manager.trade_through_harbor(
-                    self.agent_manager.players[player_id]['resources'], commerce_response['gives'],
-                    commerce_response['receives'])
-            else:
-                response = self.commerce_manager.trade_through_special_harbor(
-                    self.agent_manager.players[player_id]['resources'], commerce_response['gives'],
-                    commerce_response['receives'])
+            ratio = self.board.get_trade_ratio(player_id, commerce_response['gives'])
+            response = self.commerce_manager.trade_with_bank(self.agent_manager.players[player_id]['resources'],
+                                                             commerce_response['gives'], commerce_response['receives'],
+                                                             ratio)
 
             if isinstance(response, Hand):
                 self.agent_manager.players[player_id]['resources'] = response
                 self.agent_manager.players[player_id]['player'].hand = self.agent_manager.players[player_id]['resources']
-                commerce_phase_object['answer'] = response.resources.__to_object__()
+                if self.trace_objects:
+                    commerce_phase_object['answer'] = response.resources.__to_object__()
 
                 return commerce_phase_object, winner
             else:
@@ -859,7 +996,7 @@ class GameManager:
             return commerce_phase_object, winner
 
         elif isinstance(commerce_response, DevelopmentCard) and not self.already_played_development_card:
-            played_card_obj, winner = self.play_development_card(player_id, commerce_response, winner)
+            played_card_obj, winner = yield from self.play_development_card_steps(player_id, commerce_response, winner)
             commerce_phase_object['trade_offer'] = 'played_card'
             commerce_phase_object['harbor_trade'] = False
             commerce_phase_object['development_card_played'] = played_card_obj
@@ -877,6 +1014,12 @@ class GameManager:
          :param winner: bool
          :return: dict, bool
          """
+        return AgentCall.run(self.build_phase_object_steps(build_phase_object, build_response, player_id, winner), self.watchdog)
+
+    def build_phase_object_steps(self, build_phase_object, build_response, player_id, winner):
+        """
+        Generador de build_phase_object (ver AgentCall)
+        """
         if isinstance(build_response, dict):
             build_phase_object = build_response
 
@@ -915,7 +1058,7 @@ class GameManager:
                 return build_phase_object, winner
 
         elif isinstance(build_response, DevelopmentCard) and not self.already_played_development_card:
-            played_card_obj, winner = self.play_development_card(player_id, build_response, winner)
+            played_card_obj, winner = yield from self.play_development_card_steps(player_id, build_response, winner)
             build_phase_object['building'] = 'played_card'
             build_phase_object['finished'] = True
             build_phase_object['development_card_played'] = played_card_obj
@@ -0,0 +1,167 @@
+import itertools
+import math
+import statistics
+
+from Managers.AgentManager import AgentManager
+from Managers.TournamentRunner import TournamentRunner, game_seed
+
+
+def wilson_interval(successes, trials, confidence=0.95):
+    """
+    Intervalo de confianza de Wilson de una proporción. A diferencia del intervalo normal no se sale de [0, 1] y
+    funciona con proporciones cercanas a 0 o a 1 y con pocas partidas
+    :param successes: int
+    :param trials: int
+    :param confidence: float
+    :return: (float, float)
+    """
+    if trials == 0:
+        return 0.0, 1.0
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+    proportion = successes / trials
+    denominator = 1 + z * z / trials
+    center = (proportion + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(proportion * (1 - proportion) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+class LeagueScheduler(TournamentRunner):
+    """
+    Liga entre N agentes. Cada grupo de 4 agentes juega en todos los órdenes de asientos, porque el orden importa: el
+    jugador 0 coloca el primer pueblo y el 3 el segundo. Así cada agente se sienta el mismo número de veces en cada
+    asiento y contra los mismos rivales.
+
+    Todos los órdenes de asientos de un grupo juegan con las mismas semillas, de forma que el tablero y las primeras
+    tiradas son los mismos y las diferencias entre órdenes se deben al orden y no a la suerte. Las partidas se juegan
+    como en el TournamentRunner, en paralelo y, con queue, en una cola que se puede parar y seguir.
+
+    Los intervalos de confianza son de Wilson, tratando cada partida como independiente. Las partidas de un grupo con la
+    misma semilla no lo son del todo, así que son algo optimistas.
+
+    agent_specs: [str...] Módulo y clase de los agentes de la liga, al menos 4 y sin repetir
+    games_per_table: int Partidas de cada mesa (grupo y orden de asientos)
+    seat_orders: str PERMUTATIONS para los 24 órdenes de cada grupo o ROTATIONS para sus 4 rotaciones, que también
+                     reparten los asientos por igual pero no cambian quién juega después de quién
+    confidence: float Nivel de confianza de los intervalos
+    El resto de parámetros son los de TournamentRunner
+    """
+    PERMUTATIONS = 'permutations'
+    ROTATIONS = 'rotations'
+
+    def __init__(self, agent_specs, games_per_table=1, seat_orders=PERMUTATIONS, confidence=0.95, **kwargs):
+        if seat_orders not in (self.PERMUTATIONS, self.ROTATIONS):
+            raise ValueError('Los órdenes de asientos deben ser permutations o rotations: ' + str(seat_orders))
+        self.games_per_table = games_per_table
+        self.seat_orders = seat_orders
+        self.confidence = confidence
+        self.tables = self.league_tables(len(agent_specs), seat_orders)
+        super().__init__(agent_specs, len(self.tables) * games_per_table, **kwargs)
+        return
+
+    @classmethod
+    def league_tables(cls, agents, seat_orders=PERMUTATIONS):
+        """
+        :param agents: int. Número de agentes de la liga
+        :param seat_orders: str. PERMUTATIONS o ROTATIONS
+        :return: [(int, (int, int, int, int))...] Grupo y agentes (su índice en la liga) de cada asiento de cada mesa
+        """
+        tables = []
+        for group, players in enumerate(itertools.combinations(range(agents), 4)):
+            if seat_orders == cls.PERMUTATIONS:
+                orders = itertools.permutations(players)
+            else:
+                orders = (players[seat:] + players[:seat] for seat in range(4))
+            tables.extend((group, order) for order in orders)
+        return tables
+
+    def load_agents(self, agent_specs):
+        """
+        :param agent_specs: [str...] Módulo y clase de los agentes de la liga
+        :return: [class...] Clases de los agentes
+        """
+        if len(agent_specs) < 4:
+            raise ValueError('En la liga tiene que haber al menos 4 agentes')
+        if len(set(agent_specs)) != len(agent_specs):
+            raise ValueError('Los agentes de la liga no se pueden repetir')
+        return [AgentManager.load_agent_class(agent_spec) for agent_spec in agent_specs]
+
+    def schedule(self):
+        """
+        Partidas de la liga: las de cada mesa seguidas, para que cada proceso reutilice su GameDirector
+        :return: [(int, int, [str...])...] Número de partida, semilla y agentes en el orden de sus asientos
+        """
+        games = []
+        for group, order in self.tables:
+            agent_specs = [self.agent_specs[agent] for agent in order]
+            for game in range(self.games_per_table):
+                seed = game_seed(self.base_seed, group * self.games_per_table + game)
+                games.append((len(games), seed, agent_specs))
+        return games
+
+    def aggregate(self, summaries, elapsed):
+        """
+        :param summaries: [dict...] Resultados de las partidas
+        :param elapsed: float. Segundos
+        :return: {'games': int, 'agents': [str...], 'confidence': float, 'no_winner': int, 'average_rounds': float,
+                  'games_played': [int...], 'wins': [int...], 'win_rates': [float...],
+                  'win_rate_intervals': [(float, float)...], 'seat_wins': [int...], 'seat_win_rates': [float...],
+                  'seat_win_rate_intervals': [(float, float)...], 'agent_seat_games': [[int...]...],
+                  'agent_seat_wins': [[int...]...], 'agent_seat_win_rates': [[float...]...],
+                  'agent_seat_win_rate_intervals': [[(float, float)...]...], 'average_latency': [float...],
+                  'timeouts': [int...], 'elapsed': float, 'games_per_second': float}
+                 Las listas por agente siguen el orden de agent_specs y las listas por asiento van del 0 al 3
+        """
+        agents = len(self.agent_specs)
+        seats_by_game = {game_number: [self.agent_specs.index(agent_spec) for agent_spec in agent_specs]
+                         for game_number, _, agent_specs in self.schedule()}
+        games = len(summaries)
+        no_winner = rounds = 0
+        seat_wins = [0] * 4
+        agent_seat_games = [[0] * 4 for _ in range(agents)]
+        agent_seat_wins = [[0] * 4 for _ in range(agents)]
+        calls, total_time, timeouts = [0] * agents, [0.0] * agents, [0] * agents
+        for summary in summaries:
+            seats = seats_by_game[summary['game_number']]
+            rounds += summary['rounds']
+            for seat, agent in enumerate(seats):
+                agent_seat_games[agent][seat] += 1
+                latency = summary['agent_latency'][seat]
+                calls[agent] += latency['calls']
+                total_time[agent] += latency['total_time']
+                timeouts[agent] += sum(latency['timeouts'].values())
+            if summary['winner'] == -1:
+                no_winner += 1
+            else:
+                seat_wins[summary['winner']] += 1
+                agent_seat_wins[seats[summary['winner']]][summary['winner']] += 1
+
+        games_played = [sum(seat_games) for seat_games in agent_seat_games]
+        wins = [sum(agent_wins) for agent_wins in agent_seat_wins]
+        return {
+            'games': games,
+            'agents': [agent.__name__ for agent in self.agents],
+            'confidence': self.confidence,
+            'no_winner': no_winner,
+            'average_rounds': rounds / games if games else 0.0,
+            'games_played': games_played,
+            'wins': wins,
+            'win_rates': [wins[agent] / games_played[agent] if games_played[agent] else 0.0
+                          for agent in range(agents)],
+            'win_rate_intervals': [wilson_interval(wins[agent], games_played[agent], self.confidence)
+                                   for agent in range(agents)],
+            'seat_wins': seat_wins,
+            'seat_win_rates': [seat_win / games if games else 0.0 for seat_win in seat_wins],
+            'seat_win_rate_intervals': [wilson_interval(seat_win, games, self.confidence) for seat_win in seat_wins],
+            'agent_seat_games': agent_seat_games,
+            'agent_seat_wins': agent_seat_wins,
+            'agent_seat_win_rates': [[agent_seat_wins[agent][seat] / agent_seat_games[agent][seat]
+                                      if agent_seat_games[agent][seat] else 0.0 for seat in range(4)]
+                                     for agent in range(agents)],
+            'agent_seat_win_rate_intervals': [[wilson_interval(agent_seat_wins[agent][seat],
+                                                               agent_seat_games[agent][seat], self.confidence)
+                                               for seat in range(4)] for agent in range(agents)],
+            'average_latency': [total_time[agent] / calls[agent] if calls[agent] else 0.0 for agent in range(agents)],
+            'timeouts': timeouts,
+            'elapsed': elapsed,
+            'games_per_second': games / elapsed if elapsed else 0.0,
+        }
@@ -0,0 +1,187 @@
+import concurrent.futures
+import math
+import statistics
+
+from Classes.SandboxedAgent import SandboxedAgent
+from Managers.LeagueScheduler import wilson_interval
+from Managers.TournamentRunner import TournamentRunner, _play_game, game_seed
+
+
+class SequentialTournament(TournamentRunner):
+    """
+    Comparación A/B de un agente candidato contra un agente base que para en cuanto el resultado es significativo, con
+    un test secuencial de razón de probabilidades (SPRT) sobre su proporción de victorias.
+
+    El candidato juega contra 3 copias del agente base rotando por los 4 asientos, para que el asiento no influya. Cada
+    partida tiene su propia semilla: el SPRT y el intervalo de Wilson suponen partidas independientes, y las 4 partidas
+    de una misma semilla no lo son (el reparto del tablero y los dados son los mismos). Las partidas sin ganador no
+    cuentan. Si el candidato es igual que el agente base gana 1 de cada 4 partidas con ganador (p0 = 0.25); se
+    contrasta contra que gane p1 = p0 + delta. Las partidas se juegan por lotes en paralelo y después de cada lote se
+    mira el logaritmo de la razón de verosimilitudes (llr):
+        - llr >= log((1 - beta) / alpha): el candidato es mejor (ACCEPTED)
+        - llr <= log(beta / (1 - alpha)): el candidato no es mejor en delta (REJECTED)
+        - Si se llega a max_games sin decidir, INCONCLUSIVE
+    Con errores alpha y beta del 5 % y delta de 0.05 el test decide, de media, con bastantes menos partidas que un test
+    con un número fijo de partidas (fixed_sample_games en aggregate), y con muchas menos si la diferencia es grande.
+
+    candidate_spec: str Módulo y clase del agente candidato
+    baseline_spec: str Módulo y clase del agente base
+    max_games: int Máximo de partidas. Se redondea a un múltiplo de 4
+    delta: float Mejora de la proporción de victorias que se quiere detectar
+    alpha: float Probabilidad de dar por mejor a un candidato igual que el agente base
+    beta: float Probabilidad de no dar por mejor a un candidato que gana p0 + delta
+    batch_size: int Partidas de cada lote. Se redondea a un múltiplo de 4
+    El resto de parámetros son los de TournamentRunner, salvo queue
+    """
+    ACCEPTED = 'accepted'
+    REJECTED = 'rejected'
+    INCONCLUSIVE = 'inconclusive'
+    P0 = 0.25
+
+    def __init__(self, candidate_spec, baseline_spec, max_games=10000, delta=0.05, alpha=0.05, beta=0.05,
+                 batch_size=32, **kwargs):
+        if kwargs.get('queue') is not None:
+            raise ValueError('El torneo secuencial no se puede jugar con una cola')
+        if not 0 < delta < 1 - self.P0 or not 0 < alpha < 0.5 or not 0 < beta < 0.5:
+            raise ValueError('delta debe estar entre 0 y 0.75, y alpha y beta entre 0 y 0.5')
+        self.candidate_spec = candidate_spec
+        self.baseline_spec = baseline_spec
+        self.delta = delta
+        self.alpha = alpha
+        self.beta = beta
+        self.batch_size = 4 * max(1, math.ceil(batch_size / 4))
+        self.lower_bound = math.log(beta / (1 - alpha))
+        self.upper_bound = math.log((1 - beta) / alpha)
+        super().__init__([candidate_spec, baseline_spec, baseline_spec, baseline_spec], 4 * math.ceil(max_games / 4),
+                         **kwargs)
+        return
+
+    @staticmethod
+    def candidate_seat(game_number):
+        """
+        :param game_number: int
+        :return: int. Asiento del candidato en la partida
+        """
+        return game_number % 4
+
+    def schedule(self):
+        """
+        Partidas hasta max_games. Cada una tiene su semilla, y en cada 4 partidas seguidas el candidato pasa por los 4
+        asientos
+        :return: [(int, int, [str...])...] Número de partida, semilla y agentes en el orden de sus asientos
+        """
+        games = []
+        for game_number in range(self.games):
+            agent_specs = [self.baseline_spec] * 4
+            agent_specs[self.candidate_seat(game_number)] = self.candidate_spec
+            games.append((game_number, game_seed(self.base_seed, game_number), agent_specs))
+        return games
+
+    def log_likelihood_ratio(self, wins, decided_games):
+        """
+        :param wins: int. Victorias del candidato
+        :param decided_games: int. Partidas con ganador
+        :return: float. Logaritmo de la razón de verosimilitudes de p1 = p0 + delta frente a p0
+        """
+        p0, p1 = self.P0, self.P0 + self.delta
+        return wins * math.log(p1 / p0) + (decided_games - wins) * math.log((1 - p1) / (1 - p0))
+
+    def decision(self, llr):
+        """
+        :param llr: float
+        :return: str/None. ACCEPTED, REJECTED o None si hay que seguir jugando
+        """
+        if llr >= self.upper_bound:
+            return self.ACCEPTED
+        if llr <= self.lower_bound:
+            return self.REJECTED
+        return None
+
+    def fixed_sample_games(self):
+        """
+        :return: int. Partidas con ganador que necesitaría un test con un número fijo de partidas con los mismos
+                      errores y delta
+        """
+        normal = statistics.NormalDist()
+        p0, p1 = self.P0, self.P0 + self.delta
+        deviation = normal.inv_cdf(1 - self.alpha) * math.sqrt(p0 * (1 - p0)) + \
+            normal.inv_cdf(1 - self.beta) * math.sqrt(p1 * (1 - p1))
+        return math.ceil((deviation / self.delta) ** 2)
+
+    def results(self):
+        """
+        Juega las partidas por lotes hasta que el test decide o se llega a max_games, y devuelve el resultado de cada
+        una según se termina. La decisión solo depende de los resultados de los lotes, no del orden en el que terminan
+        :return: generator(dict)
+        """
+        games = self.schedule()
+        wins = decided_games = 0
+        executor = self._executor(self._initargs())
+        try:
+            for start in range(0, len(games), self.batch_size):
+                futures = [executor.submit(_play_game, game) for game in games[start:start + self.batch_size]]
+                for future in concurrent.futures.as_completed(futures):
+                    summary = future.result()
+                    if summary['winner'] != -1:
+                        decided_games += 1
+                        wins += summary['winner'] == self.candidate_seat(summary['game_number'])
+                    yield summary
+                if self.decision(self.log_likelihood_ratio(wins, decided_games)) is not None:
+                    return
+        finally:
+            executor.shutdown(cancel_futures=True)
+            if self.sandbox:
+                SandboxedAgent.close_all()
+        return
+
+    def aggregate(self, summaries, elapsed):
+        """
+        :param summaries: [dict...] Resultados de las partidas
+        :param elapsed: float. Segundos
+        :return: {'games': int, 'agents': [str, str], 'result': str, 'decided_games': int, 'wins': int,
+                  'win_rate': float, 'win_rate_interval': (float, float), 'llr': float, 'lower_bound': float,
+                  'upper_bound': float, 'fixed_sample_games': int, 'seat_wins': [int...], 'no_winner': int,
+                  'average_rounds': float, 'average_latency': [float, float], 'timeouts': [int, int],
+                  'elapsed': float, 'games_per_second': float}
+                 wins, win_rate y seat_wins son del candidato, win_rate sobre las partidas con ganador. Las listas de
+                 dos elementos son del candidato y del agente base. El intervalo es de Wilson al 1 - alpha
+        """
+        games = len(summaries)
+        wins = decided_games = rounds = 0
+        seat_wins = [0] * 4
+        calls, total_time, timeouts = [0, 0], [0.0, 0.0], [0, 0]
+        for summary in summaries:
+            candidate_seat = self.candidate_seat(summary['game_number'])
+            rounds += summary['rounds']
+            if summary['winner'] != -1:
+                decided_games += 1
+                if summary['winner'] == candidate_seat:
+                    wins += 1
+                    seat_wins[candidate_seat] += 1
+            for seat, latency in enumerate(summary['agent_latency']):
+                agent = 0 if seat == candidate_seat else 1
+                calls[agent] += latency['calls']
+                total_time[agent] += latency['total_time']
+                timeouts[agent] += sum(latency['timeouts'].values())
+
+        llr = self.log_likelihood_ratio(wins, decided_games)
+        return {
+            'games': games,
+            'agents': [self.agents[0].__name__, self.agents[1].__name__],
+            'result': self.decision(llr) or self.INCONCLUSIVE,
+            'decided_games': decided_games,
+            'wins': wins,
+            'win_rate': wins / decided_games if decided_games else 0.0,
+            'win_rate_interval': wilson_interval(wins, decided_games, 1 - self.alpha),
+            'llr': llr,
+            'lower_bound': self.lower_bound,
+            'upper_bound': self.upper_bound,
+            'fixed_sample_games': self.fixed_sample_games(),
+            'seat_wins': seat_wins,
+            'no_winner': games - decided_games,
+            'average_rounds': rounds / games if games else 0.0,
+            'average_latency': [total_time[agent] / calls[agent] if calls[agent] else 0.0 for agent in range(2)],
+            'timeouts': timeouts,
+            'elapsed': elapsed,
+            'games_per_second': games / elapsed if elapsed else 0.0,
+        }
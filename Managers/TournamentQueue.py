@@ -0,0 +1,258 @@
+import contextlib
+import json
+import os
+import socket
+import sqlite3
+import time
+import uuid
+
+
+class TournamentQueue:
+    """
+    Cola de partidas en un fichero SQLite, para que un torneo largo se pueda parar y seguir, y repartir entre varios
+    procesos o máquinas que compartan el fichero. Cada partida es una fila con los agentes en el orden de sus asientos
+    y la semilla: con la misma semilla y los mismos asientos la partida es la misma la juegue quien la juegue.
+
+    Cada partida lleva también los ajustes del torneo que cambian su resultado o su traza (settings, ver
+    TournamentRunner.queue_settings). Forman parte de la clave de la partida, así que la misma partida con otros ajustes
+    es otra partida y se vuelve a jugar, en lugar de devolver el resultado de los ajustes anteriores.
+
+    Un trabajador reserva partidas (claim), las juega, guarda su resultado (complete) y, mientras juega, renueva sus
+    reservas (heartbeat). Las reservas que no se renuevan en stale_timeout segundos son de un trabajador que ha muerto y
+    vuelven a la cola. Si dos trabajadores terminan la misma partida se queda el primer resultado. Una partida que se ha
+    reservado max_attempts veces sin terminarse (porque falla o porque mata a su trabajador) pasa a failed con su último
+    error, en lugar de volver a la cola para siempre.
+
+    Cada operación es una transacción BEGIN IMMEDIATE, así que varios trabajadores pueden usar el mismo fichero. Entre
+    máquinas el sistema de ficheros compartido tiene que soportar los bloqueos de SQLite (NFS con bloqueos POSIX, por
+    ejemplo) y los relojes tienen que estar más o menos en hora, porque las reservas caducan con time.time().
+
+    Las partidas se filtran por mesa: los agentes en el orden de sus asientos (agent_specs para una mesa, tables para
+    varias), y por ajustes. Cada partida terminada tiene un número de orden (completed), así que quien espera resultados
+    solo lee los terminados desde la última vez (completed_results).
+
+    path: str Fichero de la cola. Se crea si no existe
+    stale_timeout: float Segundos tras los que una reserva sin renovar vuelve a la cola
+    max_attempts: int Veces que se puede reservar una partida antes de darla por fallida
+    """
+    PENDING = 'pending'
+    CLAIMED = 'claimed'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    TABLE = ('CREATE TABLE IF NOT EXISTS {} ('
+             'id INTEGER PRIMARY KEY, '
+             'agents TEXT NOT NULL, '
+             'seed INTEGER NOT NULL, '
+             "settings TEXT NOT NULL DEFAULT '', "
+             'game_number INTEGER NOT NULL, '
+             "status TEXT NOT NULL DEFAULT 'pending', "
+             'worker TEXT, '
+             'heartbeat REAL, '
+             'attempts INTEGER NOT NULL DEFAULT 0, '
+             'result TEXT, '
+             'error TEXT, '
+             'completed INTEGER, '
+             'UNIQUE (agents, seed, settings))')
+
+    def __init__(self, path, stale_timeout=300.0, max_attempts=3):
+        self.path = str(path)
+        self.stale_timeout = stale_timeout
+        self.max_attempts = max_attempts
+        # Autocommit: las transacciones se abren a mano con BEGIN IMMEDIATE en transaction
+        self.connection = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        with self.transaction() as cursor:
+            cursor.execute(self.TABLE.format('games'))
+            columns = [column[1] for column in cursor.execute('PRAGMA table_info(games)')]
+            # Las colas de antes de completed se numeran en el orden en el que se añadieron sus partidas
+            if 'completed' not in columns:
+                cursor.execute('ALTER TABLE games ADD COLUMN completed INTEGER')
+                cursor.execute('UPDATE games SET completed = id WHERE status = ?', (self.DONE,))
+            # En las colas de antes de settings cambia la clave única, así que se vuelve a crear la tabla. No se sabe
+            # con qué ajustes se jugaron sus partidas, así que se quedan sin ajustes ('')
+            if 'settings' not in columns:
+                copied = ('id, agents, seed, game_number, status, worker, heartbeat, attempts, result, error, '
+                          'completed')
+                cursor.execute('ALTER TABLE games RENAME TO games_old')
+                cursor.execute(self.TABLE.format('games'))
+                cursor.execute('INSERT INTO games (' + copied + ') SELECT ' + copied + ' FROM games_old')
+                cursor.execute('DROP TABLE games_old')
+            cursor.execute('CREATE INDEX IF NOT EXISTS games_status ON games (status, agents)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS games_completed ON games (completed)')
+        return
+
+    @staticmethod
+    def table_filter(agent_specs=None, tables=None, settings=None):
+        """
+        Condición SQL para quedarse con las partidas de unas mesas y unos ajustes. Las mesas van en un solo parámetro,
+        así que no hay límite de mesas (una liga puede tener miles)
+        :param agent_specs: [str...]/None. Agentes de una mesa en el orden de sus asientos
+        :param tables: [[str...]...]/None. Agentes de varias mesas
+        :param settings: str/None. Ajustes de las partidas
+        :return: str, list. Condición (empieza por AND, vacía si no hay filtro) y sus parámetros
+        """
+        condition, parameters = '', []
+        if agent_specs is not None:
+            tables = [agent_specs]
+        if tables is not None:
+            condition += ' AND agents IN (SELECT value FROM json_each(?))'
+            parameters.append(json.dumps([json.dumps(list(agent_specs)) for agent_specs in tables]))
+        if settings is not None:
+            condition += ' AND settings = ?'
+            parameters.append(settings)
+        return condition, parameters
+
+    @staticmethod
+    def new_worker_id():
+        """
+        :return: str. Identificador de un trabajador, distinto en cada máquina, proceso y llamada
+        """
+        return socket.gethostname() + ':' + str(os.getpid()) + ':' + uuid.uuid4().hex[:8]
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """
+        Transacción que bloquea la escritura del fichero desde el principio, para que dos trabajadores no reserven la
+        misma partida
+        :return: contextmanager(Cursor)
+        """
+        cursor = self.connection.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            yield cursor
+        except BaseException:
+            cursor.execute('ROLLBACK')
+            raise
+        cursor.execute('COMMIT')
+        return
+
+    def close(self):
+        self.connection.close()
+        return
+
+    def add_games(self, agent_specs, games, settings=''):
+        """
+        Añade partidas a la cola. Las que ya estaban con los mismos ajustes, terminadas o no, se dejan como están
+        :param agent_specs: [str...] Módulo y clase de los agentes en el orden de sus asientos
+        :param games: [(int, int)...] Número de partida y semilla
+        :param settings: str. Ajustes de las partidas
+        :return: int. Partidas añadidas
+        """
+        agents = json.dumps(list(agent_specs))
+        with self.transaction() as cursor:
+            before = self.connection.total_changes
+            cursor.executemany('INSERT OR IGNORE INTO games (agents, seed, settings, game_number) VALUES (?, ?, ?, ?)',
+                               [(agents, seed, settings, game_number) for game_number, seed in games])
+            return self.connection.total_changes - before
+
+    def claim(self, worker, limit=1, agent_specs=None, tables=None, settings=None):
+        """
+        Reserva partidas pendientes. Antes devuelve a la cola las reservas caducadas, o las da por fallidas si ya se han
+        reservado max_attempts veces
+        :param worker: str. Identificador del trabajador (new_worker_id)
+        :param limit: int. Máximo de partidas
+        :param agent_specs: [str...]/None. Solo partidas de estos agentes en este orden
+        :param tables: [[str...]...]/None. Solo partidas de estas mesas
+        :param settings: str/None. Solo partidas con estos ajustes
+        :return: [{'id': int, 'agents': [str...], 'seed': int, 'game_number': int}...]
+        """
+        now = time.time()
+        with self.transaction() as cursor:
+            cursor.execute("UPDATE games SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, worker = NULL, "
+                           "error = 'Reserva caducada de ' || worker WHERE status = ? AND heartbeat < ?",
+                           (self.max_attempts, self.FAILED, self.PENDING, self.CLAIMED, now - self.stale_timeout))
+            condition, parameters = self.table_filter(agent_specs, tables, settings)
+            query = 'SELECT id, agents, seed, game_number FROM games WHERE status = ?' + condition
+            parameters = [self.PENDING] + parameters
+            rows = cursor.execute(query + ' ORDER BY id LIMIT ?', parameters + [limit]).fetchall()
+            cursor.executemany('UPDATE games SET status = ?, worker = ?, heartbeat = ?, attempts = attempts + 1 '
+                               'WHERE id = ?', [(self.CLAIMED, worker, now, row[0]) for row in rows])
+        return [{'id': job_id, 'agents': json.loads(agents), 'seed': seed, 'game_number': game_number}
+                for job_id, agents, seed, game_number in rows]
+
+    def heartbeat(self, worker):
+        """
+        Renueva todas las reservas del trabajador
+        :param worker: str
+        :return: None
+        """
+        with self.transaction() as cursor:
+            cursor.execute('UPDATE games SET heartbeat = ? WHERE worker = ? AND status = ?',
+                           (time.time(), worker, self.CLAIMED))
+        return
+
+    def complete(self, worker, job_id, summary):
+        """
+        Guarda el resultado de una partida
+        :param worker: str
+        :param job_id: int
+        :param summary: dict. Resultado de la partida (GameDirector.last_summary)
+        :return: bool. False si otro trabajador ya la había terminado
+        """
+        with self.transaction() as cursor:
+            # La transacción bloquea la escritura, así que los números de orden no se repiten
+            cursor.execute('UPDATE games SET status = ?, worker = ?, result = ?, error = NULL, '
+                           'completed = (SELECT COALESCE(MAX(completed), 0) + 1 FROM games) '
+                           'WHERE id = ? AND status != ?', (self.DONE, worker, json.dumps(summary), job_id, self.DONE))
+            return cursor.rowcount == 1
+
+    def release(self, worker, job_id, error=None):
+        """
+        Devuelve a la cola una partida reservada que no se ha terminado. Si ha fallado y ya se ha reservado
+        max_attempts veces se da por fallida. Si no ha fallado (el torneo se ha parado) la reserva no cuenta
+        :param worker: str
+        :param job_id: int
+        :param error: str/None. Error por el que no se ha terminado
+        :return: None
+        """
+        with self.transaction() as cursor:
+            if error is None:
+                cursor.execute('UPDATE games SET status = ?, worker = NULL, attempts = attempts - 1 WHERE id = ? AND '
+                               'worker = ? AND status = ?', (self.PENDING, job_id, worker, self.CLAIMED))
+            else:
+                cursor.execute('UPDATE games SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, worker = NULL, '
+                               'error = ? WHERE id = ? AND worker = ? AND status = ?',
+                               (self.max_attempts, self.FAILED, self.PENDING, error, job_id, worker, self.CLAIMED))
+        return
+
+    def results(self, agent_specs=None, tables=None, settings=None):
+        """
+        :param agent_specs: [str...]/None. Solo partidas de estos agentes en este orden
+        :param tables: [[str...]...]/None. Solo partidas de estas mesas
+        :param settings: str/None. Solo partidas con estos ajustes
+        :return: [dict...] Resultados de las partidas terminadas, en el orden en el que se añadieron
+        """
+        condition, parameters = self.table_filter(agent_specs, tables, settings)
+        query = 'SELECT result FROM games WHERE status = ?' + condition + ' ORDER BY id'
+        return [json.loads(row[0]) for row in self.connection.execute(query, [self.DONE] + parameters)]
+
+    def completed_results(self, after=0, agent_specs=None, tables=None, settings=None):
+        """
+        Resultados de las partidas terminadas después de otras, para esperar a los resultados sin volver a leerlos todos
+        :param after: int. Número de orden (completed) del último resultado leído, 0 para leerlos todos
+        :param agent_specs: [str...]/None. Solo partidas de estos agentes en este orden
+        :param tables: [[str...]...]/None. Solo partidas de estas mesas
+        :param settings: str/None. Solo partidas con estos ajustes
+        :return: [dict...], int. Resultados en el orden en el que se han terminado, y el número de orden del último
+                 (after si no hay ninguno nuevo)
+        """
+        condition, parameters = self.table_filter(agent_specs, tables, settings)
+        query = 'SELECT completed, result FROM games WHERE completed > ?' + condition + ' ORDER BY completed'
+        results = []
+        for completed, result in self.connection.execute(query, [after] + parameters):
+            results.append(json.loads(result))
+            after = completed
+        return results, after
+
+    def progress(self, agent_specs=None, tables=None, settings=None):
+        """
+        :param agent_specs: [str...]/None. Solo partidas de estos agentes en este orden
+        :param tables: [[str...]...]/None. Solo partidas de estas mesas
+        :param settings: str/None. Solo partidas con estos ajustes
+        :return: {'pending': int, 'claimed': int, 'done': int, 'failed': int}
+        """
+        condition, parameters = self.table_filter(agent_specs, tables, settings)
+        query = 'SELECT status, COUNT(*) FROM games WHERE 1' + condition
+        progress = {self.PENDING: 0, self.CLAIMED: 0, self.DONE: 0, self.FAILED: 0}
+        progress.update(self.connection.execute(query + ' GROUP BY status', parameters).fetchall())
+        return progress
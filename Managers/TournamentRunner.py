@@ -0,0 +1,441 @@
+import concurrent.futures
+import json
+import multiprocessing
+import multiprocessing.util
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+
+from Classes.Constants import TraceLevelConstants
+from Classes.SandboxedAgent import SandboxedAgent
+from Managers.AgentManager import AgentManager
+from Managers.GameDirector import GameDirector
+from Managers.TournamentQueue import TournamentQueue
+from TraceLoader.EventLog import EventLog
+from TraceLoader.ResultsStore import ResultsStore
+from TraceLoader.TraceCompression import TraceCompression
+from TraceLoader.TraceIndex import TraceIndex
+from TraceLoader.TraceLoader import TraceLoader
+from TraceLoader.TraceStream import TraceStream
+
+# GameDirector de cada proceso o hilo del pool. Se crea una vez por proceso o hilo en _init_worker y se reutiliza en
+# todas las partidas que juega
+_worker = threading.local()
+
+
+def gil_enabled():
+    """
+    :return: bool. Si el intérprete tiene GIL. Sin GIL (free-threaded) los hilos juegan partidas en paralelo
+    """
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return is_gil_enabled() if is_gil_enabled is not None else True
+
+
+# Semillas base y números de partida válidos: la semilla de cada partida (game_seed) cabe en 64 bits sin signo, como se
+# guarda en ResultsStore y en EventLog
+SEED_LIMIT = 2 ** 32
+
+
+def game_seed(base_seed, game_number):
+    """
+    Semilla de una partida. Solo depende de la semilla base y del número de partida, así que una partida da el mismo
+    resultado la juegue el proceso que la juegue y con cualquier número de procesos
+    :param base_seed: int. De 0 a SEED_LIMIT - 1
+    :param game_number: int. De 0 a SEED_LIMIT - 1
+    :return: int. Menor que 2 ** 64
+    """
+    if not 0 <= base_seed < SEED_LIMIT or not 0 <= game_number < SEED_LIMIT:
+        raise ValueError('La semilla base y el número de partida deben estar entre 0 y ' + str(SEED_LIMIT - 1) + ': ' +
+                         str(base_seed) + ', ' + str(game_number))
+    return base_seed * SEED_LIMIT + game_number
+
+
+def _init_worker(max_rounds, trace_level, trace_path, time_budgets, sandbox, results_path, stream_traces,
+                 compression, event_log):
+    _worker.settings = (max_rounds, trace_level, trace_path, time_budgets, sandbox, compression)
+    # Cada proceso o hilo escribe los resultados en su propio shard y las trazas en su propio fichero JSON Lines o de
+    # eventos
+    _worker.results_store = ResultsStore(results_path) if results_path is not None else None
+    _worker.trace_stream = None
+    if event_log and trace_path is not None:
+        _worker.trace_stream = EventLog.in_directory(trace_path)
+    elif stream_traces and trace_path is not None:
+        _worker.trace_stream = TraceStream.in_directory(trace_path, compression)
+    if _worker.trace_stream is not None:
+        # Al terminar el proceso se escriben las últimas trazas
+        multiprocessing.util.Finalize(_worker.trace_stream, _worker.trace_stream.close, exitpriority=10)
+    # Clase de cada agente, ya dentro de un SandboxedAgent si hace falta. Son de cada hilo, así dos hilos no comparten
+    # los procesos de un agente
+    _worker.agent_classes = {}
+    _worker.game_director = None
+    _worker.game_director_agents = None
+    return
+
+
+def _get_game_director(agent_specs):
+    """
+    GameDirector del proceso o hilo actual para unos agentes. Se reutiliza mientras las partidas son de los mismos
+    agentes en los mismos asientos, y si cambian se crea otro (cuesta menos de un milisegundo)
+    :param agent_specs: [str...] Módulo y clase de los 4 agentes
+    :return: GameDirector
+    """
+    agent_specs = tuple(agent_specs)
+    if _worker.game_director_agents == agent_specs:
+        return _worker.game_director
+
+    max_rounds, trace_level, trace_path, time_budgets, sandbox, compression = _worker.settings
+    agents = []
+    for agent_spec in agent_specs:
+        if agent_spec not in _worker.agent_classes:
+            agent = AgentManager.load_agent_class(agent_spec)
+            _worker.agent_classes[agent_spec] = SandboxedAgent.wrap(agent) if sandbox else agent
+        agents.append(_worker.agent_classes[agent_spec])
+    _worker.game_director = GameDirector(agents=agents, max_rounds=max_rounds, trace_level=trace_level,
+                                         time_budgets=time_budgets, results_store=_worker.results_store,
+                                         trace_stream=_worker.trace_stream)
+    _worker.game_director_agents = agent_specs
+    _worker.game_director.trace_loader.compression = compression
+    if trace_path is not None:
+        _worker.game_director.trace_loader.full_path = Path(trace_path)
+    return _worker.game_director
+
+
+def _play_game(game):
+    """
+    Juega una partida con el GameDirector del proceso o hilo actual
+    :param game: (int, int, [str...]) Número de partida, semilla y agentes en el orden de sus asientos
+    :return: dict. El resultado de la partida (GameDirector.game_summary)
+    """
+    game_number, seed, agent_specs = game
+    game_director = _get_game_director(agent_specs)
+    game_director.game_start(game_number, print_outcome=False, seed=seed)
+    # La traza ya está en su fichero, no hace falta guardarla en memoria para games.json
+    game_director.trace_loader.all_games_trace.clear()
+    return dict(game_director.last_summary, seed=seed)
+
+
+class TournamentRunner:
+    """
+    Juega una serie de partidas entre los mismos agentes repartiéndolas entre varios procesos o hilos. Cada partida
+    tiene su propia semilla (game_seed), así que los resultados no dependen de cuántos procesos o hilos haya ni de cuál
+    juegue cada partida. Los resultados de cada partida llegan al proceso principal según se terminan.
+
+    Cada hilo tiene su propio GameDirector y el motor no tiene estado compartido entre partidas, así que los hilos son
+    seguros con y sin GIL. Con GIL no juegan en paralelo, por eso por defecto solo se usan en Python free-threaded.
+
+    agent_specs: [str...] Módulo y clase de los 4 agentes (MyModule.MyClass)
+    games: int Número de partidas
+    base_seed: int Semilla a partir de la que se calcula la de cada partida, de 0 a SEED_LIMIT - 1
+    workers: int Número de procesos o hilos
+    executor: str/None 'process', 'thread' o None para elegir hilos solo si el intérprete no tiene GIL
+    trace_level: str TraceLevelConstants de las partidas
+    max_rounds: int Máximo de rondas por partida
+    time_budgets: {str: float}/None Tiempo máximo de respuesta de cada trigger de los agentes (ver AgentWatchdog)
+    sandbox: bool Ejecutar cada agente en su propio proceso (ver SandboxedAgent), para que si falla no pare el torneo
+    queue: str/None Fichero de una TournamentQueue. Si se indica, las partidas se apuntan en la cola y se juegan las que
+                    quedan: si el torneo se para, al volver a lanzarlo se siguen donde se quedaron, y varias máquinas
+                    con el mismo fichero se reparten las partidas
+    stale_timeout: float Segundos tras los que vuelve a la cola una partida reservada por un trabajador muerto
+    max_attempts: int Veces que se puede reservar una partida de la cola antes de darla por fallida. El torneo termina
+                      sin las partidas fallidas, que se cuentan en failed_games
+    trace_path: str/None Carpeta en la que se guardan las trazas. Si es None se usa la de TraceLoader
+    results_path: str/None Carpeta de un ResultsStore en la que se guarda el resultado de cada partida
+    stream_traces: bool Escribir las trazas en ficheros JSON Lines (ver TraceStream), uno por proceso o hilo, en
+                        lugar de en un fichero por partida
+    compression: str/None Formato de TraceCompression en el que se comprimen los ficheros de trazas
+    event_log: bool Escribir las trazas de eventos en ficheros binarios (ver EventLog), uno por proceso o hilo. Solo
+                    con trace_level EVENTS
+    games_file: bool Al terminar, escribir games.json con las trazas de los game_N.json del torneo, como al jugar con
+                     un solo GameDirector. No se escribe con stream_traces ni con event_log
+    index: bool Al terminar, escribir el índice de las trazas (ver TraceIndex). Hay que volver a leer todas las trazas
+                del torneo, así que solo se hace si se pide
+    """
+
+    def __init__(self, agent_specs, games, base_seed=0, workers=1, trace_level=TraceLevelConstants.NONE,
+                 max_rounds=1000, trace_path=None, executor=None, time_budgets=None, sandbox=False,
+                 queue=None, stale_timeout=300.0, results_path=None, stream_traces=False, compression=None,
+                 event_log=False, games_file=True, index=False, max_attempts=3):
+        # Se cargan aquí para que un agente mal escrito falle antes de arrancar los procesos
+        self.agents = self.load_agents(agent_specs)
+        self.agent_specs = list(agent_specs)
+        self.games = games
+        game_seed(base_seed, 0)  # Falla antes de arrancar los procesos si la semilla base no es válida
+        self.base_seed = base_seed
+        self.workers = max(1, workers)
+        self.trace_level = trace_level
+        self.max_rounds = max_rounds
+        self.time_budgets = time_budgets
+        self.sandbox = sandbox
+        self.queue = queue
+        self.stale_timeout = stale_timeout
+        self.max_attempts = max_attempts
+        self.failed_games = 0
+        self.trace_path = trace_path
+        self.results_path = results_path
+        self.stream_traces = stream_traces
+        TraceCompression.suffix(compression)  # Falla antes de arrancar los procesos si el formato no existe
+        self.compression = compression
+        if event_log and trace_level != TraceLevelConstants.EVENTS:
+            raise ValueError('event_log solo guarda trazas de eventos (TraceLevelConstants.EVENTS)')
+        self.event_log = event_log
+        if index and (trace_level == TraceLevelConstants.NONE or event_log):
+            raise ValueError('index solo indexa trazas en JSON: hace falta un trace_level con trazas y sin event_log')
+        self.games_file = games_file
+        self.index = index
+        if executor is None:
+            executor = 'process' if gil_enabled() else 'thread'
+        if executor not in ('process', 'thread'):
+            raise ValueError('El executor debe ser process o thread: ' + str(executor))
+        self.executor = executor
+        if trace_level != TraceLevelConstants.NONE and trace_path is None:
+            # Todos los procesos e hilos tienen que escribir en la misma carpeta
+            self.trace_path = str(TraceLoader().full_path)
+        return
+
+    def load_agents(self, agent_specs):
+        """
+        :param agent_specs: [str...] Módulo y clase de los 4 agentes
+        :return: [class...] Clases de los agentes
+        """
+        if len(agent_specs) != 4:
+            raise ValueError('El número de agentes debe ser 4')
+        return [AgentManager.load_agent_class(agent_spec) for agent_spec in agent_specs]
+
+    def schedule(self):
+        """
+        Partidas del torneo. Todas son de los mismos agentes en los mismos asientos
+        :return: [(int, int, [str...])...] Número de partida, semilla y agentes en el orden de sus asientos
+        """
+        return [(game_number, game_seed(self.base_seed, game_number), self.agent_specs)
+                for game_number in range(self.games)]
+
+    def results(self):
+        """
+        Juega las partidas y devuelve el resultado de cada una según se termina, no en orden de partida
+        :return: generator(dict)
+        """
+        games = self.schedule()
+        initargs = self._initargs()
+
+        if self.queue is not None:
+            try:
+                yield from self._queue_results(games, initargs)
+            finally:
+                if self.sandbox:
+                    SandboxedAgent.close_all()
+            return
+
+        if self.workers == 1 or self.executor == 'thread':
+            try:
+                yield from self._local_results(games, initargs)
+            finally:
+                # Los procesos de los agentes de los procesos del pool terminan con ellos, los de este se paran aquí
+                if self.sandbox:
+                    SandboxedAgent.close_all()
+            return
+
+        # Partidas pequeñas por tarea para que ningún proceso se quede con las partidas largas al final
+        chunksize = max(1, min(8, self.games // (self.workers * 16)))
+        with multiprocessing.Pool(self.workers, initializer=_init_worker, initargs=initargs) as pool:
+            for summary in pool.imap_unordered(_play_game, games, chunksize):
+                yield summary
+            # Los procesos terminan solos en lugar de matarse al salir del with, así escriben sus últimas trazas
+            pool.close()
+            pool.join()
+        return
+
+    def _initargs(self):
+        """
+        :return: tuple. Argumentos de _init_worker
+        """
+        return (self.max_rounds, self.trace_level, self.trace_path, self.time_budgets, self.sandbox,
+                self.results_path, self.stream_traces, self.compression, self.event_log)
+
+    def _local_results(self, games, initargs):
+        """
+        Juega las partidas en este proceso, en el hilo actual o en un pool de hilos
+        :param games: [(int, int, [str...])...] Partidas (ver schedule)
+        :param initargs: tuple. Argumentos de _init_worker
+        :return: generator(dict)
+        """
+        if self.workers == 1:
+            _init_worker(*initargs)
+            for game in games:
+                yield _play_game(game)
+            return
+
+        with concurrent.futures.ThreadPoolExecutor(self.workers, initializer=_init_worker,
+                                                   initargs=initargs) as executor:
+            futures = [executor.submit(_play_game, game) for game in games]
+            for future in concurrent.futures.as_completed(futures):
+                yield future.result()
+        return
+
+    def _executor(self, initargs):
+        """
+        Pool de procesos o hilos al que se mandan las partidas de una en una con submit
+        :param initargs: tuple. Argumentos de _init_worker
+        :return: concurrent.futures.Executor
+        """
+        if self.executor == 'process' and self.workers > 1:
+            return concurrent.futures.ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=initargs)
+        return concurrent.futures.ThreadPoolExecutor(self.workers, initializer=_init_worker, initargs=initargs)
+
+    def queue_settings(self):
+        """
+        Ajustes del torneo que cambian el resultado o la traza de las partidas. En la cola son parte de la clave de cada
+        partida, así que al cambiarlos las partidas se vuelven a jugar
+        :return: str. JSON
+        """
+        return json.dumps({'max_rounds': self.max_rounds, 'trace_level': self.trace_level,
+                           'time_budgets': self.time_budgets, 'sandbox': self.sandbox}, sort_keys=True)
+
+    def _queue_results(self, games, initargs):
+        """
+        Apunta las partidas en la cola y juega las que quedan. Primero devuelve las que ya estaban terminadas, luego las
+        que juega este proceso y, cuando no quedan partidas libres, espera a las que juegan otros trabajadores. Así
+        devuelve el resultado de todas las partidas del torneo una vez
+        :param games: [(int, int, [str...])...] Partidas (ver schedule)
+        :param initargs: tuple. Argumentos de _init_worker
+        :return: generator(dict)
+        """
+        tournament_queue = TournamentQueue(self.queue, self.stale_timeout, self.max_attempts)
+        worker = TournamentQueue.new_worker_id()
+        tables = {}
+        for game_number, seed, agent_specs in games:
+            tables.setdefault(tuple(agent_specs), []).append((game_number, seed))
+        settings = self.queue_settings()
+        for agent_specs, table_games in tables.items():
+            tournament_queue.add_games(agent_specs, table_games, settings)
+        # Solo se reservan y leen partidas de las mesas y los ajustes del torneo, aunque la cola tenga las de otros
+        # torneos
+        table_filter = [list(agent_specs) for agent_specs in tables]
+        remaining = {(game_number, seed) for game_number, seed, _ in games}
+        last_completed = 0
+
+        def new_results(summaries):
+            # Las partidas del torneo que todavía no se han devuelto
+            for summary in summaries:
+                if (summary['game_number'], summary['seed']) in remaining:
+                    remaining.remove((summary['game_number'], summary['seed']))
+                    yield summary
+
+        def completed_results():
+            # Solo los resultados terminados desde la última consulta, para no leer la cola entera en cada espera
+            nonlocal last_completed
+            summaries, last_completed = tournament_queue.completed_results(last_completed, tables=table_filter,
+                                                                               settings=settings)
+            return new_results(summaries)
+
+        yield from completed_results()
+
+        executor = self._executor(initargs)
+        # Se reservan pocas partidas a la vez para que las demás queden libres para otras máquinas
+        window = self.workers * 2
+        heartbeat_interval = self.stale_timeout / 4
+        in_flight = {}
+        try:
+            while True:
+                if remaining and len(in_flight) < window:
+                    for job in tournament_queue.claim(worker, window - len(in_flight), tables=table_filter,
+                                                       settings=settings):
+                        in_flight[executor.submit(_play_game, (job['game_number'], job['seed'], job['agents']))] = job
+
+                if not in_flight:
+                    # Las que faltan las tiene otro trabajador: se espera a sus resultados o a que caduquen sus reservas
+                    yield from completed_results()
+                    if not remaining:
+                        return
+                    progress = tournament_queue.progress(tables=table_filter, settings=settings)
+                    if not progress[TournamentQueue.PENDING] and not progress[TournamentQueue.CLAIMED]:
+                        # Las que faltan han fallado max_attempts veces: se quedan en la cola con su error
+                        self.failed_games = progress[TournamentQueue.FAILED]
+                        return
+                    time.sleep(min(heartbeat_interval, 5.0))
+                    continue
+
+                finished, _ = concurrent.futures.wait(in_flight, heartbeat_interval,
+                                                      concurrent.futures.FIRST_COMPLETED)
+                tournament_queue.heartbeat(worker)
+                for future in finished:
+                    job = in_flight.pop(future)
+                    try:
+                        summary = future.result()
+                    except Exception:
+                        tournament_queue.release(worker, job['id'], traceback.format_exc())
+                        raise
+                    if tournament_queue.complete(worker, job['id'], summary):
+                        yield from new_results((summary,))
+        finally:
+            # Si el torneo se para, las partidas reservadas vuelven a la cola sin esperar a que caduquen
+            for future, job in in_flight.items():
+                future.cancel()
+                tournament_queue.release(worker, job['id'])
+            executor.shutdown(cancel_futures=True)
+            tournament_queue.close()
+        return
+
+    def run(self, on_result=None):
+        """
+        Juega todas las partidas y devuelve las estadísticas
+        :param on_result: function(dict)/None. Se llama con el resultado de cada partida según llega
+        :return: dict (ver aggregate)
+        """
+        start = time.perf_counter()
+        summaries = []
+        for summary in self.results():
+            summaries.append(summary)
+            if on_result is not None:
+                on_result(summary)
+        elapsed = time.perf_counter() - start
+        if self.games_file and self.trace_level != TraceLevelConstants.NONE and not (self.stream_traces or
+                                                                                     self.event_log):
+            trace_loader = TraceLoader(compression=self.compression)
+            trace_loader.full_path = Path(self.trace_path)
+            trace_loader.export_game_files(sorted(summary['game_number'] for summary in summaries))
+        if self.index and Path(self.trace_path).is_dir():
+            # Índice de las trazas para buscar partidas sin abrirlas (ver TraceIndex)
+            TraceIndex.open(self.trace_path)
+        return self.aggregate(summaries, elapsed)
+
+    def aggregate(self, summaries, elapsed):
+        """
+        :param summaries: [dict...] Resultados de las partidas
+        :param elapsed: float. Segundos
+        :return: {'games': int, 'agents': [str...], 'wins': [int...], 'win_rates': [float...], 'no_winner': int,
+                  'average_rounds': float, 'average_latency': [float...], 'max_latency': [float...],
+                  'timeouts': [int...], 'elapsed': float, 'games_per_second': float}
+                 Las latencias son los segundos que tarda cada jugador en responder a un trigger
+        """
+        games = len(summaries)
+        wins = [0, 0, 0, 0]
+        no_winner = 0
+        rounds = 0
+        calls, total_time, max_latency, timeouts = [0] * 4, [0.0] * 4, [0.0] * 4, [0] * 4
+        for summary in summaries:
+            if summary['winner'] == -1:
+                no_winner += 1
+            else:
+                wins[summary['winner']] += 1
+            rounds += summary['rounds']
+            for player, latency in enumerate(summary['agent_latency']):
+                calls[player] += latency['calls']
+                total_time[player] += latency['total_time']
+                max_latency[player] = max(max_latency[player], latency['max_time'])
+                timeouts[player] += sum(latency['timeouts'].values())
+
+        return {
+            'games': games,
+            'agents': [agent.__name__ for agent in self.agents],
+            'wins': wins,
+            'win_rates': [win / games if games else 0.0 for win in wins],
+            'no_winner': no_winner,
+            'average_rounds': rounds / games if games else 0.0,
+            'average_latency': [total_time[player] / calls[player] if calls[player] else 0.0 for player in range(4)],
+            'max_latency': max_latency,
+            'timeouts': timeouts,
+            'elapsed': elapsed,
+            'games_per_second': games / elapsed if elapsed else 0.0,
+        }
@@ -0,0 +1,207 @@
+import asyncio
+import threading
+import time
+
+from Agents.RandomAgent import RandomAgent
+from Classes.AgentCall import AgentCall
+from Classes.AgentWatchdog import AgentWatchdog
+from Classes.Constants import TraceLevelConstants
+from Classes.TrackedRandom import TrackedRandom
+from Interfaces.AsyncAgentInterface import AsyncAgentInterface
+from Managers.AsyncGameDirector import AsyncGameDirector
+from Managers.GameDirector import GameDirector
+
+# Los agentes colgados esperan a este evento, que se activa al acabar cada test para que sus hilos terminen
+release_agents = threading.Event()
+
+
+class HungAgent(RandomAgent):
+    """
+    Agente que se cuelga al colocar sus pueblos y en la fase de construcción
+    """
+
+    def on_game_start(self, board_instance):
+        release_agents.wait()
+        return super().on_game_start(board_instance)
+
+    def on_build_phase(self, board_instance):
+        release_agents.wait()
+        return {'building': 'town', 'node_id': 0, 'road_to': None}
+
+
+class SlowAgent(RandomAgent):
+    """
+    Agente que responde a las ofertas de comercio, pero tarde
+    """
+
+    def on_trade_offer(self, board_instance, offer=None, player_id=int):
+        time.sleep(0.02)
+        return True
+
+
+class LateAgent(RandomAgent):
+    """
+    Agente que se pasa de tiempo al descartar, y después tira su mano y usa el generador de la partida
+    """
+    finished = threading.Event()
+
+    def on_having_more_than_7_materials_when_thief_is_called(self):
+        release_agents.wait()
+        self.hand.remove_material(0, self.hand.get_from_id(0))
+        self.rng.random()
+        self.finished.set()
+        return self.hand
+
+
+class HungAsyncAgent(AsyncAgentInterface):
+    """
+    Agente asíncrono que no termina nunca su fase de comercio
+    """
+
+    async def on_commerce_phase(self):
+        await asyncio.sleep(3600)
+
+
+class TestAgentWatchdog:
+    def test_hung_agent(self):
+        release_agents.clear()
+        game_director = GameDirector(agents=(HungAgent, RandomAgent, RandomAgent, RandomAgent), max_rounds=20,
+                                     trace_level=TraceLevelConstants.FULL,
+                                     time_budgets={'on_game_start': 0.05, 'on_build_phase': 0.01})
+        try:
+            start = time.perf_counter()
+            trace = game_director.game_start(0, False, seed=0)
+            assert time.perf_counter() - start < 10
+        finally:
+            release_agents.set()
+
+        # Sin respuesta se le colocan los pueblos al azar y no construye nada en la partida
+        assert len(trace['setup']['P0']) == 2
+        assert all(node['id'] in range(54) for node in trace['setup']['P0'])
+        for round_object in trace['game'].values():
+            assert round_object['turn_P0']['build_phase'] in ([], [{'building': 'None'}])
+
+        latency = game_director.last_summary['agent_latency']
+        assert latency[0]['timeouts']['on_game_start'] == 2
+        assert latency[0]['timeouts']['on_build_phase'] == game_director.last_summary['rounds']
+        assert latency[1]['timeouts'] == {}
+
+    def test_slow_agent(self):
+        # Las ofertas que se aceptan tarde se rechazan
+        game_director = GameDirector(agents=(RandomAgent, SlowAgent, SlowAgent, SlowAgent), max_rounds=10,
+                                     trace_level=TraceLevelConstants.FULL, time_budgets={AgentWatchdog.DEFAULT: 0.01})
+        trace = game_director.game_start(0, False, seed=3)
+        answers = [answer for round_object in trace['game'].values() for turn in round_object.values()
+                   for commerce in turn['commerce_phase'] for receiver in commerce.get('answers', [])
+                   for answer in receiver if answer['receiver'] != 0]
+        assert answers and all(answer['response'] is False for answer in answers)
+        assert sum(game_director.last_summary['agent_latency'][1]['timeouts'].values()) > 0
+
+    def test_latency_histogram(self):
+        game_director = GameDirector(agents=(RandomAgent,) * 4, max_rounds=20, trace_level=TraceLevelConstants.NONE)
+        summary = game_director.game_start(0, False, seed=1)
+        for latency in summary['agent_latency']:
+            assert latency['calls'] > 0 and sum(latency['histogram']) == latency['calls']
+            assert 0 < latency['max_time'] <= latency['total_time']
+            assert latency['timeouts'] == {}
+
+        # Cada partida empieza con los tiempos a cero
+        summary = game_director.game_start(1, False, seed=1)
+        assert summary['agent_latency'][0]['calls'] == game_director.game_manager.watchdog.latencies[0]['calls']
+
+    def test_hung_async_agent(self):
+        game_director = AsyncGameDirector(agents=(HungAsyncAgent, RandomAgent, RandomAgent, RandomAgent),
+                                          max_rounds=10, trace_level=TraceLevelConstants.FULL,
+                                          time_budgets={'on_commerce_phase': 0.001})
+        trace = asyncio.run(game_director.game_start(0, False, seed=0))
+        for round_object in trace['game'].values():
+            assert round_object['turn_P0']['commerce_phase'] in ([], [{'trade_offer': 'None'}])
+        assert game_director.last_summary['agent_latency'][0]['timeouts']['on_commerce_phase'] > 0
+
+    def test_default_response(self):
+        watchdog = AgentWatchdog({'on_build_phase': 0.01})
+        agent = HungAgent(2)
+        release_agents.clear()
+        try:
+            response = watchdog.call(AgentCall(agent, 'on_build_phase', None, default='fallback'))
+        finally:
+            release_agents.set()
+        assert response == 'fallback'
+        assert watchdog.latencies[2]['timeouts'] == {'on_build_phase': 1}
+
+        # Los triggers sin tiempo máximo se llaman directamente
+        assert watchdog.call(AgentCall(agent, 'on_turn_start', default='fallback')) is None
+        assert watchdog.latencies[2]['calls'] == 2
+
+    def test_same_game_with_budget(self):
+        # Con un tiempo que no se acaba, la partida es la misma que sin tiempo aunque los agentes usen copias
+        traces = []
+        for time_budgets in (None, {AgentWatchdog.DEFAULT: 10.0}):
+            game_director = GameDirector(agents=(RandomAgent, SlowAgent, RandomAgent, RandomAgent), max_rounds=30,
+                                         trace_level=TraceLevelConstants.FULL, time_budgets=time_budgets)
+            game_director.trace_loader.export_to_file = lambda game_number: None
+            traces.append(game_director.game_start(0, False, seed=2))
+        assert traces[0] == traces[1]
+
+    def test_late_agent_is_isolated(self):
+        watchdog = AgentWatchdog({AgentWatchdog.DEFAULT: 0.01})
+        agent = LateAgent(1)
+        agent.rng = TrackedRandom(0)
+        agent.hand.add_material(0, 5)
+        state = agent.rng.getstate()
+        release_agents.clear()
+        LateAgent.finished.clear()
+        try:
+            response = watchdog.call(AgentCall(agent, 'on_having_more_than_7_materials_when_thief_is_called',
+                                               default='fallback'))
+        finally:
+            release_agents.set()
+        assert response == 'fallback'
+
+        # El agente sigue en su hilo, pero no cambia la mano ni el generador de la partida
+        assert LateAgent.finished.wait(5)
+        assert agent.hand.get_from_id(0) == 5
+        assert agent.rng.getstate() == state
+
+        # Si responde a tiempo sus cambios sí llegan a la partida
+        watchdog.time_budgets['on_having_more_than_7_materials_when_thief_is_called'] = 5.0
+        response = watchdog.call(AgentCall(agent, 'on_having_more_than_7_materials_when_thief_is_called'))
+        assert response is agent.hand and agent.hand.get_from_id(0) == 0
+        assert agent.rng.getstate() != state
+
+    def test_sync_agent_does_not_block_event_loop(self):
+        watchdog = AgentWatchdog({'on_build_phase': 0.5})
+
+        async def play():
+            ticks = []
+
+            async def tick():
+                for _ in range(5):
+                    await asyncio.sleep(0.01)
+                    ticks.append(time.perf_counter())
+
+            start = time.perf_counter()
+            response, _ = await asyncio.gather(
+                watchdog.call_async(AgentCall(HungAgent(0), 'on_build_phase', None, default='fallback')), tick())
+            return response, ticks[-1] - start
+
+        release_agents.clear()
+        try:
+            response, ticks_time = asyncio.run(play())
+        finally:
+            release_agents.set()
+        # Las demás corrutinas siguen mientras el agente síncrono agota su tiempo
+        assert response == 'fallback'
+        assert ticks_time < 0.4
+
+
+if __name__ == '__main__':
+    test = TestAgentWatchdog()
+    test.test_hung_agent()
+    test.test_slow_agent()
+    test.test_latency_histogram()
+    test.test_hung_async_agent()
+    test.test_default_response()
+    test.test_same_game_with_budget()
+    test.test_late_agent_is_isolated()
+    test.test_sync_agent_does_not_block_event_loop()
@@ -0,0 +1,163 @@
+import asyncio
+import json
+
+import pytest
+
+from Agents.AdrianHerasAgent import AdrianHerasAgent
+from Agents.RandomAgent import RandomAgent
+from Classes.Constants import BuildConstants, TraceLevelConstants
+from Interfaces.AgentInterface import AgentInterface
+from Interfaces.AsyncAgentInterface import AsyncAgentInterface
+from Managers.AsyncGameDirector import AsyncGameDirector
+from Managers.GameDirector import GameDirector
+
+
+class StandInInferenceServer:
+    """
+    Servidor de inferencia de pega. Por cada línea JSON {'options': [...], 'draw': int} espera un poco, como si
+    evaluase un modelo, y responde {'choice': options[draw % len(options)]}
+    """
+
+    def __init__(self, delay=0.001):
+        self.delay = delay
+        self.server = None
+        self.port = None
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, '127.0.0.1', 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        while line := await reader.readline():
+            request = json.loads(line)
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(self.delay)
+            self.in_flight -= 1
+            writer.write((json.dumps({'choice': request['options'][request['draw'] % len(request['options'])]}) +
+                          '\n').encode())
+            await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+
+
+class LocalChoiceAgent(AgentInterface):
+    """
+    Agente síncrono que elige sus jugadas igual que el servidor de inferencia, pero sin preguntarle
+    """
+
+    def choose(self, options):
+        return options[self.rng.randrange(1 << 16) % len(options)]
+
+    def on_game_start(self, board_instance):
+        self.board = board_instance
+        node_id = self.choose(self.board.valid_starting_nodes())
+        return node_id, self.choose(self.board.nodes[node_id]['adjacent'])
+
+    def on_build_phase(self, board_instance):
+        self.board = board_instance
+        legal_moves = self.board.moves.legal_moves(self.id, self.hand, cards_left=False)
+        for building in (BuildConstants.CITY, BuildConstants.TOWN, BuildConstants.ROAD):
+            if legal_moves[building]:
+                choice = self.choose(legal_moves[building])
+                if building == BuildConstants.ROAD:
+                    return {'building': building, 'node_id': choice['starting_node'],
+                            'road_to': choice['finishing_node']}
+                return {'building': building, 'node_id': choice, 'road_to': None}
+        return None
+
+
+class InferenceAgent(AsyncAgentInterface):
+    """
+    Agente asíncrono que le pregunta sus jugadas al servidor de inferencia. Juega igual que LocalChoiceAgent
+    """
+    server = None
+
+    async def choose(self, options):
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.server.port)
+        writer.write((json.dumps({'options': options, 'draw': self.rng.randrange(1 << 16)}) + '\n').encode())
+        await writer.drain()
+        choice = json.loads(await reader.readline())['choice']
+        writer.close()
+        await writer.wait_closed()
+        return choice
+
+    async def on_game_start(self, board_instance):
+        self.board = board_instance
+        node_id = await self.choose(self.board.valid_starting_nodes())
+        return node_id, await self.choose(self.board.nodes[node_id]['adjacent'])
+
+    async def on_build_phase(self, board_instance):
+        self.board = board_instance
+        legal_moves = self.board.moves.legal_moves(self.id, self.hand, cards_left=False)
+        for building in (BuildConstants.CITY, BuildConstants.TOWN, BuildConstants.ROAD):
+            if legal_moves[building]:
+                choice = await self.choose(legal_moves[building])
+                if building == BuildConstants.ROAD:
+                    return {'building': building, 'node_id': choice['starting_node'],
+                            'road_to': choice['finishing_node']}
+                return {'building': building, 'node_id': choice, 'road_to': None}
+        return None
+
+
+class TestAsyncGameDirector:
+    max_rounds = 40
+
+    def sync_traces(self, agents, seeds):
+        game_director = GameDirector(agents=agents, max_rounds=self.max_rounds, trace_level=TraceLevelConstants.FULL)
+        return [game_director.game_start(seed, False, seed=seed) for seed in seeds]
+
+    async def async_traces(self, agents, seeds):
+        directors = [AsyncGameDirector(agents=agents, max_rounds=self.max_rounds,
+                                       trace_level=TraceLevelConstants.FULL) for _ in seeds]
+        return await asyncio.gather(*[director.game_start(seed, False, seed=seed)
+                                      for director, seed in zip(directors, seeds)])
+
+    def test_sync_agents(self):
+        # Los agentes síncronos juegan igual con AsyncGameDirector que con GameDirector
+        agents = (RandomAgent, RandomAgent, AdrianHerasAgent, AdrianHerasAgent)
+        seeds = list(range(4))
+        assert asyncio.run(self.async_traces(agents, seeds)) == self.sync_traces(agents, seeds)
+
+    def test_inference_agents(self):
+        seeds = list(range(20))
+
+        async def play():
+            server = StandInInferenceServer()
+            await server.start()
+            InferenceAgent.server = server
+            try:
+                traces = await self.async_traces((InferenceAgent, RandomAgent, InferenceAgent, AdrianHerasAgent), seeds)
+            finally:
+                await server.close()
+            return traces, server
+
+        traces, server = asyncio.run(play())
+
+        # Las partidas se han jugado a la vez: el servidor ha tenido varias peticiones pendientes al mismo tiempo
+        assert server.requests > len(seeds) * 8
+        assert server.max_in_flight > 1
+
+        # Y cada partida es la misma que con el agente síncrono equivalente
+        assert traces == self.sync_traces((LocalChoiceAgent, RandomAgent, LocalChoiceAgent, AdrianHerasAgent), seeds)
+
+    def test_async_agents_need_async_director(self):
+        game_director = GameDirector(agents=(InferenceAgent, RandomAgent, RandomAgent, RandomAgent),
+                                     max_rounds=self.max_rounds, trace_level=TraceLevelConstants.NONE)
+        with pytest.raises(TypeError):
+            game_director.game_start(0, False, seed=0)
+
+
+if __name__ == '__main__':
+    test = TestAsyncGameDirector()
+    test.test_sync_agents()
+    test.test_inference_agents()
+    test.test_async_agents_need_async_director()
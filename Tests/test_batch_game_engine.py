@@ -0,0 +1,75 @@
+import numpy as np
+
+from Classes.Board import Board
+from Classes.Constants import BuildConstants
+from Managers.BatchGameEngine import BatchGameEngine
+
+
+class TestBatchGameEngine:
+    def build_same_position(self):
+        """
+        Construye la misma posición en un Board y en la partida 0 de un BatchGameEngine
+        """
+        board = Board()
+        engine = BatchGameEngine(1, seed=0)
+        game = np.array([0])
+        for player, node_id in ((0, 10), (1, 40), (2, 24)):
+            board.nodes[node_id]['player'] = player
+            engine._place_town(game, np.array([node_id]), player)
+        for player, start, end in ((0, 10, 11), (0, 11, 12), (0, 12, 13), (1, 40, 39), (2, 24, 25), (1, 39, 38)):
+            board.build_road(player, start, end)
+            engine._place_road(game, np.array([engine.EDGE_ID_MATRIX[start, end]]), player)
+        board.build_city(0, 10)
+        engine.cities[0, 10] = True
+        return board, engine, game
+
+    def test_production(self):
+        board, engine, game = self.build_same_position()
+
+        # Con cada tirada cada jugador recibe lo mismo que con la tabla de producción del tablero (dos veces)
+        for roll in range(2, 13):
+            expected = np.zeros((4, 5), dtype=np.int16)
+            for player, material, amount in board.get_production(roll):
+                expected[player, material] += amount * engine.PRODUCTION_MULTIPLIER
+            engine.hands[:] = 0
+            engine.give_resources(game, np.array([roll]))
+            assert (engine.hands[0] == expected).all()
+
+    def test_legal_moves(self):
+        board, engine, game = self.build_same_position()
+
+        # Las jugadas legales son las mismas que las de MoveGenerator
+        for player in range(3):
+            towns = np.flatnonzero(engine._legal_moves(game, player, BuildConstants.TOWN)[0]).tolist()
+            assert towns == board.moves.towns(player)
+            cities = np.flatnonzero(engine._legal_moves(game, player, BuildConstants.CITY)[0]).tolist()
+            assert cities == board.moves.cities(player)
+            roads = np.flatnonzero(engine._legal_moves(game, player, BuildConstants.ROAD)[0])
+            assert [{'starting_node': int(engine.ROAD_ADJACENT_NODE[move]), 'finishing_node': int(engine.ROAD_NODE[move])}
+                    for move in roads] == board.moves.roads(player)
+
+    def test_run(self):
+        results = BatchGameEngine(40, max_rounds=100, seed=3).run()
+
+        # Nadie se queda con materiales negativos y solo ganan partidas con 10 puntos o más
+        engine = BatchGameEngine(40, max_rounds=100, seed=3)
+        engine.run()
+        assert (engine.hands >= 0).all()
+        won = results['winner'] != -1
+        assert (results['victory_points'][won, results['winner'][won]] >= 10).all()
+        assert (results['max_rounds_reached'] == ~won).all()
+        assert (results['rounds'] <= 100).all() and (results['rounds'][~won] == 100).all()
+
+        # La misma semilla juega las mismas partidas
+        assert (engine.results()['rounds'] == results['rounds']).all()
+        assert (engine.results()['winner'] == results['winner']).all()
+
+        summaries = engine.game_summaries()
+        assert len(summaries) == 40 and summaries[0]['winner'] == results['winner'][0]
+
+
+if __name__ == '__main__':
+    test = TestBatchGameEngine()
+    test.test_production()
+    test.test_legal_moves()
+    test.test_run()
@@ -1,4 +1,7 @@
+from copy import copy
+
 from Classes.Board import Board
+from Classes.BoardTopology import BoardTopology
 from Classes.Constants import *
 
 
@@ -364,6 +367,206 @@ class TestBoard:
 
         return
 
+    def test_trade_ratios(self):
+        # Comprobamos que el ratio de comercio con el banco sigue a los puertos que tiene cada jugador
+        board = Board()
+        assert board.get_trade_ratios(0) == [4, 4, 4, 4, 4]
+
+        # Puerto de cereal
+        board.nodes[3]['player'] = 0
+        assert board.get_trade_ratio(0, MaterialConstants.CEREAL) == 2
+        assert board.get_trade_ratios(0) == [2, 4, 4, 4, 4]
+
+        # Puerto 3:1
+        board.nodes[7]['player'] = 0
+        assert board.get_trade_ratios(0) == [2, 3, 3, 3, 3]
+        assert board.get_trade_ratios(1) == [4, 4, 4, 4, 4]
+
+        # Si pierde el nodo pierde el puerto, aunque tenga otro nodo del mismo puerto sigue teniéndolo
+        board.nodes[4]['player'] = 0
+        board.nodes[3]['player'] = -1
+        assert board.get_trade_ratios(0) == [2, 3, 3, 3, 3]
+        board.nodes[4]['player'] = 1
+        assert board.get_trade_ratios(0) == [3, 3, 3, 3, 3]
+        assert board.get_trade_ratios(1) == [2, 4, 4, 4, 4]
+        return
+
+    def test_production(self):
+        # Comprobamos que la tabla de producción se mantiene al día al cambiar los nodos
+        board = Board()
+
+        # Al principio nadie produce nada
+        assert all(list(board.get_production(roll)) == [] for roll in range(2, 13))
+
+        # El nodo 20 toca los terrenos 4 (mineral, 6), 8 (madera, 3) y 9 (cereal, 11)
+        board.nodes[20]['player'] = 0
+        assert list(board.get_production(6)) == [(0, MaterialConstants.MINERAL, 1)]
+        assert list(board.get_production(3)) == [(0, MaterialConstants.WOOD, 1)]
+        assert list(board.get_production(11)) == [(0, MaterialConstants.CEREAL, 1)]
+
+        # Una ciudad produce el doble
+        board.build_city(0, 20)
+        assert list(board.get_production(11)) == [(0, MaterialConstants.CEREAL, 2)]
+
+        # El 7 nunca produce y al quitar el pueblo deja de producir
+        assert list(board.get_production(7)) == []
+        board.nodes[20]['player'] = -1
+        assert list(board.get_production(11)) == []
+
+        return
+
+    def test_road_network(self):
+        # Comprobamos que la carretera más larga se actualiza al construir carreteras y pueblos
+        board = Board()
+        assert board.road_network.longest_road() == {'longest_road': 0, 'player': -1}
+
+        board.nodes[0]['player'] = 0
+        for start, end in ((0, 1), (1, 2), (2, 3), (3, 4)):
+            board.build_road(0, start, end)
+        assert board.road_network.get_longest_road(0) == 4
+
+        # Una bifurcación no alarga la carretera
+        board.build_road(0, 2, 10)
+        assert board.road_network.get_longest_road(0) == 4
+
+        # Cerrando un ciclo 0-1-2-10-9-8 se puede recorrer entero y seguir hasta el nodo 4
+        for start, end in ((0, 8), (8, 9), (9, 10)):
+            board.build_road(0, start, end)
+        assert board.road_network.longest_road() == {'longest_road': 8, 'player': 0}
+
+        # Un pueblo rival en el nodo 3 corta la carretera: se puede llegar hasta él pero no atravesarlo
+        board.nodes[3]['player'] = 1
+        assert board.road_network.longest_road() == {'longest_road': 7, 'player': 0}
+
+        # Solo se suma una vez cada carretera
+        board.nodes[6]['player'] = 1
+        board.build_road(1, 6, 5)
+        board.build_road(1, 6, 5)
+        assert board.road_network.get_longest_road(1) == 1
+        return
+
+    def test_topology(self):
+        # La topología se comparte entre tableros, pero el estado de cada partida no
+        board = Board()
+        other_board = Board()
+        for node in board.nodes:
+            assert node['adjacent'] == BoardTopology.ADJACENT_NODES[node['id']]
+            assert node['contacting_terrain'] == BoardTopology.CONTACTING_TERRAIN[node['id']]
+            assert node['harbor'] == BoardTopology.HARBORS[node['id']]
+        assert BoardTopology.EDGES[BoardTopology.EDGE_IDS[(9, 8)]] == (8, 9)
+        assert BoardTopology.HARBOR_NODES[HarborConstants.MINERAL] == (28, 38)
+
+        board.nodes[0]['player'] = 0
+        assert other_board.nodes[0]['player'] == -1
+        return
+
+    def test_node_views(self):
+        # Los nodos y terrenos son vistas del estado del tablero, con la misma forma que los diccionarios de siempre
+        board = Board()
+        board_copy = copy(board)
+
+        board.nodes[0]['player'] = 0
+        board.nodes[0]['roads'].append({'player_id': 0, 'node_id': 8})
+        board.build_road(0, 0, 1)
+        board.build_city(0, 0)
+        assert board.nodes[0] == {'id': 0, 'adjacent': (1, 8), 'harbor': HarborConstants.WOOD,
+                                  'roads': [{'player_id': 0, 'node_id': 8}, {'player_id': 0, 'node_id': 1}],
+                                  'has_city': True, 'player': 0, 'contacting_terrain': (0,)}
+        assert board.nodes[8]['roads'] == [{'player_id': 0, 'node_id': 0}]
+        assert board.export_nodes()[0] == {'id': 0, 'adjacent': [1, 8], 'harbor': HarborConstants.WOOD,
+                                           'roads': [{'player_id': 0, 'node_id': 8}, {'player_id': 0, 'node_id': 1}],
+                                           'has_city': True, 'player': 0, 'contacting_terrain': [0]}
+
+        # Las copias que reciben los agentes comparten el estado
+        assert board_copy.nodes[0]['has_city'] is True
+        assert board_copy.nodes[1]['roads'] == [{'player_id': 0, 'node_id': 0}]
+
+        assert board.terrain[7]['has_thief'] and board.terrain[7]['probability'] == 0
+        board.move_thief(3)
+        assert board_copy.terrain[3]['has_thief'] and not board_copy.terrain[7]['has_thief']
+        assert board.export_terrain()[3] == {'id': 3, 'has_thief': True, 'probability': 4,
+                                             'terrain_type': TerrainConstants.CLAY,
+                                             'contacting_nodes': [7, 8, 9, 17, 18, 19]}
+
+        # La topología no se puede cambiar desde los nodos
+        try:
+            board.nodes[0]['adjacent'] = [1]
+            assert False
+        except TypeError:
+            pass
+        return
+
+    def test_board_view(self):
+        # Los agentes reciben una vista de solo lectura que siempre es la misma y ve el estado actual
+        board = Board()
+        view = board.get_view()
+        assert board.get_view() is view
+
+        version = view.version
+        board.nodes[0]['player'] = 0
+        board.build_road(0, 0, 1)
+        assert view.version > version
+        assert view.nodes[0]['player'] == 0 and view.valid_town_nodes(0) == []
+        assert view.nodes[1]['roads'] == [{'player_id': 0, 'node_id': 0}]
+
+        # La versión no cambia si no se cambia el tablero
+        version = view.version
+        assert board.build_road(0, 0, 1)['response'] is False
+        assert view.version == version
+
+        for modify in (lambda: view.build_road(0, 1, 2),
+                       lambda: view.build_town(0, 2),
+                       lambda: view.move_thief(3),
+                       lambda: view.nodes[5].__setitem__('player', 1),
+                       lambda: view.nodes[1]['roads'].append({'player_id': 0, 'node_id': 2}),
+                       lambda: view.terrain[3].__setitem__('has_thief', True),
+                       lambda: view.state.node_owner.__setitem__(5, 1),
+                       lambda: view.state.edge_owner.__setitem__(0, 1),
+                       lambda: setattr(view.state, 'thief', 3),
+                       lambda: setattr(view.state, 'version', 0),
+                       lambda: view.state.player_harbors.__setitem__(0, 1),
+                       lambda: view.state.add_road(0, 0),
+                       lambda: view.production[6].__setitem__((0, 5), (1, 0, 1)),
+                       lambda: view.production.__setitem__(6, {}),
+                       lambda: setattr(view.moves, 'cache', {}),
+                       lambda: setattr(view.road_network, 'lengths', [9] * 4),
+                       lambda: setattr(view, 'state', board.state)):
+            try:
+                modify()
+                assert False
+            except (TypeError, AttributeError):
+                pass
+        # Las consultas de la partida no se pueden alcanzar desde la vista
+        for name in ('cache', 'state'):
+            assert not hasattr(view.moves, name)
+        for name in ('edges', 'adjacency', 'add_road'):
+            assert not hasattr(view.road_network, name)
+        assert board.nodes[5]['player'] == -1 and board.nodes[2]['roads'] == [] and board.terrain[7]['has_thief']
+        assert board.state.edge_owner[0] == 0 and board.state.thief == 7 and (0, 5) not in board.production[6]
+        assert view.version == version
+
+        # Las vistas leen el estado actual
+        assert view.state.node_owner[0] == 0 and view.state.node_roads(1) == board.state.node_roads(1)
+        assert view.production == board.production
+        assert view.road_network.longest_road() == board.road_network.longest_road()
+        assert view.moves.roads(0) == board.moves.roads(0)
+
+        # get_board da un tablero nuevo en los dos, y copy_board uno que se puede modificar con el estado actual, sin
+        # cambiar el de la partida
+        for new_board in (board.get_board(), view.get_board()):
+            assert type(new_board) is Board and new_board.version == 0
+            assert all(node['player'] == -1 for node in new_board.nodes)
+        board.set_node_city(0, True)
+        assert [dict(node) for node in board.copy_board().nodes] == [dict(node) for node in board.nodes]
+        copy = view.copy_board()
+        assert type(copy) is Board
+        assert [dict(node) for node in copy.nodes] == [dict(node) for node in view.nodes]
+        assert [dict(terrain) for terrain in copy.terrain] == [dict(terrain) for terrain in view.terrain]
+        assert copy.production == view.production
+        assert copy.build_road(0, 1, 2)['response']
+        assert board.nodes[2]['roads'] == [] and view.version == board.version
+        return
+
 
 if __name__ == '__main__':
     test = TestBoard()
@@ -376,3 +579,9 @@ if __name__ == '__main__':
     test.test_valid_road_nodes()
     test.test_valid_starting_nodes()
     test.test_check_for_player_harbors()
+    test.test_trade_ratios()
+    test.test_production()
+    test.test_road_network()
+    test.test_topology()
+    test.test_node_views()
+    test.test_board_view()
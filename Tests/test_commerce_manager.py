@@ -22,6 +22,12 @@ class TestCommerceManager:
         commerce_manager.trade_through_special_harbor(hand, 4, 0)
         assert hand.get_from_id(4) == 2 and hand.get_from_id(0) == 3
 
+        # Comercio con el banco indicando el ratio. Si no hay materiales suficientes no hace nada
+        assert commerce_manager.trade_with_bank(hand, 0, 1, 3) is hand
+        assert hand.get_from_id(0) == 0 and hand.get_from_id(1) == 2
+        assert commerce_manager.trade_with_bank(hand, 1, 0, 4) is False
+        assert hand.get_from_id(0) == 0 and hand.get_from_id(1) == 2
+
 
 if __name__ == '__main__':
     test = TestCommerceManager()
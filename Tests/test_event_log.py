@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+
+from Agents.AdrianHerasAgent import AdrianHerasAgent
+from Agents.RandomAgent import RandomAgent
+from Classes.Constants import TraceLevelConstants
+from Managers.GameDirector import GameDirector
+from Managers.TournamentRunner import SEED_LIMIT, TournamentRunner, game_seed
+from TraceLoader.EventLog import EventLog, EventLogReader
+from TraceLoader.TraceEvents import TraceEvents
+
+
+class TestEventLog:
+
+    def play(self, tmp_path, games):
+        event_log = EventLog(tmp_path / 'games.events')
+        game_director = GameDirector(agents=(RandomAgent, AdrianHerasAgent) * 2, max_rounds=100,
+                                     trace_level=TraceLevelConstants.EVENTS, trace_stream=event_log)
+        traces = [game_director.game_start(game_number, False, seed=game_number) for game_number in range(games)]
+        event_log.close()
+        return traces
+
+    def test_write_read(self, tmp_path):
+        traces = self.play(tmp_path, 3)
+        assert sorted(path.name for path in tmp_path.iterdir()) == ['board.json', 'games.events', 'games.index']
+
+        reader = EventLogReader(tmp_path)
+        assert len(reader) == 3
+        assert list(reader.index['game_number']) == [0, 1, 2]
+        assert list(reader.index['rounds']) == [trace['summary']['rounds'] for trace in traces]
+        assert list(reader.index['winner']) == [trace['summary']['winner'] for trace in traces]
+        assert [len(events) for events in reader] == list(reader.index['count'])
+
+        events = reader.game(1)
+        assert isinstance(events, np.ndarray) and np.all(events['game_number'] == 1)
+        assert np.all(np.diff(events['round']) >= 0)
+        setup = reader.round(1, -1)
+        assert list(setup['player']) == [0, 1, 2, 3, 3, 2, 1, 0]
+        assert setup['args'][0, :2].tolist() == traces[1]['setup'][0][:2]
+
+        # Cada turno acaba con un evento end
+        ends = events[events['event_type'] == EventLog.event_type('end')]
+        assert len(ends) == sum(1 for event in traces[1]['events'] if event[2] == TraceEvents.END)
+        round_events = reader.round(1, 5)
+        assert len(round_events) and np.all(round_events['round'] == 5)
+        assert len(round_events) == np.count_nonzero(events['round'] == 5)
+        with pytest.raises(KeyError):
+            reader.game(3)
+
+    def test_unfinished_game(self, tmp_path):
+        self.play(tmp_path, 2)
+        reader = EventLogReader(tmp_path / 'games.events')
+        # El proceso muere a mitad de escribir los eventos de una partida y su entrada del índice
+        with open(tmp_path / 'games.events', 'ab') as events_file:
+            events_file.write(EventLog.RECORD.pack(2, 0, 0, 0, *[0] * EventLog.ARGS)[:10])
+        with open(tmp_path / 'games.index', 'ab') as index_file:
+            index_file.write(EventLog.INDEX.pack(2, 2, int(reader.index['count'].sum()), 50, 1, 0))
+            index_file.write(b'\0' * 5)
+        reader = EventLogReader(tmp_path / 'games.events')
+        assert list(reader.index['game_number']) == [0, 1]
+
+        # Al seguir escribiendo se descarta el registro a medias
+        self.play(tmp_path, 1)
+        assert list(EventLogReader(tmp_path).index['game_number']) == [0, 1, 0]
+
+    def test_only_events(self, tmp_path):
+        with pytest.raises(ValueError):
+            EventLog(tmp_path / 'games.events').write(0, {'summary': {}})
+        with pytest.raises(ValueError):
+            TournamentRunner(['RandomAgent.RandomAgent'] * 4, 1, trace_level=TraceLevelConstants.FULL,
+                             event_log=True)
+
+    def test_tournament_runner(self, tmp_path):
+        runner = TournamentRunner(['RandomAgent.RandomAgent'] * 4, 6, workers=2, executor='process', max_rounds=100,
+                                  trace_level=TraceLevelConstants.EVENTS, trace_path=str(tmp_path), event_log=True)
+        summaries = {summary['game_number']: summary for summary in runner.results()}
+        reader = EventLogReader(tmp_path)
+        assert sorted(reader.index['game_number']) == list(range(6))
+        for entry in reader.index:
+            assert entry['winner'] == summaries[entry['game_number']]['winner']
+
+    def test_limits(self, tmp_path):
+        # Semillas de 64 bits, como las de la mayor semilla base
+        runner = TournamentRunner(['RandomAgent.RandomAgent'] * 4, 2, base_seed=SEED_LIMIT - 1, workers=2,
+                                  executor='process', max_rounds=100, trace_level=TraceLevelConstants.EVENTS,
+                                  trace_path=str(tmp_path), event_log=True)
+        runner.run()
+        reader = EventLogReader(tmp_path)
+        assert sorted(int(seed) for seed in reader.index['seed']) == [game_seed(SEED_LIMIT - 1, 0),
+                                                                      game_seed(SEED_LIMIT - 1, 1)]
+
+        # Partidas de más de 32767 rondas
+        trace = self.play(tmp_path / 'short', 1)[0]
+        trace['events'] = [[round_number + 40000] + event for round_number, *event in trace['events']]
+        trace['summary']['rounds'] += 40000
+        event_log = EventLog(tmp_path / 'long' / 'games.events')
+        event_log.write(0, trace)
+        event_log.close()
+        reader = EventLogReader(tmp_path / 'long')
+        assert reader.index['rounds'][0] == trace['summary']['rounds']
+        assert len(reader.round(0, 40005)) and np.all(reader.round(0, 40005)['round'] == 40005)
+        assert list(reader.round(0, -1)['player']) == [0, 1, 2, 3, 3, 2, 1, 0]
+
+        trace['seed'] = 2 ** 64
+        with pytest.raises(ValueError):
+            EventLog(tmp_path / 'long' / 'games.events').write(1, trace)
+
+
+if __name__ == '__main__':
+    import pathlib
+    import tempfile
+
+    test = TestEventLog()
+    for test_name in ('test_write_read', 'test_unfinished_game', 'test_only_events', 'test_tournament_runner',
+                      'test_limits'):
+        with tempfile.TemporaryDirectory() as directory:
+            getattr(test, test_name)(pathlib.Path(directory))
@@ -1,6 +1,17 @@
+import contextlib
+import io
+import random
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
 from Managers.GameDirector import GameDirector
-from Classes.Constants import DevelopmentCardConstants
+from Classes.Constants import DevelopmentCardConstants, TraceLevelConstants
 from Classes.DevelopmentCards import *
+from Agents.AdrianHerasAgent import AdrianHerasAgent
+from Agents.AlexPastorAgent import AlexPastorAgent
+from Agents.RandomAgent import RandomAgent
 
 
 class TestGameDirector:
@@ -149,6 +160,102 @@ class TestGameDirector:
     def test_game_start_and_game_loop(self):
         self.game_director.game_start(1)
 
+    def test_game_start_trace_levels(self):
+        game_director = GameDirector(for_test=True, max_rounds=50, trace_level=TraceLevelConstants.NONE)
+
+        # Sin traza solo se devuelve el resultado de la partida y no se guarda nada en el trace_loader
+        summary = game_director.game_start(1, False)
+        assert game_director.trace_loader.current_trace == {}
+        assert summary['game_number'] == 1 and summary['rounds'] == game_director.game_manager.get_round()
+        assert summary['victory_points'] == [player['victory_points'] for player in
+                                             game_director.game_manager.get_players()]
+        assert summary['max_rounds_reached'] == (summary['winner'] == -1)
+
+        # Con el resumen se guarda únicamente el resultado de la partida
+        summary = game_director.game_start(2, False, TraceLevelConstants.SUMMARY)
+        assert game_director.trace_loader.current_trace == {'summary': summary}
+
+        # Con la traza completa se guardan el setup y todas las rondas
+        trace = game_director.game_start(3, False, TraceLevelConstants.FULL)
+        assert list(trace.keys()) == ['setup', 'game']
+        assert 'victory_points' in trace['game']['round_0']['turn_P0']['end_turn']
+
+    def test_no_trace_objects(self):
+        agents = (RandomAgent, RandomAgent, AdrianHerasAgent, AlexPastorAgent)
+        game_director = GameDirector(agents=agents, max_rounds=20, trace_level=TraceLevelConstants.NONE)
+
+        # Sin traza no se crean los objetos de los turnos ni se imprime nada, tampoco al llegar al máximo de rondas
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            summary = game_director.game_start(0, False, seed=3)
+        assert output.getvalue() == ''
+        assert summary['max_rounds_reached']
+        assert game_director.start_turn(False, 0)[0] is None
+        assert game_director.end_turn(False, 0)[0] is None
+
+        # La partida es la misma que con la traza completa
+        full_director = GameDirector(agents=agents, max_rounds=20, trace_level=TraceLevelConstants.FULL)
+        full_director.trace_loader.export_to_file = lambda game_number: None
+        full_director.game_start(0, False, seed=3)
+        assert full_director.last_summary == dict(summary, agent_latency=full_director.last_summary['agent_latency'])
+        assert full_director.start_turn(False, 0)[0]['development_card_played'] == []
+
+    def test_game_start_seed(self):
+        game_director = GameDirector(for_test="test_específico", max_rounds=50, trace_level=TraceLevelConstants.FULL)
+        other_director = GameDirector(for_test="test_específico", max_rounds=50, trace_level=TraceLevelConstants.FULL)
+
+        # La partida solo depende de su semilla: no usa ni cambia el módulo random, aunque entre medias se juegue otra
+        random.seed(1)
+        state = random.getstate()
+        trace = game_director.game_start(1, False, seed=42)
+        assert random.getstate() == state
+        other_director.game_start(2, False, seed=7)
+        random.random()
+        assert game_director.game_start(3, False, seed=42) == trace
+        assert other_director.game_start(4, False, seed=42) == trace
+
+    def test_concurrent_games(self):
+        # Varios GameDirector jugando a la vez en hilos dan las mismas partidas que jugándolas de una en una
+        agents = (RandomAgent, RandomAgent, AdrianHerasAgent, AlexPastorAgent)
+        threads_number, games_per_thread = 4, 6
+        seeds = [[thread * 1000 + game for game in range(games_per_thread)] for thread in range(threads_number)]
+
+        with tempfile.TemporaryDirectory() as trace_folder:
+            def new_director():
+                game_director = GameDirector(agents=agents, max_rounds=60, trace_level=TraceLevelConstants.FULL)
+                game_director.trace_loader.full_path = Path(trace_folder)
+                return game_director
+
+            expected = [[new_director().game_start(seed, False, seed=seed) for seed in thread_seeds]
+                        for thread_seeds in seeds]
+
+            results = [None] * threads_number
+            errors = []
+            barrier = threading.Barrier(threads_number)
+
+            def play(thread):
+                try:
+                    game_director = new_director()
+                    barrier.wait()
+                    results[thread] = [game_director.game_start(seed, False, seed=seed) for seed in seeds[thread]]
+                except Exception as exception:
+                    errors.append(exception)
+
+            # Cambios de hilo muy frecuentes para que las partidas se mezclen lo máximo posible
+            switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(1e-6)
+            try:
+                threads = [threading.Thread(target=play, args=(thread,)) for thread in range(threads_number)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            finally:
+                sys.setswitchinterval(switch_interval)
+
+        assert errors == []
+        assert results == expected
+
 
 if __name__ == '__main__':
     test = TestGameDirector()
@@ -160,3 +267,7 @@ if __name__ == '__main__':
     test.test_round_start()
     test.test_round_end()
     test.test_game_start_and_game_loop()
+    test.test_game_start_trace_levels()
+    test.test_no_trace_objects()
+    test.test_game_start_seed()
+    test.test_concurrent_games()
@@ -0,0 +1,88 @@
+import pytest
+
+from Managers.LeagueScheduler import LeagueScheduler, wilson_interval
+from Managers.TournamentRunner import TournamentRunner, game_seed
+
+
+class TestLeagueScheduler:
+    agent_specs = ['RandomAgent.RandomAgent', 'AdrianHerasAgent.AdrianHerasAgent',
+                   'AlexPastorAgent.AlexPastorAgent', 'BuilderAgent.BuilderAgent']
+
+    def test_wilson_interval(self):
+        assert wilson_interval(5, 10) == pytest.approx((0.2366, 0.7634), abs=1e-4)
+        assert wilson_interval(0, 10)[0] == pytest.approx(0.0) and wilson_interval(10, 10)[1] == pytest.approx(1.0)
+        assert wilson_interval(0, 0) == (0.0, 1.0)
+        # Con más confianza o menos partidas el intervalo es más ancho
+        assert wilson_interval(50, 100, 0.99)[0] < wilson_interval(50, 100)[0] < wilson_interval(500, 1000)[0]
+
+    def test_league_tables(self):
+        # Con 5 agentes hay 5 grupos de 4 y cada agente se sienta lo mismo en cada asiento
+        for seat_orders, tables_per_group in ((LeagueScheduler.PERMUTATIONS, 24), (LeagueScheduler.ROTATIONS, 4)):
+            tables = LeagueScheduler.league_tables(5, seat_orders)
+            assert len(tables) == 5 * tables_per_group
+            assert len(set(order for _, order in tables)) == len(tables)
+            for agent in range(5):
+                seat_counts = [sum(order[seat] == agent for _, order in tables) for seat in range(4)]
+                assert seat_counts == [seat_counts[0]] * 4 and seat_counts[0] > 0
+
+    def test_schedule(self):
+        league = LeagueScheduler(self.agent_specs, 2, seat_orders=LeagueScheduler.ROTATIONS, base_seed=4)
+        schedule = league.schedule()
+        assert league.games == len(schedule) == 8
+        assert [game_number for game_number, _, _ in schedule] == list(range(8))
+        # Todos los órdenes de asientos juegan con las mismas semillas
+        assert [seed for _, seed, _ in schedule] == [game_seed(4, 0), game_seed(4, 1)] * 4
+        assert schedule[2][2] == self.agent_specs[1:] + self.agent_specs[:1]
+
+        with pytest.raises(ValueError):
+            LeagueScheduler(self.agent_specs[:3])
+        with pytest.raises(ValueError):
+            LeagueScheduler(self.agent_specs + self.agent_specs[:1])
+        with pytest.raises(ValueError):
+            LeagueScheduler(self.agent_specs, seat_orders='random')
+
+    def test_league_results(self):
+        league = LeagueScheduler(self.agent_specs, 2, seat_orders=LeagueScheduler.ROTATIONS, workers=2,
+                                 executor='thread', max_rounds=100)
+        summaries = list(league.results())
+        stats = league.aggregate(summaries, 1.0)
+        assert stats['games'] == 8 and stats['games_played'] == [8] * 4
+        assert stats['agent_seat_games'] == [[2] * 4] * 4
+        assert sum(stats['seat_wins']) + stats['no_winner'] == 8 == sum(stats['wins']) + stats['no_winner']
+        for agent in range(4):
+            low, high = stats['win_rate_intervals'][agent]
+            assert low <= stats['win_rates'][agent] <= high
+
+        # La primera mesa es la misma partida que la del TournamentRunner con esos asientos
+        runner = TournamentRunner(self.agent_specs, 2, max_rounds=100)
+        first_table = sorted((summary for summary in summaries if summary['game_number'] < 2),
+                             key=lambda summary: summary['game_number'])
+        for league_summary, runner_summary in zip(first_table, sorted(runner.results(),
+                                                                      key=lambda summary: summary['game_number'])):
+            assert league_summary['winner'] == runner_summary['winner']
+            assert league_summary['victory_points'] == runner_summary['victory_points']
+
+    def test_aggregate(self):
+        league = LeagueScheduler(self.agent_specs, 1, seat_orders=LeagueScheduler.ROTATIONS)
+        latency = {'calls': 10, 'total_time': 1.0, 'max_time': 0.2, 'timeouts': {}}
+        # Gana siempre el asiento 0, salvo en la última partida, que no tiene ganador
+        summaries = [{'game_number': game_number, 'winner': 0 if game_number < 3 else -1, 'rounds': 10,
+                      'agent_latency': [latency] * 4} for game_number in range(4)]
+        stats = league.aggregate(summaries, 2.0)
+        assert stats['wins'] == [1, 1, 1, 0]
+        assert stats['seat_wins'] == [3, 0, 0, 0]
+        assert stats['seat_win_rates'] == [0.75, 0.0, 0.0, 0.0]
+        assert stats['agent_seat_wins'][1] == [1, 0, 0, 0]
+        assert stats['agent_seat_win_rates'][3] == [0.0, 0.0, 0.0, 0.0]
+        assert stats['no_winner'] == 1
+        assert stats['average_latency'] == [0.1] * 4
+        assert stats['seat_win_rate_intervals'][0] == wilson_interval(3, 4)
+
+
+if __name__ == '__main__':
+    test = TestLeagueScheduler()
+    test.test_wilson_interval()
+    test.test_league_tables()
+    test.test_schedule()
+    test.test_league_results()
+    test.test_aggregate()
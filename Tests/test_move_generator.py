@@ -0,0 +1,62 @@
+from Classes.Board import Board
+from Classes.Constants import *
+from Classes.Hand import Hand
+from Classes.MoveGenerator import MoveGenerator
+
+
+class TestMoveGenerator:
+    def test_cached_moves(self):
+        board = Board()
+        moves = board.moves
+        board.nodes[0]['player'] = 0
+        board.build_road(0, 0, 1)
+
+        # Mientras no cambie el tablero se reutiliza lo calculado
+        roads = moves.roads(0)
+        assert roads == board.valid_road_nodes(0)
+        assert moves.cache[(moves.ROAD, 0)][0] == board.version
+
+        # Modificar lo devuelto no cambia la caché
+        roads[0]['starting_node'] = 53
+        roads.append({'starting_node': 52, 'finishing_node': 53})
+        assert moves.roads(0) == board.valid_road_nodes(0) != roads
+
+        # Al construir cambia la versión y se recalcula
+        board.build_road(0, 1, 2)
+        assert {'starting_node': 2, 'finishing_node': 3} in moves.roads(0)
+        assert moves.towns(0) == [2]
+        assert moves.cities(0) == [0]
+        assert 0 not in moves.starting_towns() and 1 not in moves.starting_towns()
+        return
+
+    def test_legal_moves(self):
+        board = Board()
+        board.nodes[0]['player'] = 0
+        board.build_road(0, 0, 1)
+        board.build_road(0, 1, 2)
+
+        legal_moves = board.moves.legal_moves(0)
+        assert legal_moves[BuildConstants.ROAD] == board.valid_road_nodes(0)
+        assert legal_moves[BuildConstants.TOWN] == [2]
+        assert legal_moves[BuildConstants.CITY] == [0]
+        assert legal_moves[BuildConstants.CARD] is True
+
+        # Con la mano solo quedan las jugadas que se pueden pagar
+        hand = Hand()
+        hand.add_material([MaterialConstants.CLAY, MaterialConstants.WOOD], 1)
+        legal_moves = board.moves.legal_moves(0, hand, cards_left=False)
+        assert legal_moves[BuildConstants.ROAD] == board.valid_road_nodes(0)
+        assert legal_moves[BuildConstants.TOWN] == [] and legal_moves[BuildConstants.CITY] == []
+        assert legal_moves[BuildConstants.CARD] is False
+
+        # Los agentes usan la misma caché desde su vista del tablero
+        board.moves.cache.clear()
+        assert board.get_view().moves.roads(0) == board.valid_road_nodes(0)
+        assert (MoveGenerator.ROAD, 0) in board.moves.cache
+        return
+
+
+if __name__ == '__main__':
+    test = TestMoveGenerator()
+    test.test_cached_moves()
+    test.test_legal_moves()
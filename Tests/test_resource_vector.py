@@ -0,0 +1,62 @@
+from Classes.Constants import BuildConstants, MaterialConstants
+from Classes.Hand import Hand
+from Classes.Materials import Materials
+from Classes.ResourceVector import ResourceVector
+
+
+class TestResourceVector:
+    def test_in_place_operations(self):
+        vector = ResourceVector(1, 2, 3, 4, 5)
+        amounts = vector.amounts
+
+        # Sumar y restar modifica el propio vector y ningún material baja de 0
+        vector.add_from_id_in_place([MaterialConstants.CEREAL, MaterialConstants.CEREAL, MaterialConstants.WOOL], 2)
+        assert vector == Materials(5, 2, 3, 4, 7) and vector.amounts is amounts
+        vector.subtract(Materials(1, 3, 0, 0, 0))
+        assert vector == [4, 0, 3, 4, 7]
+        vector.add(Materials(0, 1, 0, 0, 0))
+        assert vector.mineral == 1 and vector.get_from_id(MaterialConstants.MINERAL) == 1
+
+        # El desierto (-1) no es un material y se ignora
+        vector.add_from_id_in_place([-1, MaterialConstants.CLAY], 1)
+        assert vector == [4, 1, 4, 4, 7]
+
+        # Las operaciones de Materials siguen devolviendo un vector nuevo
+        added = vector.add_from_id(MaterialConstants.WOOD, 1)
+        assert added.wood == 5 and vector.wood == 4
+        assert vector + Materials(1, 1, 1, 1, 1) == [5, 2, 5, 5, 8]
+        assert vector.to_materials() == Materials(4, 1, 4, 4, 7)
+
+    def test_comparisons(self):
+        vector = ResourceVector(1, 0, 1, 1, 1)
+
+        # Las comparaciones devuelven bool
+        assert (vector == Materials(1, 0, 1, 1, 1)) is True
+        assert (vector == Materials(1, 0, 1, 1, 2)) is False
+        assert vector != ResourceVector(0, 0, 0, 0, 0)
+        assert (Materials(0, 0, 0, 0, 0) == Materials(1, 0, 0, 0, 0)) is False
+
+        # Orden parcial por componentes
+        assert Materials(0, 0, 1, 1, 0) <= vector and vector >= Materials(0, 0, 1, 1, 0)
+        assert Materials(0, 0, 1, 1, 0) < vector and not vector < vector
+        assert not vector <= Materials(2, 3, 0, 0, 0) and not vector >= Materials(2, 3, 0, 0, 0)
+
+    def test_can_afford(self):
+        hand = Hand()
+        hand.add_material([MaterialConstants.CEREAL, MaterialConstants.CLAY, MaterialConstants.WOOD,
+                           MaterialConstants.WOOL], 1)
+
+        for building in (BuildConstants.TOWN, BuildConstants.CITY, BuildConstants.ROAD, BuildConstants.CARD):
+            expected = Materials(1, 0, 1, 1, 1).has_more(building)
+            assert hand.resources.can_afford(building) == hand.resources.has_more(building) == expected
+
+        assert not hand.resources.can_afford('castle')
+        assert not hand.resources.has_more(Materials(1, 0, -1, 1, 1))
+        assert hand.resources.has_more(Materials(1, 0, 1, 0, 0))
+
+
+if __name__ == '__main__':
+    test = TestResourceVector()
+    test.test_in_place_operations()
+    test.test_comparisons()
+    test.test_can_afford()
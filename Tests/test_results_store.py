@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from Agents.AdrianHerasAgent import AdrianHerasAgent
+from Agents.RandomAgent import RandomAgent
+from Classes.Constants import TraceLevelConstants
+from Managers.GameDirector import GameDirector
+from Managers.TournamentRunner import SEED_LIMIT, TournamentRunner, game_seed
+from TraceLoader.ResultsStore import ResultsStore
+
+
+class TestResultsStore:
+    agents = (RandomAgent, AdrianHerasAgent, RandomAgent, RandomAgent)
+
+    def play(self, results_store, seeds, agents=None):
+        game_director = GameDirector(agents=agents or self.agents, max_rounds=100,
+                                     trace_level=TraceLevelConstants.NONE, results_store=results_store)
+        return [game_director.game_start(game_number, False, seed=seed) for game_number, seed in enumerate(seeds)]
+
+    def test_append_and_read(self, tmp_path):
+        results_store = ResultsStore(tmp_path)
+        summaries = self.play(results_store, [5, 6, 7])
+        results_store.close()
+
+        records, agent_names = ResultsStore.read(tmp_path)
+        assert agent_names == ['RandomAgent', 'AdrianHerasAgent']
+        assert len(records) == 3 and records.dtype.itemsize == ResultsStore.RECORD.size
+        assert list(records['seed']) == [5, 6, 7]
+        for record, summary in zip(records, summaries):
+            assert [agent_names[agent] for agent in record['agents']] == summary['agents']
+            assert record['game_number'] == summary['game_number']
+            assert record['winner'] == summary['winner']
+            assert list(record['victory_points']) == summary['victory_points']
+            assert record['largest_army'] == summary['largest_army']
+            assert record['longest_road'] == summary['longest_road']
+            assert record['rounds'] == summary['rounds']
+            assert record['max_rounds_reached'] == summary['max_rounds_reached']
+            assert record['wall_time'] > 0
+
+    def test_shards_and_merge(self, tmp_path):
+        # Cada escritor tiene su shard y su lista de agentes, al leer se juntan
+        first_store, second_store = ResultsStore(tmp_path), ResultsStore(tmp_path)
+        self.play(first_store, [1, 2])
+        self.play(second_store, [3], agents=(AdrianHerasAgent, AdrianHerasAgent, RandomAgent, AdrianHerasAgent))
+        first_store.close()
+        second_store.close()
+        assert len(ResultsStore.shards(tmp_path)) == 2
+
+        records, agent_names = ResultsStore.read(tmp_path)
+        assert sorted(records['seed']) == [1, 2, 3]
+        third_game = records[records['seed'] == 3][0]
+        assert [agent_names[agent] for agent in third_game['agents']] == ['AdrianHerasAgent', 'AdrianHerasAgent',
+                                                                          'RandomAgent', 'AdrianHerasAgent']
+
+        merged_shard = ResultsStore.merge(tmp_path)
+        assert ResultsStore.shards(tmp_path) == [merged_shard]
+        merged_records, merged_agent_names = ResultsStore.read(tmp_path)
+        assert merged_agent_names == agent_names
+        assert np.array_equal(merged_records, records)
+
+    def test_unfinished_record(self, tmp_path):
+        results_store = ResultsStore(tmp_path)
+        self.play(results_store, [1, 2])
+        # El proceso muere a mitad de escribir la segunda partida
+        results_store.shard.truncate(len(ResultsStore.MAGIC) + ResultsStore.RECORD.size + 10)
+        results_store.close()
+        records, _ = ResultsStore.read(tmp_path)
+        assert list(records['seed']) == [1]
+        assert len(ResultsStore.read(tmp_path / 'empty')[0]) == 0
+
+    def test_tournament_runner(self, tmp_path):
+        runner = TournamentRunner(['RandomAgent.RandomAgent'] * 4, 6, base_seed=2, workers=2, executor='process',
+                                  max_rounds=100, results_path=str(tmp_path))
+        summaries = {summary['game_number']: summary for summary in runner.results()}
+        records, _ = ResultsStore.read(tmp_path)
+        assert sorted(records['game_number']) == list(range(6))
+        for record in records:
+            assert record['seed'] == game_seed(2, record['game_number'])
+            assert record['winner'] == summaries[record['game_number']]['winner']
+
+    def test_large_seeds(self, tmp_path):
+        # Con la mayor semilla base, las semillas de las partidas ocupan los 64 bits del registro
+        runner = TournamentRunner(['RandomAgent.RandomAgent'] * 4, 2, base_seed=SEED_LIMIT - 1, max_rounds=100,
+                                  results_path=str(tmp_path))
+        runner.run()
+        records, _ = ResultsStore.read(tmp_path)
+        assert sorted(int(seed) for seed in records['seed']) == [game_seed(SEED_LIMIT - 1, 0),
+                                                                  game_seed(SEED_LIMIT - 1, 1)]
+        assert ResultsStore.encode_seed(-5) == 5
+        with pytest.raises(ValueError):
+            ResultsStore.encode_seed(2 ** 64)
+
+
+if __name__ == '__main__':
+    import pathlib
+    import tempfile
+
+    test = TestResultsStore()
+    for test_name in ('test_append_and_read', 'test_shards_and_merge', 'test_unfinished_record',
+                      'test_tournament_runner', 'test_large_seeds'):
+        with tempfile.TemporaryDirectory() as directory:
+            getattr(test, test_name)(pathlib.Path(directory))
@@ -0,0 +1,168 @@
+import os
+import time
+
+import pytest
+
+from Agents.AdrianHerasAgent import AdrianHerasAgent
+from Agents.AlexPastorAgent import AlexPastorAgent
+from Agents.RandomAgent import RandomAgent
+from Classes.Board import Board
+from Classes.Constants import TraceLevelConstants
+from Classes.DevelopmentCards import DevelopmentCard, DevelopmentCardsHand
+from Classes.Hand import Hand
+from Classes.SandboxProtocol import SandboxProtocol
+from Classes.SandboxedAgent import SandboxedAgent
+from Classes.TrackedRandom import TrackedRandom
+from Interfaces.AsyncAgentInterface import AsyncAgentInterface
+from Managers.GameDirector import GameDirector
+
+
+class CrashingAgent(RandomAgent):
+    """
+    Agente cuyo proceso muere en su primera fase de construcción
+    """
+
+    def on_build_phase(self, board_instance):
+        os._exit(1)
+
+
+class FailingAgent(RandomAgent):
+    """
+    Agente que lanza una excepción en cada fase de comercio
+    """
+
+    def on_commerce_phase(self):
+        raise ZeroDivisionError('comercio')
+
+
+class HungAgent(RandomAgent):
+    """
+    Agente que se cuelga en su primera fase de comercio
+    """
+
+    def on_commerce_phase(self):
+        time.sleep(3600)
+
+
+class TestSandboxedAgent:
+    max_rounds = 60
+
+    def play(self, agents, seeds, time_budgets=None):
+        game_director = GameDirector(agents=agents, max_rounds=self.max_rounds, trace_level=TraceLevelConstants.FULL,
+                                     time_budgets=time_budgets)
+        return [game_director.game_start(seed, False, seed=seed) for seed in seeds]
+
+    def test_protocol(self):
+        engine, worker = SandboxProtocol(), SandboxProtocol()
+        board, hand, development_cards, rng = Board(), Hand(), [], TrackedRandom(3)
+        copy, copy_hand, copy_development_cards, copy_rng = Board(), Hand(), DevelopmentCardsHand(), TrackedRandom()
+
+        board.set_node_player(10, 1)
+        board.set_node_player(20, 2)
+        board.set_node_city(20, True)
+        board.add_road(1, 10, 11)
+        board.add_road(2, 20, 21)
+        board.add_road(1, 11, 12)
+        board.set_thief(4, True)
+        hand.add_material([0, 1, 1, 4], 2)
+        development_cards.append(DevelopmentCard(0, 0))
+        rng.random()
+
+        message = engine.encode_call('on_build_phase', board, hand, development_cards, rng, (board.get_view(),))
+        trigger, args = worker.decode_call(message, copy, copy_hand, copy_development_cards, copy_rng)
+        assert trigger == 'on_build_phase' and len(args) == 1 and args[0] is copy.get_view()
+        assert copy.export_nodes() == board.export_nodes() and copy.export_terrain() == board.export_terrain()
+        assert copy_hand.resources.amounts == hand.resources.amounts
+        assert [(card.type, card.effect) for card in copy_development_cards.hand] == [(0, 0)]
+        assert copy_rng.getstate() == rng.getstate()
+
+        # Sin cambios solo se envía la cabecera
+        message = engine.encode_call('on_turn_start', board, hand, development_cards, rng, ())
+        assert len(message) == SandboxProtocol.CALL_HEADER.size
+        worker.decode_call(message, copy, copy_hand, copy_development_cards, copy_rng)
+
+        # El agente descarta, usa el generador y juega su carta: la mano y el generador vuelven al motor
+        copy_hand.remove_material(1, 2)
+        copy_rng.randint(0, 10)
+        response = worker.encode_response(copy_development_cards.hand[0], None, copy_hand,
+                                          copy_development_cards.hand, copy_rng)
+        assert len(response) < 40
+        card, error = engine.decode_response(response, hand, development_cards, rng)
+        assert card is development_cards[0] and error is None
+        assert hand.resources.amounts == copy_hand.resources.amounts
+        assert rng.getstate() == copy_rng.getstate()
+
+        # Un cambio pequeño se envía en unos pocos bytes
+        board.add_road(1, 12, 13)
+        message = engine.encode_call('on_trade_offer', board, hand, development_cards, rng, (board.get_view(), None, 2))
+        assert worker.decode_call(message, copy, copy_hand, copy_development_cards, copy_rng)[1][1:] == (None, 2)
+        assert copy.export_nodes() == board.export_nodes()
+        assert len(message) < 40
+
+    def test_same_games(self):
+        # La partida es la misma con los agentes en otros procesos
+        agents = (RandomAgent, AdrianHerasAgent, AlexPastorAgent, RandomAgent)
+        sandboxed_agents = tuple(SandboxedAgent.wrap(agent) for agent in agents)
+        try:
+            assert self.play(sandboxed_agents, range(3)) == self.play(agents, range(3))
+        finally:
+            SandboxedAgent.close_all()
+        stats = sandboxed_agents[1].stats[1]
+        assert stats['calls'] > 0 and stats['errors'] == stats['crashes'] == 0
+        assert stats['bytes_sent'] / stats['calls'] < 500
+
+    def test_crashing_agent(self):
+        crashing_agent = SandboxedAgent.wrap(CrashingAgent)
+        try:
+            traces = self.play((crashing_agent, RandomAgent, RandomAgent, RandomAgent), range(2))
+        finally:
+            SandboxedAgent.close_all()
+        # Las partidas terminan sin que el agente construya nada, y en cada una se le arranca un proceso nuevo
+        for trace in traces:
+            for round_object in trace['game'].values():
+                assert round_object['turn_P0']['build_phase'] in ([], [{'building': 'None'}])
+        assert crashing_agent.stats[0]['crashes'] == 2
+
+    def test_failing_agent(self):
+        failing_agent = SandboxedAgent.wrap(FailingAgent)
+        try:
+            game_director = GameDirector(agents=(failing_agent, RandomAgent, RandomAgent, RandomAgent),
+                                         max_rounds=self.max_rounds, trace_level=TraceLevelConstants.NONE)
+            game_director.game_start(0, False, seed=0)
+            agent = game_director.game_manager.agent_manager.players[0]['player']
+        finally:
+            SandboxedAgent.close_all()
+        assert failing_agent.stats[0]['errors'] == game_director.last_summary['rounds']
+        assert failing_agent.stats[0]['crashes'] == 0
+        assert 'ZeroDivisionError: comercio' in agent.last_error
+
+    def test_hung_agent(self):
+        hung_agent = SandboxedAgent.wrap(HungAgent)
+        start = time.perf_counter()
+        try:
+            traces = self.play((hung_agent, RandomAgent, RandomAgent, RandomAgent), range(2),
+                               time_budgets={'on_commerce_phase': 0.2})
+        finally:
+            SandboxedAgent.close_all()
+        assert time.perf_counter() - start < 60
+        # El proceso colgado se mata en la siguiente llamada y se arranca otro en la siguiente partida
+        assert hung_agent.stats[0]['crashes'] == 2
+        assert all(trace['game'] for trace in traces)
+
+    def test_wrap(self):
+        with pytest.raises(ValueError):
+            SandboxedAgent.wrap(AsyncAgentInterface)
+        with pytest.raises(ValueError):
+            SandboxedAgent.wrap(SandboxedAgent.wrap(RandomAgent))
+        with pytest.raises(ValueError):
+            SandboxedAgent.wrap(Board)
+
+
+if __name__ == '__main__':
+    test = TestSandboxedAgent()
+    test.test_protocol()
+    test.test_same_games()
+    test.test_crashing_agent()
+    test.test_failing_agent()
+    test.test_hung_agent()
+    test.test_wrap()
@@ -0,0 +1,82 @@
+import math
+
+import pytest
+
+from Managers.SequentialTournament import SequentialTournament
+from Managers.TournamentRunner import game_seed
+
+
+class TestSequentialTournament:
+    max_rounds = 200
+
+    def test_log_likelihood_ratio(self):
+        tournament = SequentialTournament('RandomAgent.RandomAgent', 'BuilderAgent.BuilderAgent', alpha=0.05, beta=0.1)
+        assert tournament.upper_bound == pytest.approx(math.log(0.9 / 0.05))
+        assert tournament.lower_bound == pytest.approx(math.log(0.1 / 0.95))
+        assert tournament.log_likelihood_ratio(1, 1) == pytest.approx(math.log(0.3 / 0.25))
+        assert tournament.log_likelihood_ratio(0, 1) == pytest.approx(math.log(0.7 / 0.75))
+        # Ganar 1 de cada 4 partidas es evidencia de que el candidato es igual que el agente base
+        assert tournament.log_likelihood_ratio(25, 100) < 0
+        assert tournament.decision(3.0) == SequentialTournament.ACCEPTED
+        assert tournament.decision(-2.3) == SequentialTournament.REJECTED
+        assert tournament.decision(0.0) is None
+        assert tournament.fixed_sample_games() > 500
+
+        with pytest.raises(ValueError):
+            SequentialTournament('RandomAgent.RandomAgent', 'BuilderAgent.BuilderAgent', delta=0.8)
+        with pytest.raises(ValueError):
+            SequentialTournament('RandomAgent.RandomAgent', 'BuilderAgent.BuilderAgent', queue='queue.db')
+
+    def test_schedule(self):
+        tournament = SequentialTournament('RandomAgent.RandomAgent', 'BuilderAgent.BuilderAgent', max_games=10,
+                                          batch_size=6, base_seed=3)
+        schedule = tournament.schedule()
+        assert tournament.games == len(schedule) == 12 and tournament.batch_size == 8
+        # El candidato pasa por los 4 asientos, y cada partida tiene su semilla para que sean independientes
+        assert len({seed for _, seed, _ in schedule}) == len(schedule)
+        for game_number, seed, agent_specs in schedule:
+            assert seed == game_seed(3, game_number)
+            assert agent_specs.index('RandomAgent.RandomAgent') == game_number % 4
+            assert agent_specs.count('BuilderAgent.BuilderAgent') == 3
+
+    def test_stops_early(self):
+        # Un agente mucho mejor o mucho peor se decide en pocos lotes
+        better = SequentialTournament('BuilderAgent.BuilderAgent', 'RandomAgent.RandomAgent', max_games=2000,
+                                      max_rounds=self.max_rounds)
+        stats = better.run()
+        assert stats['result'] == SequentialTournament.ACCEPTED
+        assert stats['games'] % better.batch_size == 0 and stats['games'] < 200
+        assert stats['llr'] >= stats['upper_bound']
+
+        worse = SequentialTournament('RandomAgent.RandomAgent', 'BuilderAgent.BuilderAgent', max_games=2000,
+                                     max_rounds=self.max_rounds)
+        stats = worse.run()
+        assert stats['result'] == SequentialTournament.REJECTED
+        assert stats['games'] < stats['fixed_sample_games']
+        low, high = stats['win_rate_interval']
+        assert high < SequentialTournament.P0
+
+    def test_inconclusive(self):
+        tournament = SequentialTournament('RandomAgent.RandomAgent', 'RandomAgent.RandomAgent', max_games=8,
+                                          max_rounds=self.max_rounds)
+        stats = tournament.run()
+        assert stats['result'] == SequentialTournament.INCONCLUSIVE
+        assert stats['games'] == 8 and stats['decided_games'] + stats['no_winner'] == 8
+
+    def test_workers_give_same_decision(self):
+        stats = []
+        for workers in (1, 2):
+            tournament = SequentialTournament('RandomAgent.RandomAgent', 'BuilderAgent.BuilderAgent', max_games=2000,
+                                              max_rounds=self.max_rounds, workers=workers, executor='thread')
+            stats.append(tournament.run())
+        for key in ('result', 'games', 'wins', 'decided_games', 'llr', 'seat_wins'):
+            assert stats[0][key] == stats[1][key]
+
+
+if __name__ == '__main__':
+    test = TestSequentialTournament()
+    test.test_log_likelihood_ratio()
+    test.test_schedule()
+    test.test_stops_early()
+    test.test_inconclusive()
+    test.test_workers_give_same_decision()
@@ -0,0 +1,201 @@
+import json
+import sqlite3
+import time
+
+import pytest
+
+from Classes.Constants import TraceLevelConstants
+from Managers.LeagueScheduler import LeagueScheduler
+from Managers.TournamentQueue import TournamentQueue
+from Managers.TournamentRunner import TournamentRunner, game_seed
+
+
+class TestTournamentQueue:
+    agent_specs = ['RandomAgent.RandomAgent', 'AdrianHerasAgent.AdrianHerasAgent',
+                   'RandomAgent.RandomAgent', 'AlexPastorAgent.AlexPastorAgent']
+
+    @staticmethod
+    def without_latency(summaries):
+        # Los tiempos de respuesta de los agentes cambian en cada ejecución, el resto del resultado no
+        return sorted(({key: value for key, value in summary.items() if key != 'agent_latency'}
+                       for summary in summaries), key=lambda summary: summary['game_number'])
+
+    def test_add_games(self, tmp_path):
+        tournament_queue = TournamentQueue(tmp_path / 'queue.db')
+        games = [(game_number, game_seed(0, game_number)) for game_number in range(5)]
+        assert tournament_queue.add_games(self.agent_specs, games) == 5
+        # Las partidas que ya están no se vuelven a añadir, con otro orden de asientos son otras partidas
+        assert tournament_queue.add_games(self.agent_specs, games[:3] + [(5, game_seed(0, 5))]) == 1
+        assert tournament_queue.add_games(self.agent_specs[::-1], games) == 5
+        assert tournament_queue.progress(self.agent_specs) == {'pending': 6, 'claimed': 0, 'done': 0, 'failed': 0}
+        assert tournament_queue.progress() == {'pending': 11, 'claimed': 0, 'done': 0, 'failed': 0}
+
+    def test_claim_and_complete(self, tmp_path):
+        tournament_queue = TournamentQueue(tmp_path / 'queue.db')
+        other_queue = TournamentQueue(tmp_path / 'queue.db')
+        tournament_queue.add_games(self.agent_specs, [(game_number, game_number) for game_number in range(4)])
+
+        # Dos trabajadores nunca reservan la misma partida
+        first = tournament_queue.claim('first', 3, self.agent_specs)
+        second = other_queue.claim('second', 3, self.agent_specs)
+        assert [job['game_number'] for job in first] == [0, 1, 2]
+        assert [job['game_number'] for job in second] == [3]
+        assert first[0]['agents'] == self.agent_specs
+        assert tournament_queue.claim('first', 3, self.agent_specs[::-1]) == []
+
+        assert tournament_queue.complete('first', first[0]['id'], {'game_number': 0})
+        assert not other_queue.complete('second', first[0]['id'], {'game_number': 99})
+        tournament_queue.release('first', first[1]['id'], 'error')
+        assert tournament_queue.progress() == {'pending': 1, 'claimed': 2, 'done': 1, 'failed': 0}
+        assert tournament_queue.results() == [{'game_number': 0}]
+        assert [job['game_number'] for job in other_queue.claim('second', 3)] == [1]
+
+    def test_stale_claims(self, tmp_path):
+        tournament_queue = TournamentQueue(tmp_path / 'queue.db', stale_timeout=0.2)
+        tournament_queue.add_games(self.agent_specs, [(0, 0), (1, 1)])
+        tournament_queue.claim('dead', 1)
+        tournament_queue.claim('alive', 1)
+        time.sleep(0.3)
+        tournament_queue.heartbeat('alive')
+        # La reserva del trabajador que no la renueva vuelve a la cola, la del otro no
+        assert [job['game_number'] for job in tournament_queue.claim('new', 2)] == [0]
+        # El trabajador muerto puede volver y terminarla, se queda el primer resultado
+        assert tournament_queue.complete('dead', 1, {'game_number': 0})
+        assert not tournament_queue.complete('new', 1, {'game_number': 0})
+
+    def test_resume(self, tmp_path):
+        queue_path = str(tmp_path / 'queue.db')
+        expected = self.without_latency(TournamentRunner(self.agent_specs, 8, base_seed=2, max_rounds=100).results())
+
+        # Se para el torneo a la mitad: las partidas terminadas se guardan y las que estaban en juego vuelven a la cola
+        runner = TournamentRunner(self.agent_specs, 8, base_seed=2, max_rounds=100, workers=2, executor='thread',
+                                  queue=queue_path)
+        results = runner.results()
+        first_results = [next(results) for _ in range(3)]
+        results.close()
+        progress = TournamentQueue(queue_path).progress()
+        assert progress['done'] >= 3 and progress['claimed'] == 0
+
+        # Al seguirlo se juegan solo las que faltan y se devuelven todas
+        runner = TournamentRunner(self.agent_specs, 8, base_seed=2, max_rounds=100, queue=queue_path)
+        resumed_results = list(runner.results())
+        assert self.without_latency(resumed_results) == expected
+        assert self.without_latency(resumed_results[:3]) == self.without_latency(first_results)
+        assert TournamentQueue(queue_path).progress() == {'pending': 0, 'claimed': 0, 'done': 8, 'failed': 0}
+
+    def test_process_workers(self, tmp_path):
+        runner = TournamentRunner(self.agent_specs, 6, base_seed=5, max_rounds=100, workers=2, executor='process',
+                                  queue=str(tmp_path / 'queue.db'), trace_level=TraceLevelConstants.NONE)
+        expected = self.without_latency(TournamentRunner(self.agent_specs, 6, base_seed=5, max_rounds=100).results())
+        assert self.without_latency(runner.results()) == expected
+
+    def test_completed_results(self, tmp_path):
+        tournament_queue = TournamentQueue(tmp_path / 'queue.db')
+        tournament_queue.add_games(self.agent_specs, [(0, 0), (1, 1), (2, 2)])
+        tournament_queue.add_games(self.agent_specs[::-1], [(0, 0)])
+        jobs = tournament_queue.claim('worker', 4)
+        for job in (jobs[2], jobs[3], jobs[0]):
+            tournament_queue.complete('worker', job['id'], {'game_number': job['game_number'], 'id': job['id']})
+
+        # Los resultados llegan en el orden en el que se han terminado, y solo los nuevos
+        results, last = tournament_queue.completed_results(tables=[self.agent_specs])
+        assert [result['id'] for result in results] == [jobs[2]['id'], jobs[0]['id']]
+        assert tournament_queue.completed_results(last, tables=[self.agent_specs]) == ([], last)
+        tournament_queue.complete('worker', jobs[1]['id'], {'game_number': 1})
+        assert tournament_queue.completed_results(last, self.agent_specs)[0] == [{'game_number': 1}]
+        assert len(tournament_queue.completed_results(tables=[self.agent_specs, self.agent_specs[::-1]])[0]) == 4
+        assert tournament_queue.progress(tables=[self.agent_specs[::-1]]) == {'pending': 0, 'claimed': 0, 'done': 1, 'failed': 0}
+
+    def test_other_tournaments(self, tmp_path):
+        # Otro torneo en la misma cola, con partidas pendientes y una terminada con el mismo número y semilla
+        queue_path = str(tmp_path / 'queue.db')
+        league = LeagueScheduler(self.agent_specs[1:] + ['BuilderAgent.BuilderAgent'],
+                                 seat_orders=LeagueScheduler.ROTATIONS, max_rounds=50, queue=queue_path)
+        other_specs = ['BuilderAgent.BuilderAgent'] * 4
+        tournament_queue = TournamentQueue(queue_path)
+        tournament_queue.add_games(other_specs, [league.schedule()[0][:2], (1, 11), (2, 12), (3, 13)])
+        job = tournament_queue.claim('other', 1, other_specs)[0]
+        tournament_queue.complete('other', job['id'], {'game_number': job['game_number'], 'seed': job['seed'],
+                                                       'other': True})
+
+        summaries = list(league.results())
+        assert len(summaries) == 4 and not any(summary.get('other') for summary in summaries)
+        assert tournament_queue.progress(other_specs) == {'pending': 3, 'claimed': 0, 'done': 1, 'failed': 0}
+
+    def test_failing_game(self, tmp_path):
+        queue_path = str(tmp_path / 'queue.db')
+        runner = TournamentRunner(self.agent_specs, 2, max_rounds=100, queue=queue_path)
+        runner.max_rounds = 'many'
+        with pytest.raises(TypeError):
+            list(runner.results())
+        # La partida que falla vuelve a la cola con su error
+        tournament_queue = TournamentQueue(queue_path)
+        assert tournament_queue.progress() == {'pending': 2, 'claimed': 0, 'done': 0, 'failed': 0}
+        errors = [error for error, in tournament_queue.connection.execute('SELECT error FROM games') if error]
+        assert errors and all('TypeError' in error for error in errors)
+
+    def test_settings(self, tmp_path):
+        queue_path = str(tmp_path / 'queue.db')
+        TournamentRunner(self.agent_specs, 4, max_rounds=100, queue=queue_path).run()
+        # Con otros ajustes las partidas son otras y se vuelven a jugar, no se devuelven las de los ajustes anteriores
+        runner = TournamentRunner(self.agent_specs, 4, max_rounds=10, queue=queue_path)
+        summaries = self.without_latency(runner.results())
+        assert summaries == self.without_latency(TournamentRunner(self.agent_specs, 4, max_rounds=10).results())
+        assert all(summary['rounds'] <= 10 for summary in summaries)
+        tournament_queue = TournamentQueue(queue_path)
+        assert tournament_queue.progress() == {'pending': 0, 'claimed': 0, 'done': 8, 'failed': 0}
+        assert tournament_queue.progress(settings=runner.queue_settings()) == {'pending': 0, 'claimed': 0, 'done': 4, 'failed': 0}
+
+    def test_old_queue(self, tmp_path):
+        # Cola de antes de settings y completed, con una partida terminada
+        connection = sqlite3.connect(tmp_path / 'queue.db')
+        connection.execute("CREATE TABLE games (id INTEGER PRIMARY KEY, agents TEXT NOT NULL, seed INTEGER NOT NULL, "
+                           "game_number INTEGER NOT NULL, status TEXT NOT NULL DEFAULT 'pending', worker TEXT, "
+                           "heartbeat REAL, attempts INTEGER NOT NULL DEFAULT 0, result TEXT, error TEXT, "
+                           "UNIQUE (agents, seed))")
+        connection.execute("INSERT INTO games (agents, seed, game_number, status, result) VALUES (?, 0, 0, 'done', ?)",
+                           (json.dumps(self.agent_specs), json.dumps({'game_number': 0})))
+        connection.commit()
+        connection.close()
+
+        tournament_queue = TournamentQueue(tmp_path / 'queue.db')
+        assert tournament_queue.results(self.agent_specs, settings='') == [{'game_number': 0}]
+        assert tournament_queue.completed_results(settings='') == ([{'game_number': 0}], 1)
+        assert tournament_queue.add_games(self.agent_specs, [(0, 0)], 'settings') == 1
+
+    def test_max_attempts(self, tmp_path):
+        tournament_queue = TournamentQueue(tmp_path / 'queue.db', stale_timeout=0.1, max_attempts=2)
+        tournament_queue.add_games(self.agent_specs, [(0, 0), (1, 1), (2, 2)])
+        # La partida 0 mata a su trabajador cada vez, la 1 falla cada vez y la 2 se devuelve sin error al parar
+        for worker in ('first', 'second'):
+            jobs = tournament_queue.claim(worker, 3)
+            tournament_queue.release(worker, jobs[1]['id'], 'RuntimeError')
+            tournament_queue.release(worker, jobs[2]['id'])
+            time.sleep(0.2)
+        assert [job['game_number'] for job in tournament_queue.claim('third', 3)] == [2]
+        assert tournament_queue.progress() == {'pending': 0, 'claimed': 1, 'done': 0, 'failed': 2}
+        errors = dict(tournament_queue.connection.execute('SELECT game_number, error FROM games WHERE status = ?',
+                                                          (TournamentQueue.FAILED,)))
+        assert errors == {0: 'Reserva caducada de second', 1: 'RuntimeError'}
+
+        # El torneo termina sin las partidas fallidas
+        queue_path = str(tmp_path / 'runner.db')
+        runner = TournamentRunner(self.agent_specs, 3, max_rounds=100, queue=queue_path, max_attempts=1)
+        tournament_queue = TournamentQueue(queue_path, max_attempts=1)
+        tournament_queue.add_games(self.agent_specs, [(1, game_seed(0, 1))], runner.queue_settings())
+        job = tournament_queue.claim('crashed', 1)[0]
+        tournament_queue.release('crashed', job['id'], 'RuntimeError')
+        assert sorted(summary['game_number'] for summary in runner.results()) == [0, 2]
+        assert runner.failed_games == 1
+
+
+if __name__ == '__main__':
+    import pathlib
+    import tempfile
+
+    test = TestTournamentQueue()
+    for test_name in ('test_add_games', 'test_claim_and_complete', 'test_stale_claims', 'test_resume',
+                      'test_process_workers', 'test_completed_results', 'test_other_tournaments', 'test_failing_game',
+                      'test_settings', 'test_old_queue', 'test_max_attempts'):
+        with tempfile.TemporaryDirectory() as directory:
+            getattr(test, test_name)(pathlib.Path(directory))
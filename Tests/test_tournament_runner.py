@@ -0,0 +1,114 @@
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from Agents.RandomAgent import RandomAgent
+from Classes.Constants import TraceLevelConstants
+from Managers.AgentManager import AgentManager
+from Managers.TournamentRunner import SEED_LIMIT, TournamentRunner, game_seed
+
+
+class TestTournamentRunner:
+    agent_specs = ['RandomAgent.RandomAgent', 'AdrianHerasAgent.AdrianHerasAgent',
+                   'RandomAgent.RandomAgent', 'AlexPastorAgent.AlexPastorAgent']
+
+    @staticmethod
+    def sorted_results(runner):
+        # Los tiempos de respuesta de los agentes cambian en cada ejecución, el resto del resultado no
+        results = []
+        for summary in sorted(runner.results(), key=lambda summary: summary['game_number']):
+            summary.pop('agent_latency')
+            results.append(summary)
+        return results
+
+    def test_game_seed(self):
+        # La semilla solo depende de la semilla base y del número de partida, y no se repite entre semillas base
+        assert game_seed(3, 5) == game_seed(3, 5)
+        seeds = {game_seed(base_seed, game_number) for base_seed in range(3) for game_number in range(1000)}
+        assert len(seeds) == 3000
+        # La semilla de cualquier partida cabe en 64 bits sin signo
+        assert game_seed(SEED_LIMIT - 1, SEED_LIMIT - 1) == 2 ** 64 - 1
+        for base_seed, game_number in ((SEED_LIMIT, 0), (-1, 0), (0, SEED_LIMIT)):
+            with pytest.raises(ValueError):
+                game_seed(base_seed, game_number)
+        with pytest.raises(ValueError):
+            TournamentRunner(self.agent_specs, 1, base_seed=SEED_LIMIT)
+
+    def test_load_agent_class(self):
+        assert AgentManager.load_agent_class('') is RandomAgent
+        assert AgentManager.load_agent_class('RandomAgent.RandomAgent') is RandomAgent
+        with pytest.raises(ValueError):
+            AgentManager.load_agent_class('RandomAgent')
+        with pytest.raises(ValueError):
+            AgentManager.load_agent_class('RandomAgent.NotAnAgent')
+        with pytest.raises(ValueError):
+            TournamentRunner(['RandomAgent.RandomAgent'] * 3, 1)
+
+    def test_workers_give_same_results(self):
+        # Con uno o varios procesos cada partida termina igual
+        results = []
+        for workers in (1, 2):
+            runner = TournamentRunner(self.agent_specs, 6, base_seed=7, workers=workers,
+                                      trace_level=TraceLevelConstants.NONE, max_rounds=100)
+            results.append(self.sorted_results(runner))
+        assert results[0] == results[1]
+        assert [summary['game_number'] for summary in results[0]] == list(range(6))
+        assert [summary['seed'] for summary in results[0]] == [game_seed(7, game_number) for game_number in range(6)]
+
+    def test_thread_workers_give_same_results(self):
+        # Con hilos cada partida tiene su propio GameDirector y termina igual que jugándolas de una en una
+        results = []
+        for workers, executor in ((1, 'process'), (4, 'thread')):
+            runner = TournamentRunner(self.agent_specs, 12, base_seed=3, workers=workers,
+                                      trace_level=TraceLevelConstants.NONE, max_rounds=100, executor=executor)
+            results.append(self.sorted_results(runner))
+        assert results[0] == results[1]
+        with pytest.raises(ValueError):
+            TournamentRunner(self.agent_specs, 1, executor='fiber')
+
+    def test_games_file(self):
+        # Como al jugar con un solo GameDirector, games.json tiene todas las trazas en orden de partida
+        with tempfile.TemporaryDirectory() as trace_folder:
+            runner = TournamentRunner(self.agent_specs, 4, workers=2, trace_level=TraceLevelConstants.FULL,
+                                      max_rounds=30, trace_path=trace_folder)
+            runner.run()
+            traces = [json.loads((Path(trace_folder) / ('game_' + str(game_number) + '.json')).read_text())
+                      for game_number in range(4)]
+            assert json.loads((Path(trace_folder) / 'games.json').read_text()) == traces
+
+            runner = TournamentRunner(self.agent_specs, 1, trace_level=TraceLevelConstants.SUMMARY, max_rounds=30,
+                                      trace_path=str(Path(trace_folder) / 'without'), games_file=False)
+            runner.run()
+            assert not (Path(trace_folder) / 'without' / 'games.json').exists()
+
+    def test_aggregate(self):
+        runner = TournamentRunner(self.agent_specs, 4)
+        summaries = [{'winner': 1, 'rounds': 10}, {'winner': 1, 'rounds': 20},
+                     {'winner': -1, 'rounds': 30}, {'winner': 3, 'rounds': 40}]
+        for game, summary in enumerate(summaries):
+            summary['agent_latency'] = [{'calls': 10, 'total_time': 0.5 * (player + game), 'max_time': 0.1 * game,
+                                         'timeouts': {'on_build_phase': 1} if player == game else {}}
+                                        for player in range(4)]
+        stats = runner.aggregate(summaries, 2.0)
+        assert stats['games'] == 4
+        assert stats['agents'] == ['RandomAgent', 'AdrianHerasAgent', 'RandomAgent', 'AlexPastorAgent']
+        assert stats['wins'] == [0, 2, 0, 1]
+        assert stats['win_rates'] == [0.0, 0.5, 0.0, 0.25]
+        assert stats['no_winner'] == 1
+        assert stats['average_rounds'] == 25.0
+        assert stats['average_latency'] == pytest.approx([0.075, 0.125, 0.175, 0.225])
+        assert stats['max_latency'] == pytest.approx([0.3] * 4)
+        assert stats['timeouts'] == [1, 1, 1, 1]
+        assert stats['games_per_second'] == 2.0
+
+
+if __name__ == '__main__':
+    test = TestTournamentRunner()
+    test.test_game_seed()
+    test.test_load_agent_class()
+    test.test_workers_give_same_results()
+    test.test_thread_workers_give_same_results()
+    test.test_games_file()
+    test.test_aggregate()
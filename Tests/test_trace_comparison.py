@@ -5,13 +5,11 @@ from Managers.GameDirector import GameDirector
 from Agents.RandomAgent import RandomAgent as ra
 from Agents.AdrianHerasAgent import AdrianHerasAgent as aha
 
-import random
 import json
 
 game_director = GameDirector(agents=(ra, ra, aha, aha), max_rounds=200)
 for i in range(100):
-    random.seed(i)
-    game_trace = game_director.game_start(i, False)
+    game_trace = game_director.game_start(i, False, seed=i)
     game_hash = hash(json.dumps(game_trace)) # convert to string because dict is not hashable
     with open(f'./../Tests/test_traces/game_{i}.json', 'r') as f:
         test_hash = hash(f.read())
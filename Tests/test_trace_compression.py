@@ -0,0 +1,89 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from Agents.RandomAgent import RandomAgent
+from Classes.Constants import TraceLevelConstants
+from Managers.GameDirector import GameDirector
+from Managers.TournamentRunner import TournamentRunner
+from TraceLoader.TraceCompression import TraceCompression
+from TraceLoader.TraceLoader import TraceLoader
+from TraceLoader.TraceStream import TraceStream
+
+
+class TestTraceCompression:
+
+    def test_names(self):
+        assert TraceCompression.split('games-a-1-b.jsonl.xz') == ('games-a-1-b.jsonl', TraceCompression.LZMA)
+        assert TraceCompression.split(Path('Traces') / 'game_3.json.gz') == ('game_3.json', TraceCompression.GZIP)
+        assert TraceCompression.split('game_3.json') == ('game_3.json', None)
+        assert TraceCompression.suffix(None) == ''
+        assert TraceCompression.suffix(TraceCompression.BZ2) == '.bz2'
+        with pytest.raises(ValueError):
+            TraceCompression.suffix('zip')
+        with pytest.raises(ValueError):
+            TraceLoader(compression='zip')
+
+    def test_trace_loader(self, tmp_path):
+        for compression in TraceCompression.available():
+            game_director = GameDirector(agents=(RandomAgent,) * 4, max_rounds=50,
+                                         trace_level=TraceLevelConstants.FULL)
+            game_director.trace_loader.full_path = tmp_path / compression
+            game_director.trace_loader.compression = compression
+            traces = [dict(game_number=game_number, **game_director.game_start(game_number, False, seed=game_number))
+                      for game_number in range(3)]
+            game_director.trace_loader.export_every_game_to_file()
+
+            suffix = TraceCompression.suffix(compression)
+            assert sorted(path.name for path in (tmp_path / compression).iterdir()) == \
+                ['game_0.json' + suffix, 'game_1.json' + suffix, 'game_2.json' + suffix, 'games.json' + suffix]
+            # Se leen igual que sin comprimir, y games.json no se lee dos veces
+            assert list(TraceLoader.read(tmp_path / compression)) == traces
+            assert list(TraceLoader.read(tmp_path / compression / ('games.json' + suffix))) == traces
+
+    def test_bundled_traces(self, tmp_path):
+        test_traces = Path(__file__).parent / 'test_traces'
+        with open(test_traces / 'game_7.json') as trace_file:
+            trace = json.load(trace_file)
+        trace_loader = TraceLoader(compression=TraceCompression.GZIP)
+        trace_loader.full_path = tmp_path
+        trace_loader.current_trace = trace
+        trace_loader.export_to_file(7)
+        assert (tmp_path / 'game_7.json.gz').stat().st_size * 10 < (test_traces / 'game_7.json').stat().st_size
+        assert list(TraceLoader.read(tmp_path)) == list(TraceLoader.read(test_traces / 'game_7.json'))
+
+    def test_stream(self, tmp_path):
+        trace_stream = TraceStream.in_directory(tmp_path, TraceCompression.GZIP, flush_games=2, flush_interval=3600)
+        assert trace_stream.path.name.endswith('.jsonl.gz')
+        for game_number in range(3):
+            trace_stream.write(game_number, {'summary': {'winner': game_number}})
+        # El fichero sin terminar se puede leer hasta la última partida vaciada a disco
+        assert [trace['game_number'] for trace in TraceLoader.read(tmp_path)] == [0, 1]
+        trace_stream.close()
+        # Otro proceso añade sus partidas al mismo fichero
+        trace_stream = TraceStream(trace_stream.path)
+        trace_stream.write(3, {'summary': {'winner': 3}})
+        trace_stream.close()
+        assert [trace['summary']['winner'] for trace in TraceStream.read(tmp_path)] == [0, 1, 2, 3]
+
+    def test_tournament_runner(self, tmp_path):
+        runner = TournamentRunner(['RandomAgent.RandomAgent'] * 4, 4, max_rounds=100,
+                                  trace_level=TraceLevelConstants.SUMMARY, trace_path=str(tmp_path),
+                                  compression=TraceCompression.LZMA)
+        summaries = list(runner.results())
+        assert len(list(tmp_path.glob('game_*.json.xz'))) == 4
+        traces = list(TraceLoader.read(tmp_path))
+        assert [trace['game_number'] for trace in traces] == [0, 1, 2, 3]
+        assert [trace['summary']['winner'] for trace in traces] == [summary['winner'] for summary in summaries]
+
+
+if __name__ == '__main__':
+    import pathlib
+    import tempfile
+
+    test = TestTraceCompression()
+    test.test_names()
+    for test_name in ('test_trace_loader', 'test_bundled_traces', 'test_stream', 'test_tournament_runner'):
+        with tempfile.TemporaryDirectory() as directory:
+            getattr(test, test_name)(pathlib.Path(directory))
@@ -0,0 +1,76 @@
+import json
+
+from Agents.AdrianHerasAgent import AdrianHerasAgent
+from Agents.AlexPastorAgent import AlexPastorAgent
+from Agents.BuilderAgent import BuilderAgent
+from Agents.RandomAgent import RandomAgent
+from Classes.Constants import TraceLevelConstants
+from Managers.GameDirector import GameDirector
+from TraceLoader.TraceEvents import TraceEvents
+from TraceLoader.TraceLoader import TraceLoader
+from TraceLoader.TraceStream import TraceStream
+
+
+class TestTraceEvents:
+    agents = (AlexPastorAgent, BuilderAgent, RandomAgent, AdrianHerasAgent)
+
+    def play(self, tmp_path, trace_level, seeds, trace_stream=None):
+        game_director = GameDirector(agents=self.agents, max_rounds=100, trace_level=trace_level,
+                                     trace_stream=trace_stream)
+        game_director.trace_loader.full_path = tmp_path
+        # Se pasan por JSON para comparar las trazas tal y como se escriben
+        return [json.loads(json.dumps(game_director.game_start(seed, False, seed=seed))) for seed in seeds]
+
+    def test_expand(self, tmp_path):
+        # Las trazas de eventos se reconstruyen igual que las completas de la misma partida
+        full_traces = self.play(tmp_path / 'full', TraceLevelConstants.FULL, range(3))
+        event_traces = self.play(tmp_path / 'events', TraceLevelConstants.EVENTS, range(3))
+        for full_trace, event_trace in zip(full_traces, event_traces):
+            assert event_trace['version'] == TraceEvents.VERSION
+            assert event_trace['summary']['game_number'] == event_trace['seed']
+            assert json.dumps(TraceEvents.expand(event_trace)) == json.dumps(full_trace)
+
+    def test_board_written_once(self, tmp_path):
+        event_traces = self.play(tmp_path, TraceLevelConstants.EVENTS, range(2))
+        assert sorted(path.name for path in tmp_path.iterdir()) == ['board.json', 'game_0.json', 'game_1.json']
+        assert 'board' not in json.dumps(event_traces[0])
+        with open(tmp_path / 'board.json') as board_file:
+            assert json.load(board_file) == TraceEvents.static_board()
+
+    def test_read_expand(self, tmp_path):
+        full_traces = self.play(tmp_path / 'full', TraceLevelConstants.FULL, [5])
+        trace_stream = TraceStream(tmp_path / 'events' / 'games.jsonl')
+        self.play(tmp_path / 'events', TraceLevelConstants.EVENTS, [5], trace_stream)
+        trace_stream.close()
+        assert (tmp_path / 'events' / 'board.json').exists()
+
+        # Las trazas completas se leen igual con expand
+        full_trace = next(TraceLoader.read(tmp_path / 'full', expand=True))
+        assert full_trace.pop('game_number') == 5
+        assert full_trace == full_traces[0]
+
+        expanded_trace = next(TraceLoader.read(tmp_path / 'events', expand=True))
+        assert expanded_trace.pop('game_number') == 5
+        assert expanded_trace == full_trace
+
+    def test_changes_only_with_events(self, tmp_path):
+        # Con los demás niveles de traza no se apuntan los cambios que solo necesita la traza de eventos
+        for trace_level in (TraceLevelConstants.NONE, TraceLevelConstants.SUMMARY, TraceLevelConstants.FULL):
+            game_director = GameDirector(agents=self.agents, max_rounds=100, trace_level=trace_level)
+            game_director.trace_loader.full_path = tmp_path
+            game_director.game_start(0, False, seed=0)
+            game_manager = game_director.game_manager
+            assert not game_manager.track_changes
+            assert game_manager.last_agent_changes == [] and game_manager.last_thief_changes == []
+            assert game_manager.last_discards == [] and game_manager.last_free_roads == []
+            assert game_manager.last_year_of_plenty is None
+
+
+if __name__ == '__main__':
+    import pathlib
+    import tempfile
+
+    test = TestTraceEvents()
+    for test_name in ('test_expand', 'test_board_written_once', 'test_read_expand', 'test_changes_only_with_events'):
+        with tempfile.TemporaryDirectory() as directory:
+            getattr(test, test_name)(pathlib.Path(directory))
@@ -0,0 +1,114 @@
+import json
+
+import pytest
+
+from Agents.AdrianHerasAgent import AdrianHerasAgent
+from Agents.AlexPastorAgent import AlexPastorAgent
+from Classes.Constants import TraceLevelConstants
+from Managers.GameDirector import GameDirector
+from Managers.TournamentRunner import TournamentRunner
+from TraceLoader.TraceCompression import TraceCompression
+from TraceLoader.TraceIndex import TraceIndex
+from TraceLoader.TraceLoader import TraceLoader
+from TraceLoader.TraceStream import TraceStream
+
+
+class TestTraceIndex:
+    agents = (AlexPastorAgent, AdrianHerasAgent) * 2
+
+    def play(self, tmp_path, trace_level, game_numbers, trace_stream=None, compression=None):
+        game_director = GameDirector(agents=self.agents, max_rounds=100, trace_level=trace_level,
+                                     trace_stream=trace_stream)
+        game_director.trace_loader.full_path = tmp_path
+        game_director.trace_loader.compression = compression
+        # Las trazas completas no llevan el resultado de la partida, así que se guarda al generarlo
+        summaries = []
+        game_summary = game_director.game_summary
+        game_director.game_summary = lambda *args: summaries.append(game_summary(*args)) or summaries[-1]
+        for game_number in game_numbers:
+            game_director.game_start(game_number, False, seed=game_number)
+        if trace_stream is not None:
+            trace_stream.close()
+        return summaries
+
+    def test_query_and_load(self, tmp_path):
+        summaries = self.play(tmp_path, TraceLevelConstants.FULL, [0, 1, 2])
+        summaries += self.play(tmp_path, TraceLevelConstants.EVENTS, [3, 4, 5], TraceStream(tmp_path / 'games.jsonl'))
+        trace_index = TraceIndex.open(tmp_path)
+        assert (tmp_path / TraceIndex.FILE).exists()
+
+        games = {game['game_number']: game for game in trace_index.games()}
+        assert sorted(games) == list(range(6))
+        for summary in summaries:
+            game = games[summary['game_number']]
+            assert (game['winner'], game['rounds']) == (summary['winner'], summary['rounds'])
+            assert game['victory_points'] == summary['victory_points']
+        assert games[4]['agents'] == summaries[4]['agents'] and games[0]['agents'] is None
+
+        winners = trace_index.query(winner=summaries[1]['winner'])
+        assert {game['game_number'] for game in winners} == {summary['game_number'] for summary in summaries
+                                                            if summary['winner'] == summaries[1]['winner']}
+        short_games = trace_index.query(lambda game: game['rounds'] < 40)
+        assert {game['game_number'] for game in short_games} == {summary['game_number'] for summary in summaries
+                                                                if summary['rounds'] < 40}
+
+        # Las trazas que se leen con el índice son las mismas que las de TraceLoader.read
+        traces = {trace['game_number']: trace for trace in TraceLoader.read(tmp_path)}
+        for game_number, game in games.items():
+            assert trace_index.load(game) == traces[game_number]
+        assert trace_index.load_round(games[1], 2) == traces[1]['game']['round_2']
+        assert trace_index.load_round(games[4], 2) == [event for event in traces[4]['events'] if event[0] == 2]
+        assert trace_index.load(games[3], expand=True)['game'] == \
+            TraceLoader.read(tmp_path / 'games.jsonl', expand=True).__next__()['game']
+
+        # Las cartas jugadas se cuentan igual en las trazas completas y en las de eventos
+        full_cards = [game['cards'] for game in trace_index.query(format='full')]
+        self.play(tmp_path / 'events', TraceLevelConstants.EVENTS, [0, 1, 2])
+        assert [game['cards'] for game in TraceIndex.open(tmp_path / 'events').games()] == full_cards
+
+    def test_update(self, tmp_path):
+        self.play(tmp_path, TraceLevelConstants.EVENTS, [0, 1], TraceStream(tmp_path / 'games.jsonl'))
+        self.play(tmp_path, TraceLevelConstants.FULL, [2], compression=TraceCompression.GZIP)
+        first_games = list(TraceIndex.open(tmp_path).games())
+        assert [game['file'] for game in first_games] == ['game_2.json.gz', 'games.jsonl', 'games.jsonl']
+
+        # Al abrirlo de nuevo solo se leen las líneas nuevas y los ficheros que han cambiado
+        self.play(tmp_path, TraceLevelConstants.EVENTS, [3], TraceStream(tmp_path / 'games.jsonl'))
+        with open(tmp_path / 'games.jsonl', 'a') as trace_file:
+            trace_file.write('{"game_number": 4, "summ')
+        (tmp_path / 'game_2.json.gz').unlink()
+        trace_index = TraceIndex.open(tmp_path)
+        games = list(trace_index.games())
+        assert [game['game_number'] for game in games] == [0, 1, 3]
+        assert games[:2] == first_games[1:]
+        assert trace_index.load(games[2])['summary']['game_number'] == 3
+
+        with open(tmp_path / TraceIndex.FILE) as index_file:
+            assert json.load(index_file)['files'] == trace_index.files
+        assert TraceIndex.open(tmp_path, update=False).files == trace_index.files
+
+    def test_tournament_runner(self, tmp_path):
+        # Sin pedirlo no se crea el índice
+        runner = TournamentRunner(['RandomAgent.RandomAgent'] * 4, 4, max_rounds=50,
+                                  trace_level=TraceLevelConstants.SUMMARY, trace_path=str(tmp_path))
+        runner.run()
+        assert not (tmp_path / TraceIndex.FILE).exists()
+
+        # Con index se crea al terminar el torneo
+        runner.index = True
+        runner.run()
+        trace_index = TraceIndex.open(tmp_path, update=False)
+        assert sorted(game['game_number'] for game in trace_index.games()) == [0, 1, 2, 3]
+        assert {game['format'] for game in trace_index.games()} == {'summary'}
+        with pytest.raises(ValueError):
+            TournamentRunner(['RandomAgent.RandomAgent'] * 4, 1, index=True)
+
+
+if __name__ == '__main__':
+    import pathlib
+    import tempfile
+
+    test = TestTraceIndex()
+    for test_name in ('test_query_and_load', 'test_update', 'test_tournament_runner'):
+        with tempfile.TemporaryDirectory() as directory:
+            getattr(test, test_name)(pathlib.Path(directory))
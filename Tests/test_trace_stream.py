@@ -0,0 +1,65 @@
+from Agents.RandomAgent import RandomAgent
+from Classes.Constants import TraceLevelConstants
+from Managers.GameDirector import GameDirector
+from Managers.TournamentRunner import TournamentRunner
+from TraceLoader.TraceStream import TraceStream
+
+
+class TestTraceStream:
+
+    def test_stream(self, tmp_path):
+        trace_stream = TraceStream(tmp_path / 'games.jsonl')
+        game_director = GameDirector(agents=(RandomAgent,) * 4, max_rounds=50, trace_level=TraceLevelConstants.FULL,
+                                     trace_stream=trace_stream)
+        game_director.trace_loader.full_path = tmp_path
+        traces = [game_director.game_start(game_number, False, seed=game_number) for game_number in range(3)]
+        trace_stream.close()
+
+        # Las trazas no se guardan en memoria ni en un fichero por partida
+        assert game_director.trace_loader.all_games_trace == []
+        assert [path.name for path in tmp_path.iterdir()] == ['games.jsonl']
+        streamed_traces = list(TraceStream.read(tmp_path / 'games.jsonl'))
+        assert [trace.pop('game_number') for trace in streamed_traces] == [0, 1, 2]
+        assert streamed_traces == traces
+
+    def test_flush(self, tmp_path):
+        trace_stream = TraceStream(tmp_path / 'games.jsonl', flush_games=2, flush_interval=3600)
+        trace_stream.write(0, {'summary': {}})
+        assert list(TraceStream.read(tmp_path)) == []
+        trace_stream.write(1, {'summary': {}})
+        assert [trace['game_number'] for trace in TraceStream.read(tmp_path)] == [0, 1]
+
+        trace_stream = TraceStream(tmp_path / 'other.jsonl', flush_games=100, flush_interval=0)
+        trace_stream.write(2, {'summary': {}})
+        assert [trace['game_number'] for trace in TraceStream.read(tmp_path / 'other.jsonl')] == [2]
+
+    def test_unfinished_line(self, tmp_path):
+        trace_stream = TraceStream(tmp_path / 'games.jsonl')
+        trace_stream.write(0, {'summary': {'winner': 1}})
+        trace_stream.close()
+        # El proceso muere a mitad de escribir la segunda partida
+        with open(tmp_path / 'games.jsonl', 'a') as trace_file:
+            trace_file.write('{"game_number": 1, "summ')
+        assert list(TraceStream.read(tmp_path)) == [{'game_number': 0, 'summary': {'winner': 1}}]
+
+    def test_tournament_runner(self, tmp_path):
+        # Cada proceso escribe su fichero y al terminar escribe las trazas que le quedaban
+        runner = TournamentRunner(['RandomAgent.RandomAgent'] * 4, 10, workers=2, executor='process',
+                                  max_rounds=100, trace_level=TraceLevelConstants.SUMMARY, trace_path=str(tmp_path),
+                                  stream_traces=True)
+        summaries = {summary['game_number']: summary for summary in runner.results()}
+        traces = list(TraceStream.read(tmp_path))
+        assert 1 <= len(list(tmp_path.glob('*.jsonl'))) <= 2
+        assert sorted(trace['game_number'] for trace in traces) == list(range(10))
+        for trace in traces:
+            assert trace['summary']['winner'] == summaries[trace['game_number']]['winner']
+
+
+if __name__ == '__main__':
+    import pathlib
+    import tempfile
+
+    test = TestTraceStream()
+    for test_name in ('test_stream', 'test_flush', 'test_unfinished_line', 'test_tournament_runner'):
+        with tempfile.TemporaryDirectory() as directory:
+            getattr(test, test_name)(pathlib.Path(directory))
@@ -0,0 +1,368 @@
+import os
+import socket
+import struct
+import time
+import uuid
+from pathlib import Path
+
+from TraceLoader.ResultsStore import ResultsStore
+from TraceLoader.TraceEvents import TraceEvents
+
+
+class EventLog:
+    """
+    Trazas de eventos (ver TraceEvents) en formato binario, para analizar millones de partidas sin leer JSON. Se usa
+    como el TraceStream de un TraceLoader: GameDirector(trace_level=TraceLevelConstants.EVENTS,
+    trace_stream=EventLog(path)).
+
+    Cada evento es un registro de tamaño fijo (RECORD): número de partida, ronda, jugador, tipo de evento
+    (EVENT_TYPES) y ARGS argumentos enteros, con -1 en los que no se usan. Los eventos de una partida van seguidos y en
+    orden de ronda, y la colocación inicial tiene ronda -1. Cada partida añade además una entrada de tamaño fijo (INDEX)
+    al índice (fichero .index): su número, su semilla, su primer registro, cuántos tiene, sus rondas y su ganador. Así
+    el lector (EventLogReader) va directamente a la partida N, o a su ronda R, sin leer las demás. Las rondas son
+    enteros de 32 bits, porque max_rounds no tiene límite, y la semilla se guarda como en ResultsStore (encode_seed).
+
+    Los argumentos de cada tipo de evento son:
+    setup: nodo, carretera
+    start: dados (-1 si una carta ha dado la victoria antes de tirarlos)
+    thief: ladrón anterior, ladrón, jugador robado, material robado. Tras un 7 o una carta de caballero
+    discard: jugador, descartes de cada material
+    hand: jugador, cambios de cada material (ver GameManager.agent_call_steps)
+    trade: oferta (lo que da y lo que recibe de cada material), inviable, respuestas
+    answer: receptor, completado, número de respuestas, última oferta (la que se intercambia si se completa)
+    bank: material que da, material que recibe
+    card: carta (CARDS), fase (PHASES) y según la carta: caballeros (knight), material y cantidad (monopoly), nodo y
+          carretera de cada carretera (road_building) o materiales (year_of_plenty)
+    build: construcción (BUILDINGS), nodo, carretera, terminada, tipo y efecto de la carta comprada
+    end: sin argumentos
+
+    A diferencia de la traza de eventos en JSON, no guarda los textos de las cartas (errores, carreteras no válidas...),
+    así que no se puede reconstruir la traza completa a partir de él.
+
+    El fichero se vacía a disco cada flush_games partidas o cada flush_interval segundos, primero los eventos y luego el
+    índice, así que una partida del índice siempre tiene todos sus eventos escritos. Para escribir solo hace falta la
+    librería estándar; para leer hace falta NumPy.
+
+    path: Path Fichero de eventos (.events). El índice es el mismo fichero con la extensión .index
+    flush_games: int Partidas entre cada vaciado a disco
+    flush_interval: float Segundos máximos entre vaciados a disco
+    """
+    MAGIC = b'PCE2'
+    SUFFIX = '.events'
+    INDEX_SUFFIX = '.index'
+    ARGS = 14
+    # game_number, round, player, event_type, args
+    RECORD = struct.Struct('<qibb' + str(ARGS) + 'h')
+    RECORD_FIELDS = [('game_number', '<i8'), ('round', '<i4'), ('player', 'i1'), ('event_type', 'i1'),
+                     ('args', '<i2', (ARGS,))]
+    # game_number, seed, first, count, rounds, winner
+    INDEX = struct.Struct('<qQqqib')
+    INDEX_FIELDS = [('game_number', '<i8'), ('seed', '<u8'), ('first', '<i8'), ('count', '<i8'), ('rounds', '<i4'),
+                    ('winner', 'i1')]
+
+    EVENT_TYPES = ('setup', 'start', 'thief', 'discard', 'hand', 'trade', 'answer', 'bank', 'card', 'build', 'end')
+    EVENT_CODES = dict(zip(EVENT_TYPES, range(len(EVENT_TYPES))))
+    CARDS = ('none', 'knight', 'victory_point', 'failed_victory_point', 'monopoly', 'road_building', 'year_of_plenty')
+    PHASES = ('start', 'commerce', 'build', 'end')
+    BUILDINGS = ('town', 'city', 'road', 'card')
+
+    def __init__(self, path, flush_games=16, flush_interval=1.0):
+        self.path = Path(path)
+        self.flush_games = flush_games
+        self.flush_interval = flush_interval
+        self.file = None
+        self.index_file = None
+        self.records = 0
+        self.unflushed_games = 0
+        self.last_flush = time.monotonic()
+        return
+
+    @classmethod
+    def in_directory(cls, directory, **kwargs):
+        """
+        EventLog con un fichero propio en una carpeta, para que varios procesos o hilos escriban en la misma carpeta
+        :param directory: str/Path
+        :return: EventLog
+        """
+        name = 'games-' + socket.gethostname() + '-' + str(os.getpid()) + '-' + uuid.uuid4().hex[:8] + cls.SUFFIX
+        return cls(Path(directory) / name, **kwargs)
+
+    @classmethod
+    def event_type(cls, name):
+        """
+        :param name: str. Nombre del tipo de evento (EVENT_TYPES)
+        :return: int. Valor de la columna event_type
+        """
+        return cls.EVENT_CODES[name]
+
+    def write(self, game_number, trace):
+        """
+        Añade los eventos de una partida
+        :param game_number: int
+        :param trace: dict. Traza de eventos de la partida (TraceEvents.to_object)
+        :return: None
+        """
+        if not TraceEvents.is_events_trace(trace):
+            raise ValueError('EventLog solo guarda trazas de eventos (TraceLevelConstants.EVENTS)')
+        seed = ResultsStore.encode_seed(trace['seed'])
+        if self.file is None:
+            self.open_files()
+
+        records = self.encode(trace)
+        self.file.write(b''.join(self.RECORD.pack(game_number, round_number, player, event_type,
+                                                  *args, *[-1] * (self.ARGS - len(args)))
+                                 for round_number, player, event_type, args in records))
+        summary = trace['summary']
+        self.index_file.write(self.INDEX.pack(game_number, seed, self.records, len(records),
+                                              summary['rounds'], summary['winner']))
+        self.records += len(records)
+        self.unflushed_games += 1
+        if self.unflushed_games >= self.flush_games or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+        return
+
+    def open_files(self):
+        """
+        Abre el fichero de eventos y su índice. Si ya existían, se sigue escribiendo tras sus partidas completas
+        :return: None
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.path, 'ab')
+        self.index_file = open(self.path.with_suffix(self.INDEX_SUFFIX), 'a+b')
+        if self.file.tell() == 0:
+            self.file.write(self.MAGIC)
+        self.records = (self.file.tell() - len(self.MAGIC)) // self.RECORD.size
+        self.file.truncate(len(self.MAGIC) + self.records * self.RECORD.size)
+
+        self.index_file.seek(0)
+        data = self.index_file.read()[len(self.MAGIC):]
+        if self.index_file.tell() == 0:
+            self.index_file.write(self.MAGIC)
+        # Se quitan las partidas a las que les faltan eventos, que si no acabarían apuntando a los de otra partida
+        games = len(data) // self.INDEX.size
+        for game in range(games):
+            _, _, first, count, _, _ = self.INDEX.unpack_from(data, game * self.INDEX.size)
+            if first + count > self.records:
+                games = game
+                break
+        self.index_file.truncate(len(self.MAGIC) + games * self.INDEX.size)
+        return
+
+    def flush(self):
+        if self.file is not None:
+            self.file.flush()
+            self.index_file.flush()
+        self.unflushed_games = 0
+        self.last_flush = time.monotonic()
+        return
+
+    def close(self):
+        if self.file is not None:
+            self.flush()
+            self.file.close()
+            self.index_file.close()
+            self.file = self.index_file = None
+        return
+
+    # -- -- -- -- Codificación -- -- -- --
+    @classmethod
+    def encode(cls, trace):
+        """
+        :param trace: dict. Traza de eventos
+        :return: [(int, int, int, [int...])...] Ronda, jugador, tipo y argumentos de cada registro
+        """
+        records = []
+        # Las colocaciones van en el orden en el que se hicieron: de P0 a P3 y de P3 a P0
+        for player, placement in [(player, 0) for player in range(4)] + [(player, 1) for player in range(3, -1, -1)]:
+            records.append((-1, player, cls.event_type('setup'),
+                            trace['setup'][player][placement * 2:placement * 2 + 2]))
+
+        def add(event_type, event_args):
+            records.append((round_number, player, cls.EVENT_CODES[event_type], event_args))
+
+        for round_number, player, kind, *args in trace['events']:
+            if kind == TraceEvents.START:
+                dice, card, thief, discards = (args + [None] * 4)[:4]
+                thief_changes = args[4] if len(args) > 4 else ()
+                if card is not None:
+                    cls.encode_card(add, card, 'start')
+                add('start', [-1 if dice is None else dice])
+                for discarded in discards or ():
+                    add('discard', discarded)
+                for changes in thief_changes:
+                    add('hand', changes)
+                if thief is not None:
+                    add('thief', thief)
+            elif kind == TraceEvents.HAND:
+                for changes in args[0]:
+                    add('hand', changes)
+            elif kind == TraceEvents.TRADE:
+                offer, answers = args
+                add('trade', offer + [answers is None, len(answers or ())])
+                for answer in answers or ():
+                    if isinstance(answer, int):
+                        add('answer', [answer, False, 1] + offer)
+                    else:
+                        receiver, completed, *responses = answer
+                        add('answer', [receiver, completed, len(responses)] + (responses[-2] if len(responses) > 1
+                                                                               else offer))
+            elif kind == TraceEvents.BANK:
+                add('bank', args)
+            elif kind in (TraceEvents.TRADE_CARD, TraceEvents.BUILD_CARD):
+                cls.encode_card(add, args[0], 'commerce' if kind == TraceEvents.TRADE_CARD else 'build')
+            elif kind == TraceEvents.BUILD:
+                response, finished, *card = args
+                if isinstance(response, list):
+                    response = dict(zip(TraceEvents.BUILD_KEYS, response))
+                building = response.get('building')
+                add('build', [cls.BUILDINGS.index(building) if building in cls.BUILDINGS else -1,
+                              cls.integer(response.get('node_id')), cls.integer(response.get('road_to')), finished]
+                    + card)
+            elif kind == TraceEvents.END:
+                if args:
+                    cls.encode_card(add, args[0], 'end')
+                add('end', [])
+        return records
+
+    @classmethod
+    def encode_card(cls, add, card, phase):
+        """
+        Añade el registro de una carta jugada, y el del ladrón si es un caballero
+        :param add: function(str, [int...]) Añade un registro del turno
+        :param card: dict/str. Carta de la traza de eventos
+        :param phase: str. Fase del turno (PHASES)
+        :return: None
+        """
+        if isinstance(card, str):
+            card = {'played_card': card}
+        played_card = card['played_card']
+        args = [cls.CARDS.index(played_card) if played_card in cls.CARDS else -1, cls.PHASES.index(phase)]
+        if played_card == 'knight':
+            add('card', args + [card['total_knights']])
+            add('thief', [card['past_thief_terrain'], card['thief_terrain'], card['robbed_player'],
+                          card['stolen_material_id']])
+            return
+        if played_card == 'monopoly':
+            args += [card['material_chosen'], card['material_sum']]
+        elif played_card == 'road_building':
+            args += [cls.integer(value) for road in card['built_roads'] for value in road]
+        elif played_card == 'year_of_plenty':
+            args += card['materials']
+        add('card', args)
+        return
+
+    @staticmethod
+    def integer(value):
+        """
+        :return: int. value si es un entero, y si no -1
+        """
+        return value if isinstance(value, int) and not isinstance(value, bool) else -1
+
+
+class EventLogReader:
+    """
+    Lee los ficheros de un EventLog, o todos los de una carpeta, como arrays estructurados de NumPy (con las columnas
+    de EventLog.RECORD_FIELDS). Los ficheros de eventos se abren con np.memmap, así que solo se leen del disco los
+    registros que se usan: game y round van directamente a los de una partida o una ronda con el índice.
+
+    index: np.ndarray Índice de todas las partidas, en el orden de los ficheros (columnas de EventLog.INDEX_FIELDS y
+                      file, el fichero de la partida en records)
+    records: [np.memmap...] Registros de cada fichero
+    """
+
+    def __init__(self, path):
+        import numpy as np
+
+        path = Path(path)
+        if path.is_dir():
+            paths = sorted(path.glob('*' + EventLog.SUFFIX))
+        else:
+            paths = [path]
+
+        self.records = []
+        indexes = []
+        for file_number, file_path in enumerate(paths):
+            records = self.open_records(file_path)
+            index = self.read_index(file_path.with_suffix(EventLog.INDEX_SUFFIX))
+            # Si el proceso murió al escribir, puede haber partidas en el índice sin todos sus eventos
+            index = index[index['first'] + index['count'] <= len(records)]
+            self.records.append(records)
+            indexes.append((index, file_number))
+
+        index_dtype = np.dtype(EventLog.INDEX_FIELDS + [('file', '<i4')])
+        self.index = np.zeros(sum(len(index) for index, _ in indexes), index_dtype)
+        position = 0
+        for index, file_number in indexes:
+            for name in index.dtype.names:
+                self.index[name][position:position + len(index)] = index[name]
+            self.index['file'][position:position + len(index)] = file_number
+            position += len(index)
+        self.positions = {game_number: position for position, game_number in enumerate(self.index['game_number'])}
+        return
+
+    @staticmethod
+    def open_records(path):
+        """
+        :param path: Path. Fichero de eventos
+        :return: np.memmap. Sus registros completos
+        """
+        import numpy as np
+
+        dtype = np.dtype(EventLog.RECORD_FIELDS)
+        with open(path, 'rb') as events_file:
+            if events_file.read(len(EventLog.MAGIC)) != EventLog.MAGIC:
+                raise ValueError('No es un fichero de eventos: ' + str(path))
+        count = (path.stat().st_size - len(EventLog.MAGIC)) // dtype.itemsize
+        if count == 0:
+            return np.zeros(0, dtype)
+        return np.memmap(path, dtype, 'r', offset=len(EventLog.MAGIC), shape=(count,))
+
+    @staticmethod
+    def read_index(path):
+        """
+        :param path: Path. Índice de un fichero de eventos
+        :return: np.ndarray. Sus entradas completas
+        """
+        import numpy as np
+
+        dtype = np.dtype(EventLog.INDEX_FIELDS)
+        with open(path, 'rb') as index_file:
+            if index_file.read(len(EventLog.MAGIC)) != EventLog.MAGIC:
+                raise ValueError('No es un índice de eventos: ' + str(path))
+            data = index_file.read()
+        return np.frombuffer(data, dtype, len(data) // dtype.itemsize)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self):
+        """
+        :return: generator(np.ndarray) Los eventos de cada partida, en el orden del índice
+        """
+        for entry in self.index:
+            yield self.slice(entry)
+
+    def slice(self, entry):
+        first = int(entry['first'])
+        return self.records[entry['file']][first:first + int(entry['count'])]
+
+    def game(self, game_number):
+        """
+        :param game_number: int
+        :return: np.ndarray. Eventos de la partida, sin copiarlos del fichero
+        """
+        if game_number not in self.positions:
+            raise KeyError('No hay eventos de la partida ' + str(game_number))
+        return self.slice(self.index[self.positions[game_number]])
+
+    def round(self, game_number, round_number):
+        """
+        :param game_number: int
+        :param round_number: int. -1 es la colocación inicial
+        :return: np.ndarray. Eventos de la ronda de la partida. Como van en orden de ronda, se buscan por bisección
+        """
+        import numpy as np
+
+        events = self.game(game_number)
+        start, end = np.searchsorted(events['round'], [round_number, round_number + 1])
+        return events[start:end]
@@ -0,0 +1,175 @@
+import os
+import socket
+import struct
+import uuid
+from pathlib import Path
+
+
+class ResultsStore:
+    """
+    Resultado de cada partida en una carpeta de ficheros binarios de solo añadir, para calcular estadísticas de millones
+    de partidas sin abrir sus trazas.
+
+    Cada ResultsStore que escribe (uno por proceso o hilo) añade sus partidas a su propio fichero (shard), así que no
+    hace falta bloquearlos y juntarlos es concatenarlos. Cada partida es un registro de tamaño fijo (RECORD) que se
+    escribe en cuanto termina: si el proceso muere, como mucho se pierde la última partida, que se descarta al leer.
+    Los agentes se guardan como un índice en la lista de nombres del shard (fichero .agents, una línea por agente).
+
+    Para escribir solo hace falta la librería estándar. Para leer (read) hace falta NumPy: los registros se leen como un
+    array estructurado, con una columna por campo (RECORD_FIELDS).
+
+    path: Path Carpeta de los shards
+    """
+    MAGIC = b'PCR1'
+    # seed, game_number, agents (4), winner, victory_points (4), largest_army, longest_road, rounds,
+    # max_rounds_reached, wall_time
+    RECORD = struct.Struct('<Qq4hb4bbbi?d')
+    RECORD_FIELDS = [('seed', '<u8'), ('game_number', '<i8'), ('agents', '<i2', (4,)), ('winner', 'i1'),
+                     ('victory_points', 'i1', (4,)), ('largest_army', 'i1'), ('longest_road', 'i1'),
+                     ('rounds', '<i4'), ('max_rounds_reached', '?'), ('wall_time', '<f8')]
+    SHARD_SUFFIX = '.results'
+    AGENTS_SUFFIX = '.agents'
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.shard = None
+        self.shard_path = None
+        self.agents_file = None
+        self.agent_ids = {}
+        return
+
+    def open_shard(self):
+        """
+        Crea el shard de este ResultsStore. El nombre es distinto en cada máquina, proceso y ResultsStore
+        :return: None
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        name = socket.gethostname() + '-' + str(os.getpid()) + '-' + uuid.uuid4().hex[:8]
+        self.shard_path = self.path / (name + self.SHARD_SUFFIX)
+        self.agents_file = open(self.path / (name + self.AGENTS_SUFFIX), 'a', encoding='utf-8')
+        self.shard = open(self.shard_path, 'ab')
+        self.shard.write(self.MAGIC)
+        self.shard.flush()
+        return
+
+    def agent_id(self, agent_name):
+        """
+        :param agent_name: str
+        :return: int. Índice del agente en la lista de nombres del shard. Si no estaba se añade
+        """
+        if agent_name not in self.agent_ids:
+            self.agent_ids[agent_name] = len(self.agent_ids)
+            self.agents_file.write(agent_name + '\n')
+            self.agents_file.flush()
+        return self.agent_ids[agent_name]
+
+    def append(self, summary, seed, wall_time):
+        """
+        Añade el resultado de una partida
+        :param summary: dict. Resultado de la partida (GameDirector.game_summary)
+        :param seed: int. Semilla de la partida
+        :param wall_time: float. Segundos que ha durado la partida
+        :return: None
+        """
+        if self.shard is None:
+            self.open_shard()
+        agents = [self.agent_id(agent_name) for agent_name in summary['agents']]
+        self.shard.write(self.RECORD.pack(self.encode_seed(seed), summary['game_number'], *agents, summary['winner'],
+                                          *summary['victory_points'], summary['largest_army'],
+                                          summary['longest_road'], summary['rounds'],
+                                          summary['max_rounds_reached'], wall_time))
+        self.shard.flush()
+        return
+
+    @staticmethod
+    def encode_seed(seed):
+        """
+        Semilla tal como se guarda en los registros, como entero de 64 bits sin signo. random.seed juega la misma
+        partida con una semilla y con la misma en negativo, así que se guarda su valor absoluto. Las semillas de
+        game_seed y las que elige GameDirector caben siempre; una semilla mayor no se puede guardar
+        :param seed: int
+        :return: int
+        """
+        if abs(seed) >= 2 ** 64:
+            raise ValueError('La semilla no cabe en 64 bits: ' + str(seed))
+        return abs(seed)
+
+    def close(self):
+        if self.shard is not None:
+            self.shard.close()
+            self.agents_file.close()
+            self.shard = self.agents_file = None
+        return
+
+    @classmethod
+    def shards(cls, path):
+        """
+        :param path: str/Path. Carpeta de los shards
+        :return: [Path...] Shards de la carpeta, ordenados por nombre
+        """
+        return sorted(Path(path).glob('*' + cls.SHARD_SUFFIX))
+
+    @classmethod
+    def read_shard(cls, shard):
+        """
+        :param shard: Path
+        :return: (np.ndarray, [str...]) Registros del shard y nombres de sus agentes
+        """
+        import numpy as np
+
+        dtype = np.dtype(cls.RECORD_FIELDS)
+        with open(shard, 'rb') as shard_file:
+            if shard_file.read(len(cls.MAGIC)) != cls.MAGIC:
+                raise ValueError('No es un shard de resultados: ' + str(shard))
+            data = shard_file.read()
+        # Un registro a medias es de una partida que no se terminó de escribir
+        records = np.frombuffer(data, dtype, len(data) // dtype.itemsize)
+        agent_names = shard.with_suffix(cls.AGENTS_SUFFIX).read_text(encoding='utf-8').splitlines()
+        return records, agent_names
+
+    @classmethod
+    def read(cls, path):
+        """
+        Lee los resultados de todos los shards de una carpeta
+        :param path: str/Path. Carpeta de los shards
+        :return: (np.ndarray, [str...]) Registros de todas las partidas y nombres de los agentes. La columna agents
+                 tiene el índice de cada agente en la lista de nombres
+        """
+        import numpy as np
+
+        agent_names, agent_ids = [], {}
+        all_records = []
+        for shard in cls.shards(path):
+            records, shard_agent_names = cls.read_shard(shard)
+            for agent_name in shard_agent_names:
+                if agent_name not in agent_ids:
+                    agent_ids[agent_name] = len(agent_names)
+                    agent_names.append(agent_name)
+            records = records.copy()
+            if len(shard_agent_names):
+                records['agents'] = np.array([agent_ids[agent_name] for agent_name in shard_agent_names],
+                                             dtype=np.int16)[records['agents']]
+            all_records.append(records)
+        if not all_records:
+            return np.zeros(0, np.dtype(cls.RECORD_FIELDS)), agent_names
+        return np.concatenate(all_records), agent_names
+
+    @classmethod
+    def merge(cls, path):
+        """
+        Junta todos los shards de una carpeta en uno. Solo se debe hacer cuando nadie está escribiendo en ella
+        :param path: str/Path. Carpeta de los shards
+        :return: Path. El shard nuevo
+        """
+        shards = cls.shards(path)
+        records, agent_names = cls.read(path)
+        store = cls(path)
+        store.open_shard()
+        for agent_name in agent_names:
+            store.agent_id(agent_name)
+        store.shard.write(records.tobytes())
+        store.close()
+        for shard in shards:
+            shard.unlink()
+            shard.with_suffix(cls.AGENTS_SUFFIX).unlink()
+        return store.shard_path
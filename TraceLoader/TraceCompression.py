@@ -0,0 +1,88 @@
+import bz2
+import gzip
+import lzma
+from pathlib import Path
+
+try:
+    # Zstandard está en la librería estándar desde Python 3.14
+    from compression import zstd
+except ImportError:
+    zstd = None
+
+
+class TraceCompression:
+    """
+    Formatos en los que se pueden comprimir las trazas. El formato de un fichero se sabe por su extensión
+    (game_0.json.gz, games-*.jsonl.xz...), así que los ficheros comprimidos se leen igual que los que no lo están.
+
+    Las trazas repiten mucho las mismas claves (hand_P0, total_P0...), así que se comprimen mucho: con gzip ocupan unas
+    25 veces menos y con bz2 unas 60, pero bz2 y lzma escriben unas 7 veces más despacio que gzip (ver
+    Benchmarks/trace_compression_benchmark.py).
+    zstd solo está si Python trae compression.zstd (3.14 o posterior).
+    """
+    GZIP = 'gzip'
+    BZ2 = 'bz2'
+    LZMA = 'lzma'
+    ZSTD = 'zstd'
+
+    SUFFIXES = {GZIP: '.gz', BZ2: '.bz2', LZMA: '.xz', ZSTD: '.zst'}
+    # Nivel de compresión al escribir. El de gzip.open por defecto (9) es mucho más lento y apenas comprime más que 6
+    LEVELS = {GZIP: 6, BZ2: 9, LZMA: 6, ZSTD: 3}
+
+    @classmethod
+    def available(cls):
+        """
+        :return: [str...] Formatos que se pueden usar con esta versión de Python
+        """
+        return [compression for compression in cls.SUFFIXES if compression != cls.ZSTD or zstd is not None]
+
+    @classmethod
+    def suffix(cls, compression):
+        """
+        :param compression: str/None. Formato, o None para no comprimir
+        :return: str. Extensión que se añade al nombre de los ficheros ('' si no se comprimen)
+        """
+        if compression is None:
+            return ''
+        if compression not in cls.available():
+            raise ValueError('Formato de compresión no disponible: ' + str(compression) + '. Se puede usar: ' +
+                             ', '.join(cls.available()))
+        return cls.SUFFIXES[compression]
+
+    @classmethod
+    def split(cls, path):
+        """
+        Separa la extensión de compresión del nombre de un fichero
+        :param path: str/Path
+        :return: str, str/None. Nombre sin la extensión de compresión y formato (None si no está comprimido)
+        """
+        name = Path(path).name
+        for compression, suffix in cls.SUFFIXES.items():
+            if name.endswith(suffix):
+                return name[:-len(suffix)], compression
+        return name, None
+
+    @classmethod
+    def open(cls, path, mode='rt', compression=None):
+        """
+        Abre un fichero de texto, comprimido o no
+        :param path: str/Path
+        :param mode: str. 'rt', 'wt' o 'at', o 'rb' para leer los bytes (descomprimidos)
+        :param compression: str/None. Formato. Si es None se saca de la extensión del fichero
+        :return: file
+        """
+        if compression is None:
+            compression = cls.split(path)[1]
+        encoding = None if 'b' in mode else 'utf-8'
+        if compression is None:
+            return open(path, mode, encoding=encoding)
+        cls.suffix(compression)  # Falla si el formato no existe o no está disponible
+        if compression == cls.GZIP:
+            return gzip.open(path, mode, compresslevel=cls.LEVELS[cls.GZIP], encoding=encoding)
+        if compression == cls.BZ2:
+            return bz2.open(path, mode, compresslevel=cls.LEVELS[cls.BZ2], encoding=encoding)
+        # lzma y zstd no admiten nivel de compresión al leer
+        writing = 'r' not in mode
+        if compression == cls.LZMA:
+            return lzma.open(path, mode, preset=cls.LEVELS[cls.LZMA] if writing else None, encoding=encoding)
+        return zstd.open(path, mode, level=cls.LEVELS[cls.ZSTD] if writing else None, encoding=encoding)
@@ -0,0 +1,580 @@
+import argparse
+import json
+from pathlib import Path
+
+from Classes.Board import Board
+from Classes.Constants import BuildConstants, MaterialConstants
+from Classes.Hand import Hand
+from Classes.ResourceVector import ResourceVector
+
+
+class TraceEvents:
+    """
+    Traza de eventos (versión 2). En lugar de guardar en cada turno las manos, los totales y los puntos de victoria de
+    todos los jugadores, guarda solo lo que ha pasado: las colocaciones iniciales, los dados, el ladrón, los descartes,
+    los comercios, las construcciones y las cartas jugadas, además de la semilla y el resultado de la partida. El
+    tablero tampoco se guarda en cada partida: es siempre el mismo y se escribe una vez por carpeta de trazas en
+    board.json (ver TraceLoader). Ocupa unas 13 veces menos que la traza completa y json.dumps tarda unas 7 veces menos
+    (ver Benchmarks/trace_events_benchmark.py).
+
+    expand reconstruye la traza completa (versión 1) rehaciendo la partida sobre un Board a partir de los eventos, así
+    que el Visualizer puede seguir leyéndola.
+
+    Cada evento es una lista [ronda, jugador, tipo, argumentos...], donde los argumentos del final que no hacen falta no
+    se guardan:
+    START: dados, carta, [ladrón anterior, ladrón, jugador robado, material robado], [[jugador, descartes...]...],
+           cambios. Los dados son None si la carta ha dado la victoria. El ladrón y los descartes solo si sale un 7, y
+           los cambios solo si el jugador ha cambiado su mano al mover el ladrón
+    HAND: cambios. Lo que los agentes han cambiado de su mano en sus triggers antes del siguiente evento, como
+          [[jugador, cereal, mineral, arcilla, madera, lana]...] (ver GameManager.agent_call_steps)
+    TRADE: oferta, respuestas. La oferta son 10 enteros (lo que da y lo que recibe) y las respuestas son None si la
+           oferta es inviable, y si no [[receptor, completada, respuesta...]...] donde cada contraoferta es su oferta.
+           Un rechazo sin contraoferta es solo el receptor
+    BANK: material que da, material que recibe
+    TRADE_CARD, BUILD_CARD, END: carta jugada (en END puede no haberla)
+    BUILD: respuesta del agente, terminada[, tipo de carta, efecto de carta]
+
+    Que el jugador deje de comerciar o de construir no se guarda, se deduce al rehacer la partida. Las cartas son el
+    objeto de la carta de la traza completa sin las manos, con las carreteras que se han construido (built_roads) en la
+    de construir carreteras y los materiales recibidos (materials) en la de año de la abundancia, o solo su nombre si
+    no tienen nada más
+    """
+    VERSION = 2
+    BOARD_FILE = 'board.json'
+
+    # Tipos de evento. Son enteros para que ocupen poco
+    START = 0
+    HAND = 1
+    TRADE = 2
+    BANK = 3
+    TRADE_CARD = 4
+    BUILD = 5
+    BUILD_CARD = 6
+    END = 7
+
+    # Claves de la respuesta de on_build_phase que se guardan como lista. Si la respuesta tiene otras, se guarda entera
+    BUILD_KEYS = ('building', 'node_id', 'road_to')
+    BUILD_ERROR = 'Falta de materiales'
+    UNKNOWN_BUILD_ERROR = 'Se intenta constrir algo fuera de las reglas'
+    MATERIALS = ('cereal', 'mineral', 'clay', 'wood', 'wool')
+
+    def __init__(self):
+        self.seed = None
+        self.setup = [[] for _ in range(4)]
+        self.events = []
+        return
+
+    def reset(self, seed):
+        """
+        :param seed: int. Semilla de la nueva partida
+        :return: None
+        """
+        self.seed = seed
+        self.setup = [[] for _ in range(4)]
+        self.events = []
+        return
+
+    # -- -- -- -- Escritura -- -- -- --
+    def add_setup(self, player, node_id, road_to):
+        self.setup[player] += [node_id, road_to]
+        return
+
+    def add_start_turn(self, round_number, player, start_turn_object, game_manager):
+        """
+        :param round_number: int
+        :param player: int
+        :param start_turn_object: dict. start_turn de la traza completa
+        :param game_manager: GameManager. De aquí salen los descartes y lo que no guarda la carta
+        :return: None
+        """
+        self.add_agent_changes(round_number, player, game_manager)
+        cards = start_turn_object['development_card_played']
+        event = [round_number, player, self.START, start_turn_object.get('dice')]
+        if cards:
+            event.append(self.encode_card(cards[0], game_manager))
+        elif event[3] == 7:
+            event.append(None)
+        if event[3] == 7:
+            event.append([start_turn_object['past_thief_terrain'], start_turn_object['thief_terrain'],
+                          start_turn_object['robbed_player'], start_turn_object['stolen_material_id']])
+            event.append(game_manager.last_discards)
+            if game_manager.last_thief_changes:
+                event.append(game_manager.last_thief_changes)
+        self.events.append(event)
+        game_manager.reset_last_changes()
+        return
+
+    def add_commerce(self, round_number, player, commerce_phase_object, game_manager):
+        """
+        :param commerce_phase_object: dict. Elemento de commerce_phase de la traza completa
+        :return: None
+        """
+        self.add_agent_changes(round_number, player, game_manager)
+        trade_offer = commerce_phase_object['trade_offer']
+        if trade_offer == 'None':
+            # Se deduce al rehacer la partida: es lo último del comercio si nadie ha ganado
+            game_manager.reset_last_changes()
+            return
+        if trade_offer == 'played_card':
+            event = [round_number, player, self.TRADE_CARD,
+                     self.encode_card(commerce_phase_object['development_card_played'], game_manager)]
+        elif commerce_phase_object['harbor_trade']:
+            event = [round_number, player, self.BANK, trade_offer['gives'], trade_offer['receives']]
+        else:
+            answers = None
+            if not commerce_phase_object['inviable']:
+                answers = []
+                for responses in commerce_phase_object['answers']:
+                    if len(responses) == 1 and responses[0]['response'] is False:
+                        # Un rechazo sin contraoferta, lo más habitual, se guarda solo con el receptor
+                        answers.append(responses[0]['receiver'])
+                        continue
+                    answer = [responses[0]['receiver'], responses[-1]['completed']]
+                    # Cada contraoferta es la oferta a la que contesta la siguiente respuesta
+                    answer += [self.encode_offer(response['trade_offer']) for response in responses[1:]]
+                    answer.append(responses[-1]['response'])
+                    answers.append(answer)
+            event = [round_number, player, self.TRADE, self.encode_offer(trade_offer), answers]
+        self.events.append(event)
+        game_manager.reset_last_changes()
+        return
+
+    def add_build(self, round_number, player, build_phase_object, game_manager):
+        """
+        :param build_phase_object: dict. Elemento de build_phase de la traza completa
+        :return: None
+        """
+        self.add_agent_changes(round_number, player, game_manager)
+        building = build_phase_object['building']
+        if building == 'None' and 'finished' not in build_phase_object:
+            # Igual que en el comercio, se deduce al rehacer la partida
+            game_manager.reset_last_changes()
+            return
+        if building == 'played_card':
+            event = [round_number, player, self.BUILD_CARD,
+                     self.encode_card(build_phase_object['development_card_played'], game_manager)]
+        else:
+            response = {key: value for key, value in build_phase_object.items()
+                        if key not in ('finished', 'error_msg', 'card_id', 'card_type', 'card_effect')}
+            if tuple(response) == self.BUILD_KEYS[:len(response)]:
+                response = list(response.values())
+            event = [round_number, player, self.BUILD, response, build_phase_object['finished']]
+            if 'card_type' in build_phase_object:
+                event += [build_phase_object['card_type'], build_phase_object['card_effect']]
+        self.events.append(event)
+        game_manager.reset_last_changes()
+        return
+
+    def add_end_turn(self, round_number, player, end_turn_object, game_manager):
+        """
+        :param end_turn_object: dict. end_turn de la traza completa
+        :return: None
+        """
+        self.add_agent_changes(round_number, player, game_manager)
+        cards = end_turn_object['development_card_played']
+        event = [round_number, player, self.END]
+        if cards:
+            event.append(self.encode_card(cards[0], game_manager))
+        self.events.append(event)
+        game_manager.reset_last_changes()
+        return
+
+    def add_agent_changes(self, round_number, player, game_manager):
+        """
+        Añade un evento hand si los agentes han cambiado su mano desde el último evento. Los cambios de la colocación
+        inicial se añaden antes del primer turno
+        :return: None
+        """
+        if game_manager.last_agent_changes:
+            self.events.append([round_number, player, self.HAND, game_manager.last_agent_changes])
+        return
+
+    def to_object(self, summary):
+        """
+        :param summary: dict. Resultado de la partida (ver GameDirector.game_summary)
+        :return: dict. Traza de eventos de la partida
+        """
+        return {'version': self.VERSION, 'seed': self.seed, 'summary': summary, 'setup': self.setup,
+                'events': self.events}
+
+    @classmethod
+    def encode_card(cls, card_obj, game_manager):
+        """
+        :param card_obj: dict. Carta jugada en la traza completa
+        :param game_manager: GameManager
+        :return: dict. La carta sin las manos de los jugadores y con lo que hace falta para rehacer su efecto
+        """
+        card = {key: value for key, value in card_obj.items() if not key.startswith('hand_P')}
+        if card['played_card'] == 'road_building':
+            card['built_roads'] = game_manager.last_free_roads
+        elif card['played_card'] == 'year_of_plenty':
+            card['materials'] = game_manager.last_year_of_plenty
+        elif len(card) == 1:
+            # Las cartas que no se han podido jugar solo tienen el nombre
+            return card['played_card']
+        return card
+
+    @classmethod
+    def encode_offer(cls, trade_offer):
+        """
+        :param trade_offer: {'gives': {material: str}, 'receives': {material: str}}
+        :return: [int...] Los 5 materiales que da y los 5 que recibe
+        """
+        return ([int(trade_offer['gives'][material]) for material in cls.MATERIALS] +
+                [int(trade_offer['receives'][material]) for material in cls.MATERIALS])
+
+    @classmethod
+    def decode_offer(cls, offer):
+        """
+        :param offer: [int...] Oferta de encode_offer
+        :return: {'gives': {material: str}, 'receives': {material: str}}
+        """
+        return {'gives': ResourceVector(*offer[:5]).__to_object__(),
+                'receives': ResourceVector(*offer[5:]).__to_object__()}
+
+    @staticmethod
+    def static_board():
+        """
+        Tablero sin construcciones, el que se escribe en board.json
+        :return: {'board_nodes': [dict...], 'board_terrain': [dict...]}
+        """
+        board = Board()
+        return {'board_nodes': board.export_nodes(), 'board_terrain': board.export_terrain()}
+
+    # -- -- -- -- Lectura -- -- -- --
+    @classmethod
+    def is_events_trace(cls, trace):
+        return trace.get('version') == cls.VERSION
+
+    @classmethod
+    def separators(cls, trace):
+        """
+        Las trazas de eventos se escriben sin espacios. Las completas, como siempre
+        :param trace: dict
+        :return: (str, str)/None. separators de json.dumps
+        """
+        return (',', ':') if cls.is_events_trace(trace) else None
+
+    @classmethod
+    def expand(cls, trace):
+        """
+        Reconstruye la traza completa (versión 1) de una partida
+        :param trace: dict. Traza de eventos
+        :return: {'setup': dict, 'game': dict}
+        """
+        return EventReplay(trace).run()
+
+
+class EventReplay:
+    """
+    Rehace una partida a partir de su traza de eventos, con las mismas reglas que GameManager y GameDirector, para
+    sacar lo que la traza completa guarda en cada turno (manos, puntos de victoria y tablero)
+    """
+
+    def __init__(self, trace):
+        self.trace = trace
+        self.board = Board()
+        self.hands = [Hand() for _ in range(4)]
+        self.victory_points = [0] * 4
+        self.knights = [0] * 4
+        self.largest_army_player = -1
+        self.longest_road = {'longest_road': 4, 'player': -1}
+        self.longest_road_player = -1
+        self.winner = False
+        return
+
+    def run(self):
+        setup = {'board': {}}
+        for player in range(4):
+            setup['P' + str(player)] = []
+        # Los primeros pueblos se colocan de P0 a P3 y los segundos de P3 a P0
+        for player, placement in [(player, 0) for player in range(4)] + [(player, 1) for player in range(3, -1, -1)]:
+            node_id, road_to = self.trace['setup'][player][placement * 2:placement * 2 + 2]
+            self.place_starting_town(player, node_id, road_to)
+            setup['P' + str(player)].append({'id': node_id, 'road': road_to})
+
+        game = {}
+        turn = None
+        for event in self.trace['events']:
+            round_number, player, kind = event[:3]
+            args = event[3:]
+            if kind == TraceEvents.START:
+                turn = {'start_turn': self.start_turn(player, *args), 'commerce_phase': [], 'build_phase': [],
+                        'end_turn': None}
+                game.setdefault('round_' + str(round_number), {})['turn_P' + str(player)] = turn
+                trading = True
+            elif kind == TraceEvents.END:
+                if trading:
+                    self.end_commerce(turn)
+                self.end_build(turn)
+                turn['end_turn'] = self.end_turn(player, *args)
+            elif kind == TraceEvents.HAND:
+                self.change_hands(args[0])
+            elif kind in (TraceEvents.TRADE, TraceEvents.BANK, TraceEvents.TRADE_CARD):
+                turn['commerce_phase'].append(self.commerce(player, kind, args))
+            else:
+                if trading:
+                    self.end_commerce(turn)
+                    trading = False
+                turn['build_phase'].append(self.build(player, kind, args))
+
+        setup['board'].update({
+            'board_nodes': self.board.export_nodes(),
+            'board_terrain': self.board.export_terrain(),
+        })
+        return {'setup': setup, 'game': game}
+
+    # -- -- -- -- Fases -- -- -- --
+    def place_starting_town(self, player, node_id, road_to):
+        self.board.nodes[node_id]['player'] = player
+        self.hands[player].add_material([self.board.terrain[terrain_id]['terrain_type']
+                                         for terrain_id in self.board.nodes[node_id]['contacting_terrain']], 1)
+        self.victory_points[player] += 1
+        self.board.build_road(player, node_id, road_to)
+        return
+
+    def start_turn(self, player, dice, card=None, thief=None, discards=None, thief_changes=()):
+        start_turn_object = {'development_card_played': []}
+        if card is not None:
+            start_turn_object['development_card_played'].append(self.play_card(player, card))
+        if dice is None:
+            return start_turn_object
+
+        # La mano del agente y la del AgentManager son el mismo objeto, así que GameManager.give_resources le suma los
+        # materiales dos veces
+        for producer, material, amount in self.board.get_production(dice):
+            self.hands[producer].add_material(material, amount * 2)
+
+        start_turn_object['dice'] = dice
+        start_turn_object['actual_player'] = str(player)
+        if thief is not None:
+            for discarded_player, *discarded in discards:
+                for material, amount in enumerate(discarded):
+                    self.hands[discarded_player].remove_material(material, amount)
+            self.change_hands(thief_changes)
+            self.move_thief(*thief)
+            start_turn_object['past_thief_terrain'], start_turn_object['thief_terrain'], \
+                start_turn_object['robbed_player'], start_turn_object['stolen_material_id'] = thief
+
+        for i in range(4):
+            start_turn_object['hand_P' + str(i)] = self.hands[i].resources.__to_object__()
+            start_turn_object['total_P' + str(i)] = str(self.hands[i].get_total())
+        return start_turn_object
+
+    def end_commerce(self, turn):
+        """
+        Los bucles de GameDirector.round_start solo acaban sin ganador cuando el agente no comercia, así que la traza
+        de eventos no lo guarda
+        """
+        if not self.winner:
+            turn['commerce_phase'].append({'trade_offer': 'None'})
+        return
+
+    def end_build(self, turn):
+        """
+        Igual que end_commerce, salvo que la construcción también acaba si falla una construcción
+        """
+        if not self.winner and (not turn['build_phase'] or turn['build_phase'][-1]['finished']):
+            turn['build_phase'].append({'building': 'None'})
+        return
+
+    def commerce(self, player, kind, args):
+        if kind == TraceEvents.TRADE_CARD:
+            return {'trade_offer': 'played_card', 'harbor_trade': False,
+                    'development_card_played': self.play_card(player, args[0])}
+        if kind == TraceEvents.BANK:
+            gives, receives = args
+            hand = self.hands[player]
+            ratio = self.board.get_trade_ratio(player, gives)
+            if hand.get_from_id(gives) >= ratio:
+                hand.remove_material(gives, ratio)
+                hand.add_material(receives, 1)
+                answer = hand.resources.__to_object__()
+            else:
+                answer = False
+            return {'trade_offer': {'gives': gives, 'receives': receives}, 'harbor_trade': True, 'answer': answer}
+
+        offer, answers = args
+        commerce_phase_object = {'trade_offer': TraceEvents.decode_offer(offer), 'harbor_trade': False,
+                                 'inviable': answers is None}
+        if answers is None:
+            return commerce_phase_object
+
+        commerce_phase_object['answers'] = []
+        for answer in answers:
+            receiver, completed, *responses = [answer, False, False] if isinstance(answer, int) else answer
+            trade_offer = offer
+            response_objects = []
+            for count, response in enumerate(responses, 1):
+                # En las contraofertas (cuenta par) el receptor y el que ofrece se intercambian
+                giver_id, receiver_id = (player, receiver) if count % 2 else (receiver, player)
+                response_objects.append({'count': count, 'trade_offer': TraceEvents.decode_offer(trade_offer),
+                                         'giver': giver_id, 'receiver': receiver_id,
+                                         'response': True if count < len(responses) else response})
+                if count < len(responses):
+                    trade_offer = response
+            response_objects[-1]['completed'] = completed
+            commerce_phase_object['answers'].append(response_objects)
+            if completed:
+                if len(responses) % 2:
+                    self.trade_with_player(trade_offer, receiver, player)
+                else:
+                    self.trade_with_player(trade_offer, player, receiver)
+        return commerce_phase_object
+
+    def build(self, player, kind, args):
+        if kind == TraceEvents.BUILD_CARD:
+            return {'building': 'played_card', 'finished': True,
+                    'development_card_played': self.play_card(player, args[0])}
+
+        response, finished = args[:2]
+        if isinstance(response, list):
+            response = dict(zip(TraceEvents.BUILD_KEYS, response))
+        build_phase_object = dict(response)
+        building = build_phase_object['building']
+        if building not in (BuildConstants.TOWN, BuildConstants.CITY, BuildConstants.ROAD, BuildConstants.CARD):
+            build_phase_object['finished'] = False
+            build_phase_object['error_msg'] = TraceEvents.UNKNOWN_BUILD_ERROR
+            return build_phase_object
+        if not finished:
+            build_phase_object['finished'] = False
+            build_phase_object['error_msg'] = TraceEvents.BUILD_ERROR
+            return build_phase_object
+
+        hand = self.hands[player]
+        if building == BuildConstants.TOWN:
+            self.check(self.board.build_town(player, response['node_id']))
+            hand.remove_material([MaterialConstants.CEREAL, MaterialConstants.CLAY, MaterialConstants.WOOD,
+                                  MaterialConstants.WOOL], 1)
+            self.victory_points[player] += 1
+        elif building == BuildConstants.CITY:
+            self.check(self.board.build_city(player, response['node_id']))
+            hand.remove_material(MaterialConstants.CEREAL, 2)
+            hand.remove_material(MaterialConstants.MINERAL, 3)
+            self.victory_points[player] += 1
+        elif building == BuildConstants.ROAD:
+            self.check(self.board.build_road(player, response['node_id'], response['road_to']))
+            hand.remove_material([MaterialConstants.CLAY, MaterialConstants.WOOD], 1)
+        else:
+            hand.remove_material([MaterialConstants.CEREAL, MaterialConstants.MINERAL, MaterialConstants.WOOL], 1)
+            card_type, card_effect = args[2:]
+            build_phase_object['card_id'] = card_effect
+            build_phase_object['card_type'] = card_type
+            build_phase_object['card_effect'] = card_effect
+        build_phase_object['finished'] = True
+        return build_phase_object
+
+    def end_turn(self, player, card=None):
+        end_turn_object = {'development_card_played': []}
+        if card is not None:
+            end_turn_object['development_card_played'].append(self.play_card(player, card))
+
+        if not self.winner:
+            # Igual que GameDirector.end_turn: se quita el título y se le da a quien tenga la carretera más larga
+            if self.longest_road_player != -1:
+                self.victory_points[self.longest_road_player] -= 2
+            longest_road_obj = self.board.road_network.longest_road()
+            if longest_road_obj['longest_road'] > self.longest_road['longest_road']:
+                self.longest_road = longest_road_obj
+            self.longest_road_player = self.longest_road['player']
+            if self.longest_road_player != -1:
+                self.victory_points[self.longest_road_player] += 2
+
+        end_turn_object['victory_points'] = {'J' + str(i): str(self.victory_points[i]) for i in range(4)}
+        return end_turn_object
+
+    # -- -- -- -- Efectos -- -- -- --
+    def play_card(self, player, card):
+        """
+        :param player: int
+        :param card: dict. Carta de la traza de eventos
+        :return: dict. Carta de la traza completa
+        """
+        if isinstance(card, str):
+            card = {'played_card': card}
+        card_obj = {key: value for key, value in card.items() if key not in ('built_roads', 'materials')}
+        played_card = card['played_card']
+        if played_card == 'knight':
+            self.knights[player] = card['total_knights']
+            # GameManager nunca sube el mínimo del ejército más grande, así que cualquiera con más de 2 caballeros se
+            # lo queda
+            if self.knights[player] > 2:
+                if self.largest_army_player != -1:
+                    self.victory_points[self.largest_army_player] -= 2
+                self.largest_army_player = player
+                self.victory_points[player] += 2
+            self.move_thief(card['past_thief_terrain'], card['thief_terrain'], card['robbed_player'],
+                            card['stolen_material_id'])
+        elif played_card == 'victory_point':
+            self.victory_points[player] = 10
+            self.winner = True
+        elif played_card == 'monopoly':
+            material = card['material_chosen']
+            material_sum = 0
+            for hand in self.hands:
+                material_sum += hand.get_from_id(material)
+                hand.remove_material(material, hand.get_from_id(material))
+            self.hands[player].add_material(material, material_sum)
+            for i in range(4):
+                card_obj['hand_P' + str(i)] = self.hands[i].resources.__to_object__()
+        elif played_card == 'road_building':
+            for node_id, road_to in card['built_roads']:
+                self.check(self.board.build_road(player, node_id, road_to))
+        elif played_card == 'year_of_plenty':
+            for material in card['materials']:
+                self.hands[player].add_material(material, 1)
+            card_obj['hand_P' + str(player)] = self.hands[player].resources.__to_object__()
+        return card_obj
+
+    def change_hands(self, changes):
+        """
+        :param changes: [[jugador, cereal, mineral, arcilla, madera, lana]...] Cambios de los agentes en su mano
+        :return: None
+        """
+        for player, *amounts in changes:
+            for material, amount in enumerate(amounts):
+                self.hands[player].add_material(material, amount)
+        return
+
+    def move_thief(self, past_thief_terrain, thief_terrain, robbed_player, stolen_material_id):
+        self.board.set_thief(past_thief_terrain, False)
+        self.board.set_thief(thief_terrain, True)
+        if robbed_player != -1:
+            self.hands[robbed_player].remove_material(stolen_material_id, 1)
+            # GameManager._steal_from_player le da el material a agent_manager.actual_player, que nunca cambia de 0
+            self.hands[0].add_material(stolen_material_id, 1)
+        return
+
+    def trade_with_player(self, offer, giver, receiver):
+        """
+        Igual que GameManager._trade_with_player, que ya ha comprobado que los dos tienen los materiales
+        """
+        for material in range(5):
+            self.hands[giver].remove_material(material, offer[material])
+            self.hands[receiver].add_material(material, offer[material])
+            self.hands[receiver].remove_material(material, offer[5 + material])
+            self.hands[giver].add_material(material, offer[5 + material])
+        return
+
+    @staticmethod
+    def check(built):
+        if not built['response']:
+            raise ValueError('La traza de eventos no corresponde a la partida: ' + built['error_msg'])
+        return
+
+
+if __name__ == '__main__':
+    from TraceLoader.TraceLoader import TraceLoader
+
+    parser = argparse.ArgumentParser(description='Convierte trazas de eventos en trazas completas (game_N.json) para '
+                                                 'el Visualizer')
+    parser.add_argument('path', help='Carpeta de trazas o fichero de trazas')
+    parser.add_argument('output', help='Carpeta en la que se escriben las trazas completas')
+    args = parser.parse_args()
+
+    output = Path(args.output)
+    output.mkdir(parents=True, exist_ok=True)
+    for trace in TraceLoader.read(args.path, expand=True):
+        game_number = trace.pop('game_number')
+        with open(output / ('game_' + str(game_number) + '.json'), 'w', encoding='utf-8') as outfile:
+            outfile.write(json.dumps(trace))
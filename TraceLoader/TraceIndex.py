@@ -0,0 +1,364 @@
+import argparse
+import json
+import os
+import re
+import uuid
+from pathlib import Path
+
+from TraceLoader.TraceCompression import TraceCompression
+from TraceLoader.TraceEvents import TraceEvents
+from TraceLoader.TraceLoader import TraceLoader
+from TraceLoader.TraceStream import TraceStream
+
+
+class TraceIndex:
+    """
+    Índice de una carpeta de trazas (TraceLoader/Traces/<fecha>), para buscar partidas sin abrir todas las trazas.
+    Se guarda en la propia carpeta, en index.json.
+
+    Por cada partida guarda su resultado (GAME_FIELDS), las cartas que se han jugado, en qué fichero está su traza y en
+    qué bytes (offset y length), para leer solo esa traza. En las trazas completas guarda también los bytes de cada
+    ronda (round_offsets), para leer solo una ronda. Las trazas de eventos y de resultado llevan el resultado de la partida;
+    en las completas solo están winner, victory_points y rounds, sacados de la última ronda, y el resto es None.
+
+    El índice se actualiza al abrirlo (open): solo se vuelven a leer los ficheros de trazas nuevos o que han cambiado,
+    y de los JSON Lines sin comprimir solo las líneas nuevas. En los ficheros comprimidos los bytes son los del
+    fichero descomprimido, así que para leer una traza se descomprime el fichero hasta ella.
+
+    Por ejemplo, las partidas en las que el jugador 2 gana en menos de 60 rondas:
+    TraceIndex.open(path).query(lambda game: game['winner'] == 2 and game['rounds'] < 60)
+    y las partidas en las que se ha jugado un monopolio: query(lambda game: game['cards'].get('monopoly')).
+
+    path: Path Carpeta de trazas
+    files: {str: dict} Por cada fichero de trazas su tamaño, su fecha de modificación, hasta qué byte se ha leído y sus
+                       partidas
+    """
+    FILE = 'index.json'
+    VERSION = 1
+    GAME_FIELDS = ('game_number', 'seed', 'agents', 'winner', 'victory_points', 'largest_army', 'longest_road',
+                   'rounds', 'max_rounds_reached')
+
+    WHITESPACE = re.compile(r'[ \t\n\r]*')
+    DECODER = json.JSONDecoder()
+
+    def __init__(self, path, files=None):
+        self.path = Path(path)
+        self.files = files if files is not None else {}
+        return
+
+    @classmethod
+    def open(cls, path, update=True):
+        """
+        :param path: str/Path. Carpeta de trazas
+        :param update: bool. Actualizar el índice con los ficheros de trazas nuevos o que han cambiado
+        :return: TraceIndex
+        """
+        path = Path(path)
+        files = None
+        if (path / cls.FILE).exists():
+            with open(path / cls.FILE, encoding='utf-8') as index_file:
+                index_object = json.load(index_file)
+            if index_object.get('version') == cls.VERSION:
+                files = index_object['files']
+        index = cls(path, files)
+        if update and index.update():
+            index.save()
+        return index
+
+    def trace_files(self):
+        """
+        :return: [Path...] Ficheros de trazas de la carpeta, en el mismo orden que TraceLoader.read
+        """
+        game_paths = [file_path for file_path in self.path.glob('game_*.json*')
+                      if TraceCompression.split(file_path)[0].endswith('.json')]
+        stream_paths = [file_path for file_path in self.path.glob('*' + TraceStream.SUFFIX + '*')
+                        if TraceCompression.split(file_path)[0].endswith(TraceStream.SUFFIX)]
+        return sorted(game_paths, key=TraceLoader._game_number) + sorted(stream_paths)
+
+    def update(self):
+        """
+        Lee los ficheros de trazas nuevos o que han cambiado y quita los que ya no están
+        :return: bool. Si el índice ha cambiado
+        """
+        changed = False
+        trace_files = self.trace_files()
+        names = {file_path.name for file_path in trace_files}
+        for name in list(self.files):
+            if name not in names:
+                del self.files[name]
+                changed = True
+
+        for file_path in trace_files:
+            stat = file_path.stat()
+            indexed = self.files.get(file_path.name)
+            if indexed is not None and indexed['size'] == stat.st_size and indexed['mtime'] == stat.st_mtime_ns:
+                continue
+            if TraceCompression.split(file_path)[0].endswith(TraceStream.SUFFIX):
+                # De un JSON Lines sin comprimir que ha crecido solo se leen las líneas nuevas
+                if (indexed is None or TraceCompression.split(file_path)[1] is not None or
+                        stat.st_size < indexed['size']):
+                    indexed = {'end': 0, 'games': []}
+                end, games = self.index_stream(file_path, indexed['end'])
+                indexed = {'end': end, 'games': indexed['games'] + games}
+            else:
+                indexed = {'games': [self.index_game_file(file_path)]}
+            indexed.update(size=stat.st_size, mtime=stat.st_mtime_ns)
+            self.files[file_path.name] = indexed
+            changed = True
+        return changed
+
+    def save(self):
+        """
+        Escribe index.json. Se escribe en un fichero propio y se renombra, para que nadie lea un índice a medias
+        :return: None
+        """
+        temporary_path = self.path / (self.FILE + '.' + uuid.uuid4().hex[:8] + '.tmp')
+        with open(temporary_path, 'w', encoding='utf-8') as index_file:
+            index_file.write(json.dumps({'version': self.VERSION, 'files': self.files}, separators=(',', ':')))
+        os.replace(temporary_path, self.path / self.FILE)
+        return
+
+    # -- -- -- -- Lectura de las trazas -- -- -- --
+    def index_game_file(self, file_path):
+        """
+        :param file_path: Path. Fichero game_N.json, comprimido o no
+        :return: dict. Entrada del índice de la partida
+        """
+        with TraceCompression.open(file_path, 'rb') as trace_file:
+            data = trace_file.read()
+        return self.index_trace(data.decode('utf-8'), TraceLoader._game_number(file_path), 0, len(data))
+
+    def index_stream(self, file_path, start):
+        """
+        :param file_path: Path. Fichero JSON Lines, comprimido o no
+        :param start: int. Byte desde el que se lee, el final de la última línea ya leída
+        :return: int, [dict...] Final de la última línea completa y entradas del índice de sus partidas
+        """
+        games = []
+        offset = start
+        with TraceCompression.open(file_path, 'rb') as trace_file:
+            trace_file.seek(start)
+            try:
+                for line in trace_file:
+                    # Una línea sin salto de línea es la de una partida que no se terminó de escribir
+                    if not line.endswith(b'\n'):
+                        break
+                    games.append(self.index_trace(line.decode('utf-8'), None, offset, len(line)))
+                    offset += len(line)
+            except EOFError:
+                # Fichero comprimido que no se terminó de escribir: ya se han leído las partidas completas
+                pass
+        return offset, games
+
+    def index_trace(self, text, game_number, offset, length):
+        """
+        :param text: str. JSON de la traza
+        :param game_number: int/None. Número de partida, si no está en la traza
+        :param offset: int. Byte del fichero en el que empieza la traza
+        :param length: int. Bytes de la traza
+        :return: dict. Entrada del índice de la partida
+        """
+        trace, rounds = self.parse(text)
+        game = dict.fromkeys(self.GAME_FIELDS)
+        game.update(offset=offset, length=length, format='summary', cards=None, round_offsets=None)
+        if TraceEvents.is_events_trace(trace):
+            game.update({key: value for key, value in trace['summary'].items() if key in game})
+            game.update(format='events', seed=trace['seed'], cards=self.count_event_cards(trace['events']))
+        elif 'game' in trace:
+            game.update(self.full_trace_summary(trace['game']))
+            game.update(format='full', cards=self.count_full_cards(trace['game']), round_offsets=rounds)
+        elif 'summary' in trace:
+            game.update({key: value for key, value in trace['summary'].items() if key in game})
+        if 'game_number' in trace:
+            game['game_number'] = trace['game_number']
+        elif game_number is not None:
+            game['game_number'] = game_number
+        return game
+
+    @classmethod
+    def parse(cls, text):
+        """
+        Lee una traza y, si es completa, dónde empieza y acaba cada ronda
+        :param text: str. JSON de la traza
+        :return: dict, {str: [int, int]} Traza y, por cada ronda, su primer byte y su longitud dentro de la traza
+        """
+        rounds = {}
+
+        def read_round(key, start):
+            value, end = cls.DECODER.raw_decode(text, start)
+            rounds[key[len('round_'):]] = [start, end - start]
+            return value, end
+
+        def read_member(key, start):
+            if key == 'game' and text[start] == '{':
+                return cls.parse_object(text, start, read_round)
+            return cls.DECODER.raw_decode(text, start)
+
+        trace, _ = cls.parse_object(text, cls.WHITESPACE.match(text).end(), read_member)
+        if not text.isascii():
+            # Las posiciones de los caracteres no son las de los bytes
+            for round_key, (start, length) in rounds.items():
+                byte_start = len(text[:start].encode('utf-8'))
+                rounds[round_key] = [byte_start, len(text[start:start + length].encode('utf-8'))]
+        return trace, rounds
+
+    @classmethod
+    def parse_object(cls, text, position, read_value):
+        """
+        Lee un objeto JSON miembro a miembro, para saber dónde está el valor de cada uno
+        :param text: str
+        :param position: int. Posición del '{' del objeto
+        :param read_value: function(str, int) -> (object, int). Lee el valor de la clave que empieza en una posición y
+                           devuelve el valor y la posición en la que acaba
+        :return: dict, int. El objeto y la posición en la que acaba
+        """
+        json_object = {}
+        position = cls.WHITESPACE.match(text, position + 1).end()
+        if text[position] == '}':
+            return json_object, position + 1
+        while True:
+            key, position = cls.DECODER.raw_decode(text, position)
+            # Se salta el ':'
+            start = cls.WHITESPACE.match(text, cls.WHITESPACE.match(text, position).end() + 1).end()
+            json_object[key], end = read_value(key, start)
+            position = cls.WHITESPACE.match(text, end).end()
+            if text[position] == '}':
+                return json_object, position + 1
+            position = cls.WHITESPACE.match(text, position + 1).end()
+
+    @staticmethod
+    def full_trace_summary(game):
+        """
+        :param game: dict. Rondas de una traza completa
+        :return: dict. Ganador, puntos de victoria y rondas, sacados de la última ronda
+        """
+        summary = {'rounds': len(game)}
+        if game:
+            last_round = game['round_' + str(len(game) - 1)]
+            victory_points = last_round[list(last_round)[-1]]['end_turn']['victory_points']
+            summary['victory_points'] = [int(victory_points['J' + str(player)]) for player in range(4)]
+            summary['winner'] = next((player for player, points in enumerate(summary['victory_points'])
+                                      if points >= 10), -1)
+            summary['max_rounds_reached'] = summary['winner'] == -1
+        return summary
+
+    @staticmethod
+    def count_full_cards(game):
+        """
+        :param game: dict. Rondas de una traza completa
+        :return: {str: int} Veces que se ha jugado cada carta
+        """
+        cards = {}
+        for round_object in game.values():
+            for turn in round_object.values():
+                played = turn['start_turn']['development_card_played'] + turn['end_turn']['development_card_played']
+                played += [commerce['development_card_played'] for commerce in turn['commerce_phase']
+                           if commerce['trade_offer'] == 'played_card']
+                played += [build['development_card_played'] for build in turn['build_phase']
+                           if build['building'] == 'played_card']
+                for card in played:
+                    cards[card['played_card']] = cards.get(card['played_card'], 0) + 1
+        return cards
+
+    @staticmethod
+    def count_event_cards(events):
+        """
+        :param events: [list...] Eventos de una traza de eventos
+        :return: {str: int} Veces que se ha jugado cada carta
+        """
+        cards = {}
+        for _, _, kind, *args in events:
+            card = None
+            if kind == TraceEvents.START and len(args) > 1:
+                card = args[1]
+            elif kind in (TraceEvents.TRADE_CARD, TraceEvents.BUILD_CARD, TraceEvents.END) and args:
+                card = args[0]
+            if card is not None:
+                name = card if isinstance(card, str) else card['played_card']
+                cards[name] = cards.get(name, 0) + 1
+        return cards
+
+    # -- -- -- -- Consultas -- -- -- --
+    def games(self):
+        """
+        :return: generator(dict) Entrada del índice de cada partida, con el nombre de su fichero en file
+        """
+        for name, indexed in self.files.items():
+            for game in indexed['games']:
+                yield dict(game, file=name)
+
+    def query(self, predicate=None, **fields):
+        """
+        Partidas que cumplen una condición, sin leer sus trazas
+        :param predicate: function(dict)/None. Recibe la entrada del índice de cada partida
+        :param fields: Campos que tienen que tener un valor (winner=2...)
+        :return: [dict...] Entradas del índice de las partidas
+        """
+        return [game for game in self.games()
+                if all(game[key] == value for key, value in fields.items()) and
+                (predicate is None or predicate(game))]
+
+    def read_bytes(self, game, offset=0, length=None):
+        """
+        :param game: dict. Entrada del índice de la partida
+        :param offset: int. Byte de la traza desde el que se lee
+        :param length: int/None. Bytes que se leen. Si es None, hasta el final de la traza
+        :return: str
+        """
+        with TraceCompression.open(self.path / game['file'], 'rb') as trace_file:
+            trace_file.seek(game['offset'] + offset)
+            return trace_file.read(game['length'] - offset if length is None else length).decode('utf-8')
+
+    def load(self, game, expand=False):
+        """
+        Lee la traza de una partida del índice, como TraceLoader.read
+        :param game: dict. Entrada del índice de la partida
+        :param expand: bool. Devolver las trazas de eventos como trazas completas (ver TraceEvents.expand)
+        :return: dict
+        """
+        trace = json.loads(self.read_bytes(game))
+        trace.pop('game_number', None)
+        if expand and TraceEvents.is_events_trace(trace):
+            trace = TraceEvents.expand(trace)
+        return dict(game_number=game['game_number'], **trace)
+
+    def load_round(self, game, round_number):
+        """
+        Lee una ronda de la traza de una partida del índice. De las trazas completas solo se leen los bytes de la ronda
+        :param game: dict. Entrada del índice de la partida
+        :param round_number: int
+        :return: dict/list. La ronda de la traza completa, o los eventos de la ronda de la traza de eventos
+        """
+        if game['format'] == 'full':
+            offset, length = game['round_offsets'][str(round_number)]
+            return json.loads(self.read_bytes(game, offset, length))
+        if game['format'] == 'events':
+            return [event for event in self.load(game)['events'] if event[0] == round_number]
+        raise ValueError('La traza de la partida ' + str(game['game_number']) + ' no tiene rondas')
+
+    def traces(self, predicate=None, expand=False, **fields):
+        """
+        Trazas de las partidas que cumplen una condición (ver query), leídas de una en una según se piden
+        :return: generator(dict)
+        """
+        for game in self.query(predicate, **fields):
+            yield self.load(game, expand)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Crea o actualiza el índice de una carpeta de trazas y muestra las '
+                                                 'partidas que cumplen unas condiciones')
+    parser.add_argument('path', help='Carpeta de trazas')
+    parser.add_argument('--winner', type=int, default=None)
+    parser.add_argument('--max-rounds', type=int, default=None, help='Partidas de menos rondas que estas')
+    parser.add_argument('--card', default=None, help='Partidas en las que se ha jugado esta carta (monopoly...)')
+    args = parser.parse_args()
+
+    trace_index = TraceIndex.open(args.path)
+    matches = trace_index.query(lambda game: (args.winner is None or game['winner'] == args.winner) and
+                                (args.max_rounds is None or game['rounds'] < args.max_rounds) and
+                                (args.card is None or (game['cards'] or {}).get(args.card, 0) > 0))
+    for game in matches:
+        print(json.dumps({key: game[key] for key in ('game_number', 'file', 'winner', 'rounds', 'cards')}))
+    print(str(len(matches)) + ' of ' + str(sum(len(indexed['games']) for indexed in trace_index.files.values())) +
+          ' games')
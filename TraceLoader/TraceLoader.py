@@ -1,21 +1,43 @@
 # from TraceLoader.Interpreter import Interpreter
 import json
+import os
+import shutil
+import uuid
 from pathlib import Path
 from datetime import datetime
 
+from TraceLoader.TraceCompression import TraceCompression
+from TraceLoader.TraceEvents import TraceEvents
+from TraceLoader.TraceStream import TraceStream
+
 
 class TraceLoader:
-    all_games_trace = []
-    current_trace = {}
-    full_path = ''
+    """
+    Guarda las trazas de las partidas de un GameDirector. Todo es de la instancia, así que varios GameDirector pueden
+    jugar a la vez sin mezclar sus trazas.
+
+    Con un TraceStream (stream) cada traza se añade a un fichero JSON Lines en cuanto termina la partida, en lugar de
+    escribirse en su propio fichero y guardarse en all_games_trace, así que la memoria no crece con las partidas
+
+    Con compression (un formato de TraceCompression) game_N.json y games.json se escriben comprimidos, con la extensión
+    del formato (game_N.json.gz...). read lee las trazas de cualquiera de estos ficheros, comprimidos o no
 
-    def __init__(self):
+    Con las trazas de eventos (ver TraceEvents) el tablero no va en cada traza: se escribe una vez en board.json, en la
+    carpeta de las trazas
+    """
+
+    def __init__(self, stream=None, compression=None):
+        TraceCompression.suffix(compression)  # Falla aquí si el formato no existe, no al terminar la primera partida
+        self.stream = stream
+        self.compression = compression
+        self.all_games_trace = []
+        self.current_trace = {}
+        self.board_exported = False
         # Cogemos el día y hora para ponerle el nombre a la carpeta a crear en trazas
-        # Creamos la carpeta del día y hora de hoy para guardar todas las trazas ahí
-        # Si no existe la carpeta "Traces" la crea
+        # La carpeta del día y hora de hoy se crea al exportar la primera traza, así no se crean carpetas vacías
+        # cuando se juega sin traza
         today = datetime.today().strftime('%Y-%m-%d_%H-%M-%S')
         self.full_path = Path(__file__).parent / "Traces" / today
-        self.full_path.mkdir(parents=True)
         return
 
     def export_to_file(self, game_number):
@@ -23,10 +45,17 @@ class TraceLoader:
         Función que exporta a formato JSON la variable current_trace
         :return: None
         """
+        if not self.board_exported and TraceEvents.is_events_trace(self.current_trace):
+            self.export_board(self.stream.path.parent if self.stream is not None else self.full_path)
+
+        if self.stream is not None:
+            self.stream.write(game_number, self.current_trace)
+            return
 
-        json_obj = json.dumps(self.current_trace)
-        file_path = self.full_path / ("game_" + str(game_number) + '.json')
-        with open(file_path, 'w') as outfile:
+        json_obj = json.dumps(self.current_trace, separators=TraceEvents.separators(self.current_trace))
+        self.full_path.mkdir(parents=True, exist_ok=True)
+        file_path = self.full_path / ("game_" + str(game_number) + '.json' + TraceCompression.suffix(self.compression))
+        with TraceCompression.open(file_path, 'wt', self.compression) as outfile:
             outfile.write(json_obj)
 
         # Se añade la traza al json con todas las trazas
@@ -39,10 +68,104 @@ class TraceLoader:
         :return: None
         """
         json_obj = json.dumps(self.all_games_trace)
-        file_path = self.full_path / "games.json"
-        with open(file_path, 'w') as outfile:
+        self.full_path.mkdir(parents=True, exist_ok=True)
+        file_path = self.full_path / ("games.json" + TraceCompression.suffix(self.compression))
+        with TraceCompression.open(file_path, 'wt', self.compression) as outfile:
             outfile.write(json_obj)
 
         # Se resetea la variable una vez se ha exportado
         self.all_games_trace = []
         return
+
+    def export_game_files(self, game_numbers):
+        """
+        Escribe games.json con las trazas de los game_N.json de la carpeta, para cuando no se han guardado en
+        all_games_trace (TournamentRunner). Se copian los ficheros de uno en uno, sin cargar las trazas en memoria
+        :param game_numbers: [int...] Partidas, en el orden en el que van en games.json. Las que no tienen fichero se
+                             saltan
+        :return: Path/None. El fichero escrito, o None si no hay ninguna traza
+        """
+        suffix = TraceCompression.suffix(self.compression)
+        game_paths = [self.full_path / ('game_' + str(game_number) + '.json' + suffix) for game_number in game_numbers]
+        game_paths = [game_path for game_path in game_paths if game_path.exists()]
+        if not game_paths:
+            return None
+
+        file_path = self.full_path / ("games.json" + suffix)
+        with TraceCompression.open(file_path, 'wt', self.compression) as outfile:
+            # Mismo formato que json.dumps de la lista de trazas
+            outfile.write('[')
+            for position, game_path in enumerate(game_paths):
+                if position:
+                    outfile.write(', ')
+                with TraceCompression.open(game_path) as game_file:
+                    shutil.copyfileobj(game_file, outfile)
+            outfile.write(']')
+        return file_path
+
+    def export_board(self, directory):
+        """
+        Escribe el tablero sin construcciones en board.json, si no lo ha escrito ya otro proceso
+        :param directory: Path. Carpeta de las trazas
+        :return: None
+        """
+        file_path = directory / (TraceEvents.BOARD_FILE + TraceCompression.suffix(self.compression))
+        if not file_path.exists():
+            directory.mkdir(parents=True, exist_ok=True)
+            # Se escribe en un fichero propio y se renombra, para que otro proceso nunca lea un board.json a medias
+            temporary_path = directory / (file_path.name + '.' + uuid.uuid4().hex[:8] + '.tmp')
+            with TraceCompression.open(temporary_path, 'wt', self.compression) as outfile:
+                outfile.write(json.dumps(TraceEvents.static_board()))
+            os.replace(temporary_path, file_path)
+        self.board_exported = True
+        return
+
+    @staticmethod
+    def read(path, expand=False):
+        """
+        Lee las trazas de una carpeta de trazas o de un fichero, comprimidos o no, de una en una: solo tiene en memoria
+        la traza de una partida (salvo con games.json, que se lee entero). Cada traza lleva su número de partida en
+        game_number, como las de TraceStream.read. Una carpeta se lee en orden de partida (game_N.json) y después sus
+        ficheros JSON Lines; su games.json no, porque repite las trazas de los game_N.json
+        :param path: str/Path. Carpeta o fichero (game_N.json, games.json o JSON Lines)
+        :param expand: bool. Si es True, las trazas de eventos se devuelven como trazas completas (ver
+                       TraceEvents.expand)
+        :return: generator(dict)
+        """
+        if expand:
+            for trace in TraceLoader.read(path):
+                if TraceEvents.is_events_trace(trace):
+                    trace = dict(game_number=trace['game_number'], **TraceEvents.expand(trace))
+                yield trace
+            return
+
+        path = Path(path)
+        if path.is_dir():
+            game_paths = [file_path for file_path in path.glob('game_*.json*')
+                          if TraceCompression.split(file_path)[0].endswith('.json')]
+            for file_path in sorted(game_paths, key=TraceLoader._game_number):
+                yield from TraceLoader.read(file_path)
+            yield from TraceStream.read(path)
+            return
+
+        name = TraceCompression.split(path)[0]
+        if name.endswith(TraceStream.SUFFIX):
+            yield from TraceStream.read(path)
+        elif name.startswith('game_'):
+            with TraceCompression.open(path) as trace_file:
+                yield dict(game_number=TraceLoader._game_number(path), **json.load(trace_file))
+        else:
+            with TraceCompression.open(path) as trace_file:
+                all_games_trace = json.load(trace_file)
+            # games.json no guarda los números de partida, están en el orden en el que se jugaron
+            for game_number, trace in enumerate(all_games_trace):
+                yield dict(game_number=game_number, **trace)
+        return
+
+    @staticmethod
+    def _game_number(path):
+        """
+        :param path: Path. Fichero game_N.json, comprimido o no
+        :return: int. N
+        """
+        return int(TraceCompression.split(path)[0][len('game_'):-len('.json')])
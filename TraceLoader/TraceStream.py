@@ -0,0 +1,106 @@
+import json
+import os
+import socket
+import time
+import uuid
+from pathlib import Path
+
+from TraceLoader.TraceCompression import TraceCompression
+from TraceLoader.TraceEvents import TraceEvents
+
+
+class TraceStream:
+    """
+    Escribe las trazas de las partidas en un fichero JSON Lines según terminan, una línea por partida, sin guardarlas en
+    memoria. La memoria que usa no depende del número de partidas.
+
+    Cada línea es la traza de la partida (la misma que se guarda en game_N.json) con su número de partida en
+    game_number. El fichero se vacía a disco cada flush_games partidas o cada flush_interval segundos, así que si el
+    proceso muere como mucho se pierden esas partidas; read descarta la última línea si se quedó a medias.
+
+    Si el nombre del fichero termina en la extensión de un formato de TraceCompression (games.jsonl.gz...) se escribe
+    comprimido. Al vaciarlo a disco, gzip y zstd escriben todo lo que tienen; bz2 y lzma solo bloques completos, así
+    que si el proceso muere se pueden perder más partidas.
+
+    path: Path Fichero JSON Lines
+    flush_games: int Partidas entre cada vaciado a disco
+    flush_interval: float Segundos máximos entre vaciados a disco
+    """
+    SUFFIX = '.jsonl'
+
+    def __init__(self, path, flush_games=16, flush_interval=1.0):
+        self.path = Path(path)
+        self.flush_games = flush_games
+        self.flush_interval = flush_interval
+        self.file = None
+        self.unflushed_games = 0
+        self.last_flush = time.monotonic()
+        return
+
+    @classmethod
+    def in_directory(cls, directory, compression=None, **kwargs):
+        """
+        TraceStream con un fichero propio en una carpeta, para que varios procesos o hilos escriban en la misma carpeta
+        sin mezclar sus líneas
+        :param directory: str/Path
+        :param compression: str/None. Formato de TraceCompression en el que se comprime el fichero
+        :return: TraceStream
+        """
+        name = ('games-' + socket.gethostname() + '-' + str(os.getpid()) + '-' + uuid.uuid4().hex[:8] + cls.SUFFIX +
+                TraceCompression.suffix(compression))
+        return cls(Path(directory) / name, **kwargs)
+
+    def write(self, game_number, trace):
+        """
+        Añade la traza de una partida
+        :param game_number: int
+        :param trace: dict. Traza de la partida (TraceLoader.current_trace)
+        :return: None
+        """
+        if self.file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.file = TraceCompression.open(self.path, 'at')
+        self.file.write(json.dumps(dict(game_number=game_number, **trace), separators=TraceEvents.separators(trace)) +
+                        '\n')
+        self.unflushed_games += 1
+        if self.unflushed_games >= self.flush_games or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+        return
+
+    def flush(self):
+        if self.file is not None:
+            self.file.flush()
+        self.unflushed_games = 0
+        self.last_flush = time.monotonic()
+        return
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        return
+
+    @classmethod
+    def read(cls, path):
+        """
+        Lee las trazas de un fichero, o de todos los ficheros JSON Lines de una carpeta, comprimidos o no, de una en una
+        :param path: str/Path. Fichero o carpeta
+        :return: generator(dict)
+        """
+        path = Path(path)
+        if path.is_dir():
+            paths = sorted(file_path for file_path in path.glob('*' + cls.SUFFIX + '*')
+                           if TraceCompression.split(file_path)[0].endswith(cls.SUFFIX))
+        else:
+            paths = [path]
+        for file_path in paths:
+            with TraceCompression.open(file_path) as trace_file:
+                try:
+                    for line in trace_file:
+                        # Una línea sin salto de línea es la de una partida que no se terminó de escribir
+                        if line.endswith('\n'):
+                            yield json.loads(line)
+                except EOFError:
+                    # Fichero comprimido que no se terminó de escribir: ya se han leído las partidas completas
+                    pass
+        return
@@ -1,22 +1,214 @@
-from Managers.GameDirector import GameDirector
+import argparse
+import json
+import os
 
+from Classes.AgentWatchdog import AgentWatchdog
+from Classes.Constants import TraceLevelConstants
+from Managers.LeagueScheduler import LeagueScheduler
+from Managers.SequentialTournament import SequentialTournament
+from Managers.TournamentRunner import SEED_LIMIT, TournamentRunner
+from TraceLoader.TraceCompression import TraceCompression
 
-def main():
-    game_director = GameDirector()
-    try:
-        games_to_play = int(input('Number of games to be played: '))
-    except ValueError:
-        games_to_play = 0
-    if isinstance(games_to_play, int) and games_to_play > 0:
-        for i in range(games_to_play):
-            print('......')
-            game_director.game_start(i + 1)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Juega partidas de Catan entre 4 agentes de la carpeta Agents/')
+    parser.add_argument('agents', nargs='*', default=[],
+                        help='Módulo y clase de cada agente (MyModule.MyClass). Se indican 4, o 1 para que juegue '
+                             'en los 4 asientos. Por defecto RandomAgent.RandomAgent')
+    parser.add_argument('-n', '--games', type=int, default=1,
+                        help='Número de partidas (de cada mesa en una liga, máximo con --sprt)')
+    parser.add_argument('-s', '--seed', type=int, default=0,
+                        help='Semilla base, de 0 a 2^32 - 1. Cada partida tiene la suya')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1, help='Número de procesos o hilos')
+    parser.add_argument('-e', '--executor', default=None, choices=('process', 'thread'),
+                        help='Jugar las partidas en procesos o en hilos. Por defecto hilos solo en Python sin GIL')
+    parser.add_argument('-t', '--trace-level', default=TraceLevelConstants.FULL,
+                        choices=(TraceLevelConstants.NONE, TraceLevelConstants.SUMMARY, TraceLevelConstants.FULL,
+                                 TraceLevelConstants.EVENTS),
+                        help='Traza que se guarda de cada partida')
+    parser.add_argument('--max-rounds', type=int, default=1000, help='Máximo de rondas por partida')
+    parser.add_argument('-o', '--output', default=None,
+                        help='Fichero en el que se escribe el resultado de cada partida, una línea JSON por partida')
+    parser.add_argument('-q', '--quiet', action='store_true', help='No mostrar el resultado de cada partida')
+    parser.add_argument('-b', '--time-budget', action='append', default=[], metavar='[TRIGGER=]SECONDS',
+                        help='Tiempo máximo de respuesta de los agentes. Con TRIGGER=SECONDS (p. ej. '
+                             'on_build_phase=0.5) solo para ese trigger, con SECONDS para todos. Se puede repetir')
+    parser.add_argument('--sandbox', action='store_true',
+                        help='Ejecutar cada agente en su propio proceso, para que un agente que falla no pare el '
+                             'torneo')
+    parser.add_argument('--queue', default=None, metavar='FILE',
+                        help='Cola SQLite de partidas. Si el torneo se para, al volver a lanzarlo se juegan solo las '
+                             'que faltan. Varias máquinas con el mismo fichero se reparten las partidas')
+    parser.add_argument('--stale-timeout', type=float, default=300.0,
+                        help='Segundos tras los que una partida de la cola reservada por un proceso muerto se vuelve '
+                             'a jugar')
+    parser.add_argument('--max-attempts', type=int, default=3,
+                        help='Veces que se puede reservar una partida de la cola antes de darla por fallida')
+    parser.add_argument('--league', action='store_true',
+                        help='Liga entre 4 o más agentes: cada grupo de 4 juega en todos los órdenes de asientos')
+    parser.add_argument('--seat-orders', default=LeagueScheduler.PERMUTATIONS,
+                        choices=(LeagueScheduler.PERMUTATIONS, LeagueScheduler.ROTATIONS),
+                        help='Órdenes de asientos de cada grupo de la liga: los 24 o las 4 rotaciones')
+    parser.add_argument('-r', '--results', default=None, metavar='DIR',
+                        help='Carpeta en la que se añade el resultado de cada partida en formato binario (ver '
+                             'TraceLoader/ResultsStore.py)')
+    parser.add_argument('--stream-traces', action='store_true',
+                        help='Escribir las trazas en ficheros JSON Lines según terminan las partidas, uno por proceso, '
+                             'en lugar de un fichero por partida')
+    parser.add_argument('--event-log', action='store_true',
+                        help='Con --trace-level events, escribir las trazas en ficheros binarios de registros de '
+                             'tamaño fijo, uno por proceso (ver TraceLoader/EventLog.py)')
+    parser.add_argument('--no-games-file', dest='games_file', action='store_false',
+                        help='No escribir games.json con todas las trazas al terminar')
+    parser.add_argument('--index', action='store_true',
+                        help='Al terminar, escribir un índice de las trazas para buscar partidas sin abrirlas (ver '
+                             'TraceLoader/TraceIndex.py)')
+    parser.add_argument('--compress', default=None, choices=TraceCompression.available(),
+                        help='Comprimir los ficheros de trazas en este formato')
+    parser.add_argument('--sprt', action='store_true',
+                        help='Compara un agente candidato con uno base (se indican los 2) y para en cuanto la '
+                             'diferencia es significativa, como mucho tras -n partidas')
+    parser.add_argument('--delta', type=float, default=0.05,
+                        help='Con --sprt, mejora de la proporción de victorias (0.25 si son iguales) que se quiere '
+                             'detectar')
+    parser.add_argument('--alpha', type=float, default=0.05, help='Con --sprt, probabilidad de falso positivo')
+    parser.add_argument('--beta', type=float, default=0.05, help='Con --sprt, probabilidad de falso negativo')
+    parser.add_argument('--batch-size', type=int, default=32,
+                        help='Con --sprt, partidas que se juegan entre cada comprobación del test')
+    args = parser.parse_args(argv)
+
+    args.time_budgets = {}
+    for time_budget in args.time_budget:
+        trigger, _, seconds = time_budget.rpartition('=')
+        try:
+            args.time_budgets[trigger or AgentWatchdog.DEFAULT] = float(seconds)
+        except ValueError:
+            parser.error('Tiempo no válido: ' + time_budget)
+
+    if args.event_log and args.trace_level != TraceLevelConstants.EVENTS:
+        parser.error('--event-log necesita --trace-level events')
+    if args.index and (args.trace_level == TraceLevelConstants.NONE or args.event_log):
+        parser.error('--index necesita trazas en JSON (--trace-level summary, full o events, sin --event-log)')
+    if args.sprt:
+        if len(args.agents) != 2 or args.league or args.queue:
+            parser.error('Con --sprt hay que indicar 2 agentes, el candidato y el base, y no se puede usar --league '
+                         'ni --queue')
+    elif args.league:
+        if len(args.agents) < 4 or len(set(args.agents)) != len(args.agents):
+            parser.error('En la liga hay que indicar 4 o más agentes distintos')
+    elif len(args.agents) == 0:
+        args.agents = ['RandomAgent.RandomAgent'] * 4
+    elif len(args.agents) == 1:
+        args.agents = args.agents * 4
+    elif len(args.agents) != 4:
+        parser.error('Hay que indicar 1 o 4 agentes')
+    if args.games < 1:
+        parser.error('Invalid quantity')
+    if not 0 <= args.seed < SEED_LIMIT:
+        parser.error('La semilla base debe estar entre 0 y ' + str(SEED_LIMIT - 1))
+    return args
+
+
+def percentage(rate):
+    return str(round(rate * 100, 1)) + '%'
+
+
+def print_league(stats):
+    """
+    Muestra la tasa de victorias de cada agente, en total y en cada asiento, y la de cada asiento
+    :param stats: dict. Estadísticas de LeagueScheduler.aggregate
+    :return: None
+    """
+    confidence = percentage(stats['confidence'])
+    for agent, name in enumerate(stats['agents']):
+        low, high = stats['win_rate_intervals'][agent]
+        print(name + ': ' + str(stats['wins'][agent]) + '/' + str(stats['games_played'][agent]) + ' wins (' +
+              percentage(stats['win_rates'][agent]) + ', ' + confidence + ' CI ' + percentage(low) + '-' +
+              percentage(high) + ') | by seat: ' +
+              ' '.join('P' + str(seat) + ' ' + percentage(rate)
+                       for seat, rate in enumerate(stats['agent_seat_win_rates'][agent])) +
+              ' | average latency: ' + str(round(stats['average_latency'][agent] * 1000, 3)) + ' ms')
+    for seat in range(4):
+        low, high = stats['seat_win_rate_intervals'][seat]
+        print('Seat P' + str(seat) + ': ' + str(stats['seat_wins'][seat]) + ' wins (' +
+              percentage(stats['seat_win_rates'][seat]) + ', ' + confidence + ' CI ' + percentage(low) + '-' +
+              percentage(high) + ')')
+    print('No winner: ' + str(stats['no_winner']) + ' | Average rounds: ' + str(round(stats['average_rounds'], 1)))
+    return
+
+
+def print_sequential(stats):
+    """
+    Muestra el resultado del test secuencial
+    :param stats: dict. Estadísticas de SequentialTournament.aggregate
+    :return: None
+    """
+    candidate, baseline = stats['agents']
+    low, high = stats['win_rate_interval']
+    print(candidate + ' vs ' + baseline + ': ' + stats['result'] + ' | ' + str(stats['wins']) + '/' +
+          str(stats['decided_games']) + ' wins (' + percentage(stats['win_rate']) + ', CI ' + percentage(low) + '-' +
+          percentage(high) + ') | LLR ' + str(round(stats['llr'], 2)) + ' in [' + str(round(stats['lower_bound'], 2)) +
+          ', ' + str(round(stats['upper_bound'], 2)) + ']')
+    print('Candidate wins by seat: ' + ' '.join('P' + str(seat) + ' ' + str(wins)
+                                                for seat, wins in enumerate(stats['seat_wins'])) +
+          ' | No winner: ' + str(stats['no_winner']) + ' | Fixed-size test: ' + str(stats['fixed_sample_games']) +
+          ' decided games')
+    return
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    runner_args = dict(base_seed=args.seed, workers=args.workers, trace_level=args.trace_level,
+                       max_rounds=args.max_rounds, executor=args.executor, time_budgets=args.time_budgets or None,
+                       sandbox=args.sandbox, queue=args.queue, stale_timeout=args.stale_timeout,
+                       max_attempts=args.max_attempts, results_path=args.results, stream_traces=args.stream_traces,
+                       compression=args.compress, event_log=args.event_log,
+                       games_file=args.games_file, index=args.index)
+    if args.sprt:
+        runner = SequentialTournament(args.agents[0], args.agents[1], args.games, delta=args.delta, alpha=args.alpha,
+                                      beta=args.beta, batch_size=args.batch_size, **runner_args)
+    elif args.league:
+        runner = LeagueScheduler(args.agents, args.games, seat_orders=args.seat_orders, **runner_args)
     else:
-        print('......')
-        print('Invalid quantity')
+        runner = TournamentRunner(args.agents, args.games, **runner_args)
+    output = open(args.output, 'w') if args.output else None
+
+    def on_result(summary):
+        if output is not None:
+            output.write(json.dumps(summary) + '\n')
+        if not args.quiet:
+            print('Game (' + str(summary['game_number']) + ') winner: P' + str(summary['winner']) +
+                  ' | victory points: ' + str(summary['victory_points']) + ' | rounds: ' + str(summary['rounds']) +
+                  (' (maximum number of rounds reached)' if summary['max_rounds_reached'] else ''))
+
+    try:
+        stats = runner.run(on_result)
+    finally:
+        if output is not None:
+            output.close()
+
     print('------------------------')
-    game_director.trace_loader.export_every_game_to_file()
-    return
+    print(str(stats['games']) + ' games in ' + str(round(stats['elapsed'], 2)) + ' s (' +
+          str(round(stats['games_per_second'], 2)) + ' games/s, ' + str(runner.workers) + ' ' + runner.executor +
+          ' workers)')
+    if runner.failed_games:
+        print(str(runner.failed_games) + ' games failed ' + str(args.max_attempts) + ' times and were skipped (see '
+              'the error column of ' + args.queue + ')')
+    if args.sprt:
+        print_sequential(stats)
+        return stats
+    if args.league:
+        print_league(stats)
+        return stats
+    for player in range(4):
+        print('P' + str(player) + ' (' + stats['agents'][player] + '): ' + str(stats['wins'][player]) + ' wins (' +
+              str(round(stats['win_rates'][player] * 100, 1)) + '%) | average latency: ' +
+              str(round(stats['average_latency'][player] * 1000, 3)) + ' ms | timeouts: ' +
+              str(stats['timeouts'][player]))
+    print('No winner: ' + str(stats['no_winner']) + ' | Average rounds: ' + str(round(stats['average_rounds'], 1)))
+    if runner.trace_path is not None:
+        print('Traces: ' + runner.trace_path)
+    return stats
 
 
 if __name__ == '__main__':